@@ -16,7 +16,8 @@
 # https://creativecommons.org/licenses/by/4.0/legalcode
 import datetime
 import os
-from typing import Any, Dict, Optional, cast
+import threading
+from typing import Any, Dict, List, Optional, cast
 
 import structlog
 from flask import Flask
@@ -32,12 +33,68 @@ ENVVAR_JOB_ID = "DIOPTRA_RQ_JOB_ID"
 
 LOGGER: BoundLogger = structlog.stdlib.get_logger()
 
+# Flask apps used for database access, by REST API environment.  Creating an
+# app registers the whole REST API, which is far slower than the queries
+# clients make, so each process creates one app per environment and reuses
+# it, along with its pool of database connections.
+_APPS: Dict[Optional[str], Flask] = {}
+_APPS_LOCK = threading.Lock()
+
+# Apps inherited from a parent process whose pools couldn't be disposed of
+# without closing the parent's connections; kept so they are never collected.
+_INHERITED_APPS: List[Flask] = []
+
+
+def _get_app(env: Optional[str]) -> Flask:
+    """
+    Get the app used for database access in the given REST API environment,
+    creating it on first use.
+
+    Args:
+        env: The REST API configuration environment, or None for the default
+
+    Returns:
+        A Flask app
+    """
+    with _APPS_LOCK:
+        app = _APPS.get(env)
+
+        if app is None:
+            app = create_app(env=env)
+            _APPS[env] = app
+
+    return app
+
+
+def _forget_apps_after_fork() -> None:
+    """
+    Forget the apps inherited from a parent process, e.g. in an RQ work horse.
+    Their pooled connections belong to the parent, so the child must neither
+    use nor close them.
+    """
+    global _APPS_LOCK
+    _APPS_LOCK = threading.Lock()
+
+    for app in _APPS.values():
+        with app.app_context():
+            try:
+                db.engine.dispose(close=False)
+
+            except TypeError:
+                # SQLAlchemy < 1.4.33 can only dispose of a pool by closing
+                # its connections.
+                _INHERITED_APPS.append(app)
+
+    _APPS.clear()
+
+
+os.register_at_fork(after_in_child=_forget_apps_after_fork)
+
 
 class DioptraDatabaseClient(object):
     @property
     def app(self) -> Flask:
-        app = create_app(env=self.restapi_env)
-        return app
+        return _get_app(self.restapi_env)
 
     @property
     def job_id(self) -> Optional[str]:
@@ -61,6 +118,7 @@ class DioptraDatabaseClient(object):
                 "queue": job.queue.name,
                 "depends_on": job.depends_on,
                 "timeout": job.timeout,
+                "mlflow_run_id": job.mlflow_run_id,
             }
 
     def update_active_job_status(self, status: str) -> None:
@@ -106,6 +164,38 @@ class DioptraDatabaseClient(object):
                 db.session.rollback()
                 raise
 
+    def start_job(self, job_id: str, run_id: str) -> Dict[str, Any]:
+        """
+        Associate a job with its MLflow run and mark it started, in a single
+        transaction.
+
+        Args:
+            job_id: The ID of the job
+            run_id: The ID of the job's MLflow run
+
+        Returns:
+            The job's details, as returned by get_job()
+        """
+        LOGGER.info(f"=== Starting job with ID '{job_id}' in MLFlow run {run_id} ===")
+
+        with self.app.app_context():
+            job: Job = Job.query.get(job_id)
+            job.update(changes={"mlflow_run_id": run_id, "status": "started"})
+
+            try:
+                db.session.commit()
+
+            except IntegrityError:
+                db.session.rollback()
+                raise
+
+            return {
+                "job_id": job.job_id,
+                "queue": job.queue.name,
+                "depends_on": job.depends_on,
+                "timeout": job.timeout,
+            }
+
     def create_job(self, job_id: str, experiment_id: int) -> None:
         timestamp = datetime.datetime.now()
 
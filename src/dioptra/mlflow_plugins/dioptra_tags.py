@@ -17,3 +17,5 @@
 DIOPTRA_DEPENDS_ON = "dioptra.dependsOn"
 DIOPTRA_JOB_ID = "dioptra.jobId"
 DIOPTRA_QUEUE = "dioptra.queue"
+DIOPTRA_RESUMED_FROM_JOB_ID = "dioptra.resumedFromJobId"
+DIOPTRA_RESUMED_FROM_RUN_ID = "dioptra.resumedFromRunId"
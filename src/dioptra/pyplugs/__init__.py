@@ -54,6 +54,7 @@ from __future__ import annotations
 from collections import namedtuple as _namedtuple
 from datetime import date as _date
 
+from ._manifest import *  # noqa
 from ._plugins import *  # noqa
 
 __url__ = "https://pages.nist.gov/dioptra"
@@ -0,0 +1,357 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+"""A manifest index of plug-ins, for listing them without importing them
+
+A manifest is a JSON file in a plug-in package's directory which records, for
+each plug-in module in the package, the registered functions with their
+docstrings and sort values, and a hash of the module's source.  It is built by
+statically analyzing the source, so building it imports nothing either.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import textwrap
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import structlog
+from structlog.stdlib import BoundLogger
+
+LOGGER: BoundLogger = structlog.stdlib.get_logger()
+
+MANIFEST_FILENAME = "_pyplugs_manifest.json"
+MANIFEST_VERSION = 1
+
+
+class ManifestFunc(NamedTuple):
+    """Information about one plug-in function, from a manifest"""
+
+    func_name: str
+    description: str
+    doc: str
+    sort_value: float
+
+
+class ManifestPlugin(NamedTuple):
+    """Information about one plug-in module, from a manifest"""
+
+    source_hash: str
+    module_doc: str
+    funcs: List[ManifestFunc]
+
+
+# Manifest entries which have been checked against plug-in sources, keyed by
+# (package, plugin).  None means the plug-in must be imported to learn about it.
+_VERIFIED: Dict[Tuple[str, str], Optional[ManifestPlugin]] = {}
+
+
+def _hash_source(source: bytes) -> str:
+    """Compute the hash recorded for plug-in module source code"""
+    return hashlib.sha256(source).hexdigest()
+
+
+class _RegisterNames(NamedTuple):
+    """The names under which a module refers to pyplugs and pyplugs.register"""
+
+    module_names: List[str]
+    register_names: List[str]
+
+
+def _is_register(node: ast.AST, names: _RegisterNames) -> bool:
+    """Check whether an expression refers to pyplugs.register"""
+    if isinstance(node, ast.Name):
+        return node.id in names.register_names
+
+    return (
+        isinstance(node, ast.Attribute)
+        and node.attr == "register"
+        and ast.unparse(node.value) in names.module_names
+    )
+
+
+def _is_maybe_register(node: ast.AST, names: _RegisterNames) -> bool:
+    """Check whether an expression might refer to pyplugs.register, e.g. via
+    a name bound in a way the static analysis doesn't follow"""
+    return _is_register(node, names) or (
+        isinstance(node, ast.Attribute) and node.attr == "register"
+    )
+
+
+def _get_register_names(tree: ast.Module) -> _RegisterNames:
+    """Find local names bound to pyplugs and pyplugs.register by imports in a
+    module"""
+    module_names = ["pyplugs", "dioptra.pyplugs"]
+    register_names = []
+
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            module_names.extend(
+                alias.asname
+                for alias in node.names
+                if alias.name == "dioptra.pyplugs" and alias.asname
+            )
+
+        elif isinstance(node, ast.ImportFrom) and node.module == "dioptra":
+            module_names.extend(
+                alias.asname
+                for alias in node.names
+                if alias.name == "pyplugs" and alias.asname
+            )
+
+        elif isinstance(node, ast.ImportFrom) and node.module == "dioptra.pyplugs":
+            register_names.extend(
+                alias.asname or alias.name
+                for alias in node.names
+                if alias.name == "register"
+            )
+
+    return _RegisterNames(module_names, register_names)
+
+
+def _get_sort_value(decorator: ast.expr, register_names: _RegisterNames) -> float:
+    """Get the sort value of a pyplugs.register decorator
+
+    Raises:
+        ValueError: If the decorator is not pyplugs.register, or its sort
+            value is not a literal
+    """
+    if _is_register(decorator, register_names):
+        return 0
+
+    if (
+        isinstance(decorator, ast.Call)
+        and _is_register(decorator.func, register_names)
+        and not decorator.args
+        and all(keyword.arg == "sort_value" for keyword in decorator.keywords)
+    ):
+        if not decorator.keywords:
+            return 0
+
+        return ast.literal_eval(decorator.keywords[0].value)
+
+    raise ValueError("Not a plug-in registration")
+
+
+def _dedent_doc(doc: str) -> str:
+    """Dedent the long part of a docstring the way pyplugs.register does"""
+    return textwrap.dedent(doc).strip()
+
+
+def scan_plugin_source(source: bytes) -> Optional[ManifestPlugin]:
+    """Find the plug-in functions defined in plug-in module source code
+
+    Only module-level functions decorated with pyplugs.register are
+    recognized.  If pyplugs.register is used in any other way, or might be
+    (e.g. any other ".register" attribute), or no plug-ins are found, the
+    plug-ins can't be determined without importing the module, and None is
+    returned.
+    """
+    tree = ast.parse(source)
+    register_names = _get_register_names(tree)
+
+    funcs = []
+    registrations = set()
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+
+        for decorator in node.decorator_list:
+            try:
+                sort_value = _get_sort_value(decorator, register_names)
+            except ValueError:
+                continue
+
+            description, _, doc = (
+                ast.get_docstring(node, clean=False) or ""
+            ).partition("\n\n")
+            funcs.append(
+                ManifestFunc(
+                    func_name=node.name,
+                    description=description,
+                    doc=_dedent_doc(doc),
+                    sort_value=sort_value,
+                )
+            )
+            registrations.update(id(sub_node) for sub_node in ast.walk(decorator))
+            break
+
+    # Any other use of pyplugs.register, e.g. calling it directly or via a
+    # name bound some other way, means static analysis is not enough.
+    for node in ast.walk(tree):
+        if id(node) not in registrations and _is_maybe_register(node, register_names):
+            return None
+
+    # Likewise if no registrations were recognized at all; the module can't be
+    # a plug-in unless it registers something some other way.
+    if not funcs:
+        return None
+
+    return ManifestPlugin(
+        source_hash=_hash_source(source),
+        module_doc=ast.get_docstring(tree, clean=False) or "",
+        funcs=funcs,
+    )
+
+
+def build_manifest(package_dir: str | os.PathLike) -> Dict[str, ManifestPlugin]:
+    """Build a manifest of the plug-in modules in a package directory"""
+    manifest = {}
+
+    for path in sorted(Path(package_dir).glob("*.py")):
+        if path.name.startswith("_"):
+            continue
+
+        try:
+            manifest_plugin = scan_plugin_source(path.read_bytes())
+
+        except (OSError, SyntaxError, ValueError) as err:
+            LOGGER.warning("Unable to scan plug-in", path=str(path), error=str(err))
+            continue
+
+        if manifest_plugin is not None:
+            manifest[path.stem] = manifest_plugin
+
+    return manifest
+
+
+def write_manifests(root_dir: str | os.PathLike) -> int:
+    """Write manifests for all plug-in packages under a directory
+
+    This should be done whenever the plug-ins in the directory change, e.g.
+    after they are downloaded.  Stale manifest entries are detected and
+    ignored, so this is an optimization rather than a requirement.
+
+    Returns:
+        The number of manifests written
+    """
+    num_written = 0
+
+    for dir_path, dir_names, file_names in os.walk(root_dir):
+        dir_names[:] = [name for name in dir_names if not name.startswith("_")]
+
+        if not any(
+            name.endswith(".py") and not name.startswith("_") for name in file_names
+        ):
+            continue
+
+        manifest = build_manifest(dir_path)
+        manifest_json = {
+            "version": MANIFEST_VERSION,
+            "plugins": {
+                plugin_name: {
+                    "source_hash": manifest_plugin.source_hash,
+                    "module_doc": manifest_plugin.module_doc,
+                    "funcs": [func._asdict() for func in manifest_plugin.funcs],
+                }
+                for plugin_name, manifest_plugin in manifest.items()
+            },
+        }
+
+        Path(dir_path, MANIFEST_FILENAME).write_text(
+            json.dumps(manifest_json, indent=2), encoding="utf-8"
+        )
+        num_written += 1
+
+    _VERIFIED.clear()
+
+    return num_written
+
+
+def _get_package_dirs(package: str) -> List[str]:
+    """Find the directories of a package, importing only the package itself"""
+    try:
+        spec = importlib.util.find_spec(package)
+
+    except (ImportError, ValueError):
+        return []
+
+    if spec is None or not spec.submodule_search_locations:
+        return []
+
+    return list(spec.submodule_search_locations)
+
+
+def _read_manifest_plugin(package_dir: str, plugin: str) -> Optional[ManifestPlugin]:
+    """Read one plug-in's manifest entry from a package directory"""
+    try:
+        manifest_json = json.loads(
+            Path(package_dir, MANIFEST_FILENAME).read_text(encoding="utf-8")
+        )
+
+    except (OSError, ValueError):
+        return None
+
+    if manifest_json.get("version") != MANIFEST_VERSION:
+        return None
+
+    plugin_json = manifest_json["plugins"].get(plugin)
+    if plugin_json is None:
+        return None
+
+    return ManifestPlugin(
+        source_hash=plugin_json["source_hash"],
+        module_doc=plugin_json["module_doc"],
+        funcs=[ManifestFunc(**func_json) for func_json in plugin_json["funcs"]],
+    )
+
+
+def lookup(package: str, plugin: str) -> Optional[ManifestPlugin]:
+    """Look up a plug-in in the manifest of its package
+
+    The entry is only returned if it is up to date with the plug-in's source.
+
+    Returns:
+        The manifest entry, or None if the plug-in must be imported to learn
+        about it
+    """
+    key = (package, plugin)
+    if key in _VERIFIED:
+        return _VERIFIED[key]
+
+    manifest_plugin = None
+    for package_dir in _get_package_dirs(package):
+        source_path = Path(package_dir, plugin + ".py")
+        if not source_path.is_file():
+            continue
+
+        manifest_plugin = _read_manifest_plugin(package_dir, plugin)
+
+        if manifest_plugin is not None:
+            try:
+                source_hash = _hash_source(source_path.read_bytes())
+            except OSError:
+                source_hash = None
+
+            if source_hash != manifest_plugin.source_hash:
+                LOGGER.debug(
+                    "Stale plug-in manifest entry", package=package, plugin=plugin
+                )
+                manifest_plugin = None
+
+        break
+
+    _VERIFIED[key] = manifest_plugin
+
+    return manifest_plugin
+
+
+__all__ = ["build_manifest", "write_manifests"]
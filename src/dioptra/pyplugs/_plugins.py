@@ -53,6 +53,7 @@ from typing import (
     Callable,
     Dict,
     List,
+    Mapping,
     NamedTuple,
     Optional,
     TypeVar,
@@ -72,6 +73,8 @@ from dioptra.sdk.exceptions import (
 )
 from dioptra.sdk.utilities.decorators import require_package
 
+from . import _manifest
+
 LOGGER: BoundLogger = structlog.stdlib.get_logger()
 
 
@@ -186,34 +189,121 @@ def task_nout(nout: int) -> Callable[[Plugin], NoutPlugin]:
     return decorator
 
 
-def names(package: str) -> List[str]:
-    """List all plug-ins in one package"""
-    _import_all(package)
+class _LazyPlugin:
+    """A stand-in for a plug-in function known from a manifest, which imports
+    the plug-in when first called"""
 
-    return sorted(_PLUGINS[package].keys(), key=lambda p: info(package, p).sort_value)
+    def __init__(self, package: str, plugin: str, func_name: str, doc: str) -> None:
+        self._package = package
+        self._plugin = plugin
+        self.__name__ = self.__qualname__ = func_name
+        self.__module__ = f"{package}.{plugin}" if package else plugin
+        self.__doc__ = doc
 
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return get(self._package, self._plugin, self.__name__)(*args, **kwargs)
 
-def funcs(package: str, plugin: str) -> List[str]:
-    """List all functions in one plug-in"""
-    _import(package, plugin)
-    plugin_info = _PLUGINS[package][plugin]
+    def __repr__(self) -> str:
+        return f"<lazy plug-in {self.__module__}.{self.__name__}>"
 
-    return list(plugin_info.keys())
 
+def _manifest_info(package: str, plugin: str) -> Optional[Dict[str, PluginInfo]]:
+    """Get information about a plug-in which has not been imported, from the
+    manifest of its package, if it has an up to date one"""
+    manifest_plugin = _manifest.lookup(package, plugin)
+    if manifest_plugin is None:
+        return None
 
-def info(package: str, plugin: str, func: Optional[str] = None) -> PluginInfo:
-    """Get information about a plug-in"""
-    _import(package, plugin)
+    return {
+        manifest_func.func_name: PluginInfo(
+            package_name=package,
+            plugin_name=plugin,
+            func_name=manifest_func.func_name,
+            func=_LazyPlugin(
+                package,
+                plugin,
+                manifest_func.func_name,
+                "\n\n".join(
+                    filter(None, [manifest_func.description, manifest_func.doc])
+                ),
+            ),
+            description=manifest_func.description,
+            doc=manifest_func.doc,
+            module_doc=manifest_plugin.module_doc,
+            sort_value=manifest_func.sort_value,
+        )
+        for manifest_func in manifest_plugin.funcs
+    }
 
-    try:
+
+def _plugin_info(package: str, plugin: str) -> Mapping[str, PluginInfo]:
+    """Get information about the functions of a plug-in, from the plug-in
+    itself if it has been imported, else from a manifest if possible, else by
+    importing it"""
+    if package in _PLUGINS and plugin in _PLUGINS[package]:
         plugin_info = _PLUGINS[package][plugin]
 
-    except KeyError as exc:
+    else:
+        plugin_info = _manifest_info(package, plugin)
+
+        if plugin_info is None:
+            _import(package, plugin)
+            plugin_info = _PLUGINS.get(package, {}).get(plugin)
+
+    if not plugin_info:
         raise UnknownPluginError(
             f"Could not find any plug-in named {plugin!r} inside {package!r}. "
             "Use pyplugs.register to register functions as plug-ins"
-        ) from exc
+        )
+
+    return plugin_info
+
+
+def names(package: str) -> List[str]:
+    """List all plug-ins in one package"""
+    sort_values = {}
 
+    for plugin in _list_plugins(package):
+        try:
+            plugin_info = _plugin_info(package, plugin)
+
+        except (ImportError, UnknownPluginError):
+            continue  # Don't let errors in one plugin, affect the others
+
+        sort_values[plugin] = next(iter(plugin_info.values())).sort_value
+
+    # Include plug-ins registered in the package without a module of their own
+    for plugin, plugin_info in _PLUGINS[package].items():
+        if plugin not in sort_values and plugin_info:
+            sort_values[plugin] = next(iter(plugin_info.values())).sort_value
+
+    return sorted(sort_values, key=sort_values.__getitem__)
+
+
+def funcs(package: str, plugin: str) -> List[str]:
+    """List all functions in one plug-in"""
+    return list(_plugin_info(package, plugin).keys())
+
+
+def info(package: str, plugin: str, func: Optional[str] = None) -> PluginInfo:
+    """Get information about a plug-in
+
+    If the plug-in has not been imported, the information may come from a
+    manifest instead, in which case the plug-in is imported when its function
+    is first called.  Use get() to get the plug-in function itself.
+    """
+    plugin_info = _plugin_info(package, plugin)
+
+    return _func_info(package, plugin, plugin_info, func)
+
+
+def _func_info(
+    package: str,
+    plugin: str,
+    plugin_info: Mapping[str, PluginInfo],
+    func: Optional[str] = None,
+) -> PluginInfo:
+    """Get information about one function of a plug-in"""
     func = next(iter(plugin_info.keys())) if func is None else func
 
     try:
@@ -231,6 +321,10 @@ def exists(package: str, plugin: str) -> bool:
     if package in _PLUGINS and plugin in _PLUGINS[package]:
         return True
 
+    manifest_plugin = _manifest.lookup(package, plugin)
+    if manifest_plugin is not None:
+        return bool(manifest_plugin.funcs)
+
     try:
         _import(package, plugin)
 
@@ -242,7 +336,9 @@ def exists(package: str, plugin: str) -> bool:
 
 
 def get(package: str, plugin: str, func: Optional[str] = None) -> Plugin:
-    """Get a given plugin"""
+    """Get a given plugin, importing it if necessary"""
+    _import(package, plugin)
+
     return info(package, plugin, func).func
 
 
@@ -258,7 +354,7 @@ def call(
 @require_package("prefect", exc_type=PrefectDependencyError)
 def get_task(package: str, plugin: str, func: Optional[str] = None) -> FunctionTask:
     """Get a given plugin wrapped as a prefect task"""
-    plugin_func: Union[Plugin, NoutPlugin] = info(package, plugin, func).func
+    plugin_func: Union[Plugin, NoutPlugin] = get(package, plugin, func)
     nout: Optional[int] = getattr(plugin_func, "_task_nout", None)
 
     return task(nout=nout)(plugin_func)
@@ -305,8 +401,8 @@ def _import(package: str, plugin: str) -> None:
         raise
 
 
-def _import_all(package: str) -> None:
-    """Import all plugins in a package"""
+def _list_plugins(package: str) -> List[str]:
+    """List the plugin modules in a package, without importing them"""
     try:
         all_resources = resources.contents(package)
 
@@ -317,11 +413,14 @@ def _import_all(package: str) -> None:
     _PLUGINS.setdefault(package, {})
 
     # Loop through all Python files in the directories of the package
-    plugins = [
+    return [
         r[:-3] for r in all_resources if r.endswith(".py") and not r.startswith("_")
     ]
 
-    for plugin in plugins:
+
+def _import_all(package: str) -> None:
+    """Import all plugins in a package"""
+    for plugin in _list_plugins(package):
         try:
             _import(package, plugin)
 
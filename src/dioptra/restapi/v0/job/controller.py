@@ -35,6 +35,7 @@ from .schema import (
     JobBaseSchema,
     JobMutableFieldsSchema,
     JobNewTaskEngineSchema,
+    JobNewTaskEngineSweepSchema,
     JobSchema,
 )
 from .service import JobNewTaskEngineService, JobService
@@ -170,5 +171,43 @@ class JobNewTaskEngineResource(Resource):
             global_parameters=parsed_obj.get("globalParameters"),
             timeout=parsed_obj.get("timeout"),
             depends_on=parsed_obj.get("dependsOn"),
+            resume_from_job_id=parsed_obj.get("resumeFromJobId"),
+            log=log,
+        )
+
+
+@api.route("/newTaskEngineSweep")
+class JobNewTaskEngineSweepResource(Resource):
+    """Lets you POST to create new parameter sweep jobs using the new declarative
+    task engine."""
+
+    @inject
+    def __init__(
+        self, job_new_task_engine_service: JobNewTaskEngineService, *args, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self._job_new_task_engine_service = job_new_task_engine_service
+
+    @login_required
+    @accepts(schema=JobNewTaskEngineSweepSchema, api=api)
+    @responds(schema=JobSchema, api=api)
+    def post(self) -> Job:
+        """Creates a new parameter sweep job using the new declarative task
+        engine."""
+        log: BoundLogger = LOGGER.new(
+            request_id=str(uuid.uuid4()),
+            resource="job/newTaskEngineSweep",
+            request_type="POST",
+        )  # noqa: F841
+        parsed_obj = request.parsed_obj  # type: ignore
+        log.info("Request received")
+        return self._job_new_task_engine_service.create(
+            queue_name=parsed_obj["queue"],
+            experiment_name=parsed_obj["experimentName"],
+            experiment_description=parsed_obj["experimentDescription"],
+            global_parameters=parsed_obj.get("globalParameters"),
+            timeout=parsed_obj.get("timeout"),
+            depends_on=parsed_obj.get("dependsOn"),
+            parameter_grid=parsed_obj["parameterGrid"],
             log=log,
         )
@@ -19,6 +19,8 @@ from __future__ import annotations
 
 from flask_restx import Api
 
+from dioptra.sdk.exceptions.task_engine import InvalidParameterGridError
+
 
 class JobDoesNotExistError(Exception):
     """The requested job does not exist."""
@@ -36,6 +38,11 @@ class InvalidExperimentDescriptionError(Exception):
     """The experiment description failed validation."""
 
 
+class InvalidResumeJobError(Exception):
+    """The job to resume does not exist, did not fail, or belongs to another
+    experiment."""
+
+
 def register_error_handlers(api: Api) -> None:
     @api.errorhandler(JobDoesNotExistError)
     def handle_job_does_not_exist_error(error):
@@ -65,3 +72,24 @@ def register_error_handlers(api: Api) -> None:
     @api.errorhandler(InvalidExperimentDescriptionError)
     def handle_invalid_experiment_description_error(error):
         return {"message": "The experiment description is invalid!"}, 400
+
+    @api.errorhandler(InvalidResumeJobError)
+    def handle_invalid_resume_job_error(error):
+        return (
+            {
+                "message": "Bad Request - Only a failed job of the same "
+                "experiment may be resumed."
+            },
+            400,
+        )
+
+    @api.errorhandler(InvalidParameterGridError)
+    def handle_invalid_parameter_grid_error(error):
+        return (
+            {
+                "message": "Bad Request - The parameter grid may only contain "
+                "global parameters defined by the experiment description, each "
+                "with a non-empty list of values."
+            },
+            400,
+        )
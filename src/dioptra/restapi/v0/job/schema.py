@@ -174,3 +174,31 @@ class JobNewTaskEngineSchema(Schema):
             " available.",
         },
     )
+    resumeFromJobId = fields.String(
+        metadata={
+            "description": "The UUID of a failed job of the same experiment to"
+            " resume.  Steps which completed in that job are restored from"
+            " checkpoints instead of being run again, if the worker"
+            " checkpoints step outputs.  The new job has its own MLflow run,"
+            " tagged with the failed job's ID and MLflow run ID.  Parameter"
+            " sweeps can't be resumed.",
+        },
+    )
+
+
+class JobNewTaskEngineSweepSchema(JobNewTaskEngineSchema):
+    class Meta:
+        # Parameter sweeps aren't checkpointed, so can't be resumed.
+        exclude = ("resumeFromJobId",)
+
+    parameterGrid = fields.Dict(
+        keys=fields.String(),
+        values=fields.List(fields.Raw(), validate=validate.Length(min=1)),
+        required=True,
+        metadata={
+            "description": "A mapping from global parameter name to a list of"
+            " values to sweep over.  The experiment is run once for every"
+            " combination of values, sharing the results of steps which don't"
+            " depend on any swept parameter.",
+        },
+    )
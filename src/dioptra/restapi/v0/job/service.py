@@ -21,7 +21,7 @@ import datetime
 import json
 import uuid
 from pathlib import Path
-from typing import Any, Mapping, cast
+from typing import Any, Mapping, Sequence, cast
 
 import structlog
 from injector import inject
@@ -35,11 +35,15 @@ from dioptra.restapi.v0.experiment.service import ExperimentNameService
 from dioptra.restapi.v0.queue.service import QueueNameService
 from dioptra.restapi.v0.shared.rq.service import RQService
 from dioptra.restapi.v0.shared.s3.service import S3Service
-from dioptra.task_engine.validation import is_valid
+from dioptra.sdk.exceptions.task_engine import InvalidParameterGridError
+from dioptra.task_engine.sweep import validate_parameter_grid
+from dioptra.task_engine.validation_cache import get_validation_cache
 
 from .errors import (
     InvalidExperimentDescriptionError,
+    InvalidResumeJobError,
     JobDoesNotExistError,
+    JobSubmissionError,
     JobWorkflowUploadError,
 )
 
@@ -254,6 +258,8 @@ class JobNewTaskEngineService(object):
         global_parameters: Mapping[str, Any] | None = None,
         timeout: str | None = None,
         depends_on: str | None = None,
+        resume_from_job_id: str | None = None,
+        parameter_grid: Mapping[str, Sequence[Any]] | None = None,
         **kwargs,
     ) -> Job:
         """Submit a task engine job.
@@ -266,12 +272,25 @@ class JobNewTaskEngineService(object):
                 None.
             timeout: The maximum execution time for the job. Defaults to None.
             depends_on: A comma-separated string of job dependencies. Defaults to None.
+            resume_from_job_id: The ID of a failed job of the same experiment whose
+                completed steps are restored from checkpoints instead of being run
+                again. Defaults to None.
+            parameter_grid: A mapping from global parameter name to a list of values.
+                If given, the job runs the experiment as a parameter sweep over every
+                combination of values. Defaults to None.
 
         Returns:
             The newly created job object.
 
         Raises:
             InvalidExperimentDescriptionError: If the experiment description is invalid.
+            InvalidParameterGridError: If the parameter grid refers to parameters the
+                experiment description doesn't define, or gives no values for a
+                parameter.
+            InvalidResumeJobError: If the job to resume does not exist, did not fail,
+                or belongs to a different experiment.
+            JobSubmissionError: If both a job to resume and a parameter grid are
+                given, since parameter sweeps can't be resumed.
         """
         log: BoundLogger = kwargs.get("log", LOGGER.new())
         experiment = cast(
@@ -287,9 +306,38 @@ class JobNewTaskEngineService(object):
             ),
         )
 
-        if not is_valid(experiment_description):
+        validated_digest = get_validation_cache().get_valid_digest(
+            experiment_description, self._rq_service.redis
+        )
+
+        if validated_digest is None:
             raise InvalidExperimentDescriptionError
 
+        if parameter_grid is not None:
+            try:
+                validate_parameter_grid(
+                    experiment_description.get("parameters", {}), parameter_grid
+                )
+
+            except InvalidParameterGridError as e:
+                log.error("Parameter grid is invalid", parameters=e.parameter_names)
+                raise
+
+        if resume_from_job_id is not None:
+            if parameter_grid is not None:
+                log.error("Parameter sweeps can't be resumed")
+                raise JobSubmissionError
+
+            resumed_job = Job.query.filter_by(job_id=resume_from_job_id).first()
+
+            if (
+                resumed_job is None
+                or resumed_job.status != "failed"
+                or resumed_job.experiment_id != experiment.experiment_id
+            ):
+                log.error("Job can't be resumed", resume_from_job_id=resume_from_job_id)
+                raise InvalidResumeJobError
+
         job_id = str(uuid.uuid4())
         timestamp = datetime.datetime.now()
         new_job = Job(
@@ -315,6 +363,9 @@ class JobNewTaskEngineService(object):
             global_parameters=global_parameters,
             depends_on=depends_on,
             timeout=timeout,
+            resume_from_job_id=resume_from_job_id,
+            parameter_grid=parameter_grid,
+            validated_digest=validated_digest,
         )
         log.info("Job submission successful", job_id=job_id)
         return new_job
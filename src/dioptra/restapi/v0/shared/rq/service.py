@@ -16,7 +16,7 @@
 # https://creativecommons.org/licenses/by/4.0/legalcode
 from __future__ import annotations
 
-from typing import Any, Mapping, Optional, Union
+from typing import Any, Mapping, Optional, Sequence, Union
 
 import structlog
 from redis import Redis
@@ -37,6 +37,10 @@ class RQService(object):
         self._run_mlflow = run_mlflow
         self._run_task_engine = run_task_engine
 
+    @property
+    def redis(self) -> Redis:
+        return self._redis
+
     def get_job_status(self, job: Job, **kwargs) -> str:
         log: BoundLogger = kwargs.get("log", LOGGER.new())
 
@@ -117,6 +121,9 @@ class RQService(object):
         global_parameters: Optional[Mapping[str, Any]] = None,
         depends_on: Optional[str] = None,
         timeout: Optional[str] = None,
+        resume_from_job_id: Optional[str] = None,
+        parameter_grid: Optional[Mapping[str, Sequence[Any]]] = None,
+        validated_digest: Optional[str] = None,
     ):
         log: BoundLogger = LOGGER.new()
 
@@ -133,6 +140,15 @@ class RQService(object):
             "global_parameters": global_parameters,
         }
 
+        if resume_from_job_id is not None:
+            cmd_kwargs["resume_from_job_id"] = resume_from_job_id
+
+        if parameter_grid is not None:
+            cmd_kwargs["parameter_grid"] = parameter_grid
+
+        if validated_digest is not None:
+            cmd_kwargs["validated_digest"] = validated_digest
+
         log.info(
             "Enqueuing job",
             function=self._run_task_engine,
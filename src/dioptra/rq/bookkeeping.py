@@ -0,0 +1,226 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+"""Job bookkeeping which is written in the background, off a job's critical path.
+
+Starting a job's run involves several round trips to the Dioptra database and
+the MLflow tracking server.  None of their results are needed to run the job,
+so a :py:class:`JobBookkeeper` coalesces them into a single database
+transaction and as few MLflow batch requests as possible, and writes them on a
+background thread while the job gets on with its work.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Mapping, Optional
+
+import structlog
+from mlflow.entities import Param, RunTag
+from mlflow.tracking import MlflowClient
+from mlflow.utils.validation import MAX_PARAMS_TAGS_PER_BATCH
+
+from dioptra.mlflow_plugins.dioptra_clients import DioptraDatabaseClient
+from dioptra.mlflow_plugins.dioptra_tags import (
+    DIOPTRA_DEPENDS_ON,
+    DIOPTRA_JOB_ID,
+    DIOPTRA_QUEUE,
+    DIOPTRA_RESUMED_FROM_JOB_ID,
+    DIOPTRA_RESUMED_FROM_RUN_ID,
+)
+
+
+def _get_logger() -> Any:
+    """
+    Get a logger for this module.
+
+    Returns:
+        A logger object
+    """
+    return structlog.get_logger(__name__)
+
+
+class JobBookkeeper(object):
+    """
+    Writes a job's bookkeeping to the Dioptra database and MLflow on a
+    background thread.
+
+    Writes are made in the order they were requested.  Nothing waits for them
+    until flush() is called, which must be done before anything which depends
+    on them, e.g. ending the job's run or updating the job's status.  Errors
+    from the background writes are logged when they happen, and raised by
+    flush().
+    """
+
+    def __init__(
+        self,
+        db_client: DioptraDatabaseClient,
+        mlflow_client: Optional[MlflowClient] = None,
+    ) -> None:
+        """
+        Initialize the bookkeeper.
+
+        Args:
+            db_client: A Dioptra database client
+            mlflow_client: An MLflow client, or None to create one for the
+                current tracking URI
+        """
+        self._db_client = db_client
+        self._mlflow_client = mlflow_client or MlflowClient()
+        # A single thread keeps the writes in order.
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="dioptra-bookkeeping"
+        )
+        self._pending: List[Future] = []
+
+    def __enter__(self) -> "JobBookkeeper":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def start_job(
+        self,
+        job_id: str,
+        run_id: str,
+        experiment_desc: Mapping[str, Any],
+        global_parameters: Mapping[str, Any],
+        resumed_from_job_id: Optional[str] = None,
+    ) -> None:
+        """
+        Record the start of a Dioptra job's run, in the background: associate
+        the MLflow run with the job and mark the job started, in a single
+        database transaction, then record the job's details, experiment, and
+        global parameters in the run.
+
+        Args:
+            job_id: The ID of the Dioptra job
+            run_id: The ID of the job's MLflow run
+            experiment_desc: A declarative experiment description, as a mapping
+            global_parameters: Global parameters for this run, as a mapping
+                from parameter name to value
+            resumed_from_job_id: The ID of the failed job this job resumes, if
+                any.  The run is tagged with that job's ID and MLflow run ID,
+                where the metrics of the steps which were not run again are
+                found.
+        """
+        # Copy the mappings, since the caller may change them while the write
+        # is pending.
+        self._submit(
+            self._write_job_start,
+            job_id,
+            run_id,
+            dict(experiment_desc),
+            dict(global_parameters),
+            resumed_from_job_id,
+        )
+
+    def flush(self) -> None:
+        """
+        Wait for all pending writes to complete.
+
+        Raises:
+            Exception: The error raised by the first pending write which
+                failed, if any
+        """
+        pending, self._pending = self._pending, []
+        error = None
+
+        for future in pending:
+            future_error = future.exception()
+
+            if error is None:
+                error = future_error
+
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """
+        Wait for all pending writes to complete, and stop the background
+        thread.  Unlike flush(), this does not raise errors from the writes;
+        they will have been logged already.
+        """
+        self._pending = []
+        self._executor.shutdown(wait=True)
+
+    def _submit(self, func: Callable[..., None], *args: Any) -> None:
+        """
+        Run a write on the background thread.
+
+        Args:
+            func: The function which does the write
+            args: Positional arguments to the function
+        """
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(_log_error)
+        self._pending.append(future)
+
+    def _write_job_start(
+        self,
+        job_id: str,
+        run_id: str,
+        experiment_desc: Mapping[str, Any],
+        global_parameters: Mapping[str, Any],
+        resumed_from_job_id: Optional[str],
+    ) -> None:
+        """
+        Write the records for the start of a Dioptra job's run.  See
+        start_job().
+        """
+        job = self._db_client.start_job(job_id, run_id)
+
+        params = [Param(key, str(value)) for key, value in global_parameters.items()]
+        tags = [
+            RunTag(DIOPTRA_JOB_ID, job_id),
+            RunTag(DIOPTRA_QUEUE, str(job.get("queue", ""))),
+            RunTag(DIOPTRA_DEPENDS_ON, str(job.get("depends_on", ""))),
+        ]
+
+        if resumed_from_job_id is not None:
+            resumed_job = self._db_client.get_job(resumed_from_job_id)
+            tags.append(RunTag(DIOPTRA_RESUMED_FROM_JOB_ID, resumed_from_job_id))
+
+            if resumed_job.get("mlflow_run_id"):
+                tags.append(
+                    RunTag(DIOPTRA_RESUMED_FROM_RUN_ID, resumed_job["mlflow_run_id"])
+                )
+
+        # MLflow bounds the number of params and tags in a batch.
+        entities: List[Any] = [*params, *tags]
+
+        for batch_start in range(0, len(entities), MAX_PARAMS_TAGS_PER_BATCH):
+            batch = entities[batch_start : batch_start + MAX_PARAMS_TAGS_PER_BATCH]
+            self._mlflow_client.log_batch(
+                run_id,
+                params=[entity for entity in batch if isinstance(entity, Param)],
+                tags=[entity for entity in batch if isinstance(entity, RunTag)],
+            )
+
+        self._mlflow_client.log_dict(run_id, experiment_desc, "experiment.yaml")
+
+
+def _log_error(future: Future) -> None:
+    """
+    Log the error from a failed background write, as soon as it happens.
+    flush() may not be called for some time, if at all.
+
+    Args:
+        future: The future for the write
+    """
+    error = future.exception()
+
+    if error is not None:
+        _get_logger().error(
+            "Job bookkeeping failed", exc_info=(type(error), error, error.__traceback__)
+        )
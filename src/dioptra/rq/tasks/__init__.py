@@ -15,6 +15,15 @@
 # ACCESS THE FULL CC BY 4.0 LICENSE HERE:
 # https://creativecommons.org/licenses/by/4.0/legalcode
 from .run_mlflow import run_mlflow_task
-from .run_task_engine import run_task_engine_task
+from .run_task_engine import (
+    finish_distributed_run_task,
+    run_task_engine_partition_task,
+    run_task_engine_task,
+)
 
-__all__ = ["run_mlflow_task", "run_task_engine_task"]
+__all__ = [
+    "finish_distributed_run_task",
+    "run_mlflow_task",
+    "run_task_engine_partition_task",
+    "run_task_engine_task",
+]
@@ -17,6 +17,7 @@
 import os
 import shlex
 import subprocess
+from contextlib import ExitStack
 from pathlib import Path
 from subprocess import CompletedProcess
 from tempfile import TemporaryDirectory
@@ -29,8 +30,9 @@ from rq.job import Job as RQJob
 from rq.job import get_current_job
 from structlog.stdlib import BoundLogger
 
+from dioptra import pyplugs
 from dioptra.sdk.utilities.s3.uri import s3_uri_to_bucket_prefix
-from dioptra.worker.s3_download import s3_download
+from dioptra.worker.s3_download import s3_download, s3_snapshot, s3_sync
 
 LOGGER: BoundLogger = structlog.stdlib.get_logger()
 
@@ -65,6 +67,8 @@ def run_mlflow_task(
     dioptra_plugins_s3_uri = os.getenv("DIOPTRA_PLUGINS_S3_URI")
     dioptra_custom_plugins_s3_uri = os.getenv("DIOPTRA_CUSTOM_PLUGINS_S3_URI")
     dioptra_plugin_dir = os.getenv("DIOPTRA_PLUGIN_DIR")
+    dioptra_plugin_snapshot_dir = os.getenv("DIOPTRA_PLUGIN_SNAPSHOT_DIR")
+    s3_download_max_workers = int(os.getenv("DIOPTRA_S3_DOWNLOAD_MAX_WORKERS", "1"))
 
     # For mypy; assume correct environment variables
     assert mlflow_s3_endpoint_url
@@ -98,19 +102,57 @@ def run_mlflow_task(
     if entry_point_kwargs is not None:
         cmd.extend(shlex.split(entry_point_kwargs))
 
-    with TemporaryDirectory(dir=os.getenv("DIOPTRA_WORKDIR")) as tmpdir:
+    with ExitStack() as stack:
+        tmpdir = stack.enter_context(
+            TemporaryDirectory(dir=os.getenv("DIOPTRA_WORKDIR"))
+        )
+
         log.info("Downloading workflow: %s", workflow_uri)
         _download_workflow(s3, tmpdir, workflow_uri)
 
         log.info("Downloading plugins")
-        s3_download(
-            s3,
-            dioptra_plugin_dir,
-            True,
-            True,
-            dioptra_plugins_s3_uri,
-            dioptra_custom_plugins_s3_uri,
-        )
+        if dioptra_plugin_snapshot_dir:
+            # The job sees the snapshot as its plugin directory, which is
+            # kept until the MLflow job completes.
+            snapshot_dir = str(
+                stack.enter_context(
+                    s3_snapshot(
+                        s3,
+                        dioptra_plugin_snapshot_dir,
+                        True,
+                        dioptra_plugins_s3_uri,
+                        dioptra_custom_plugins_s3_uri,
+                        max_workers=s3_download_max_workers,
+                        finalize=pyplugs.write_manifests,
+                    )
+                )
+            )
+            env["DIOPTRA_PLUGIN_DIR"] = snapshot_dir
+            env["PYTHONPATH"] = os.pathsep.join(
+                path for path in (snapshot_dir, env.get("PYTHONPATH")) if path
+            )
+        else:
+            if os.getenv("DIOPTRA_PLUGINS_SYNC"):
+                s3_sync(
+                    s3,
+                    dioptra_plugin_dir,
+                    True,
+                    dioptra_plugins_s3_uri,
+                    dioptra_custom_plugins_s3_uri,
+                    max_workers=s3_download_max_workers,
+                )
+            else:
+                s3_download(
+                    s3,
+                    dioptra_plugin_dir,
+                    True,
+                    True,
+                    dioptra_plugins_s3_uri,
+                    dioptra_custom_plugins_s3_uri,
+                    max_workers=s3_download_max_workers,
+                )
+
+            pyplugs.write_manifests(dioptra_plugin_dir)
 
         log.info("Executing MLFlow job", cmd=" ".join(cmd))
         p = subprocess.run(args=cmd, cwd=tmpdir, env=env)
@@ -14,26 +14,47 @@
 #
 # ACCESS THE FULL CC BY 4.0 LICENSE HERE:
 # https://creativecommons.org/licenses/by/4.0/legalcode
+import contextlib
 import os
 import pathlib
+import re
+import sys
 import tempfile
-from typing import Any, Mapping, MutableMapping, Optional
+import urllib.parse
+from typing import Any, Iterator, Mapping, MutableMapping, Optional, Sequence
 
 import boto3
 import mlflow
 import structlog
 from botocore.client import BaseClient
-from rq.job import get_current_job
+from redis import Redis
+from rq.job import Dependency, Job, JobStatus, get_current_job
+from rq.queue import Queue
 
+from dioptra import pyplugs
 from dioptra.mlflow_plugins.dioptra_clients import DioptraDatabaseClient
-from dioptra.mlflow_plugins.dioptra_tags import (
-    DIOPTRA_DEPENDS_ON,
-    DIOPTRA_JOB_ID,
-    DIOPTRA_QUEUE,
+from dioptra.rq.bookkeeping import JobBookkeeper
+from dioptra.task_engine.checkpoint import StepCheckpointStore, compute_run_digest
+from dioptra.task_engine.output_store import (
+    StepOutputStore,
+    make_step_output_store,
+)
+from dioptra.task_engine.partition import PlanPartition, partition_plan
+from dioptra.task_engine.plan import compile_experiment, slice_plan
+from dioptra.task_engine.profiling import StepProfiler
+from dioptra.task_engine.step_cache import DEFAULT_MAX_CACHE_SIZE, StepOutputCache
+from dioptra.task_engine.sweep import ParameterSweep
+from dioptra.task_engine.task_engine import run_experiment, run_plan
+from dioptra.task_engine.validation_cache import (
+    compute_description_digest,
+    get_validation_cache,
+)
+from dioptra.worker.s3_download import s3_download, s3_snapshot, s3_sync
+
+# Step profile summary entries which aren't numeric measurements
+_NON_MEASUREMENT_PROFILE_KEYS = frozenset(
+    ("step_name", "task_plugin_id", "cprofile_stats", "tracemalloc_stats")
 )
-from dioptra.task_engine.task_engine import run_experiment
-from dioptra.task_engine.validation import is_valid
-from dioptra.worker.s3_download import s3_download
 
 
 def _get_logger() -> Any:
@@ -51,10 +72,60 @@ def run_task_engine_task(
     experiment_desc: Mapping[str, Any],
     global_parameters: MutableMapping[str, Any],
     s3: Optional[BaseClient] = None,
+    resume_from_job_id: Optional[str] = None,
+    parameter_grid: Optional[Mapping[str, Sequence[Any]]] = None,
+    validated_digest: Optional[str] = None,
 ):
     """
     Run an experiment via the task engine.
 
+    The experiment description is validated before it is run, unless the job
+    carries a validated digest matching the description, i.e. it was already
+    validated when the job was submitted.  Otherwise validation results are
+    looked up in the validation cache, which is shared with the REST API via
+    the job's Redis connection.
+
+    If the DIOPTRA_CHECKPOINT_DIR environment variable is set, step outputs
+    are checkpointed to a job-scoped subdirectory as steps complete, and the
+    checkpoints are deleted once the run succeeds.  A failed job may then be
+    resumed by submitting a new job with the same experiment description and
+    global parameters, and resume_from_job_id set to the ID of the failed job.
+    The resumed job has its own MLflow run, which has no metrics or artifacts
+    from the steps restored from checkpoints; it is tagged with the failed
+    job's ID and MLflow run ID, whose run has them.
+
+    Each step is profiled, and the profile is logged and recorded in the MLflow
+    run as metrics and a "step_profile.json" artifact.  The
+    DIOPTRA_CPROFILE_STEPS and DIOPTRA_TRACEMALLOC_STEPS environment variables
+    may name steps (comma-separated) to additionally profile with cProfile or
+    tracemalloc; their statistics are included in the artifact.
+
+    Steps are run one at a time, unless the DIOPTRA_TASK_ENGINE_MAX_WORKERS
+    environment variable sets a larger number of steps to run concurrently.
+    Independent steps then run in a thread pool, or if any task plugin is a
+    coroutine function, on an event loop, so that I/O-bound steps overlap.
+
+    If a parameter grid is given, the experiment is run as a parameter sweep:
+    steps which don't depend on any swept parameter are run once, and the
+    remaining steps are run once per point of the grid, each in a nested
+    MLflow run.  Sweeps are not checkpointed.
+
+    If the DIOPTRA_STEP_OUTPUT_STORE_URI environment variable is set, the
+    experiment is instead distributed across workers: its graph is
+    partitioned into chains of steps, each chain is run by a child job on this
+    job's queue, and step outputs pass between child jobs through a step
+    output store at that URI (an S3 URI, or a local directory shared by the
+    workers).  Child jobs depend on the jobs whose outputs they consume, and a
+    final job, which runs once all of them have completed, marks the run
+    finished or failed.  A child job whose dependencies failed fails without
+    running its steps.  This job only submits the child jobs.  Distributed
+    runs are not checkpointed, and parameter sweeps are not distributed.
+
+    Each child job runs in its own working directory, possibly on a different
+    worker, so only step outputs pass between them.  Experiments whose steps
+    pass each other paths of local files, e.g. a file written by one step and
+    read by another, must not be distributed.
+
     Args:
         experiment_id: The ID of the experiment to use for this run
         experiment_desc: A declarative experiment description, as a mapping
@@ -64,6 +135,14 @@ def run_task_engine_task(
             one according to environment variables.  This argument is not
             normally used, but useful in unit tests when you need a specially
             configured object with stubbed responses.
+        resume_from_job_id: The ID of a previous, failed job whose completed
+            steps should be restored from checkpoints instead of being run
+            again.  If None, run all steps.
+        parameter_grid: A mapping from global parameter name to a list of
+            values to sweep over, or None to run the experiment once
+        validated_digest: The digest of the experiment description, as
+            computed by the validation cache when the description was found to
+            be valid, or None if the description has not been validated
     """
     rq_job = get_current_job()
     rq_job_id = rq_job.get_id() if rq_job else None
@@ -72,49 +151,387 @@ def run_task_engine_task(
         log = _get_logger()
 
         mlflow_s3_endpoint_url = os.getenv("MLFLOW_S3_ENDPOINT_URL")
-        dioptra_plugins_s3_uri = os.getenv("DIOPTRA_PLUGINS_S3_URI")
-        dioptra_custom_plugins_s3_uri = os.getenv("DIOPTRA_CUSTOM_PLUGINS_S3_URI")
-        dioptra_plugin_dir = os.getenv("DIOPTRA_PLUGIN_DIR")
-        dioptra_work_dir = os.getenv("DIOPTRA_WORKDIR")
+        dioptra_checkpoint_dir = os.getenv("DIOPTRA_CHECKPOINT_DIR")
+        dioptra_step_output_store_uri = os.getenv("DIOPTRA_STEP_OUTPUT_STORE_URI")
+        max_workers = _get_max_workers()
 
         # For mypy; assume correct environment variables
         assert mlflow_s3_endpoint_url
-        assert dioptra_plugins_s3_uri
-        assert dioptra_custom_plugins_s3_uri
-        assert dioptra_plugin_dir
 
         if not s3:
             s3 = boto3.client("s3", endpoint_url=mlflow_s3_endpoint_url)
 
-        if is_valid(experiment_desc):
-            s3_download(
-                s3,
-                dioptra_plugin_dir,
-                True,
-                True,
-                dioptra_plugins_s3_uri,
-                dioptra_custom_plugins_s3_uri,
-            )
+        if _is_valid(
+            experiment_desc, validated_digest, rq_job.connection if rq_job else None
+        ):
+            with _download_plugins(s3) as plugin_dir, _plugin_import_path(plugin_dir):
+                if rq_job and dioptra_step_output_store_uri:
+                    if parameter_grid:
+                        log.warning("Parameter sweeps are not distributed")
+
+                    elif _submit_distributed_run(
+                        rq_job,
+                        experiment_id,
+                        experiment_desc,
+                        global_parameters,
+                        dioptra_step_output_store_uri,
+                    ):
+                        if resume_from_job_id:
+                            log.warning(
+                                "Unable to resume job: distributed runs are not"
+                                " checkpointed",
+                                resume_from_job_id=resume_from_job_id,
+                            )
+                        return
+
+                step_cache = _make_step_cache()
+
+                checkpoint = None
+                if parameter_grid:
+                    if resume_from_job_id:
+                        log.warning(
+                            "Unable to resume job: parameter sweeps are not"
+                            " checkpointed",
+                            resume_from_job_id=resume_from_job_id,
+                        )
+
+                elif dioptra_checkpoint_dir:
+                    # A resumed job continues checkpointing into the store of
+                    # the job it resumes, so if it fails too, resuming the
+                    # original job again picks up where it left off.
+                    checkpoint_job_id = resume_from_job_id or rq_job_id
+                    checkpoint = StepCheckpointStore(
+                        pathlib.Path(dioptra_checkpoint_dir) / str(checkpoint_job_id),
+                        compute_run_digest(experiment_desc, global_parameters),
+                    )
 
-            saved_cwd = pathlib.Path.cwd()
-            with tempfile.TemporaryDirectory(dir=dioptra_work_dir) as tempdir:
-                os.chdir(tempdir)
-                try:
+                elif resume_from_job_id:
+                    log.warning(
+                        "Unable to resume job: DIOPTRA_CHECKPOINT_DIR is not set",
+                        resume_from_job_id=resume_from_job_id,
+                    )
+
+                with _work_dir():
                     _run_experiment(
-                        rq_job_id, experiment_id, experiment_desc, global_parameters
+                        rq_job_id,
+                        experiment_id,
+                        experiment_desc,
+                        global_parameters,
+                        step_cache,
+                        checkpoint,
+                        resume_from_job_id if checkpoint else None,
+                        parameter_grid,
+                        max_workers,
                     )
-                finally:
-                    os.chdir(saved_cwd)
 
         else:
             log.error("Experiment description was invalid!")
 
 
+def run_task_engine_partition_task(
+    job_id: str,
+    mlflow_run_id: str,
+    experiment_desc: Mapping[str, Any],
+    global_parameters: MutableMapping[str, Any],
+    step_names: Sequence[str],
+    output_store_uri: str,
+    s3: Optional[BaseClient] = None,
+):
+    """
+    Run a partition of a distributed experiment run: a chain of steps of the
+    experiment, within the MLflow run of the Dioptra job.  Outputs of steps
+    outside of the partition are loaded from the step output store, and
+    outputs consumed by steps outside of the partition are saved to it.
+
+    These jobs are submitted by run_task_engine_task(); the experiment
+    description was validated before they were submitted.
+
+    Args:
+        job_id: The ID of the Dioptra job the partition is part of
+        mlflow_run_id: The ID of the MLflow run of the Dioptra job
+        experiment_desc: A declarative experiment description, as a mapping
+        global_parameters: Global parameters for this run, as a mapping from
+            parameter name to value
+        step_names: The names of the steps in the partition
+        output_store_uri: The URI of the step output store of the Dioptra job
+        s3: An optional boto3 S3 client object to use.  If not given, construct
+            one according to environment variables.
+    """
+    with structlog.contextvars.bound_contextvars(
+        rq_job_id=job_id, partition=step_names[0]
+    ):
+        if not s3:
+            s3 = boto3.client("s3", endpoint_url=os.getenv("MLFLOW_S3_ENDPOINT_URL"))
+
+        with _download_plugins(s3) as plugin_dir:
+            with _plugin_import_path(plugin_dir), _work_dir():
+                _run_partition(
+                    get_current_job(),
+                    job_id,
+                    mlflow_run_id,
+                    experiment_desc,
+                    global_parameters,
+                    step_names,
+                    make_step_output_store(output_store_uri, s3),
+                    _make_step_cache(),
+                    _get_max_workers(),
+                )
+
+
+def finish_distributed_run_task(
+    job_id: str,
+    mlflow_run_id: str,
+    output_store_uri: str,
+    s3: Optional[BaseClient] = None,
+):
+    """
+    Finish a distributed experiment run, once all of its partitions have
+    completed: mark the MLflow run and Dioptra job finished, or failed if any
+    partition failed, and delete the step outputs which were passed between
+    partitions.
+
+    This is the only job of a distributed run which ends its MLflow run, so
+    that a partition completing after another failed can't reopen it.
+
+    Args:
+        job_id: The ID of the Dioptra job
+        mlflow_run_id: The ID of the MLflow run of the Dioptra job
+        output_store_uri: The URI of the step output store of the Dioptra job
+        s3: An optional boto3 S3 client object to use.  If not given, construct
+            one according to environment variables.
+    """
+    with structlog.contextvars.bound_contextvars(rq_job_id=job_id):
+        log = _get_logger()
+
+        if not s3:
+            s3 = boto3.client("s3", endpoint_url=os.getenv("MLFLOW_S3_ENDPOINT_URL"))
+
+        failed_job_ids = _get_failed_dependencies(get_current_job())
+
+        make_step_output_store(output_store_uri, s3).clear()
+
+        mlflow.start_run(run_id=mlflow_run_id)
+
+        if failed_job_ids:
+            log.error("=== Run failed ===", failed_job_ids=failed_job_ids)
+            mlflow.end_run("FAILED")
+            DioptraDatabaseClient().update_job_status(job_id, "failed")
+
+        else:
+            log.info("=== Run succeeded ===")
+            mlflow.end_run()
+            DioptraDatabaseClient().update_job_status(job_id, "finished")
+
+
+def _get_failed_dependencies(rq_job: Optional[Job]) -> list[str]:
+    """
+    Find which of the dependencies of a redis queue job did not succeed.
+    Dependencies which no longer exist are assumed to have succeeded, since
+    the results of successful jobs expire much sooner than those of failed
+    jobs.
+
+    Args:
+        rq_job: A redis queue job, or None
+
+    Returns:
+        The IDs of the job's dependencies which did not succeed
+    """
+    if rq_job is None:
+        return []
+
+    return [
+        dependency.id
+        for dependency in rq_job.fetch_dependencies()
+        if dependency.get_status() != JobStatus.FINISHED
+    ]
+
+
+@contextlib.contextmanager
+def _download_plugins(s3: BaseClient) -> Iterator[str]:
+    """
+    Download task plugins from the S3 URIs given by the DIOPTRA_PLUGINS_S3_URI
+    and DIOPTRA_CUSTOM_PLUGINS_S3_URI environment variables, for the duration
+    of the context.
+
+    If the DIOPTRA_PLUGIN_SNAPSHOT_DIR environment variable is set, plugins
+    are stored there as immutable snapshots, one per distinct set of plugin
+    files, which concurrent jobs on the host share.  The snapshot is kept
+    until the context exits, since plugin modules may be imported lazily
+    during the run.  Otherwise they are
+    downloaded to the directory given by the DIOPTRA_PLUGIN_DIR environment
+    variable: if DIOPTRA_PLUGINS_SYNC is set, only plugin files which changed
+    since the last job are downloaded.  DIOPTRA_S3_DOWNLOAD_MAX_WORKERS sets
+    how many files are downloaded concurrently.
+
+    Args:
+        s3: A boto3 S3 client object
+
+    Yields:
+        The directory the plugins were downloaded to
+    """
+    dioptra_plugins_s3_uri = os.getenv("DIOPTRA_PLUGINS_S3_URI")
+    dioptra_custom_plugins_s3_uri = os.getenv("DIOPTRA_CUSTOM_PLUGINS_S3_URI")
+    dioptra_plugin_dir = os.getenv("DIOPTRA_PLUGIN_DIR")
+    dioptra_plugin_snapshot_dir = os.getenv("DIOPTRA_PLUGIN_SNAPSHOT_DIR")
+    s3_download_max_workers = int(os.getenv("DIOPTRA_S3_DOWNLOAD_MAX_WORKERS", "1"))
+
+    # For mypy; assume correct environment variables
+    assert dioptra_plugins_s3_uri
+    assert dioptra_custom_plugins_s3_uri
+    assert dioptra_plugin_dir
+
+    if dioptra_plugin_snapshot_dir:
+        with s3_snapshot(
+            s3,
+            dioptra_plugin_snapshot_dir,
+            True,
+            dioptra_plugins_s3_uri,
+            dioptra_custom_plugins_s3_uri,
+            max_workers=s3_download_max_workers,
+            finalize=pyplugs.write_manifests,
+        ) as snapshot_dir:
+            yield str(snapshot_dir)
+
+        return
+
+    if os.getenv("DIOPTRA_PLUGINS_SYNC"):
+        s3_sync(
+            s3,
+            dioptra_plugin_dir,
+            True,
+            dioptra_plugins_s3_uri,
+            dioptra_custom_plugins_s3_uri,
+            max_workers=s3_download_max_workers,
+        )
+    else:
+        s3_download(
+            s3,
+            dioptra_plugin_dir,
+            True,
+            True,
+            dioptra_plugins_s3_uri,
+            dioptra_custom_plugins_s3_uri,
+            max_workers=s3_download_max_workers,
+        )
+
+    # Lets plug-ins be listed and validated without importing them
+    pyplugs.write_manifests(dioptra_plugin_dir)
+
+    yield dioptra_plugin_dir
+
+
+@contextlib.contextmanager
+def _plugin_import_path(plugin_dir: str) -> Iterator[None]:
+    """
+    Put a plugin directory first on the import path, for the duration of the
+    context.  Jobs run in their own work horse processes, so plugin modules
+    imported by one job aren't seen by the next.
+
+    Args:
+        plugin_dir: The directory plugins were downloaded to
+    """
+    sys.path.insert(0, plugin_dir)
+    try:
+        yield
+    finally:
+        sys.path.remove(plugin_dir)
+
+
+def _make_step_cache() -> Optional[StepOutputCache]:
+    """
+    Create a step output cache configured according to environment variables.
+
+    Returns:
+        A step output cache, or None if DIOPTRA_STEP_CACHE_DIR is not set
+    """
+    dioptra_step_cache_dir = os.getenv("DIOPTRA_STEP_CACHE_DIR")
+
+    if not dioptra_step_cache_dir:
+        return None
+
+    return StepOutputCache(
+        dioptra_step_cache_dir,
+        int(os.getenv("DIOPTRA_STEP_CACHE_MAX_SIZE", DEFAULT_MAX_CACHE_SIZE)),
+    )
+
+
+def _get_max_workers() -> Optional[int]:
+    """
+    Get the maximum number of steps to run concurrently, from the
+    DIOPTRA_TASK_ENGINE_MAX_WORKERS environment variable.
+
+    Returns:
+        The maximum number of steps, or None if the variable is not set, to
+        run steps one at a time
+    """
+    dioptra_task_engine_max_workers = os.getenv("DIOPTRA_TASK_ENGINE_MAX_WORKERS")
+
+    if not dioptra_task_engine_max_workers:
+        return None
+
+    return int(dioptra_task_engine_max_workers)
+
+
+@contextlib.contextmanager
+def _work_dir() -> Iterator[None]:
+    """
+    Change the current directory to a new temporary subdirectory of the
+    directory given by the DIOPTRA_WORKDIR environment variable, for the
+    duration of the context.  The subdirectory is deleted afterward.
+    """
+    saved_cwd = pathlib.Path.cwd()
+    with tempfile.TemporaryDirectory(dir=os.getenv("DIOPTRA_WORKDIR")) as tempdir:
+        os.chdir(tempdir)
+        try:
+            yield
+        finally:
+            os.chdir(saved_cwd)
+
+
+def _is_valid(
+    experiment_desc: Mapping[str, Any],
+    validated_digest: Optional[str],
+    redis: Optional[Redis],
+) -> bool:
+    """
+    Determine whether an experiment description is valid, skipping validation
+    if it was already validated.
+
+    Args:
+        experiment_desc: A declarative experiment description, as a mapping
+        validated_digest: The digest of the description if it was validated
+            on submission, or None
+        redis: A Redis connection through which validation results are shared,
+            or None
+
+    Returns:
+        True if the description is valid; False if not
+    """
+    log = _get_logger()
+
+    if validated_digest is not None:
+        if validated_digest == compute_description_digest(experiment_desc):
+            log.debug("Skipping validation of pre-validated experiment description")
+            return True
+
+        log.warning(
+            "Validated digest does not match the experiment description",
+            validated_digest=validated_digest,
+        )
+
+    return get_validation_cache().get_valid_digest(experiment_desc, redis) is not None
+
+
 def _run_experiment(
     rq_job_id: str,
     experiment_id: int,
     experiment_desc: Mapping[str, Any],
     global_parameters: MutableMapping[str, Any],
+    step_cache: Optional[StepOutputCache] = None,
+    checkpoint: Optional[StepCheckpointStore] = None,
+    resume_from_job_id: Optional[str] = None,
+    parameter_grid: Optional[Mapping[str, Sequence[Any]]] = None,
+    max_workers: Optional[int] = None,
 ):
     """
     Run the given experiment, doing some bookkeeping related to the Dioptra job
@@ -127,38 +544,444 @@ def _run_experiment(
         experiment_desc: A declarative experiment description, as a mapping
         global_parameters: Global parameters for this run, as a mapping from
             parameter name to value
+        step_cache: A step output cache to use for the run, or None to
+            disable caching
+        checkpoint: A checkpoint store to save step outputs to, or None to
+            disable checkpointing
+        resume_from_job_id: The ID of the failed job whose completed steps
+            are restored from the checkpoint store, or None to run all steps
+        parameter_grid: A mapping from global parameter name to a list of
+            values to sweep over, or None to run the experiment once
+        max_workers: The maximum number of steps to run concurrently, or None
+            to run them one at a time
     """
     log = _get_logger()
     db_client = None
+    bookkeeper = None
+    profiler = _make_profiler()
 
     mlflow.set_experiment(experiment_id=str(experiment_id))
     run = mlflow.start_run()
 
     try:
         db_client = DioptraDatabaseClient()
-        job = db_client.get_job(rq_job_id)
+        bookkeeper = JobBookkeeper(db_client)
+        # Recording the job's start needn't hold up the run; it is written in
+        # the background.
+        bookkeeper.start_job(
+            rq_job_id,
+            run.info.run_id,
+            experiment_desc,
+            global_parameters,
+            resume_from_job_id,
+        )
 
-        db_client.set_mlflow_run_id_for_job(run.info.run_id, rq_job_id)
+        if parameter_grid:
+            mlflow.log_dict(parameter_grid, "parameter_grid.json")
+            _run_sweep(
+                experiment_desc,
+                global_parameters,
+                parameter_grid,
+                profiler,
+                step_cache,
+                max_workers,
+            )
 
-        mlflow.set_tag(DIOPTRA_JOB_ID, rq_job_id)
-        mlflow.set_tag(DIOPTRA_QUEUE, job.get("queue", ""))
-        mlflow.set_tag(DIOPTRA_DEPENDS_ON, job.get("depends_on", ""))
+        else:
+            run_experiment(
+                experiment_desc,
+                global_parameters,
+                max_workers=max_workers,
+                step_cache=step_cache,
+                checkpoint=checkpoint,
+                resume=resume_from_job_id is not None,
+                profiler=profiler,
+            )
 
-        mlflow.log_dict(experiment_desc, "experiment.yaml")
-        mlflow.log_params(global_parameters)
+        log.info("=== Run succeeded ===")
+        _log_step_profiles(profiler)
 
-        db_client.update_job_status(rq_job_id, "started")
+        if checkpoint:
+            checkpoint.clear()
 
-        run_experiment(experiment_desc, global_parameters)
+        # The job's start must be recorded before its end.
+        bookkeeper.flush()
+        bookkeeper.close()
 
-        log.info("=== Run succeeded ===")
         mlflow.end_run()
         db_client.update_job_status(rq_job_id, "finished")
 
     except Exception:
+        # Profiles of the steps which did complete may help diagnose the
+        # failure.
+        _log_step_profiles(profiler)
+
+        if bookkeeper:
+            bookkeeper.close()
+
         mlflow.end_run("FAILED")
 
         if db_client:
             db_client.update_job_status(rq_job_id, "failed")
 
         raise
+
+
+def _submit_distributed_run(
+    rq_job: Job,
+    experiment_id: int,
+    experiment_desc: Mapping[str, Any],
+    global_parameters: MutableMapping[str, Any],
+    step_output_store_uri: str,
+) -> bool:
+    """
+    Start a distributed run of the given experiment: partition its graph into
+    chains of steps, and submit a child job per partition to this job's queue.
+    Each child job depends on the jobs of the partitions whose outputs it
+    consumes.  A final job, which depends on all of them, finishes the run.
+
+    The MLflow run is left running, and is continued by the child jobs.
+
+    Args:
+        rq_job: The redis queue job for this job
+        experiment_id: The ID of the experiment to use for this run
+        experiment_desc: A declarative experiment description, as a mapping
+        global_parameters: Global parameters for this run, as a mapping from
+            parameter name to value
+        step_output_store_uri: The URI under which to create the step output
+            store through which the child jobs pass step outputs
+
+    Returns:
+        True if the run was distributed; False if the experiment has only one
+        partition, in which case nothing was done and it should just be run
+    """
+    log = _get_logger()
+    rq_job_id = rq_job.get_id()
+
+    partitions = partition_plan(compile_experiment(experiment_desc))
+
+    if len(partitions) < 2:
+        log.info("Experiment has a single chain of steps; not distributing it")
+        return False
+
+    db_client = None
+    output_store_uri = step_output_store_uri.rstrip("/") + "/" + rq_job_id
+
+    mlflow.set_experiment(experiment_id=str(experiment_id))
+    run = mlflow.start_run()
+
+    try:
+        db_client = DioptraDatabaseClient()
+
+        # Leave the run open for the child jobs.  This, and recording the
+        # job's start, must be done before submitting them, lest a child job
+        # which quickly fails have its status overwritten.
+        with JobBookkeeper(db_client) as bookkeeper:
+            bookkeeper.start_job(
+                rq_job_id, run.info.run_id, experiment_desc, global_parameters
+            )
+            mlflow.end_run("RUNNING")
+            bookkeeper.flush()
+
+        _submit_partition_jobs(
+            rq_job,
+            partitions,
+            run.info.run_id,
+            experiment_desc,
+            global_parameters,
+            output_store_uri,
+        )
+
+    except Exception:
+        if mlflow.active_run():
+            mlflow.end_run("FAILED")
+        else:
+            mlflow.tracking.MlflowClient().set_terminated(run.info.run_id, "FAILED")
+
+        if db_client:
+            db_client.update_job_status(rq_job_id, "failed")
+
+        raise
+
+    log.info("Distributed run across %d partition job(s)", len(partitions))
+
+    return True
+
+
+def _submit_partition_jobs(
+    rq_job: Job,
+    partitions: Sequence[PlanPartition],
+    mlflow_run_id: str,
+    experiment_desc: Mapping[str, Any],
+    global_parameters: Mapping[str, Any],
+    output_store_uri: str,
+) -> None:
+    """
+    Submit the child jobs of a distributed run to the queue of the given job.
+
+    Args:
+        rq_job: The redis queue job for the Dioptra job
+        partitions: The partitions of the experiment, in dependency order, as
+            produced by partition_plan()
+        mlflow_run_id: The ID of the MLflow run of the Dioptra job
+        experiment_desc: A declarative experiment description, as a mapping
+        global_parameters: Global parameters for this run, as a mapping from
+            parameter name to value
+        output_store_uri: The URI of the step output store of the Dioptra job
+    """
+    rq_job_id = rq_job.get_id()
+    queue = Queue(rq_job.origin, connection=rq_job.connection)
+
+    partition_jobs: dict[str, Job] = {}
+    for partition in partitions:
+        partition_jobs[partition.name] = queue.enqueue(
+            run_task_engine_partition_task,
+            kwargs={
+                "job_id": rq_job_id,
+                "mlflow_run_id": mlflow_run_id,
+                "experiment_desc": experiment_desc,
+                "global_parameters": global_parameters,
+                "step_names": list(partition.step_names),
+                "output_store_uri": output_store_uri,
+            },
+            timeout=rq_job.timeout,
+            depends_on=_make_dependency(
+                [partition_jobs[dep] for dep in partition.dependencies]
+            ),
+        )
+
+    queue.enqueue(
+        finish_distributed_run_task,
+        kwargs={
+            "job_id": rq_job_id,
+            "mlflow_run_id": mlflow_run_id,
+            "output_store_uri": output_store_uri,
+        },
+        depends_on=_make_dependency(list(partition_jobs.values())),
+    )
+
+
+def _make_dependency(jobs: Sequence[Job]) -> Optional[Dependency]:
+    """
+    Make a dependency of a child job of a distributed run on other child jobs.
+    The dependency allows failure, so that the final job always runs and can
+    mark the run failed; child jobs check for failed dependencies themselves.
+
+    Args:
+        jobs: The jobs to depend on
+
+    Returns:
+        A dependency, or None if there are no jobs to depend on
+    """
+    if not jobs:
+        return None
+
+    return Dependency(jobs=list(jobs), allow_failure=True)
+
+
+def _run_partition(
+    rq_job: Optional[Job],
+    job_id: str,
+    mlflow_run_id: str,
+    experiment_desc: Mapping[str, Any],
+    global_parameters: MutableMapping[str, Any],
+    step_names: Sequence[str],
+    output_store: StepOutputStore,
+    step_cache: Optional[StepOutputCache] = None,
+    max_workers: Optional[int] = None,
+) -> None:
+    """
+    Run a partition of a distributed experiment run within the MLflow run of
+    the Dioptra job.  The partition fails without running its steps if any of
+    the partitions it depends on failed.
+
+    The MLflow run is left running either way: only the final job of the run
+    ends it, once all partitions have completed, and it also clears the step
+    output store.
+
+    Args:
+        rq_job: The redis queue job for the partition, or None
+        job_id: The ID of the Dioptra job the partition is part of
+        mlflow_run_id: The ID of the MLflow run of the Dioptra job
+        experiment_desc: A declarative experiment description, as a mapping
+        global_parameters: Global parameters for this run, as a mapping from
+            parameter name to value
+        step_names: The names of the steps in the partition
+        output_store: The step output store of the Dioptra job
+        step_cache: A step output cache to use for the run, or None to
+            disable caching
+        max_workers: The maximum number of steps to run concurrently, or None
+            to run them one at a time
+    """
+    log = _get_logger()
+    profiler = _make_profiler()
+
+    failed_job_ids = _get_failed_dependencies(rq_job)
+    if failed_job_ids:
+        log.error("=== Partition skipped ===", failed_job_ids=failed_job_ids)
+        raise RuntimeError(
+            "Partition dependencies failed: " + ", ".join(failed_job_ids)
+        )
+
+    # Profiles of each partition are kept in separate artifacts
+    profile_artifact = "step_profiles/{}.json".format(
+        urllib.parse.quote(step_names[0], safe="")
+    )
+
+    # The run is still running, since the final job hasn't ended it, so
+    # continuing and leaving it "RUNNING" doesn't change its status.
+    mlflow.start_run(run_id=mlflow_run_id)
+
+    try:
+        plan = compile_experiment(experiment_desc)
+
+        initial_outputs = {}
+        for step_name in step_names:
+            for dep in plan.dependencies[step_name]:
+                if dep in step_names or dep in initial_outputs:
+                    continue
+
+                # Steps whose outputs nothing consumes, e.g. explicit
+                # dependencies, have no stored outputs.
+                dep_outputs = output_store.get(dep)
+                if dep_outputs is not None:
+                    initial_outputs[dep] = dep_outputs
+
+        step_outputs = run_plan(
+            slice_plan(plan, step_names),
+            global_parameters,
+            max_workers=max_workers,
+            step_cache=step_cache,
+            initial_outputs=initial_outputs,
+            profiler=profiler,
+        )
+
+        for step_name, outputs in step_outputs.items():
+            output_store.put(step_name, outputs)
+
+        log.info("=== Partition succeeded ===")
+
+    finally:
+        # Profiles of the steps which did complete may help diagnose a
+        # failure.
+        _log_step_profiles(profiler, profile_artifact)
+        mlflow.end_run("RUNNING")
+
+
+def _run_sweep(
+    experiment_desc: Mapping[str, Any],
+    global_parameters: Mapping[str, Any],
+    parameter_grid: Mapping[str, Sequence[Any]],
+    profiler: StepProfiler,
+    step_cache: Optional[StepOutputCache] = None,
+    max_workers: Optional[int] = None,
+) -> None:
+    """
+    Run the given experiment as a parameter sweep, within the active MLflow
+    run.  Steps which don't depend on swept parameters run once in the active
+    run; the remaining steps run once per point of the grid, each in a nested
+    MLflow run.
+
+    Args:
+        experiment_desc: A declarative experiment description, as a mapping
+        global_parameters: Values of global parameters which are not swept,
+            as a mapping from parameter name to value
+        parameter_grid: A mapping from global parameter name to a list of
+            values to sweep over
+        profiler: A profiler for the steps run once.  Steps run per point of
+            the grid are profiled separately, in each point's nested run.
+        step_cache: A step output cache to use for the run, or None to
+            disable caching
+        max_workers: The maximum number of steps to run concurrently, or None
+            to run them one at a time
+    """
+    sweep = ParameterSweep(
+        compile_experiment(experiment_desc), global_parameters, parameter_grid
+    )
+
+    sweep.run_prefix(max_workers=max_workers, step_cache=step_cache, profiler=profiler)
+
+    for point in sweep.points:
+        with mlflow.start_run(nested=True):
+            mlflow.log_params(point)
+
+            point_profiler = _make_profiler()
+            try:
+                sweep.run_point(
+                    point,
+                    max_workers=max_workers,
+                    step_cache=step_cache,
+                    profiler=point_profiler,
+                )
+            finally:
+                _log_step_profiles(point_profiler)
+
+
+def _make_profiler() -> StepProfiler:
+    """
+    Create a step profiler configured according to environment variables.
+
+    Returns:
+        A step profiler
+    """
+    return StepProfiler(
+        cprofile_steps=_get_step_names_env("DIOPTRA_CPROFILE_STEPS"),
+        tracemalloc_steps=_get_step_names_env("DIOPTRA_TRACEMALLOC_STEPS"),
+    )
+
+
+def _get_step_names_env(env_var: str) -> set[str]:
+    """
+    Get a set of step names from a comma-separated environment variable.
+
+    Args:
+        env_var: The name of the environment variable
+
+    Returns:
+        A set of step names; empty if the variable is not set
+    """
+    step_names = (name.strip() for name in os.getenv(env_var, "").split(","))
+
+    return {name for name in step_names if name}
+
+
+def _log_step_profiles(
+    profiler: StepProfiler, artifact_file: str = "step_profile.json"
+) -> None:
+    """
+    Log step profiles, and record them in the active MLflow run as metrics
+    named "step.<step name>.<measurement>" and a JSON artifact.
+
+    Args:
+        profiler: The profiler which profiled the run's steps
+        artifact_file: The run-relative path of the artifact
+    """
+    log = _get_logger()
+
+    report = profiler.get_report()
+    if not report:
+        return
+
+    metrics = {}
+    for summary in report:
+        measurements = {
+            key: value
+            for key, value in summary.items()
+            if key not in _NON_MEASUREMENT_PROFILE_KEYS
+        }
+
+        log.info(
+            "Step profile",
+            step_name=summary["step_name"],
+            task_plugin_id=summary.get("task_plugin_id"),
+            **measurements,
+        )
+
+        # MLflow restricts the characters allowed in metric names
+        metric_prefix = "step." + re.sub(r"[^\w\-. /]", "_", summary["step_name"])
+        for key, value in measurements.items():
+            if value is not None:
+                metrics[metric_prefix + "." + key] = float(value)
+
+    mlflow.log_metrics(metrics)
+    mlflow.log_dict(report, artifact_file)
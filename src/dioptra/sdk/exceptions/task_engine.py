@@ -156,6 +156,24 @@ class MissingTaskPluginNameError(StepError):
         super().__init__("Step is missing a task plugin name", context_step_name)
 
 
+class StepTimeoutError(StepError):
+    """
+    A task plugin invocation did not complete within its step's timeout.
+    """
+
+    def __init__(self, timeout: float, context_step_name: Optional[str] = None) -> None:
+        super().__init__(
+            "Task plugin invocation timed out after {} seconds".format(timeout),
+            context_step_name,
+        )
+
+        self.timeout = timeout
+
+    def __reduce__(self) -> Any:
+        # Lets the error be raised in a worker process
+        return type(self), (self.timeout, self.context_step_name)
+
+
 class MissingGlobalParametersError(BaseTaskEngineError):
     """
     A value could not be obtained for some task graph global parameter(s).
@@ -169,6 +187,21 @@ class MissingGlobalParametersError(BaseTaskEngineError):
         self.parameter_names = parameter_names
 
 
+class InvalidParameterGridError(BaseTaskEngineError):
+    """
+    A parameter sweep grid referred to undefined global parameters, or gave no
+    values for a parameter.
+    """
+
+    def __init__(self, parameter_names: Iterable[str]) -> None:
+        super().__init__(
+            "Parameter grid entries must name global parameters and give a"
+            " non-empty list of values: " + ", ".join(parameter_names)
+        )
+
+        self.parameter_names = parameter_names
+
+
 class IllegalPluginNameError(BaseTaskEngineError):
     """A task was defined with an illegal plugin name."""
 
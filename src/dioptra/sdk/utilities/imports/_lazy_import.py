@@ -0,0 +1,102 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import importlib
+import importlib.util
+from typing import Any, Optional, Set
+
+import structlog
+from structlog.stdlib import BoundLogger
+
+LOGGER: BoundLogger = structlog.stdlib.get_logger()
+
+_UNRESOLVED = object()
+_CHECKED_PACKAGES: Set[str] = set()
+
+
+class _LazyImport(object):
+    """A stand-in for a module or module attribute that is imported on first use."""
+
+    __slots__ = ("_name", "_attribute", "_target")
+
+    def __init__(self, name: str, attribute: Optional[str]) -> None:
+        self._name = name
+        self._attribute = attribute
+        self._target: Any = _UNRESOLVED
+
+    def _resolve(self) -> Any:
+        if self._target is _UNRESOLVED:
+            module = importlib.import_module(self._name)
+            self._target = (
+                module if self._attribute is None else getattr(module, self._attribute)
+            )
+
+        return self._target
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._resolve()(*args, **kwargs)
+
+    def __instancecheck__(self, instance: Any) -> bool:
+        return isinstance(instance, self._resolve())
+
+    def __subclasscheck__(self, subclass: Any) -> bool:
+        return issubclass(subclass, self._resolve())
+
+    def __repr__(self) -> str:
+        target = self._name if self._attribute is None else self._attribute
+        state = "unresolved" if self._target is _UNRESOLVED else "resolved"
+
+        return f"<lazy import {target!r} from {self._name!r} ({state})>"
+
+
+def lazy_import(name: str, attribute: Optional[str] = None) -> Any:
+    """Defers importing a module, or an attribute of a module, until it is used.
+
+    The import happens the first time the returned object is called or one of its
+    attributes is accessed. This keeps heavy optional dependencies such as
+    TensorFlow out of module import time, so that plugins can be listed and
+    validated without paying for them. Pair it with
+    :py:func:`~dioptra.sdk.utilities.decorators.require_package` so that a missing
+    package is reported when the plugin is called.
+
+    If the top-level package cannot be found, a warning is logged once per package,
+    mirroring the warning plugin modules used to log when an eager import failed.
+
+    Args:
+        name: The absolute name of the module to import.
+        attribute: The attribute to fetch from the module. If `None`, the module
+            itself is returned. The default is `None`.
+
+    Returns:
+        A stand-in object that forwards calls and attribute accesses to the imported
+        module or attribute.
+    """
+    package = name.partition(".")[0]
+
+    if package not in _CHECKED_PACKAGES:
+        _CHECKED_PACKAGES.add(package)
+
+        if importlib.util.find_spec(package) is None:
+            LOGGER.warn(
+                "Unable to import one or more optional packages, functionality may "
+                "be reduced",
+                package=package,
+            )
+
+    return _LazyImport(name, attribute)
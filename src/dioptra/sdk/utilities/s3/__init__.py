@@ -15,12 +15,22 @@
 # ACCESS THE FULL CC BY 4.0 LICENSE HERE:
 # https://creativecommons.org/licenses/by/4.0/legalcode
 
-from .download import download_files, download_files_uri, get_s3_keys
+from .download import (
+    DownloadReport,
+    download_files,
+    download_files_uri,
+    download_objects,
+    get_s3_keys,
+    get_s3_objects,
+)
 from .uri import s3_uri_to_bucket_prefix
 
 __all__ = [
     "s3_uri_to_bucket_prefix",
     "get_s3_keys",
+    "get_s3_objects",
     "download_files_uri",
     "download_files",
+    "download_objects",
+    "DownloadReport",
 ]
@@ -14,14 +14,48 @@
 #
 # ACCESS THE FULL CC BY 4.0 LICENSE HERE:
 # https://creativecommons.org/licenses/by/4.0/legalcode
+import time
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Any, Iterator, Optional, Union
+from typing import Any, Iterator, NamedTuple, Optional, Union
 
+import botocore.exceptions
 import structlog
+from boto3.s3.transfer import TransferConfig
 from botocore.client import BaseClient
 
 from dioptra.sdk.utilities.s3.uri import s3_uri_to_bucket_prefix
 
+# Errors after which a download is worth retrying.  Other OSErrors, e.g. a
+# full disk or a permission error writing the file, would just fail again.
+_TRANSIENT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    botocore.exceptions.ConnectionError,
+    botocore.exceptions.ReadTimeoutError,
+)
+
+# Seconds to wait before the first retry of a download; the delay doubles
+# with each further retry, up to the maximum
+_RETRY_BASE_DELAY = 0.5
+_RETRY_MAX_DELAY = 10.0
+
+# Seconds between progress reports of a long download
+_PROGRESS_INTERVAL = 10.0
+
+
+class DownloadReport(NamedTuple):
+    """
+    A summary of a batch of downloads.
+    """
+
+    num_files: int
+    num_bytes: int
+
+    # Seconds from the start of the first download to the end of the last
+    elapsed_time: float
+
 
 def _get_logger() -> Any:
     """
@@ -33,11 +67,12 @@ def _get_logger() -> Any:
     return structlog.get_logger(__name__)
 
 
-def get_s3_keys(
+def get_s3_objects(
     s3: BaseClient, bucket: str, prefix: Optional[str] = None
-) -> Iterator[str]:
+) -> Iterator[dict[str, Any]]:
     """
-    Generate all keys in the given S3 bucket, having the given prefix.
+    Generate information about all objects in the given S3 bucket, having the
+    given prefix.
 
     Args:
         s3: A boto3 S3 client object
@@ -45,13 +80,13 @@ def get_s3_keys(
         prefix: An optional key prefix
 
     Yields:
-        Key names
+        Object information mappings as given in list_objects_v2 responses,
+        including "Key", and usually "ETag", "Size" and "LastModified"
     """
 
     resp = s3.list_objects_v2(Bucket=bucket, Prefix=prefix)
 
-    for obj_info in resp.get("Contents", []):
-        yield obj_info["Key"]
+    yield from resp.get("Contents", [])
 
     while resp["IsTruncated"]:
         resp = s3.list_objects_v2(
@@ -60,8 +95,25 @@ def get_s3_keys(
             ContinuationToken=resp["NextContinuationToken"],
         )
 
-        for obj_info in resp.get("Contents", []):
-            yield obj_info["Key"]
+        yield from resp.get("Contents", [])
+
+
+def get_s3_keys(
+    s3: BaseClient, bucket: str, prefix: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Generate all keys in the given S3 bucket, having the given prefix.
+
+    Args:
+        s3: A boto3 S3 client object
+        bucket: An S3 bucket name
+        prefix: An optional key prefix
+
+    Yields:
+        Key names
+    """
+    for obj_info in get_s3_objects(s3, bucket, prefix):
+        yield obj_info["Key"]
 
 
 def download_files_uri(
@@ -94,13 +146,185 @@ def download_files_uri(
     download_files(s3, dest_dir, bucket, prefix, preserve_key_paths)
 
 
+def _download_object(
+    s3: BaseClient,
+    bucket: str,
+    key: str,
+    dest_path: Path,
+    transfer_config: Optional[TransferConfig],
+    retries: int,
+) -> int:
+    """
+    Download one object, retrying after transient errors.
+
+    Args:
+        s3: A boto3 S3 client object
+        bucket: The name of an S3 bucket
+        key: The key of the object to download
+        dest_path: The path of the file to download to
+        transfer_config: A boto3 transfer configuration, or None to use the
+            default
+        retries: The number of times to retry after a transient error
+
+    Returns:
+        The size of the downloaded file, in bytes
+    """
+    log = _get_logger()
+
+    for attempt in range(retries + 1):
+        try:
+            s3.download_file(bucket, key, str(dest_path), Config=transfer_config)
+            break
+
+        except _TRANSIENT_ERRORS as e:
+            if attempt >= retries:
+                raise
+
+            delay = min(_RETRY_BASE_DELAY * 2**attempt, _RETRY_MAX_DELAY)
+            log.warning("Retrying download of s3 key %s in %.1fs: %s", key, delay, e)
+            time.sleep(delay)
+
+    return dest_path.stat().st_size
+
+
+class _DownloadProgress:
+    """
+    Tracks the progress of a batch of downloads, and logs it periodically.
+    """
+
+    def __init__(self) -> None:
+        self.num_files = 0
+        self.num_bytes = 0
+        self.start_time = time.perf_counter()
+        self.last_report_time = self.start_time
+
+    def add(self, num_bytes: int) -> None:
+        """
+        Record a completed download.
+
+        Args:
+            num_bytes: The size of the downloaded file
+        """
+        self.num_files += 1
+        self.num_bytes += num_bytes
+
+        now = time.perf_counter()
+        if now - self.last_report_time >= _PROGRESS_INTERVAL:
+            self.last_report_time = now
+            self._log("Download progress")
+
+    def finish(self) -> DownloadReport:
+        """
+        Log and return a summary of the downloads.
+
+        Returns:
+            A download report
+        """
+        self._log("Downloads complete")
+
+        return DownloadReport(
+            self.num_files, self.num_bytes, time.perf_counter() - self.start_time
+        )
+
+    def _log(self, message: str) -> None:
+        elapsed_time = time.perf_counter() - self.start_time
+
+        _get_logger().info(
+            message,
+            files=self.num_files,
+            bytes=self.num_bytes,
+            elapsed_time=round(elapsed_time, 3),
+            mib_per_sec=round(self.num_bytes / 2**20 / max(elapsed_time, 1e-9), 3),
+        )
+
+
+def download_objects(
+    s3: BaseClient,
+    downloads: Iterable[tuple[str, str, Path]],
+    max_workers: Optional[int] = None,
+    transfer_config: Optional[TransferConfig] = None,
+    retries: int = 0,
+) -> DownloadReport:
+    """
+    Download S3 objects to local files.  With more than one worker, downloads
+    are run concurrently in a thread pool; downloads is consumed lazily, so
+    that a generator which lists keys page by page overlaps the listing with
+    the downloads.
+
+    Args:
+        s3: A boto3 S3 client object
+        downloads: (bucket, key, destination path) 3-tuples.  The parent
+            directories of the destination paths must exist.
+        max_workers: The maximum number of concurrent downloads.  If None or
+            1, objects are downloaded one at a time, in order.
+        transfer_config: A boto3 transfer configuration shared by all of the
+            downloads, or None to use the default
+        retries: The number of times to retry each download after a
+            transient error
+
+    Returns:
+        A download report
+    """
+    log = _get_logger()
+    progress = _DownloadProgress()
+
+    if max_workers is None or max_workers <= 1:
+        for bucket, key, dest_path in downloads:
+            log.debug("Downloading s3 key %s -> %s", key, str(dest_path))
+            progress.add(
+                _download_object(s3, bucket, key, dest_path, transfer_config, retries)
+            )
+
+        return progress.finish()
+
+    pending: set[Future] = set()
+
+    with ThreadPoolExecutor(max_workers) as pool:
+        try:
+            for bucket, key, dest_path in downloads:
+                # Bound the queue, so that listing doesn't run far ahead of
+                # the downloads.
+                while len(pending) >= 2 * max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        progress.add(future.result())
+
+                log.debug("Downloading s3 key %s -> %s", key, str(dest_path))
+                pending.add(
+                    pool.submit(
+                        _download_object,
+                        s3,
+                        bucket,
+                        key,
+                        dest_path,
+                        transfer_config,
+                        retries,
+                    )
+                )
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    progress.add(future.result())
+
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+    return progress.finish()
+
+
 def download_files(
     s3: BaseClient,
     dest_dir: Union[str, Path],
     bucket: str,
     prefix: Optional[str] = None,
     preserve_key_paths: bool = False,
-):
+    max_workers: Optional[int] = None,
+    transfer_config: Optional[TransferConfig] = None,
+    retries: int = 0,
+) -> DownloadReport:
     """
     Download all files from the given S3 bucket to the given directory, whose
     keys match the given prefix.
@@ -120,19 +344,27 @@ def download_files(
             discarded.  This causes a directory structure in the bucket to be
             flattened to list of filenames.  No subdirectories are created in
             this case.
+        max_workers: The maximum number of concurrent downloads; see
+            download_objects()
+        transfer_config: A boto3 transfer configuration shared by all of the
+            downloads, or None to use the default
+        retries: The number of times to retry each download after a
+            transient error
+
+    Returns:
+        A download report
     """
 
-    log = _get_logger()
+    dest_dir_path = Path(dest_dir)
 
-    if isinstance(dest_dir, str):
-        dest_dir = Path(dest_dir)
+    def _get_downloads() -> Iterator[tuple[str, str, Path]]:
+        for key in get_s3_keys(s3, bucket, prefix):
+            if preserve_key_paths:
+                key_path = dest_dir_path / key
+                key_path.parent.mkdir(parents=True, exist_ok=True)
+            else:
+                key_path = dest_dir_path / Path(key).name
 
-    for key in get_s3_keys(s3, bucket, prefix):
-        if preserve_key_paths:
-            key_path = dest_dir / key
-            key_path.parent.mkdir(parents=True, exist_ok=True)
-        else:
-            key_path = dest_dir / Path(key).name
+            yield bucket, key, key_path
 
-        log.debug("Downloading s3 key %s -> %s", key, str(key_path))
-        s3.download_file(bucket, key, str(key_path))
+    return download_objects(s3, _get_downloads(), max_workers, transfer_config, retries)
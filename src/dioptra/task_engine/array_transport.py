@@ -0,0 +1,297 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import logging
+import os
+import pathlib
+import shutil
+import tempfile
+import uuid
+from collections.abc import Sequence
+from typing import Any, Callable, NamedTuple, Optional, Union
+
+import numpy as np
+
+import dioptra.pyplugs
+from dioptra.task_engine import util
+
+# Arrays smaller than this are cheaper to pickle than to share
+DEFAULT_MIN_SHARED_ARRAY_SIZE = 1024 * 1024
+
+
+def _get_logger() -> logging.Logger:
+    """
+    Get a logger to use for functions in this module.
+
+    Returns:
+        The logger
+    """
+    return logging.getLogger(__name__)
+
+
+class SharedArrayHandle(NamedTuple):
+    """
+    A lightweight, picklable stand-in for a numpy array stored in a file in a
+    shared array transport directory.
+    """
+
+    path: str
+
+
+def _map_values(value: Any, func: Callable[[Any], Any]) -> Any:
+    """
+    Apply a function to a value, or recursively to the elements of plain
+    lists, tuples, and dicts.  Task plugins with several outputs return them
+    in such containers.
+
+    Args:
+        value: The value to map
+        func: The function to apply to non-container values
+
+    Returns:
+        The mapped value
+    """
+    value_type = type(value)
+
+    if value_type is list or value_type is tuple:
+        mapped_value = value_type(_map_values(elt, func) for elt in value)
+    elif value_type is dict:
+        mapped_value = {key: _map_values(elt, func) for key, elt in value.items()}
+    else:
+        mapped_value = func(value)
+
+    return mapped_value
+
+
+def _is_shareable(value: Any, min_size: int) -> bool:
+    """
+    Determine whether a value is an array which should be shared rather than
+    pickled.
+
+    Args:
+        value: The value to check
+        min_size: The minimum size of arrays to share, in bytes
+
+    Returns:
+        True if the value should be shared; False if not
+    """
+    return (
+        isinstance(value, np.ndarray)
+        and not value.dtype.hasobject
+        and value.nbytes >= min_size
+    )
+
+
+def _open_array(handle: SharedArrayHandle) -> np.ndarray:
+    """
+    Open a shared array.  The array is memory-mapped copy-on-write, so its
+    contents are not copied, and modifications are private to the opener.
+
+    Args:
+        handle: A handle to the array
+
+    Returns:
+        The array
+    """
+    return np.load(handle.path, mmap_mode="c")
+
+
+def export_arrays(value: Any, directory: Union[str, os.PathLike], min_size: int) -> Any:
+    """
+    Replace arrays in a value with handles to shared copies of the arrays.
+
+    Args:
+        value: A value, e.g. a task plugin output
+        directory: The directory to write shared arrays to
+        min_size: The minimum size of arrays to share, in bytes
+
+    Returns:
+        The value, with arrays replaced by SharedArrayHandle objects
+    """
+
+    def export_array(elt: Any) -> Any:
+        if _is_shareable(elt, min_size):
+            path = pathlib.Path(directory, uuid.uuid4().hex + ".npy")
+            np.save(path, elt, allow_pickle=False)
+            elt = SharedArrayHandle(str(path))
+
+        return elt
+
+    return _map_values(value, export_array)
+
+
+def import_arrays(value: Any) -> Any:
+    """
+    Replace shared array handles in a value with the arrays they refer to.
+
+    Args:
+        value: A value which may contain SharedArrayHandle objects
+
+    Returns:
+        The value, with handles replaced by memory-mapped arrays
+    """
+    return _map_values(
+        value,
+        lambda elt: _open_array(elt) if isinstance(elt, SharedArrayHandle) else elt,
+    )
+
+
+def call_task_plugin_shared(
+    directory: str,
+    min_size: int,
+    task_plugin_id: str,
+    arg_values: Sequence[Any],
+    kwarg_values: dict[str, Any],
+) -> Any:
+    """
+    Call a task plugin in a worker process, exchanging arrays with the parent
+    process through shared files rather than pickling them.
+
+    Args:
+        directory: The shared array transport directory
+        min_size: The minimum size of output arrays to share, in bytes
+        task_plugin_id: The task plugin to call, in a composed dotted
+            string form with all the parts needed by pyplugs, e.g. "a.b.c.d"
+        arg_values: Positional argument values for the plugin, which may
+            contain shared array handles
+        kwarg_values: Keyword argument values for the plugin, which may
+            contain shared array handles
+
+    Returns:
+        Whatever the task plugin returned, with large arrays replaced by
+        shared array handles
+    """
+    arg_values = import_arrays(list(arg_values))
+    kwarg_values = import_arrays(dict(kwarg_values))
+
+    output = util.call_sync(
+        dioptra.pyplugs.call,
+        *util.get_pyplugs_coords(task_plugin_id),
+        *arg_values,
+        **kwarg_values,
+    )
+
+    # Generators can't be returned from a worker process
+    return export_arrays(util.collect_generators(output), directory, min_size)
+
+
+class SharedArrayTransport:
+    """
+    Passes numpy arrays between the processes of a process pool via
+    memory-mapped files, so that large step outputs are never pickled.  Array
+    outputs of steps run in worker processes are written once to a file, and
+    the parent process and any worker which consumes them map the file rather
+    than copying it.  Files are reference counted by step: they are deleted
+    when the outputs of the step which produced them are released.
+
+    The transport directory is on a RAM-backed filesystem (/dev/shm) where
+    available.
+    """
+
+    def __init__(self, min_size: int = DEFAULT_MIN_SHARED_ARRAY_SIZE) -> None:
+        """
+        Initialize this transport.
+
+        Args:
+            min_size: The minimum size of arrays to share, in bytes.  Smaller
+                arrays are pickled as usual.
+        """
+        shm_dir: Optional[str] = "/dev/shm"
+        if not os.path.isdir("/dev/shm"):
+            shm_dir = None
+
+        self.directory = tempfile.mkdtemp(prefix="dioptra-arrays-", dir=shm_dir)
+        self.min_size = min_size
+
+        # id(array) => (array, handle), for arrays opened by this transport.
+        # Holding the array keeps its id from being reused.
+        self._handles: dict[int, tuple[np.ndarray, SharedArrayHandle]] = {}
+
+        # step name => IDs of the arrays in its outputs
+        self._step_arrays: dict[str, list[int]] = {}
+
+    def encode(self, value: Any) -> Any:
+        """
+        Replace arrays opened by this transport in the given value with their
+        handles, e.g. before passing a step output to a worker process.
+
+        Args:
+            value: A value, e.g. task plugin arguments
+
+        Returns:
+            The value, with shared arrays replaced by handles
+        """
+
+        def encode_array(elt: Any) -> Any:
+            handle_info = self._handles.get(id(elt))
+            if handle_info is not None and handle_info[0] is elt:
+                elt = handle_info[1]
+
+            return elt
+
+        return _map_values(value, encode_array)
+
+    def attach(self, step_name: str, value: Any) -> Any:
+        """
+        Open the arrays referred to by handles in the output of a step, and
+        take ownership of their files.
+
+        Args:
+            step_name: The name of the step which produced the output
+            value: The output, as returned by call_task_plugin_shared()
+
+        Returns:
+            The output, with handles replaced by memory-mapped arrays
+        """
+        array_ids = self._step_arrays.setdefault(step_name, [])
+
+        def attach_array(elt: Any) -> Any:
+            if isinstance(elt, SharedArrayHandle):
+                array = _open_array(elt)
+                self._handles[id(array)] = (array, elt)
+                array_ids.append(id(array))
+                elt = array
+
+            return elt
+
+        return _map_values(value, attach_array)
+
+    def release(self, step_name: str) -> None:
+        """
+        Delete the files of arrays in the output of a step.  Arrays which are
+        still referenced elsewhere remain valid, since their files stay mapped
+        until they are garbage collected.
+
+        Args:
+            step_name: The name of the step whose outputs were released
+        """
+        log = _get_logger()
+
+        for array_id in self._step_arrays.pop(step_name, []):
+            _, handle = self._handles.pop(array_id)
+
+            try:
+                os.remove(handle.path)
+            except OSError as e:
+                log.warning("Unable to remove shared array %s: %s", handle.path, e)
+
+    def close(self) -> None:
+        """
+        Delete all remaining shared arrays.
+        """
+        self._handles.clear()
+        self._step_arrays.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
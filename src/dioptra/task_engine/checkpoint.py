@@ -0,0 +1,229 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import pickle
+import shutil
+import tempfile
+import urllib.parse
+from collections.abc import Mapping
+from typing import Any, Union
+
+from dioptra.task_engine import util
+
+_METADATA_FILENAME = "checkpoint.json"
+_STEPS_DIRNAME = "steps"
+
+
+def _get_logger() -> logging.Logger:
+    """
+    Get a logger to use for functions in this module.
+
+    Returns:
+        The logger
+    """
+    return logging.getLogger(__name__)
+
+
+def compute_run_digest(
+    experiment_desc: Mapping[str, Any], global_parameters: Mapping[str, Any]
+) -> str:
+    """
+    Compute a digest which identifies a run of an experiment: the description
+    together with its global parameter values.  Checkpoints may only be used to
+    resume a run with the same digest.
+
+    Args:
+        experiment_desc: The experiment description, as parsed YAML or
+            equivalent
+        global_parameters: Global parameter values for the run
+
+    Returns:
+        A digest as a hex string
+    """
+    run_repr = util.canonical_repr([experiment_desc, global_parameters])
+
+    return hashlib.sha256(run_repr.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: pathlib.Path, data: bytes) -> None:
+    """
+    Write a file such that readers never see partial content, by writing to a
+    temp file and renaming it into place.
+
+    Args:
+        path: The path to write
+        data: The file content
+    """
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(data)
+        os.replace(temp_name, path)
+    except BaseException:
+        pathlib.Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+class StepCheckpointStore:
+    """
+    A job-scoped store of step outputs on local disk, used to resume a failed
+    run without re-running the steps which had already completed.  After each
+    step completes, its outputs are pickled into the store.  Steps whose
+    outputs can't be pickled are simply not checkpointed, and will be re-run
+    on resume.
+
+    A store is bound to a run digest (see compute_run_digest()).  If the store
+    on disk was written for a different digest, its content is ignored and
+    discarded, since the outputs may not be valid for this run.
+    """
+
+    def __init__(self, store_dir: Union[str, pathlib.Path], run_digest: str) -> None:
+        """
+        Initialize this store.
+
+        Args:
+            store_dir: The directory in which to keep checkpoints for the job;
+                will be created if necessary
+            run_digest: A digest identifying the run being checkpointed
+        """
+        self.store_dir = pathlib.Path(store_dir)
+        self.run_digest = run_digest
+
+        self.__steps_dir = self.store_dir / _STEPS_DIRNAME
+        self.__metadata_path = self.store_dir / _METADATA_FILENAME
+
+        self.__completed_steps = self._read_metadata()
+
+    def load(self) -> dict[str, dict[str, Any]]:
+        """
+        Load the outputs of all checkpointed steps.
+
+        Returns:
+            A nested mapping: step name => output name => output value.  Steps
+            without outputs map to empty mappings.
+        """
+        log = _get_logger()
+        step_outputs = {}
+
+        for step_name in list(self.__completed_steps):
+            step_path = self._step_path(step_name)
+
+            try:
+                with step_path.open("rb") as fp:
+                    step_outputs[step_name] = pickle.load(fp)
+            except Exception as e:
+                log.warning(
+                    "Unable to load checkpoint for step %s; it will be re-run: %s",
+                    step_name,
+                    e,
+                )
+                self.__completed_steps.remove(step_name)
+
+        return step_outputs
+
+    def save(self, step_name: str, outputs: Mapping[str, Any]) -> None:
+        """
+        Checkpoint the outputs of a completed step.
+
+        Args:
+            step_name: The name of the step which completed
+            outputs: The step's outputs, as a mapping from output name to
+                value
+        """
+        log = _get_logger()
+
+        try:
+            step_data = pickle.dumps(dict(outputs), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            log.info(
+                "Step %s outputs are not serializable; not checkpointed", step_name
+            )
+            log.debug("Serialization error: %s", e)
+            return
+
+        self.__steps_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self._step_path(step_name), step_data)
+
+        self.__completed_steps.append(step_name)
+        self._write_metadata()
+
+    def clear(self) -> None:
+        """
+        Delete all checkpoints in this store.
+        """
+        shutil.rmtree(self.store_dir, ignore_errors=True)
+        self.__completed_steps = []
+
+    def _step_path(self, step_name: str) -> pathlib.Path:
+        """
+        Get the path of the file which holds the given step's outputs.  Step
+        names are quoted, since they may contain characters which aren't legal
+        in filenames.
+
+        Args:
+            step_name: A step name
+
+        Returns:
+            A path
+        """
+        return self.__steps_dir / (urllib.parse.quote(step_name, safe="") + ".pkl")
+
+    def _read_metadata(self) -> list[str]:
+        """
+        Read the list of completed steps from the store metadata.  If the
+        store was written for a different run, discard it.
+
+        Returns:
+            A list of names of checkpointed steps
+        """
+        log = _get_logger()
+
+        try:
+            metadata = json.loads(self.__metadata_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return []
+        except ValueError:
+            log.warning("Discarding corrupt checkpoint store: %s", self.store_dir)
+            self.clear()
+            return []
+
+        if metadata.get("run_digest") != self.run_digest:
+            log.warning(
+                "Discarding checkpoints of a different experiment run: %s",
+                self.store_dir,
+            )
+            self.clear()
+            return []
+
+        return list(metadata.get("completed_steps", []))
+
+    def _write_metadata(self) -> None:
+        """
+        Write the store metadata: the run digest and completed step names.
+        """
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+        metadata = {
+            "run_digest": self.run_digest,
+            "completed_steps": self.__completed_steps,
+        }
+
+        _write_atomic(self.__metadata_path, json.dumps(metadata).encode("utf-8"))
@@ -0,0 +1,504 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import heapq
+import json
+import logging
+import statistics
+import tempfile
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from typing import Any, NamedTuple, Optional
+
+from dioptra.sdk.exceptions.task_engine import StepError
+from dioptra.task_engine.plan import (
+    CompiledStep,
+    ExecutionPlan,
+    compile_experiment,
+    resolve_invocation_args,
+)
+from dioptra.task_engine.step_cache import StepOutputCache
+from dioptra.task_engine.task_engine import resolve_global_parameters
+
+# Artifacts in which the rq task engine worker records step profiles
+_PROFILE_ARTIFACT = "step_profile.json"
+_PARTITION_PROFILE_DIR = "step_profiles"
+
+
+def _get_logger() -> logging.Logger:
+    """
+    Get a logger to use for functions in this module.
+
+    Returns:
+        The logger
+    """
+    return logging.getLogger(__name__)
+
+
+class TimingHistory:
+    """
+    Step measurements from earlier runs, as recorded by a step profiler,
+    aggregated per task plugin.  Measurements of profiles which don't name
+    their task plugin are aggregated per step name instead.
+    """
+
+    def __init__(self) -> None:
+        self.__wall_times: dict[str, list[float]] = defaultdict(list)
+        self.__peak_rss_deltas: dict[str, int] = {}
+
+    def add_report(self, report: Iterable[Mapping[str, Any]]) -> None:
+        """
+        Add the measurements of a step profile report.  Cache hits are
+        skipped, since the task plugin was not called.
+
+        Args:
+            report: A step profile report, as produced by
+                StepProfiler.get_report()
+        """
+        for summary in report:
+            if summary.get("cache_hit") or "wall_time" not in summary:
+                continue
+
+            key = summary.get("task_plugin_id") or summary["step_name"]
+            self.__wall_times[key].append(summary["wall_time"])
+
+            peak_rss_delta = summary.get("peak_rss_delta")
+            if peak_rss_delta is not None:
+                self.__peak_rss_deltas[key] = max(
+                    peak_rss_delta, self.__peak_rss_deltas.get(key, 0)
+                )
+
+    def get_wall_time(self, step: CompiledStep) -> Optional[float]:
+        """
+        Estimate the wall time of a call to a step's task plugin, as the median
+        of the recorded wall times.
+
+        Args:
+            step: A compiled step
+
+        Returns:
+            A number of seconds, or None if there are no measurements
+        """
+        wall_times = self.__wall_times.get(
+            step.task_plugin_id
+        ) or self.__wall_times.get(step.name)
+
+        return statistics.median(wall_times) if wall_times else None
+
+    def get_peak_rss_delta(self, step: CompiledStep) -> Optional[int]:
+        """
+        Estimate the peak memory growth of a call to a step's task plugin, as
+        the largest recorded growth.
+
+        Args:
+            step: A compiled step
+
+        Returns:
+            A number of bytes, or None if there are no measurements
+        """
+        peak_rss_delta = self.__peak_rss_deltas.get(step.task_plugin_id)
+        if peak_rss_delta is None:
+            peak_rss_delta = self.__peak_rss_deltas.get(step.name)
+
+        return peak_rss_delta
+
+
+class StepEstimate(NamedTuple):
+    """
+    The estimated cost of one step of a run.
+    """
+
+    step_name: str
+
+    # Estimated seconds and peak memory growth in bytes of a call to the
+    # step's task plugin, or None if there are no measurements to go on
+    wall_time: Optional[float]
+    peak_rss_delta: Optional[int]
+
+    # Whether the step's output is predicted to come from the step output
+    # cache, or None if it can't be predicted without running the steps the
+    # step depends on
+    cache_hit: Optional[bool]
+
+    # Simulated seconds from the start of the run
+    start_time: float
+    finish_time: float
+
+
+class PlanEstimate(NamedTuple):
+    """
+    The estimated cost of a run of an execution plan.
+    """
+
+    steps: Mapping[str, StepEstimate]
+
+    # The chain of dependent steps which takes longest to run, and how long
+    # it takes.  No amount of concurrency makes a run shorter than this.
+    critical_path: tuple[str, ...]
+    critical_path_time: float
+
+    # Simulated seconds the run takes with the given concurrency
+    duration: float
+
+    # Simulated peak total memory growth of concurrently running steps, in
+    # bytes
+    peak_memory: int
+
+    # Steps which are predicted to run but have no measurements, and so were
+    # counted as free
+    unmeasured_steps: tuple[str, ...]
+
+
+def _predict_cache_hit(
+    step: CompiledStep,
+    global_parameters: Mapping[str, Any],
+    step_cache: Optional[StepOutputCache],
+) -> Optional[bool]:
+    """
+    Predict whether a step's output will come from the step output cache.
+
+    Args:
+        step: A compiled step
+        global_parameters: Resolved global parameters of the run
+        step_cache: The step output cache the run will use, or None
+
+    Returns:
+        True if the cache holds the step's output; False if not; None if the
+        step's arguments depend on outputs of other steps, so its cache key
+        can't be computed without running them
+    """
+    if step_cache is None or not step_cache.is_cacheable(step.task_def):
+        return False
+
+    try:
+        arg_values, kwarg_values = resolve_invocation_args(step, global_parameters, {})
+    except StepError:
+        return None
+
+    cache_key = step_cache.make_key(step.task_plugin_id, arg_values, kwarg_values)
+
+    return cache_key is not None and step_cache.contains(cache_key)
+
+
+def _find_critical_path(
+    plan: ExecutionPlan, durations: Mapping[str, float]
+) -> tuple[tuple[str, ...], float]:
+    """
+    Find the longest chain of dependent steps of a plan.
+
+    Args:
+        plan: An execution plan
+        durations: A mapping from step name to its estimated duration
+
+    Returns:
+        A (chain of step names, total duration) 2-tuple
+    """
+    path_times: dict[str, float] = {}
+    predecessors: dict[str, Optional[str]] = {}
+
+    # Step order is a topological order, so dependencies are visited first.
+    for step_name in plan.step_order:
+        predecessor = max(
+            plan.dependencies[step_name], key=path_times.__getitem__, default=None
+        )
+        predecessors[step_name] = predecessor
+        path_times[step_name] = durations[step_name] + (
+            path_times[predecessor] if predecessor is not None else 0.0
+        )
+
+    if not path_times:
+        return (), 0.0
+
+    last_step: Optional[str] = max(plan.step_order, key=path_times.__getitem__)
+    path_time = path_times[last_step]
+
+    path = []
+    while last_step is not None:
+        path.append(last_step)
+        last_step = predecessors[last_step]
+
+    return tuple(reversed(path)), path_time
+
+
+def _simulate_schedule(
+    plan: ExecutionPlan,
+    durations: Mapping[str, float],
+    memory: Mapping[str, int],
+    max_workers: int,
+) -> tuple[dict[str, tuple[float, float]], int]:
+    """
+    Simulate running a plan with a bounded number of concurrent steps.  Ready
+    steps are started in plan order whenever a worker is free, which is how
+    the task engine schedules them.
+
+    Args:
+        plan: An execution plan
+        durations: A mapping from step name to its estimated duration
+        memory: A mapping from step name to its estimated peak memory growth
+        max_workers: The maximum number of steps to run concurrently
+
+    Returns:
+        A (step name => (start time, finish time) mapping, peak total memory
+        growth of concurrently running steps) 2-tuple
+    """
+    step_index = {step_name: idx for idx, step_name in enumerate(plan.step_order)}
+
+    dependents: dict[str, list[str]] = defaultdict(list)
+    remaining_deps = {}
+    for step_name in plan.step_order:
+        remaining_deps[step_name] = len(plan.dependencies[step_name])
+        for dep in plan.dependencies[step_name]:
+            dependents[dep].append(step_name)
+
+    ready = [
+        (step_index[step_name], step_name)
+        for step_name, count in remaining_deps.items()
+        if count == 0
+    ]
+    heapq.heapify(ready)
+
+    running: list[tuple[float, int, str]] = []
+    times = {}
+    now = 0.0
+    current_memory = 0
+    peak_memory = 0
+
+    while ready or running:
+        while ready and len(running) < max_workers:
+            idx, step_name = heapq.heappop(ready)
+            finish_time = now + durations[step_name]
+            times[step_name] = (now, finish_time)
+            heapq.heappush(running, (finish_time, idx, step_name))
+
+            current_memory += memory[step_name]
+            peak_memory = max(peak_memory, current_memory)
+
+        now, _, step_name = heapq.heappop(running)
+        current_memory -= memory[step_name]
+
+        for dependent in dependents[step_name]:
+            remaining_deps[dependent] -= 1
+            if remaining_deps[dependent] == 0:
+                heapq.heappush(ready, (step_index[dependent], dependent))
+
+    return times, peak_memory
+
+
+def estimate_plan(
+    plan: ExecutionPlan,
+    global_parameters: Mapping[str, Any],
+    history: TimingHistory,
+    step_cache: Optional[StepOutputCache] = None,
+    max_workers: Optional[int] = None,
+) -> PlanEstimate:
+    """
+    Estimate the cost of running a plan, without running it, from measurements
+    of earlier runs.  Steps predicted to be cache hits are counted as free.
+    Steps whose cache hits can't be predicted are assumed to run, so the
+    estimate errs on the expensive side.
+
+    Args:
+        plan: An execution plan, as produced by compile_experiment()
+        global_parameters: External parameter values which would be used in
+            the run.  This mapping is not modified.
+        history: Measurements of earlier runs
+        step_cache: The step output cache the run would use, or None
+        max_workers: The maximum number of steps the run would run
+            concurrently; None or 1 means one at a time
+
+    Returns:
+        A plan estimate
+    """
+    log = _get_logger()
+
+    global_parameters = dict(global_parameters)
+    resolve_global_parameters(plan.parameter_spec, global_parameters)
+
+    durations = {}
+    memory = {}
+    cache_hits = {}
+    unmeasured_steps = []
+
+    for step_name in plan.step_order:
+        step = plan.steps[step_name]
+        cache_hit = _predict_cache_hit(step, global_parameters, step_cache)
+        cache_hits[step_name] = cache_hit
+
+        if cache_hit:
+            durations[step_name] = 0.0
+            memory[step_name] = 0
+            continue
+
+        wall_time = history.get_wall_time(step)
+        if wall_time is None:
+            unmeasured_steps.append(step_name)
+
+        durations[step_name] = wall_time or 0.0
+        memory[step_name] = history.get_peak_rss_delta(step) or 0
+
+    if unmeasured_steps:
+        log.warning("No measurements of steps: %s", ", ".join(unmeasured_steps))
+
+    critical_path, critical_path_time = _find_critical_path(plan, durations)
+
+    times, peak_memory = _simulate_schedule(
+        plan, durations, memory, max(max_workers or 1, 1)
+    )
+
+    step_estimates = {
+        step_name: StepEstimate(
+            step_name,
+            history.get_wall_time(plan.steps[step_name]),
+            history.get_peak_rss_delta(plan.steps[step_name]),
+            cache_hits[step_name],
+            *times[step_name],
+        )
+        for step_name in plan.step_order
+    }
+
+    return PlanEstimate(
+        step_estimates,
+        critical_path,
+        critical_path_time,
+        max((finish for _, finish in times.values()), default=0.0),
+        peak_memory,
+        tuple(unmeasured_steps),
+    )
+
+
+def estimate_experiment(
+    experiment_desc: Mapping[str, Any],
+    global_parameters: Mapping[str, Any],
+    history: TimingHistory,
+    step_cache: Optional[StepOutputCache] = None,
+    max_workers: Optional[int] = None,
+) -> PlanEstimate:
+    """
+    Estimate the cost of running an experiment, without running it.  This
+    compiles the description to an execution plan and estimates it; see
+    estimate_plan() for details.
+
+    Args:
+        experiment_desc: The experiment description, as parsed YAML or
+            equivalent
+        global_parameters: External parameter values which would be used in
+            the experiment
+        history: Measurements of earlier runs
+        step_cache: The step output cache the run would use, or None
+        max_workers: The maximum number of steps the run would run
+            concurrently
+
+    Returns:
+        A plan estimate
+    """
+    plan = compile_experiment(experiment_desc)
+
+    return estimate_plan(plan, global_parameters, history, step_cache, max_workers)
+
+
+def get_estimate_summary(estimate: PlanEstimate) -> dict[str, Any]:
+    """
+    Flatten a plan estimate to a JSON-compatible mapping.
+
+    Args:
+        estimate: A plan estimate
+
+    Returns:
+        A mapping with the overall estimates, and per-step estimates under
+        "steps"
+    """
+    return {
+        "duration": estimate.duration,
+        "critical_path": list(estimate.critical_path),
+        "critical_path_time": estimate.critical_path_time,
+        "peak_memory": estimate.peak_memory,
+        "unmeasured_steps": list(estimate.unmeasured_steps),
+        "steps": [step_estimate._asdict() for step_estimate in estimate.steps.values()],
+    }
+
+
+def _list_profile_artifacts(client: Any, run_id: str) -> list[str]:
+    """
+    Find the step profile artifacts of an MLflow run.
+
+    Args:
+        client: An MLflow tracking client
+        run_id: The ID of the run
+
+    Returns:
+        A list of run-relative artifact paths
+    """
+    artifact_paths = []
+
+    for file_info in client.list_artifacts(run_id):
+        if file_info.path == _PROFILE_ARTIFACT:
+            artifact_paths.append(file_info.path)
+
+        elif file_info.path == _PARTITION_PROFILE_DIR and file_info.is_dir:
+            artifact_paths.extend(
+                partition_info.path
+                for partition_info in client.list_artifacts(
+                    run_id, _PARTITION_PROFILE_DIR
+                )
+                if partition_info.path.endswith(".json")
+            )
+
+    return artifact_paths
+
+
+def load_timing_history_from_mlflow(
+    client: Any,
+    experiment_ids: Iterable[str],
+    max_runs: int = 100,
+    history: Optional[TimingHistory] = None,
+) -> TimingHistory:
+    """
+    Gather the step profiles which task engine jobs recorded in MLflow runs.
+
+    Args:
+        client: An MLflow tracking client, i.e. an mlflow.tracking.MlflowClient
+        experiment_ids: IDs of the MLflow experiments whose runs to search
+        max_runs: The maximum number of runs to gather, most recent first
+        history: A timing history to add the profiles to, or None to create
+            a new one
+
+    Returns:
+        The timing history
+    """
+    log = _get_logger()
+
+    if history is None:
+        history = TimingHistory()
+
+    runs = client.search_runs(
+        list(experiment_ids),
+        max_results=max_runs,
+        order_by=["attributes.start_time DESC"],
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for run in runs:
+            for artifact_path in _list_profile_artifacts(client, run.info.run_id):
+                local_path = client.download_artifacts(
+                    run.info.run_id, artifact_path, temp_dir
+                )
+
+                with open(local_path, "r", encoding="utf-8") as fp:
+                    history.add_report(json.load(fp))
+
+            log.debug("Gathered step profiles of run %s", run.info.run_id)
+
+    return history
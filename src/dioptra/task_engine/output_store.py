@@ -0,0 +1,242 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import logging
+import os
+import pathlib
+import pickle
+import shutil
+import tempfile
+import urllib.parse
+from abc import ABCMeta, abstractmethod
+from collections.abc import Mapping
+from typing import Any, Optional, Union
+
+from botocore.client import BaseClient
+
+from dioptra.sdk.utilities.s3 import get_s3_keys, s3_uri_to_bucket_prefix
+
+
+def _get_logger() -> logging.Logger:
+    """
+    Get a logger to use for functions in this module.
+
+    Returns:
+        The logger
+    """
+    return logging.getLogger(__name__)
+
+
+def _make_step_key(step_name: str) -> str:
+    """
+    Make the key under which a step's outputs are stored.  Step names are
+    quoted, since they may contain characters which aren't legal in filenames
+    or object keys.
+
+    Args:
+        step_name: A step name
+
+    Returns:
+        A key
+    """
+    return urllib.parse.quote(step_name, safe="") + ".pkl"
+
+
+class StepOutputStore(metaclass=ABCMeta):
+    """
+    A store of step outputs, through which the jobs of a distributed run pass
+    outputs to each other.  Outputs are pickled, so all outputs consumed
+    across jobs must be picklable.  Subclasses implement storage of the
+    pickled data.
+    """
+
+    def put(self, step_name: str, outputs: Mapping[str, Any]) -> None:
+        """
+        Store the outputs of a completed step.
+
+        Args:
+            step_name: The name of the step which completed
+            outputs: The step's outputs, as a mapping from output name to
+                value
+        """
+        step_data = pickle.dumps(dict(outputs), protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._write(_make_step_key(step_name), step_data)
+
+    def get(self, step_name: str) -> Optional[dict[str, Any]]:
+        """
+        Load the outputs of a step.
+
+        Args:
+            step_name: A step name
+
+        Returns:
+            A mapping from output name to value, or None if the step's
+            outputs were not stored
+        """
+        step_data = self._read(_make_step_key(step_name))
+
+        if step_data is None:
+            return None
+
+        return pickle.loads(step_data)
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Delete all outputs in this store.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _write(self, key: str, data: bytes) -> None:
+        """
+        Write data to this store.
+
+        Args:
+            key: The key to write the data under
+            data: The data
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _read(self, key: str) -> Optional[bytes]:
+        """
+        Read data from this store.
+
+        Args:
+            key: The key the data was written under
+
+        Returns:
+            The data, or None if nothing was written under the key
+        """
+        raise NotImplementedError
+
+
+class LocalStepOutputStore(StepOutputStore):
+    """
+    A step output store in a local directory.  This is only shared between
+    workers on the same machine, or with a shared filesystem, but is a
+    convenient stand-in for an object store in development and tests.
+    """
+
+    def __init__(self, store_dir: Union[str, pathlib.Path]) -> None:
+        """
+        Initialize this store.
+
+        Args:
+            store_dir: The directory in which to keep step outputs; will be
+                created if necessary
+        """
+        self.store_dir = pathlib.Path(store_dir)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.store_dir, ignore_errors=True)
+
+    def _write(self, key: str, data: bytes) -> None:
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        path = self.store_dir / key
+
+        # Write to a temp file and rename it into place, so that readers
+        # never see partial content.
+        fd, temp_name = tempfile.mkstemp(dir=self.store_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(data)
+            os.replace(temp_name, path)
+        except BaseException:
+            pathlib.Path(temp_name).unlink(missing_ok=True)
+            raise
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            return (self.store_dir / key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+
+class S3StepOutputStore(StepOutputStore):
+    """
+    A step output store under a prefix of an S3 bucket, e.g. in MinIO.
+    """
+
+    def __init__(self, s3: BaseClient, s3_uri: str) -> None:
+        """
+        Initialize this store.
+
+        Args:
+            s3: A boto3 S3 client object
+            s3_uri: An S3 URI, of the form s3://<bucket>/<key_prefix>, under
+                which to keep step outputs
+        """
+        bucket, prefix = s3_uri_to_bucket_prefix(s3_uri)
+
+        if not bucket:
+            raise ValueError("S3 URIs must include a bucket: " + s3_uri)
+
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix.rstrip("/") + "/" if prefix else ""
+
+    def clear(self) -> None:
+        log = _get_logger()
+
+        keys = list(get_s3_keys(self.s3, self.bucket, self.prefix))
+
+        # DeleteObjects accepts at most 1000 keys per request
+        for i in range(0, len(keys), 1000):
+            self.s3.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in keys[i : i + 1000]]},
+            )
+
+        log.debug("Deleted %d step output object(s)", len(keys))
+
+    def _write(self, key: str, data: bytes) -> None:
+        self.s3.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            resp = self.s3.get_object(Bucket=self.bucket, Key=self.prefix + key)
+        except self.s3.exceptions.NoSuchKey:
+            return None
+
+        return resp["Body"].read()
+
+
+def make_step_output_store(
+    uri: str, s3: Optional[BaseClient] = None
+) -> StepOutputStore:
+    """
+    Create a step output store from a URI: an S3 URI (s3://<bucket>/<prefix>)
+    for an S3 store, or otherwise a local directory path.
+
+    Args:
+        uri: A store URI
+        s3: A boto3 S3 client object, required for S3 stores
+
+    Returns:
+        A step output store
+    """
+    store: StepOutputStore
+    if urllib.parse.urlparse(uri).scheme == "s3":
+        if s3 is None:
+            raise ValueError("An S3 client is required for S3 step output stores")
+        store = S3StepOutputStore(s3, uri)
+    else:
+        store = LocalStepOutputStore(uri)
+
+    return store
@@ -0,0 +1,106 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+from collections.abc import Mapping
+from typing import NamedTuple
+
+from dioptra.task_engine.plan import ExecutionPlan
+
+
+class PlanPartition(NamedTuple):
+    """
+    A subset of the steps of an execution plan which is run as a unit, e.g.
+    as one job of a distributed run.
+    """
+
+    # The partition is named after its first step, so names are unique
+    # within a plan.
+    name: str
+    step_names: tuple[str, ...]
+
+    # Names of the partitions whose steps this partition's steps depend on
+    dependencies: tuple[str, ...]
+
+
+def _get_step_dependents(plan: ExecutionPlan) -> Mapping[str, list[str]]:
+    """
+    Find the steps which depend on each step of a plan, via references or
+    explicit dependencies.
+
+    Args:
+        plan: An execution plan
+
+    Returns:
+        A mapping from step name to the names of the steps which depend on it
+    """
+    dependents: dict[str, list[str]] = {step_name: [] for step_name in plan.steps}
+
+    for step_name in plan.step_order:
+        for dep in plan.dependencies[step_name]:
+            dependents[dep].append(step_name)
+
+    return dependents
+
+
+def partition_plan(plan: ExecutionPlan) -> list[PlanPartition]:
+    """
+    Partition the steps of a plan into chains.  A step joins the chain of its
+    dependency if it has exactly one dependency and is that dependency's only
+    dependent; otherwise it starts a new chain.  Steps in a chain can only run
+    one after the other anyway, so running each chain as a unit loses no
+    concurrency, while independent chains may run on different machines.
+
+    Only the first step of a chain depends on steps outside of it, which keeps
+    the dependencies between partitions acyclic.
+
+    Args:
+        plan: An execution plan
+
+    Returns:
+        A list of partitions, in an order such that each partition comes after
+        all of the partitions it depends on
+    """
+    dependents = _get_step_dependents(plan)
+
+    partition_index: dict[str, int] = {}
+    partition_steps: list[list[str]] = []
+
+    for step_name in plan.step_order:
+        deps = plan.dependencies[step_name]
+
+        if len(deps) == 1 and len(dependents[deps[0]]) == 1:
+            index = partition_index[deps[0]]
+            partition_steps[index].append(step_name)
+        else:
+            index = len(partition_steps)
+            partition_steps.append([step_name])
+
+        partition_index[step_name] = index
+
+    partitions = []
+    for step_names in partition_steps:
+        # Only the first step may depend on other partitions
+        dep_names = []
+        for dep in plan.dependencies[step_names[0]]:
+            dep_name = partition_steps[partition_index[dep]][0]
+            if dep_name not in dep_names:
+                dep_names.append(dep_name)
+
+        partitions.append(
+            PlanPartition(step_names[0], tuple(step_names), tuple(dep_names))
+        )
+
+    return partitions
@@ -0,0 +1,678 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import collections
+import copy
+import inspect
+import time
+import types
+from collections.abc import Collection, Iterator, Mapping
+from typing import Any, Callable, NamedTuple, Optional, Union
+
+import dioptra.pyplugs
+from dioptra.sdk.exceptions.task_engine import (
+    IllegalOutputReferenceError,
+    MissingTaskPluginNameError,
+    OutputNotFoundError,
+    StepError,
+    StepNotFoundError,
+    TaskPluginNotFoundError,
+    UnresolvableReferenceError,
+)
+from dioptra.task_engine import util
+
+
+class ParameterReference(NamedTuple):
+    """A reference to a global parameter, e.g. "$param"."""
+
+    parameter_name: str
+
+
+class OutputReference(NamedTuple):
+    """
+    A reference to a step output, e.g. "$step.output".  The output name is
+    None for references to the only output of a step, e.g. "$step".
+    """
+
+    step_name: str
+    output_name: Optional[str]
+
+
+class Constant(NamedTuple):
+    """
+    An argument value which doesn't depend on any references, and so can be
+    computed once when the plan is compiled.
+    """
+
+    value: Any
+
+
+class ListArg(NamedTuple):
+    """A list-valued argument which contains references."""
+
+    items: tuple["ArgSpec", ...]
+
+
+class DictArg(NamedTuple):
+    """A dict-valued argument which contains references."""
+
+    items: tuple[tuple[Any, "ArgSpec"], ...]
+
+
+ArgSpec = Union[ParameterReference, OutputReference, Constant, ListArg, DictArg]
+
+
+class CompiledStep(NamedTuple):
+    """
+    A step of an execution plan, with everything needed to invoke its task
+    plugin precomputed.
+    """
+
+    name: str
+    task_def: Mapping[str, Any]
+    task_plugin_id: str
+    plugin_func: Callable[..., Any]
+    args: tuple[ArgSpec, ...]
+    kwargs: tuple[tuple[str, ArgSpec], ...]
+
+    # Seconds spent importing the task plugin when the plan was compiled.
+    # Only the first step to use a given plugin is charged for its import.
+    import_time: float = 0.0
+
+    # Whether the task plugin is a coroutine function ("async def"), which
+    # must be awaited on an event loop.
+    is_coroutine: bool = False
+
+    # Seconds to wait for each attempt to invoke the task plugin, or None to
+    # wait indefinitely; the number of times to retry the invocation after a
+    # transient error; and whether attempts which timed out may be retried.
+    timeout: Optional[float] = None
+    retries: int = 0
+    retry_timeouts: bool = False
+
+
+class ExecutionPlan(NamedTuple):
+    """
+    An immutable, executable form of an experiment description.  A plan may be
+    executed any number of times, with different global parameter values.
+    """
+
+    parameter_spec: Mapping[str, Any]
+    steps: Mapping[str, CompiledStep]
+    step_order: tuple[str, ...]
+
+    # step name => names of steps it depends on (via references or explicit
+    # dependencies)
+    dependencies: Mapping[str, tuple[str, ...]]
+
+    # step name => names of steps which consume its outputs
+    consumers: Mapping[str, tuple[str, ...]]
+
+    # (step name, output name) pairs for generator outputs which may be
+    # passed lazily to their only consumer, which takes them as a stream.
+    # Other generator outputs are collected into lists.
+    stream_outputs: frozenset[tuple[str, str]] = frozenset()
+
+
+def _compile_reference(
+    reference: str, parameter_spec: Mapping[str, Any], graph: Mapping[str, Any]
+) -> Union[ParameterReference, OutputReference]:
+    """
+    Compile a reference to a task output or global parameter.
+
+    Args:
+        reference: The reference to compile, without the "$" prefix
+        parameter_spec: The global parameter spec from the experiment
+            description
+        graph: The step graph from the experiment description
+
+    Returns:
+        A compiled reference
+    """
+    compiled_ref: Union[ParameterReference, OutputReference]
+
+    if "." in reference:
+        # Must be an <step>.<output> formatted reference
+        step_name, output_name = reference.split(".", 1)
+
+        if step_name not in graph:
+            raise StepNotFoundError(step_name)
+
+        compiled_ref = OutputReference(step_name, output_name)
+
+    # A bare name may refer to either a global parameter or the only output of
+    # a step.  Let's assume prior validation ensured the same name does not
+    # occur in both places.
+    elif reference in parameter_spec:
+        compiled_ref = ParameterReference(reference)
+
+    elif reference in graph:
+        compiled_ref = OutputReference(reference, None)
+
+    else:
+        raise UnresolvableReferenceError(reference)
+
+    return compiled_ref
+
+
+def _compile_arg(
+    arg_spec: Any, parameter_spec: Mapping[str, Any], graph: Mapping[str, Any]
+) -> ArgSpec:
+    """
+    Compile a specification for one argument of a task invocation.  Parts of
+    the specification which don't contain references are folded into
+    constants.
+
+    Args:
+        arg_spec: The argument specification
+        parameter_spec: The global parameter spec from the experiment
+            description
+        graph: The step graph from the experiment description
+
+    Returns:
+        A compiled argument specification
+    """
+    compiled_arg: ArgSpec
+
+    if isinstance(arg_spec, str):
+        if util.is_reference(arg_spec):
+            compiled_arg = _compile_reference(arg_spec[1:], parameter_spec, graph)
+
+        elif arg_spec.startswith("$$"):
+            # "escaped" dollar sign: replace only the initial "$$" with "$"
+            compiled_arg = Constant(arg_spec[1:])
+
+        else:
+            compiled_arg = Constant(arg_spec)
+
+    elif isinstance(arg_spec, dict):
+        items = tuple(
+            (key, _compile_arg(value, parameter_spec, graph))
+            for key, value in arg_spec.items()
+        )
+
+        if all(isinstance(value, Constant) for _, value in items):
+            compiled_arg = Constant({key: value.value for key, value in items})
+        else:
+            compiled_arg = DictArg(items)
+
+    elif isinstance(arg_spec, list):
+        list_items = tuple(
+            _compile_arg(sub_val, parameter_spec, graph) for sub_val in arg_spec
+        )
+
+        if all(isinstance(value, Constant) for value in list_items):
+            compiled_arg = Constant([value.value for value in list_items])
+        else:
+            compiled_arg = ListArg(list_items)
+
+    else:
+        compiled_arg = Constant(arg_spec)
+
+    return compiled_arg
+
+
+def _get_step_task_def(
+    step_name: str, step: Mapping[str, Any], tasks: Mapping[str, Any]
+) -> Mapping[str, Any]:
+    """
+    Find the definition of the task plugin invoked by the given step.
+
+    Args:
+        step_name: The name of the step
+        step: The step description
+        tasks: The task definitions from the experiment description
+
+    Returns:
+        The task definition
+    """
+    task_plugin_short_name = util.step_get_plugin_short_name(step)
+    if not task_plugin_short_name:
+        raise MissingTaskPluginNameError(step_name)
+
+    task_def = tasks.get(task_plugin_short_name)
+    if not task_def:
+        raise TaskPluginNotFoundError(task_plugin_short_name, step_name)
+
+    return task_def
+
+
+def _compile_step(
+    step_name: str,
+    step: Mapping[str, Any],
+    tasks: Mapping[str, Any],
+    parameter_spec: Mapping[str, Any],
+    graph: Mapping[str, Any],
+) -> tuple[Mapping[str, Any], tuple[ArgSpec, ...], tuple[tuple[str, ArgSpec], ...]]:
+    """
+    Compile the task invocation of one step.
+
+    Args:
+        step_name: The name of the step
+        step: The step description
+        tasks: The task definitions from the experiment description
+        parameter_spec: The global parameter spec from the experiment
+            description
+        graph: The step graph from the experiment description
+
+    Returns:
+        A (task definition, compiled positional args, compiled keyword args)
+        3-tuple
+    """
+    task_def = _get_step_task_def(step_name, step, tasks)
+
+    pos_arg_specs, kwarg_specs = util.step_get_invocation_arg_specs(step)
+
+    # step_get_invocation_arg_specs() is written to be graceful in the face of
+    # a malformed step definition (and return nulls), but we found a task
+    # plugin short name above, so nulls won't happen here.
+    assert pos_arg_specs is not None
+    assert kwarg_specs is not None
+
+    args = tuple(
+        _compile_arg(arg_spec, parameter_spec, graph) for arg_spec in pos_arg_specs
+    )
+
+    kwargs = tuple(
+        (kwarg_name, _compile_arg(kwarg_spec, parameter_spec, graph))
+        for kwarg_name, kwarg_spec in kwarg_specs.items()
+    )
+
+    return task_def, args, kwargs
+
+
+def _iter_output_references(arg_spec: ArgSpec) -> Iterator[OutputReference]:
+    """
+    Generate all step output references within a compiled argument
+    specification.
+
+    Args:
+        arg_spec: A compiled argument specification
+
+    Yields:
+        Output references
+    """
+    if isinstance(arg_spec, OutputReference):
+        yield arg_spec
+
+    elif isinstance(arg_spec, ListArg):
+        for item in arg_spec.items:
+            yield from _iter_output_references(item)
+
+    elif isinstance(arg_spec, DictArg):
+        for _, value in arg_spec.items:
+            yield from _iter_output_references(value)
+
+
+def _get_referenced_output_name(
+    reference: OutputReference, tasks: Mapping[str, Any], graph: Mapping[str, Any]
+) -> Optional[str]:
+    """
+    Find the name of the step output an output reference refers to.
+
+    Args:
+        reference: An output reference
+        tasks: The task definitions from the experiment description
+        graph: The step graph from the experiment description
+
+    Returns:
+        An output name, or None if the reference is to the only output of a
+        step which doesn't have exactly one output
+    """
+    if reference.output_name is not None:
+        return reference.output_name
+
+    task_def = _get_step_task_def(
+        reference.step_name, graph[reference.step_name], tasks
+    )
+
+    output_defs = task_def.get("outputs", [])
+    if isinstance(output_defs, Mapping):
+        output_defs = [output_defs]
+
+    if len(output_defs) != 1:
+        return None
+
+    return next(iter(output_defs[0]))
+
+
+def _find_stream_outputs(
+    compiled_invocations: Mapping[
+        str,
+        tuple[Mapping[str, Any], tuple[ArgSpec, ...], tuple[tuple[str, ArgSpec], ...]],
+    ],
+    tasks: Mapping[str, Any],
+    graph: Mapping[str, Any],
+) -> frozenset[tuple[str, str]]:
+    """
+    Find the step outputs which may be passed to their consumer lazily, if
+    they are generators: those referenced exactly once in the graph, directly
+    as the argument for a task input declared as a stream.  A generator can
+    only be consumed once, and as a whole, so anything else must get a list.
+
+    Args:
+        compiled_invocations: A mapping from step name to (task definition,
+            compiled positional args, compiled keyword args) 3-tuple, as
+            produced by _compile_step()
+        tasks: The task definitions from the experiment description
+        graph: The step graph from the experiment description
+
+    Returns:
+        A set of (step name, output name) pairs
+    """
+    reference_counts: collections.Counter[tuple[str, Optional[str]]] = (
+        collections.Counter()
+    )
+    stream_references = set()
+
+    for task_def, args, kwargs in compiled_invocations.values():
+        input_defs = util.make_task_input_map(task_def)
+        positional_input_defs = list(input_defs.values())
+
+        invocation_args = [
+            (positional_input_defs[i] if i < len(positional_input_defs) else {}, arg)
+            for i, arg in enumerate(args)
+        ]
+        invocation_args.extend(
+            (input_defs.get(kwarg_name, {}), kwarg) for kwarg_name, kwarg in kwargs
+        )
+
+        for input_def, arg_spec in invocation_args:
+            for reference in _iter_output_references(arg_spec):
+                key = (
+                    reference.step_name,
+                    _get_referenced_output_name(reference, tasks, graph),
+                )
+                reference_counts[key] += 1
+
+                if arg_spec is reference and util.input_def_is_stream(input_def):
+                    stream_references.add(key)
+
+    return frozenset(
+        (step_name, output_name)
+        for step_name, output_name in stream_references
+        if output_name is not None and reference_counts[step_name, output_name] == 1
+    )
+
+
+def _get_step_retry_policy(
+    step_def: Mapping[str, Any]
+) -> tuple[Optional[float], int, bool]:
+    """
+    Get the timeout and retry policy of a step.  Only the mixed invocation
+    form of step may set these; in the short forms, these keys would be task
+    plugin short names.
+
+    Args:
+        step_def: A step description, as a mapping
+
+    Returns:
+        A (timeout in seconds or None, number of retries, whether to retry
+        timeouts) 3-tuple
+    """
+    if "task" not in step_def:
+        return None, 0, False
+
+    return (
+        step_def.get("timeout"),
+        step_def.get("retries", 0),
+        step_def.get("retry_timeouts", False),
+    )
+
+
+def compile_experiment(experiment_desc: Mapping[str, Any]) -> ExecutionPlan:
+    """
+    Compile an experiment description to an execution plan.  All references
+    are parsed, literal arguments are folded into constants, task plugins are
+    looked up (importing them if necessary), and the step order and
+    dependency structure of the graph is computed.  The description should
+    already have been validated.
+
+    Args:
+        experiment_desc: The experiment description, as parsed YAML or
+            equivalent
+
+    Returns:
+        An execution plan
+    """
+    parameter_spec = experiment_desc.get("parameters", {})
+    tasks = experiment_desc["tasks"]
+    graph = experiment_desc["graph"]
+
+    compiled_invocations = {}
+    for step_name, step in graph.items():
+        try:
+            compiled_invocations[step_name] = _compile_step(
+                step_name, step, tasks, parameter_spec, graph
+            )
+        except StepError as e:
+            if not e.context_step_name:
+                e.context_step_name = step_name
+            raise
+
+    step_order = tuple(util.get_sorted_steps(graph))
+    dependencies = util.get_step_dependencies(graph)
+    consumers = util.get_step_output_consumers(graph)
+    stream_outputs = _find_stream_outputs(compiled_invocations, tasks, graph)
+
+    # Look up task plugins last, so that errors in the description itself
+    # take precedence over plugin lookup errors.
+    plugin_funcs: dict[str, Callable[..., Any]] = {}
+    steps = {}
+    for step_name, (task_def, args, kwargs) in compiled_invocations.items():
+        task_plugin_id = task_def["plugin"]
+
+        import_time = 0.0
+        plugin_func = plugin_funcs.get(task_plugin_id)
+        if plugin_func is None:
+            start_time = time.perf_counter()
+            plugin_func = dioptra.pyplugs.get(*util.get_pyplugs_coords(task_plugin_id))
+            import_time = time.perf_counter() - start_time
+            plugin_funcs[task_plugin_id] = plugin_func
+
+        steps[step_name] = CompiledStep(
+            step_name,
+            task_def,
+            task_plugin_id,
+            plugin_func,
+            args,
+            kwargs,
+            import_time,
+            inspect.iscoroutinefunction(plugin_func),
+            *_get_step_retry_policy(graph[step_name]),
+        )
+
+    return ExecutionPlan(
+        types.MappingProxyType(parameter_spec),
+        types.MappingProxyType(steps),
+        step_order,
+        types.MappingProxyType(
+            {step_name: tuple(deps) for step_name, deps in dependencies.items()}
+        ),
+        types.MappingProxyType(
+            {step_name: tuple(names) for step_name, names in consumers.items()}
+        ),
+        stream_outputs,
+    )
+
+
+def _resolve_output_reference(
+    reference: OutputReference, step_outputs: Mapping[str, Mapping[str, Any]]
+) -> Any:
+    """
+    Resolve a reference to a step output.
+
+    Args:
+        reference: The reference to resolve
+        step_outputs: The step outputs we have thus far.  This is a nested
+            mapping: step name => output name => output value.
+
+    Returns:
+        The referenced value
+    """
+    step_output = step_outputs.get(reference.step_name)
+
+    if reference.output_name is None:
+        if not step_output:
+            # The referenced step produced no output
+            raise UnresolvableReferenceError(reference.step_name)
+
+        if len(step_output) != 1:
+            raise IllegalOutputReferenceError(reference.step_name)
+
+        value = next(iter(step_output.values()))
+
+    else:
+        if not step_output:
+            raise StepNotFoundError(reference.step_name)
+
+        if reference.output_name not in step_output:
+            raise OutputNotFoundError(reference.step_name, reference.output_name)
+
+        value = step_output[reference.output_name]
+
+    return value
+
+
+def resolve_arg(
+    arg_spec: ArgSpec,
+    global_parameters: Mapping[str, Any],
+    step_outputs: Mapping[str, Mapping[str, Any]],
+) -> Any:
+    """
+    Resolve a compiled argument specification to the actual value to be used
+    in a task invocation.
+
+    Args:
+        arg_spec: A compiled argument specification
+        global_parameters: The global parameters in use for this run, as a
+            mapping from parameter name to value
+        step_outputs: The step outputs we have thus far.  This is a nested
+            mapping: step name => output name => output value.
+
+    Returns:
+        The value to use for the argument
+    """
+    arg_value: Any
+
+    if isinstance(arg_spec, Constant):
+        arg_value = arg_spec.value
+        if isinstance(arg_value, (list, dict)):
+            # Don't let a task plugin which modifies its argument affect later
+            # executions of the plan.
+            arg_value = copy.deepcopy(arg_value)
+
+    elif isinstance(arg_spec, OutputReference):
+        arg_value = _resolve_output_reference(arg_spec, step_outputs)
+
+    elif isinstance(arg_spec, ParameterReference):
+        arg_value = global_parameters[arg_spec.parameter_name]
+
+    elif isinstance(arg_spec, ListArg):
+        arg_value = [
+            resolve_arg(item, global_parameters, step_outputs)
+            for item in arg_spec.items
+        ]
+
+    else:
+        arg_value = {
+            key: resolve_arg(value, global_parameters, step_outputs)
+            for key, value in arg_spec.items
+        }
+
+    return arg_value
+
+
+def resolve_invocation_args(
+    step: CompiledStep,
+    global_parameters: Mapping[str, Any],
+    step_outputs: Mapping[str, Mapping[str, Any]],
+) -> tuple[list[Any], dict[str, Any]]:
+    """
+    Resolve the compiled task invocation of a step to all of the positional and
+    keyword arg values to use in the invocation.
+
+    Args:
+        step: A compiled step
+        global_parameters: The global parameters in use for this run, as a
+            mapping from parameter name to value
+        step_outputs: The step outputs we have thus far.  This is a nested
+            mapping: step name => output name => output value.
+
+    Returns:
+        A 2-tuple including a list of positional values to use in the
+        task invocation, followed by a mapping with keyword arg names and
+        values.
+    """
+    arg_values = [
+        resolve_arg(arg_spec, global_parameters, step_outputs) for arg_spec in step.args
+    ]
+
+    kwarg_values = {
+        kwarg_name: resolve_arg(kwarg_spec, global_parameters, step_outputs)
+        for kwarg_name, kwarg_spec in step.kwargs
+    }
+
+    return arg_values, kwarg_values
+
+
+def slice_plan(plan: ExecutionPlan, step_names: Collection[str]) -> ExecutionPlan:
+    """
+    Create a plan which runs only a subset of the steps of the given plan.
+    Dependencies on steps outside the subset are dropped, so their outputs
+    must be supplied when the slice is run.  Consumers outside the subset are
+    kept, which keeps outputs they consume from being released before the end
+    of a run of the slice.
+
+    Args:
+        plan: An execution plan
+        step_names: The names of the steps to keep
+
+    Returns:
+        A new execution plan
+    """
+    return ExecutionPlan(
+        plan.parameter_spec,
+        types.MappingProxyType(
+            {
+                step_name: step
+                for step_name, step in plan.steps.items()
+                if step_name in step_names
+            }
+        ),
+        tuple(step_name for step_name in plan.step_order if step_name in step_names),
+        types.MappingProxyType(
+            {
+                step_name: tuple(dep for dep in deps if dep in step_names)
+                for step_name, deps in plan.dependencies.items()
+                if step_name in step_names
+            }
+        ),
+        types.MappingProxyType(
+            {
+                step_name: consumers
+                for step_name, consumers in plan.consumers.items()
+                if step_name in step_names
+            }
+        ),
+        # A stream can't be handed to a consumer outside of the slice
+        frozenset(
+            (step_name, output_name)
+            for step_name, output_name in plan.stream_outputs
+            if step_name in step_names
+            and all(consumer in step_names for consumer in plan.consumers[step_name])
+        ),
+    )
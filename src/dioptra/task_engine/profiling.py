@@ -0,0 +1,316 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import cProfile
+import io
+import logging
+import pstats
+import threading
+import time
+import tracemalloc
+from collections.abc import Collection
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+from dioptra.task_engine import util
+
+# How many entries of cProfile and tracemalloc statistics to keep
+_DETAIL_LIMIT = 30
+
+# tracemalloc is process-wide, so concurrent calls share it: it is started
+# by the first and stopped by the last.
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_started = False
+
+
+def _get_logger() -> logging.Logger:
+    """
+    Get a logger to use for functions in this module.
+
+    Returns:
+        The logger
+    """
+    return logging.getLogger(__name__)
+
+
+class CallStats(NamedTuple):
+    """
+    Measurements of a single task plugin invocation, taken in the thread or
+    process which ran it.
+    """
+
+    wall_time: float
+
+    # CPU time of the thread which ran the plugin, or None if it could not be
+    # measured, e.g. for coroutine functions
+    cpu_time: Optional[float]
+
+    # Increase in the peak resident set size of the process running the
+    # plugin, in bytes, or None if unsupported.  With concurrent steps in one
+    # process, other steps may contribute.
+    peak_rss_delta: Optional[int]
+
+    # Formatted cProfile/tracemalloc statistics, if requested for the step
+    cprofile_stats: Optional[str] = None
+    tracemalloc_stats: Optional[str] = None
+
+
+class StepProfile(NamedTuple):
+    """
+    Timing and memory measurements for one step of a run.
+    """
+
+    step_name: str
+
+    # Seconds spent resolving the step's arguments
+    arg_resolution_time: float
+
+    # Seconds spent importing the step's task plugin, when the plan was
+    # compiled
+    plugin_import_time: float
+
+    # Whether the step's output came from the step output cache, in which
+    # case the plugin was not called and call_stats is None
+    cache_hit: bool
+
+    call_stats: Optional[CallStats]
+
+    # The step's task plugin, so that measurements can be related to the
+    # plugin in later runs, e.g. to estimate their cost
+    task_plugin_id: Optional[str] = None
+
+
+def _start_tracemalloc() -> None:
+    """
+    Start tracing memory allocations on behalf of a call, unless tracing
+    already.  Must be paired with _stop_tracemalloc().
+    """
+    global _tracemalloc_users, _tracemalloc_started
+
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_started = True
+
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> None:
+    """
+    Stop tracing memory allocations on behalf of a call, once no other calls
+    are tracing and if tracing was started by _start_tracemalloc().
+    """
+    global _tracemalloc_users, _tracemalloc_started
+
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+
+        if _tracemalloc_users == 0 and _tracemalloc_started:
+            tracemalloc.stop()
+            _tracemalloc_started = False
+
+
+def call_profiled(
+    cprofile: bool,
+    use_tracemalloc: bool,
+    func: Callable[..., Any],
+    *args: Any,
+    **kwargs: Any,
+) -> tuple[Any, CallStats]:
+    """
+    Call a function and measure it.  This is a module-level function so that
+    it can be submitted to a process pool, so that measurements are taken in
+    the process which runs the function.
+
+    Args:
+        cprofile: Whether to profile the call with cProfile
+        use_tracemalloc: Whether to trace memory allocations made by the call
+            with tracemalloc.  This is slow.  Tracing is process-wide, so
+            allocations by concurrent calls in the same process are included.
+        func: The function to call
+        *args: Positional arguments for the function
+        **kwargs: Keyword arguments for the function
+
+    Returns:
+        A (function return value, call statistics) 2-tuple
+    """
+    profiler = cProfile.Profile() if cprofile else None
+
+    if use_tracemalloc:
+        _start_tracemalloc()
+
+    start_peak_rss = util.get_peak_rss()
+    start_cpu_time = time.thread_time()
+    start_wall_time = time.perf_counter()
+
+    try:
+        if profiler is not None:
+            output = profiler.runcall(func, *args, **kwargs)
+        else:
+            output = func(*args, **kwargs)
+
+        wall_time = time.perf_counter() - start_wall_time
+        cpu_time = time.thread_time() - start_cpu_time
+
+        end_peak_rss = util.get_peak_rss()
+        peak_rss_delta = None
+        if start_peak_rss is not None and end_peak_rss is not None:
+            peak_rss_delta = end_peak_rss - start_peak_rss
+
+        cprofile_stats = None
+        if profiler is not None:
+            stats_io = io.StringIO()
+            pstats.Stats(profiler, stream=stats_io).sort_stats(
+                pstats.SortKey.CUMULATIVE
+            ).print_stats(_DETAIL_LIMIT)
+            cprofile_stats = stats_io.getvalue()
+
+        tracemalloc_stats = None
+        if use_tracemalloc:
+            top_stats = tracemalloc.take_snapshot().statistics("lineno")
+            tracemalloc_stats = "\n".join(
+                str(stat) for stat in top_stats[:_DETAIL_LIMIT]
+            )
+
+    finally:
+        if use_tracemalloc:
+            _stop_tracemalloc()
+
+    call_stats = CallStats(
+        wall_time,
+        cpu_time,
+        peak_rss_delta,
+        cprofile_stats,
+        tracemalloc_stats,
+    )
+
+    return output, call_stats
+
+
+async def call_profiled_async(
+    func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+) -> tuple[Any, CallStats]:
+    """
+    Await a coroutine function and measure it.  Other coroutines run on the
+    same event loop while this one is suspended, so only wall time is
+    meaningful: CPU time is not measured (it is None), and cProfile/tracemalloc
+    are not supported.
+
+    Args:
+        func: The coroutine function to call
+        *args: Positional arguments for the function
+        **kwargs: Keyword arguments for the function
+
+    Returns:
+        A (function return value, call statistics) 2-tuple
+    """
+    start_wall_time = time.perf_counter()
+
+    output = await func(*args, **kwargs)
+
+    call_stats = CallStats(time.perf_counter() - start_wall_time, None, None)
+
+    return output, call_stats
+
+
+class StepProfiler:
+    """
+    Collects step profiles over the course of a run, and produces a report.
+    Timing and peak memory measurements are cheap and taken for every step;
+    cProfile and tracemalloc are only used for the steps selected for them.
+    """
+
+    def __init__(
+        self,
+        cprofile_steps: Collection[str] = (),
+        tracemalloc_steps: Collection[str] = (),
+    ) -> None:
+        """
+        Initialize this profiler.
+
+        Args:
+            cprofile_steps: Names of steps to profile with cProfile
+            tracemalloc_steps: Names of steps whose memory allocations should
+                be traced with tracemalloc
+        """
+        self.cprofile_steps = cprofile_steps
+        self.tracemalloc_steps = tracemalloc_steps
+        self.profiles: list[StepProfile] = []
+
+    def add(self, profile: StepProfile) -> None:
+        """
+        Add a step profile, and log it.
+
+        Args:
+            profile: The step profile
+        """
+        log = _get_logger()
+
+        self.profiles.append(profile)
+
+        if profile.call_stats is not None:
+            cpu_time = profile.call_stats.cpu_time
+            log.info(
+                "Step %s: wall %.3fs, cpu %s, args %.3fs, import %.3fs",
+                profile.step_name,
+                profile.call_stats.wall_time,
+                "n/a" if cpu_time is None else "{:.3f}s".format(cpu_time),
+                profile.arg_resolution_time,
+                profile.plugin_import_time,
+                extra={"step_profile": get_profile_summary(profile)},
+            )
+
+    def get_report(self) -> list[dict[str, Any]]:
+        """
+        Get a JSON-compatible report of the step profiles collected so far,
+        in order of step completion.
+
+        Returns:
+            A list of step profile summaries
+        """
+        return [get_profile_summary(profile) for profile in self.profiles]
+
+
+def get_profile_summary(profile: StepProfile) -> dict[str, Any]:
+    """
+    Flatten a step profile to a JSON-compatible mapping.  Detailed cProfile
+    and tracemalloc statistics are included if present.
+
+    Args:
+        profile: A step profile
+
+    Returns:
+        A mapping from measurement name to value
+    """
+    summary: dict[str, Any] = {
+        "step_name": profile.step_name,
+        "arg_resolution_time": profile.arg_resolution_time,
+        "plugin_import_time": profile.plugin_import_time,
+        "cache_hit": profile.cache_hit,
+    }
+
+    if profile.task_plugin_id is not None:
+        summary["task_plugin_id"] = profile.task_plugin_id
+
+    if profile.call_stats is not None:
+        summary.update(profile.call_stats._asdict())
+
+        # Omit absent details, to keep the report compact
+        for detail_name in ("cprofile_stats", "tracemalloc_stats"):
+            if summary[detail_name] is None:
+                del summary[detail_name]
+
+    return summary
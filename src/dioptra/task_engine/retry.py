@@ -0,0 +1,224 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+import botocore.exceptions
+import requests.exceptions
+
+from dioptra.sdk.exceptions.task_engine import StepTimeoutError
+
+# Errors which may succeed if the task plugin is simply invoked again, e.g.
+# network hiccups talking to S3 or MLflow.  Other OSErrors, e.g. missing files
+# or permission errors, would just fail the same way again.  Timeouts are
+# handled separately, since a timed out thread can't be stopped.
+TRANSIENT_ERRORS: tuple[type[BaseException], ...] = (
+    ConnectionError,
+    TimeoutError,
+    botocore.exceptions.ConnectionError,
+    botocore.exceptions.ReadTimeoutError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
+# Retries back off exponentially: 1s, 2s, 4s, ..., up to a minute
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+
+
+def _get_logger() -> logging.Logger:
+    """
+    Get a logger to use for functions in this module.
+
+    Returns:
+        The logger
+    """
+    return logging.getLogger(__name__)
+
+
+def _get_retry_delay(attempt: int) -> float:
+    """
+    Get the time to wait before retrying after a failed attempt.
+
+    Args:
+        attempt: The zero-based number of the attempt which failed
+
+    Returns:
+        A delay in seconds
+    """
+    return min(RETRY_BASE_DELAY * 2**attempt, RETRY_MAX_DELAY)
+
+
+def _call_with_timeout(
+    timeout: Optional[float], func: Callable[..., Any], /, *args: Any, **kwargs: Any
+) -> Any:
+    """
+    Call a function, giving up on it if it doesn't return within a timeout.
+    A thread can't be forcibly stopped, so the function is called in a daemon
+    thread which is simply abandoned if it times out; its eventual result is
+    discarded.
+
+    Args:
+        timeout: Seconds to wait for the function to return, or None to call
+            it directly in the calling thread
+        func: The function to call
+        args: Positional arguments to the function
+        kwargs: Keyword arguments to the function
+
+    Returns:
+        Whatever the function returned
+
+    Raises:
+        StepTimeoutError: if the function did not return in time
+    """
+    if timeout is None:
+        return func(*args, **kwargs)
+
+    future: concurrent.futures.Future = concurrent.futures.Future()
+
+    def call() -> None:
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    # Keep context variables, e.g. bound log context, in the new thread
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(call,), daemon=True).start()
+
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        if not future.done():
+            raise StepTimeoutError(timeout) from None
+        raise
+
+
+def call_with_retries(
+    step_name: str,
+    timeout: Optional[float],
+    retries: int,
+    retry_timeouts: bool,
+    func: Callable[..., Any],
+    /,
+    *args: Any,
+    **kwargs: Any,
+) -> Any:
+    """
+    Call a task plugin on behalf of a step, enforcing the step's timeout and
+    retrying after transient errors with exponential backoff.
+
+    An attempt which times out is abandoned but keeps running, so retrying it
+    runs the task plugin twice at once.  Timeouts are therefore only retried
+    if retry_timeouts is True, for task plugins which are safe to run that
+    way.
+
+    Args:
+        step_name: The name of the step, for logging
+        timeout: Seconds to wait for each attempt, or None to wait
+            indefinitely
+        retries: The number of times to retry after a transient error
+        retry_timeouts: Whether to also retry attempts which timed out
+        func: The function to call
+        args: Positional arguments to the function
+        kwargs: Keyword arguments to the function
+
+    Returns:
+        Whatever the function returned
+    """
+    log = _get_logger()
+    retryable_errors = TRANSIENT_ERRORS
+    if retry_timeouts:
+        retryable_errors += (StepTimeoutError,)
+
+    for attempt in range(retries + 1):
+        try:
+            return _call_with_timeout(timeout, func, *args, **kwargs)
+        except retryable_errors as e:
+            if attempt >= retries:
+                raise
+
+            delay = _get_retry_delay(attempt)
+            log.warning(
+                "Step %s failed (attempt %d of %d); retrying in %.1fs: %s",
+                step_name,
+                attempt + 1,
+                retries + 1,
+                delay,
+                e,
+            )
+            time.sleep(delay)
+
+
+async def call_with_retries_async(
+    step_name: str,
+    timeout: Optional[float],
+    retries: int,
+    func: Callable[..., Awaitable[Any]],
+    /,
+    *args: Any,
+    **kwargs: Any,
+) -> Any:
+    """
+    Await a coroutine task plugin on behalf of a step, enforcing the step's
+    timeout and retrying after transient errors with exponential backoff.
+    Unlike threads, coroutines which time out are cancelled, so timeouts are
+    always retried.
+
+    Args:
+        step_name: The name of the step, for logging
+        timeout: Seconds to wait for each attempt, or None to wait
+            indefinitely
+        retries: The number of times to retry after a transient error
+        func: The coroutine function to call
+        args: Positional arguments to the function
+        kwargs: Keyword arguments to the function
+
+    Returns:
+        Whatever the coroutine returned
+    """
+    log = _get_logger()
+
+    for attempt in range(retries + 1):
+        try:
+            if timeout is None:
+                return await func(*args, **kwargs)
+
+            try:
+                return await asyncio.wait_for(func(*args, **kwargs), timeout)
+            except asyncio.TimeoutError:
+                raise StepTimeoutError(timeout) from None
+
+        except (*TRANSIENT_ERRORS, StepTimeoutError) as e:
+            if attempt >= retries:
+                raise
+
+            delay = _get_retry_delay(attempt)
+            log.warning(
+                "Step %s failed (attempt %d of %d); retrying in %.1fs: %s",
+                step_name,
+                attempt + 1,
+                retries + 1,
+                delay,
+                e,
+            )
+            await asyncio.sleep(delay)
@@ -15,13 +15,19 @@
 # ACCESS THE FULL CC BY 4.0 LICENSE HERE:
 # https://creativecommons.org/licenses/by/4.0/legalcode
 import argparse
+import json
 import logging
 import logging.config
 from collections.abc import Iterable
-from typing import Any, Union
+from typing import Any, Optional, Union
 
 import yaml
 
+import dioptra.task_engine.checkpoint
+import dioptra.task_engine.estimate
+import dioptra.task_engine.profiling
+import dioptra.task_engine.step_cache
+import dioptra.task_engine.sweep
 import dioptra.task_engine.task_engine
 
 
@@ -49,6 +55,20 @@ def _parse_args() -> argparse.Namespace:
         metavar="name=value",
     )
 
+    arg_parser.add_argument(
+        "-S",
+        help="""
+        Sweep a global parameter over a list of values.  Values must be of the
+        form <name>=<list>, where <list> is a YAML list, e.g. eps=[0.1, 0.2].
+        The experiment is run for every combination of swept values, and steps
+        which don't depend on any swept parameter are run only once.  This
+        option can be repeated.  Not compatible with --checkpoint-dir or
+        --resume.
+        """,
+        action="append",
+        metavar="name=list",
+    )
+
     arg_parser.add_argument(
         "-l",
         "--log-level",
@@ -62,7 +82,114 @@ def _parse_args() -> argparse.Namespace:
         default="info",
     )
 
-    return arg_parser.parse_args()
+    arg_parser.add_argument(
+        "-j",
+        "--max-workers",
+        help="""
+        Run up to this many independent steps concurrently.  Default: steps
+        are run one at a time.
+        """,
+        type=int,
+        default=None,
+    )
+
+    arg_parser.add_argument(
+        "--processes",
+        help="""
+        Use a pool of processes instead of threads to run steps concurrently.
+        Only meaningful together with --max-workers.
+        """,
+        action="store_true",
+    )
+
+    arg_parser.add_argument(
+        "--cache-dir",
+        help="""
+        Cache outputs of cacheable task plugins in this directory, and reuse
+        them in subsequent runs.  Default: no caching.
+        """,
+    )
+
+    arg_parser.add_argument(
+        "--checkpoint-dir",
+        help="""
+        Checkpoint step outputs to this directory as steps complete.  Default:
+        no checkpointing.
+        """,
+    )
+
+    arg_parser.add_argument(
+        "--resume",
+        help="""
+        Restore completed steps from the checkpoint directory rather than
+        running them again.  Only meaningful together with --checkpoint-dir.
+        """,
+        action="store_true",
+    )
+
+    arg_parser.add_argument(
+        "--profile",
+        help="""
+        Profile each step (wall and CPU time, peak memory growth, argument
+        resolution and plugin import time), and write a JSON report to this
+        file.  Default: no profiling.
+        """,
+        metavar="FILE",
+    )
+
+    arg_parser.add_argument(
+        "--cprofile",
+        help="""
+        Also profile the named step with cProfile.  Only meaningful together
+        with --profile.  This option can be repeated.
+        """,
+        action="append",
+        default=[],
+        metavar="STEP",
+    )
+
+    arg_parser.add_argument(
+        "--tracemalloc",
+        help="""
+        Also trace memory allocations of the named step with tracemalloc.  Only
+        meaningful together with --profile.  This option can be repeated.
+        """,
+        action="append",
+        default=[],
+        metavar="STEP",
+    )
+
+    arg_parser.add_argument(
+        "--dry-run",
+        help="""
+        Don't run the experiment; instead, estimate its duration, critical
+        path, peak memory and cache hits from the step profiles of earlier
+        runs given with --history, and print the estimate as JSON.  Takes
+        --max-workers and --cache-dir into account.  Not compatible with -S.
+        """,
+        action="store_true",
+    )
+
+    arg_parser.add_argument(
+        "--history",
+        help="""
+        A step profile report written by --profile in an earlier run, to base
+        a --dry-run estimate on.  This option can be repeated.
+        """,
+        action="append",
+        default=[],
+        metavar="FILE",
+    )
+
+    args = arg_parser.parse_args()
+
+    if args.dry_run and args.S:
+        arg_parser.error("--dry-run is not compatible with -S")
+
+    if args.S and (args.checkpoint_dir or args.resume):
+        arg_parser.error("--checkpoint-dir and --resume are not compatible with -S")
+
+    return args
 
 
 def _setup_logging(log_level: Union[int, str] = logging.INFO) -> None:
@@ -150,6 +277,99 @@ def _cmdline_params_to_map(params: Iterable[str]) -> dict[str, str]:
     return param_map
 
 
+def _run(
+    args: argparse.Namespace,
+    experiment_desc: Any,
+    global_parameters: dict[str, Any],
+    step_cache: Optional[dioptra.task_engine.step_cache.StepOutputCache],
+    profiler: Optional[dioptra.task_engine.profiling.StepProfiler],
+) -> None:
+    """
+    Run the experiment, or parameter sweep, as requested on the commandline.
+
+    Args:
+        args: Parsed commandline arguments
+        experiment_desc: The experiment description
+        global_parameters: Global parameter values given on the commandline
+        step_cache: A step output cache, or None
+        profiler: A step profiler, or None
+    """
+
+    if args.S:
+        parameter_grid = _cmdline_params_to_map(args.S)
+
+        for param_name, param_values in parameter_grid.items():
+            if not isinstance(param_values, list):
+                raise ValueError("Swept parameter values must be a list: " + param_name)
+
+        dioptra.task_engine.sweep.run_sweep(
+            experiment_desc,
+            global_parameters,
+            parameter_grid,
+            max_workers=args.max_workers,
+            use_processes=args.processes,
+            step_cache=step_cache,
+            profiler=profiler,
+        )
+
+        return
+
+    checkpoint = None
+    if args.checkpoint_dir:
+        checkpoint = dioptra.task_engine.checkpoint.StepCheckpointStore(
+            args.checkpoint_dir,
+            dioptra.task_engine.checkpoint.compute_run_digest(
+                experiment_desc, global_parameters
+            ),
+        )
+
+    dioptra.task_engine.task_engine.run_experiment(
+        experiment_desc,
+        global_parameters,
+        max_workers=args.max_workers,
+        use_processes=args.processes,
+        step_cache=step_cache,
+        checkpoint=checkpoint,
+        resume=args.resume,
+        profiler=profiler,
+    )
+
+
+def _estimate(
+    args: argparse.Namespace,
+    experiment_desc: Any,
+    global_parameters: dict[str, Any],
+    step_cache: Optional[dioptra.task_engine.step_cache.StepOutputCache],
+) -> None:
+    """
+    Estimate the cost of the experiment, and print the estimate.
+
+    Args:
+        args: Parsed commandline arguments
+        experiment_desc: The experiment description
+        global_parameters: Global parameter values given on the commandline
+        step_cache: A step output cache, or None
+    """
+    history = dioptra.task_engine.estimate.TimingHistory()
+    for history_file in args.history:
+        with open(history_file, "r", encoding="utf-8") as fp:
+            history.add_report(json.load(fp))
+
+    estimate = dioptra.task_engine.estimate.estimate_experiment(
+        experiment_desc,
+        global_parameters,
+        history,
+        step_cache=step_cache,
+        max_workers=args.max_workers,
+    )
+
+    print(
+        json.dumps(
+            dioptra.task_engine.estimate.get_estimate_summary(estimate), indent=2
+        )
+    )
+
+
 def main() -> None:
     args = _parse_args()
     _setup_logging(args.log_level)
@@ -157,7 +377,27 @@ def main() -> None:
     experiment_desc = yaml.safe_load(args.file)
     global_parameters = _cmdline_params_to_map(args.P)
 
-    dioptra.task_engine.task_engine.run_experiment(experiment_desc, global_parameters)
+    step_cache = None
+    if args.cache_dir:
+        step_cache = dioptra.task_engine.step_cache.StepOutputCache(args.cache_dir)
+
+    if args.dry_run:
+        _estimate(args, experiment_desc, global_parameters, step_cache)
+        return
+
+    profiler = None
+    if args.profile:
+        profiler = dioptra.task_engine.profiling.StepProfiler(
+            cprofile_steps=args.cprofile, tracemalloc_steps=args.tracemalloc
+        )
+
+    try:
+        _run(args, experiment_desc, global_parameters, step_cache, profiler)
+
+    finally:
+        if profiler is not None:
+            with open(args.profile, "w", encoding="utf-8") as fp:
+                json.dump(profiler.get_report(), fp, indent=2)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,312 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import hashlib
+import inspect
+import logging
+import os
+import pathlib
+import pickle
+import tempfile
+from collections.abc import Mapping, Sequence
+from typing import Any, Optional, Union
+
+import dioptra.pyplugs
+from dioptra.task_engine import util
+
+# Default bound on the total size of all cached step outputs: 10GiB
+DEFAULT_MAX_CACHE_SIZE = 10 * 1024**3
+
+_CACHE_FILE_SUFFIX = ".pkl"
+
+
+def _get_logger() -> logging.Logger:
+    """
+    Get a logger to use for functions in this module.
+
+    Returns:
+        The logger
+    """
+    return logging.getLogger(__name__)
+
+
+def _get_plugin_source_path(task_plugin_id: str) -> Optional[pathlib.Path]:
+    """
+    Find the source file which defines the given task plugin.  This imports the
+    plugin if necessary.
+
+    Args:
+        task_plugin_id: The task plugin, in a composed dotted string form with
+            all the parts needed by pyplugs, e.g. "a.b.c.d"
+
+    Returns:
+        The path to the plugin source file, or None if it could not be
+        determined (e.g. the plugin was defined interactively).
+    """
+    package_name, module_name, func_name = util.get_pyplugs_coords(task_plugin_id)
+    plugin_func = dioptra.pyplugs.get(package_name, module_name, func_name)
+
+    try:
+        source_file = inspect.getsourcefile(inspect.unwrap(plugin_func))
+    except TypeError:
+        source_file = None
+
+    return pathlib.Path(source_file) if source_file else None
+
+
+class StepOutputCache:
+    """
+    A persistent, content-addressed cache of task plugin outputs, stored on
+    local disk.  Entries are keyed on the task plugin ID, a hash of the plugin
+    source file, and the resolved plugin arguments.  So a change to a plugin
+    implementation or to any of its inputs results in a cache miss.  When the
+    total size of the cache exceeds a bound, least recently used entries are
+    evicted.
+
+    Only "pure" task plugins should have their outputs cached, i.e. those whose
+    outputs depend only on their inputs and which have no side effects.  Task
+    definitions may opt in or out of caching via a boolean "cache" property;
+    tasks which don't specify it are cached according to the cache_by_default
+    setting.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, pathlib.Path],
+        max_size: int = DEFAULT_MAX_CACHE_SIZE,
+        cache_by_default: bool = False,
+    ) -> None:
+        """
+        Initialize this cache.
+
+        Args:
+            cache_dir: The directory to store cache entries in; will be created
+                if necessary.  Several processes may share the same directory.
+            max_size: Bound on the total size of cache entries, in bytes
+            cache_by_default: Whether to cache outputs of tasks whose
+                definitions don't include a "cache" property
+        """
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.max_size = max_size
+        self.cache_by_default = cache_by_default
+
+        # Plugin source hashes, keyed by (path, mtime, size), so we don't
+        # re-hash the same source file for every step.
+        self.__source_hashes: dict[tuple[str, int, int], str] = {}
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def is_cacheable(self, task_def: Mapping[str, Any]) -> bool:
+        """
+        Determine whether outputs of the given task should be cached.
+
+        Args:
+            task_def: A task definition from an experiment description
+
+        Returns:
+            True if outputs should be cached; False if not
+        """
+        return task_def.get("cache", self.cache_by_default)
+
+    def make_key(
+        self,
+        task_plugin_id: str,
+        arg_values: Sequence[Any],
+        kwarg_values: Mapping[str, Any],
+    ) -> Optional[str]:
+        """
+        Compute a cache key for an invocation of a task plugin.
+
+        Args:
+            task_plugin_id: The task plugin, in a composed dotted string form
+                with all the parts needed by pyplugs, e.g. "a.b.c.d"
+            arg_values: Resolved positional argument values
+            kwarg_values: Resolved keyword argument values
+
+        Returns:
+            A cache key as a hex string, or None if a key could not be
+            computed, e.g. because an argument value can't be pickled or the
+            plugin source could not be found.  Such invocations are not
+            cacheable.
+        """
+        log = _get_logger()
+
+        source_hash = self._get_source_hash(task_plugin_id)
+        if source_hash is None:
+            log.debug("Unable to find source for task plugin: %s", task_plugin_id)
+            return None
+
+        # Sort kwargs so that the key doesn't depend on their order.
+        sorted_kwargs = sorted(kwarg_values.items())
+
+        try:
+            key_material = pickle.dumps(
+                (task_plugin_id, source_hash, list(arg_values), sorted_kwargs),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        except Exception as e:
+            log.debug("Unable to hash arguments of %s: %s", task_plugin_id, e)
+            return None
+
+        return hashlib.sha256(key_material).hexdigest()
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """
+        Look up a cache entry.
+
+        Args:
+            key: A cache key, as obtained from make_key()
+
+        Returns:
+            A (hit, value) 2-tuple.  If hit is False, the entry was not found
+            and value is None.
+        """
+        log = _get_logger()
+        entry_path = self._entry_path(key)
+
+        try:
+            with entry_path.open("rb") as fp:
+                value = pickle.load(fp)
+        except FileNotFoundError:
+            return False, None
+        except Exception as e:
+            # A corrupt or incompatible entry; treat as a miss and remove it.
+            log.warning("Discarding unreadable cache entry %s: %s", key, e)
+            entry_path.unlink(missing_ok=True)
+            return False, None
+
+        # Touch the entry so that eviction sees it as recently used.
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            # Another process evicted it in the meantime; no matter.
+            pass
+
+        return True, value
+
+    def contains(self, key: str) -> bool:
+        """
+        Determine whether the cache holds an entry, without loading it or
+        marking it as recently used.
+
+        Args:
+            key: A cache key, as obtained from make_key()
+
+        Returns:
+            True if the entry was found; False if not
+        """
+        return self._entry_path(key).is_file()
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a cache entry, evicting least recently used entries if
+        necessary to keep the cache within its size bound.  Values which
+        can't be pickled are silently not cached.
+
+        Args:
+            key: A cache key, as obtained from make_key()
+            value: The value to cache
+        """
+        log = _get_logger()
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temp file and rename, so that concurrent readers never
+        # see a partially written entry.
+        fd, temp_name = tempfile.mkstemp(dir=entry_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                pickle.dump(value, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_name, entry_path)
+        except Exception as e:
+            log.debug("Unable to cache value for %s: %s", key, e)
+            pathlib.Path(temp_name).unlink(missing_ok=True)
+            return
+
+        self._evict()
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        """
+        Get the path to the file which holds the entry for the given key.
+        Entries are spread across subdirectories to keep directories small.
+
+        Args:
+            key: A cache key
+
+        Returns:
+            A path
+        """
+        return self.cache_dir / key[:2] / (key + _CACHE_FILE_SUFFIX)
+
+    def _get_source_hash(self, task_plugin_id: str) -> Optional[str]:
+        """
+        Get a hash of the source file of the given task plugin.
+
+        Args:
+            task_plugin_id: The task plugin, in a composed dotted string form
+                with all the parts needed by pyplugs, e.g. "a.b.c.d"
+
+        Returns:
+            A hash as a hex string, or None if the source file could not be
+            found
+        """
+        source_path = _get_plugin_source_path(task_plugin_id)
+        if not source_path:
+            return None
+
+        try:
+            stat = source_path.stat()
+        except OSError:
+            return None
+
+        stat_key = (str(source_path), stat.st_mtime_ns, stat.st_size)
+        source_hash = self.__source_hashes.get(stat_key)
+
+        if source_hash is None:
+            source_hash = hashlib.sha256(source_path.read_bytes()).hexdigest()
+            self.__source_hashes[stat_key] = source_hash
+
+        return source_hash
+
+    def _evict(self) -> None:
+        """
+        Remove least recently used entries until the cache is within its size
+        bound.
+        """
+        log = _get_logger()
+
+        entries = []
+        total_size = 0
+        for entry_path in self.cache_dir.glob("*/*" + _CACHE_FILE_SUFFIX):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
+            total_size += stat.st_size
+
+        if total_size <= self.max_size:
+            return
+
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total_size <= self.max_size:
+                break
+
+            log.debug("Evicting cache entry: %s", entry_path.stem)
+            entry_path.unlink(missing_ok=True)
+            total_size -= size
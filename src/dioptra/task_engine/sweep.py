@@ -0,0 +1,300 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import itertools
+import logging
+from collections.abc import Iterator, Mapping, MutableMapping, Sequence
+from typing import Any, Optional
+
+from dioptra.sdk.exceptions.task_engine import InvalidParameterGridError
+from dioptra.task_engine.plan import (
+    ArgSpec,
+    DictArg,
+    ExecutionPlan,
+    ListArg,
+    ParameterReference,
+    compile_experiment,
+    slice_plan,
+)
+from dioptra.task_engine.profiling import StepProfiler
+from dioptra.task_engine.step_cache import StepOutputCache
+from dioptra.task_engine.task_engine import run_plan
+
+
+def _get_logger() -> logging.Logger:
+    """
+    Get a logger to use for functions in this module.
+
+    Returns:
+        The logger
+    """
+    return logging.getLogger(__name__)
+
+
+def expand_parameter_grid(
+    parameter_grid: Mapping[str, Sequence[Any]]
+) -> list[dict[str, Any]]:
+    """
+    Expand a parameter grid to the list of all combinations of its values.
+
+    Args:
+        parameter_grid: A mapping from global parameter name to a list of
+            values to sweep over
+
+    Returns:
+        A list of mappings from global parameter name to value, one per point
+        of the grid
+    """
+    param_names = list(parameter_grid)
+    param_value_lists = [parameter_grid[param_name] for param_name in param_names]
+
+    return [
+        dict(zip(param_names, param_values))
+        for param_values in itertools.product(*param_value_lists)
+    ]
+
+
+def validate_parameter_grid(
+    parameter_spec: Mapping[str, Any], parameter_grid: Mapping[str, Sequence[Any]]
+) -> None:
+    """
+    Check that a parameter grid only refers to defined global parameters, and
+    gives at least one value for each.
+
+    Args:
+        parameter_spec: The global parameter specification of an experiment,
+            as a mapping from parameter name to its definition
+        parameter_grid: A mapping from global parameter name to a list of
+            values to sweep over
+
+    Raises:
+        InvalidParameterGridError: If the grid is invalid
+    """
+    bad_param_names = [
+        param_name
+        for param_name, param_values in parameter_grid.items()
+        if param_name not in parameter_spec or not param_values
+    ]
+
+    if bad_param_names:
+        raise InvalidParameterGridError(bad_param_names)
+
+
+def _get_referenced_parameters(arg_specs: Iterator[ArgSpec]) -> set[str]:
+    """
+    Find the names of all global parameters referenced by the given compiled
+    argument specifications.
+
+    Args:
+        arg_specs: Compiled argument specifications
+
+    Returns:
+        A set of global parameter names
+    """
+    param_names = set()
+
+    for arg_spec in arg_specs:
+        if isinstance(arg_spec, ParameterReference):
+            param_names.add(arg_spec.parameter_name)
+        elif isinstance(arg_spec, ListArg):
+            param_names |= _get_referenced_parameters(iter(arg_spec.items))
+        elif isinstance(arg_spec, DictArg):
+            param_names |= _get_referenced_parameters(
+                value for _, value in arg_spec.items
+            )
+
+    return param_names
+
+
+def get_parameter_dependent_steps(
+    plan: ExecutionPlan, parameter_names: Sequence[str]
+) -> set[str]:
+    """
+    Find the steps of a plan which depend on any of the given global
+    parameters, directly or via another step.
+
+    Args:
+        plan: An execution plan
+        parameter_names: Global parameter names
+
+    Returns:
+        A set of step names
+    """
+    dependent_steps: set[str] = set()
+
+    # Steps are visited in topologically sorted order, so all dependencies of
+    # a step have been visited before the step itself.
+    for step_name in plan.step_order:
+        step = plan.steps[step_name]
+
+        step_params = _get_referenced_parameters(
+            itertools.chain(step.args, (kwarg for _, kwarg in step.kwargs))
+        )
+
+        if not step_params.isdisjoint(parameter_names) or any(
+            dep in dependent_steps for dep in plan.dependencies[step_name]
+        ):
+            dependent_steps.add(step_name)
+
+    return dependent_steps
+
+
+class ParameterSweep:
+    """
+    Runs an execution plan over a grid of global parameter values.  Steps
+    which don't depend on any swept parameter (the "prefix" of the graph) are
+    run only once, and their outputs are passed to runs of the remaining
+    steps (the "suffix") for each point of the grid.  The prefix outputs are
+    not copied, since they may be large or uncopyable (e.g. models or
+    clients), so suffix tasks must not modify their inputs in place; changes
+    would be seen by the remaining points.
+    """
+
+    def __init__(
+        self,
+        plan: ExecutionPlan,
+        global_parameters: Mapping[str, Any],
+        parameter_grid: Mapping[str, Sequence[Any]],
+    ) -> None:
+        """
+        Initialize this sweep.
+
+        Args:
+            plan: The execution plan to run
+            global_parameters: Values of global parameters which are not
+                swept, as a mapping from parameter name to value
+            parameter_grid: A mapping from global parameter name to a list of
+                values to sweep over
+        """
+        validate_parameter_grid(plan.parameter_spec, parameter_grid)
+
+        self.global_parameters = global_parameters
+        self.points = expand_parameter_grid(parameter_grid)
+
+        dependent_steps = get_parameter_dependent_steps(plan, list(parameter_grid))
+        self.prefix_plan = slice_plan(
+            plan,
+            [step_name for step_name in plan.steps if step_name not in dependent_steps],
+        )
+        self.suffix_plan = slice_plan(plan, dependent_steps)
+
+        self._prefix_outputs: Optional[Mapping[str, Mapping[str, Any]]] = None
+
+    def _make_parameters(self, point: Mapping[str, Any]) -> MutableMapping[str, Any]:
+        """
+        Make the global parameters for one point of the grid.
+
+        Args:
+            point: A mapping from swept parameter name to value
+
+        Returns:
+            A new mapping from global parameter name to value
+        """
+        parameters = dict(self.global_parameters)
+        parameters.update(point)
+
+        return parameters
+
+    def run_prefix(self, **run_kwargs: Any) -> None:
+        """
+        Run the steps which don't depend on any swept parameter.  This happens
+        automatically on the first call to run_point() if it hasn't been done
+        explicitly.
+
+        Args:
+            run_kwargs: Keyword args passed on to run_plan(), e.g.
+                max_workers
+        """
+        log = _get_logger()
+
+        log.info("Running %d sweep-invariant step(s) once", len(self.prefix_plan.steps))
+
+        # The prefix doesn't reference any swept parameter, so any point will
+        # do to satisfy required parameters.
+        self._prefix_outputs = run_plan(
+            self.prefix_plan, self._make_parameters(self.points[0]), **run_kwargs
+        )
+
+    def run_point(self, point: Mapping[str, Any], **run_kwargs: Any) -> None:
+        """
+        Run the steps which depend on swept parameters, for one point of the
+        grid.
+
+        Args:
+            point: A mapping from swept parameter name to value, usually one
+                of this sweep's points
+            run_kwargs: Keyword args passed on to run_plan(), e.g.
+                max_workers
+        """
+        log = _get_logger()
+
+        if self._prefix_outputs is None:
+            self.run_prefix(**run_kwargs)
+
+        log.info("Running sweep point: %s", point)
+
+        run_plan(
+            self.suffix_plan,
+            self._make_parameters(point),
+            initial_outputs=self._prefix_outputs,
+            **run_kwargs,
+        )
+
+
+def run_sweep(
+    experiment_desc: Mapping[str, Any],
+    global_parameters: Mapping[str, Any],
+    parameter_grid: Mapping[str, Sequence[Any]],
+    max_workers: Optional[int] = None,
+    use_processes: bool = False,
+    step_cache: Optional[StepOutputCache] = None,
+    profiler: Optional[StepProfiler] = None,
+) -> list[dict[str, Any]]:
+    """
+    Run an experiment via a declarative experiment description, for every
+    combination of the given global parameter values.  Steps which don't
+    depend on any swept parameter are run only once.
+
+    Args:
+        experiment_desc: The experiment description, as parsed YAML or
+            equivalent
+        global_parameters: Values of global parameters which are not swept,
+            as a mapping from parameter name to value
+        parameter_grid: A mapping from global parameter name to a list of
+            values to sweep over
+        max_workers: The maximum number of steps to run concurrently
+        use_processes: If True and max_workers is greater than 1, use a pool
+            of processes instead of threads
+        step_cache: A step output cache, or None to always run all steps
+        profiler: A profiler to record step measurements with, or None
+
+    Returns:
+        The points of the grid which were run, in order, as mappings from
+        swept parameter name to value
+    """
+    plan = compile_experiment(experiment_desc)
+    sweep = ParameterSweep(plan, global_parameters, parameter_grid)
+
+    for point in sweep.points:
+        sweep.run_point(
+            point,
+            max_workers=max_workers,
+            use_processes=use_processes,
+            step_cache=step_cache,
+            profiler=profiler,
+        )
+
+    return sweep.points
@@ -14,26 +14,46 @@
 #
 # ACCESS THE FULL CC BY 4.0 LICENSE HERE:
 # https://creativecommons.org/licenses/by/4.0/legalcode
+import asyncio
 import collections
+import concurrent.futures
+import contextlib
+import graphlib
+import inspect
 import itertools
 import logging
-from collections.abc import Iterable, Mapping, MutableMapping, Sequence
-from typing import Any, Union
+import time
+from collections.abc import Iterator, Mapping, MutableMapping, Sequence
+from typing import Any, Callable, NamedTuple, Optional, Union
 
 import dioptra.pyplugs
 from dioptra.sdk.exceptions.task_engine import (
-    IllegalOutputReferenceError,
-    IllegalPluginNameError,
     MissingGlobalParametersError,
-    MissingTaskPluginNameError,
     NonIterableTaskOutputError,
-    OutputNotFoundError,
     StepError,
-    StepNotFoundError,
-    TaskPluginNotFoundError,
-    UnresolvableReferenceError,
 )
 from dioptra.task_engine import util
+from dioptra.task_engine.array_transport import (
+    DEFAULT_MIN_SHARED_ARRAY_SIZE,
+    SharedArrayTransport,
+    call_task_plugin_shared,
+)
+from dioptra.task_engine.checkpoint import StepCheckpointStore
+from dioptra.task_engine.plan import (
+    CompiledStep,
+    ExecutionPlan,
+    compile_experiment,
+    resolve_invocation_args,
+)
+from dioptra.task_engine.profiling import (
+    CallStats,
+    StepProfile,
+    StepProfiler,
+    call_profiled,
+    call_profiled_async,
+)
+from dioptra.task_engine.retry import call_with_retries, call_with_retries_async
+from dioptra.task_engine.step_cache import StepOutputCache
 
 
 def _get_logger() -> logging.Logger:
@@ -46,206 +66,6 @@ def _get_logger() -> logging.Logger:
     return logging.getLogger(__name__)
 
 
-def _resolve_reference(
-    reference: str,
-    global_parameters: Mapping[str, Any],
-    step_outputs: Mapping[str, Mapping[str, Any]],
-) -> Any:
-    """
-    Resolve a reference to a task output or global parameter.
-
-    Args:
-        reference: The reference to resolve, without the "$" prefix
-        global_parameters: The global parameters in use for this run, as a
-            mapping from parameter name to value
-        step_outputs: The step outputs we have thus far.  This is a nested
-            mapping: step name => output name => output value.
-
-    Returns:
-        The referenced value
-    """
-
-    if "." in reference:
-        # Must be an <step>.<output> formatted reference
-        step_name, output_name = reference.split(".", 1)
-
-        step_output = step_outputs.get(step_name)
-        if not step_output:
-            raise StepNotFoundError(step_name)
-
-        if output_name not in step_output:
-            raise OutputNotFoundError(step_name, output_name)
-
-        value = step_output[output_name]
-
-    else:
-        # A bare name may refer to either a global parameter or the only
-        # output of a step.  Let's assume prior validation ensured the same
-        # name does not occur in both places.
-        if reference in global_parameters:
-            value = global_parameters[reference]
-        elif reference in step_outputs:
-            outputs = step_outputs[reference]
-            if len(outputs) != 1:
-                raise IllegalOutputReferenceError(reference)
-            value = next(iter(outputs.values()))
-        else:
-            raise UnresolvableReferenceError(reference)
-
-    return value
-
-
-def _resolve_task_parameter_value(
-    arg_spec: Any,
-    global_parameters: Mapping[str, Any],
-    step_outputs: Mapping[str, Mapping[str, Any]],
-) -> Any:
-    """
-    Resolve a specification for one argument of a task invocation, to the
-    actual value to be used in the invocation.
-
-    Args:
-        arg_spec: The argument specification
-        global_parameters: The global parameters in use for this run, as a
-            mapping from parameter name to value
-        step_outputs: The step outputs we have thus far.  This is a nested
-            mapping: step name => output name => output value.
-
-    Returns:
-        The value to use for the given parameter
-    """
-
-    if isinstance(arg_spec, str):
-        if util.is_reference(arg_spec):
-            arg_value = _resolve_reference(
-                arg_spec[1:], global_parameters, step_outputs
-            )
-
-        elif arg_spec.startswith("$$"):
-            # "escaped" dollar sign: replace only the initial "$$" with "$"
-            arg_value = arg_spec[1:]
-
-        else:
-            arg_value = arg_spec
-
-    elif isinstance(arg_spec, dict):
-        arg_value = {
-            key: _resolve_task_parameter_value(value, global_parameters, step_outputs)
-            for key, value in arg_spec.items()
-        }
-
-    elif isinstance(arg_spec, list):
-        arg_value = [
-            _resolve_task_parameter_value(sub_val, global_parameters, step_outputs)
-            for sub_val in arg_spec
-        ]
-
-    else:
-        arg_value = arg_spec
-
-    return arg_value
-
-
-def _positional_specs_to_args(
-    arg_specs: Iterable[Any],
-    global_parameters: Mapping[str, Any],
-    step_outputs: Mapping[str, Mapping[str, Any]],
-) -> list[Any]:
-    """
-    Resolve a positional parameter style invocation specification to a list
-    of actual parameter values to use in the task invocation.
-
-    Args:
-        arg_specs: A list of argument specifications.
-        global_parameters: The global parameters in use for this run, as a
-            mapping from parameter name to value
-        step_outputs: The step outputs we have thus far.  This is a nested
-            mapping: step name => output name => output value.
-
-    Returns:
-        A list of values to use for the invocation
-    """
-
-    arg_values = [
-        _resolve_task_parameter_value(arg_spec, global_parameters, step_outputs)
-        for arg_spec in arg_specs
-    ]
-
-    return arg_values
-
-
-def _kwarg_specs_to_kwargs(
-    kwarg_specs: Mapping[str, Any],
-    global_parameters: Mapping[str, Any],
-    step_outputs: Mapping[str, Mapping[str, Any]],
-) -> dict[str, Any]:
-    """
-    Resolve a keyword arg style invocation specification to a mapping of actual
-    parameter values to use in the task invocation.
-
-    Args:
-        kwarg_specs: A mapping from keyword arg name to value specification
-        global_parameters: The global parameters in use for this run, as a
-            mapping from parameter name to value
-        step_outputs: The step outputs we have thus far.  This is a nested
-            mapping: step name => output name => output value.
-
-    Returns:
-        A mapping from parameter name to actual value to use for the
-        task invocation
-    """
-    kwarg_values = {
-        kwarg_name: _resolve_task_parameter_value(
-            kwarg_value, global_parameters, step_outputs
-        )
-        for kwarg_name, kwarg_value in kwarg_specs.items()
-    }
-
-    return kwarg_values
-
-
-def _get_invocation_args(
-    step: Mapping[str, Any],
-    global_parameters: Mapping[str, Any],
-    step_outputs: Mapping[str, Mapping[str, Any]],
-) -> tuple[list[Any], dict[str, Any]]:
-    """
-    Resolve a task invocation specification to all of the positional and
-    keyword arg values to use in the invocation.
-
-    Args:
-        step: The step description
-        global_parameters: The global parameters in use for this run, as a
-            mapping from parameter name to value
-        step_outputs: The step outputs we have thus far.  This is a nested
-            mapping: step name => output name => output value.
-
-    Returns:
-        A 2-tuple including a list of positional values to use in the
-        task invocation, followed by a mapping with keyword arg names and
-        values.
-    """
-
-    pos_arg_specs, kwarg_specs = util.step_get_invocation_arg_specs(step)
-
-    # step_get_invocation_args() is written to be graceful in the face of a
-    # malformed step definition (and return nulls), but at this point I think
-    # we can assume validation has already been done, as would be the normal
-    # workflow, so nulls won't happen here.
-    assert pos_arg_specs is not None
-    assert kwarg_specs is not None
-
-    # Assume for now that validation has completed successfully, so we always
-    # have a correct step definition with arg specs?
-    arg_values = _positional_specs_to_args(
-        pos_arg_specs, global_parameters, step_outputs
-    )
-
-    kwarg_values = _kwarg_specs_to_kwargs(kwarg_specs, global_parameters, step_outputs)
-
-    return arg_values, kwarg_values
-
-
 def _update_output_map(
     step_outputs: MutableMapping[str, MutableMapping[str, Any]],
     step_name: str,
@@ -304,7 +124,7 @@ def _update_output_map(
             step_outputs[step_name][output_name] = output_value
 
 
-def _resolve_global_parameters(
+def resolve_global_parameters(
     global_parameter_spec: Mapping[str, Any],
     global_parameters: MutableMapping[str, Any],
 ) -> None:
@@ -358,106 +178,847 @@ def _resolve_global_parameters(
             del global_parameters[param_name]
 
 
-def _get_pyplugs_coords(task_plugin: str) -> list[str]:
+def _call_task_plugin(
+    task_plugin_id: str, arg_values: Sequence[Any], kwarg_values: Mapping[str, Any]
+) -> Any:
     """
-    Split a fully qualified task plugin to the three parts required as
-    identifying coordinates by pyplugs.  The coordinates are:
+    Call a task plugin with already-resolved argument values.  This is a
+    module-level function so that it can be submitted to a process pool.
 
-        <package> <module> <function name>
+    Args:
+        task_plugin_id: The task plugin to call, in a composed dotted
+            string form with all the parts needed by pyplugs, e.g. "a.b.c.d"
+        arg_values: Positional argument values for the plugin
+        kwarg_values: Keyword argument values for the plugin
+
+    Returns:
+        Whatever the task plugin returned
+    """
+    package_name, module_name, func_name = util.get_pyplugs_coords(task_plugin_id)
+
+    # Coroutine plugins get an event loop of their own in the worker process
+    output = util.call_sync(
+        dioptra.pyplugs.call,
+        package_name,
+        module_name,
+        func_name,
+        *arg_values,
+        **kwarg_values,
+    )
 
-    The task plugin is a dot-delimited string with at least two components.
-    The last two components map to <module> and <function name>; everything to
-    their left comprises the <package> part.  If there are only two components
-    in the plugin, the package will default to the empty string.  This keeps
-    with how pyplugs registers plugins.  For example:
+    # Generators can't be returned from a worker process
+    return util.collect_generators(output)
 
-        a.b => "" a b
-        a.b.c => a b c
-        a.b.c.d => a.b c d
-        a.b.c.d.e => a.b.c d e
 
-        etc...
+def _store_step_output(
+    step_outputs: MutableMapping[str, MutableMapping[str, Any]],
+    step_name: str,
+    task_def: Mapping[str, Any],
+    output: Any,
+) -> None:
+    """
+    Store the output of a completed step according to its task definition.
+    If the task plugin defines no outputs, nothing is stored.
 
     Args:
-        task_plugin: The dotted plugin string from the declarative experiment
-            description
+        step_outputs: The step outputs we have thus far.  This a is nested
+            mapping: step name => output name => output value.
+        step_name: The name of the step which completed
+        task_def: The definition of the task plugin the step invoked
+        output: Whatever the task plugin returned
+    """
+    log = _get_logger()
 
-    Returns:
-        A length-3 list of pyplugs coordinates
+    output_defs = task_def.get("outputs")
+    if output_defs:
+        _update_output_map(step_outputs, step_name, output_defs, output)
+        log.debug("Output(s): %s", str(step_outputs[step_name]))
+
+    # else: should I warn if there was an output from the task but no
+    # output_names were given?
+
+
+class _StepInvocation(NamedTuple):
+    """
+    Everything needed to invoke the task plugin for one step, or to skip the
+    invocation if its output was found in a cache.
     """
-    coords = task_plugin.rsplit(".", 2)
 
-    if len(coords) < 2:
-        raise IllegalPluginNameError(task_plugin)
+    step: CompiledStep
+    arg_values: list[Any]
+    kwarg_values: dict[str, Any]
+    cache_key: Optional[str]
+    cache_hit: bool
+    cached_output: Any
+    arg_resolution_time: float
 
-    elif len(coords) == 2:
-        coords.insert(0, "")
 
-    return coords
+class _RunContext:
+    """
+    The state of one run of an experiment, shared by the functions which
+    schedule and run its steps.
+    """
 
+    def __init__(
+        self,
+        plan: ExecutionPlan,
+        global_parameters: Mapping[str, Any],
+        step_cache: Optional[StepOutputCache],
+        checkpoint: Optional[StepCheckpointStore],
+        profiler: Optional[StepProfiler],
+    ) -> None:
+        """
+        Initialize this context.
+
+        Args:
+            plan: The execution plan being run
+            global_parameters: The global parameters in use for this run, as a
+                mapping from parameter name to value
+            step_cache: A step output cache, or None to disable caching
+            checkpoint: A checkpoint store to save step outputs to as steps
+                complete, or None to disable checkpointing
+            profiler: A profiler to record step measurements with, or None to
+                disable profiling
+        """
+        self.plan = plan
+        self.global_parameters = global_parameters
+        self.step_cache = step_cache
+        self.checkpoint = checkpoint
+        self.profiler = profiler
+
+        # The step outputs we have thus far.  This is a nested mapping:
+        # step name => output name => output value.
+        self.step_outputs: MutableMapping[str, MutableMapping[str, Any]] = (
+            collections.defaultdict(dict)
+        )
 
-def _run_step(
-    step: Mapping[str, Any],
-    task_plugin_id: str,
-    global_parameters: Mapping[str, Any],
-    step_outputs: Mapping[str, Mapping[str, Any]],
-) -> Any:
+        # Steps which need not be run, e.g. because they were restored from a
+        # checkpoint.
+        self.completed_steps: set[str] = set()
+
+        # Liveness bookkeeping, so that step outputs can be released as soon
+        # as their last consumer step has completed: the steps whose outputs
+        # each step consumes, and the number of consumers of each step's
+        # outputs which have yet to complete.
+        self.consumed_steps: dict[str, list[str]] = {
+            step_name: [] for step_name in plan.steps
+        }
+        for step_name, consumers in plan.consumers.items():
+            for consumer in consumers:
+                # Consumers outside the plan (if it is a slice of a larger
+                # plan) never run, so they keep the outputs they consume
+                # alive until the end of the run.
+                if consumer in self.consumed_steps:
+                    self.consumed_steps[consumer].append(step_name)
+
+        self.pending_consumers = {
+            step_name: len(consumers) for step_name, consumers in plan.consumers.items()
+        }
+
+        # Memory usage high-water marks, sampled as steps complete
+        self.peak_rss: Optional[int] = None
+        self.peak_resident_steps = 0
+
+        # Used to pass arrays to and from worker processes without pickling
+        # them, if running steps in a process pool.
+        self.array_transport: Optional[SharedArrayTransport] = None
+
+
+@contextlib.contextmanager
+def _step_error_context(step_name: str) -> Iterator[None]:
     """
-    Run one step of a task graph.
+    A context manager which fills in the step name as context on step errors
+    raised within it, if necessary.
 
     Args:
-        step: The step description
-        task_plugin_id: The task plugin to call, in a composed dotted
-            string form with all the parts needed by pyplugs, e.g. "a.b.c.d"
-        global_parameters: The global parameters in use for this run, as a
-            mapping from parameter name to value
-        step_outputs: The step outputs we have thus far.  This is a nested
-            mapping: step name => output name => output value.
+        step_name: The name of the step which is the context for any errors
+    """
+    try:
+        yield
+    except StepError as e:
+        if not e.context_step_name:
+            e.context_step_name = step_name
+        raise
 
-    Returns:
-        The step output (i.e. whatever the task plugin returned)
+
+def _prepare_step(step_name: str, run: _RunContext) -> _StepInvocation:
     """
+    Prepare to run one step of a task graph: resolve its arguments, and
+    consult the step output cache.
 
+    Args:
+        step_name: The name of the step to prepare
+        run: The context of the run the step is part of
+
+    Returns:
+        A step invocation
+    """
     log = _get_logger()
 
-    arg_values, kwarg_values = _get_invocation_args(
-        step, global_parameters, step_outputs
+    step = run.plan.steps[step_name]
+
+    start_time = time.perf_counter()
+    arg_values, kwarg_values = resolve_invocation_args(
+        step, run.global_parameters, run.step_outputs
     )
+    arg_resolution_time = time.perf_counter() - start_time
 
     if arg_values:
         log.debug("args: %s", arg_values)
     if kwarg_values:
         log.debug("kwargs: %s", kwarg_values)
 
-    package_name, module_name, func_name = _get_pyplugs_coords(task_plugin_id)
+    cache_key = None
+    cache_hit = False
+    cached_output = None
 
-    output = dioptra.pyplugs.call(
-        package_name, module_name, func_name, *arg_values, **kwarg_values
+    if run.step_cache is not None and run.step_cache.is_cacheable(step.task_def):
+        cache_key = run.step_cache.make_key(
+            step.task_plugin_id, arg_values, kwarg_values
+        )
+
+        if cache_key:
+            cache_hit, cached_output = run.step_cache.get(cache_key)
+            if cache_hit:
+                log.info("Using cached output")
+
+    return _StepInvocation(
+        step,
+        arg_values,
+        kwarg_values,
+        cache_key,
+        cache_hit,
+        cached_output,
+        arg_resolution_time,
     )
 
-    return output
 
+def _finish_step(
+    invocation: _StepInvocation,
+    output: Any,
+    run: _RunContext,
+    call_stats: Optional[CallStats] = None,
+) -> None:
+    """
+    Do bookkeeping for a step which completed: cache, store, and checkpoint its
+    output, and record its profile.
 
-def run_experiment(
-    experiment_desc: Mapping[str, Any], global_parameters: MutableMapping[str, Any]
+    Args:
+        invocation: The step invocation which completed
+        output: Whatever the task plugin returned
+        run: The context of the run the step is part of
+        call_stats: Measurements of the task plugin call, if profiling
+    """
+    log = _get_logger()
+    step = invocation.step
+    step_name = step.name
+
+    _store_step_output(run.step_outputs, step_name, step.task_def, output)
+
+    is_streaming = False
+    outputs = run.step_outputs.get(step_name, {})
+    if any(inspect.isgenerator(value) for value in outputs.values()):
+        is_streaming = _collect_generator_outputs(step_name, outputs, run)
+
+        # The plugin output held generators, which are consumed now (or by the
+        # stream consumer); anything cached must be rebuilt from the stored
+        # outputs.
+        if isinstance(step.task_def["outputs"], Mapping):
+            output = next(iter(outputs.values()))
+        else:
+            output = tuple(outputs.values())
+
+    if invocation.cache_key and not invocation.cache_hit:
+        # For mypy: a key is never produced without a cache
+        assert run.step_cache is not None
+
+        if is_streaming:
+            log.debug("Not caching streamed output of step: %s", step_name)
+        else:
+            run.step_cache.put(invocation.cache_key, output)
+
+    # A streamed output will be gone once consumed, so a step which streams
+    # is not checkpointed; it will be run again on resume.
+    if run.checkpoint is not None and not is_streaming:
+        run.checkpoint.save(step_name, outputs)
+
+    if run.profiler is not None:
+        run.profiler.add(
+            StepProfile(
+                step_name,
+                invocation.arg_resolution_time,
+                step.import_time,
+                invocation.cache_hit,
+                call_stats,
+                step.task_plugin_id,
+            )
+        )
+
+    _release_dead_outputs(step_name, run)
+
+
+def _collect_generator_outputs(
+    step_name: str, outputs: MutableMapping[str, Any], run: _RunContext
+) -> bool:
+    """
+    Collect generator outputs of a completed step into lists, except those
+    which are passed lazily to a consumer which takes them as a stream.
+
+    Args:
+        step_name: The name of the step which completed
+        outputs: The outputs of the step, as a mapping from output name to
+            value.  This is updated in place.
+        run: The context of the run the step is part of
+
+    Returns:
+        True if any outputs were left as generators, to be streamed; False if
+        not
+    """
+    log = _get_logger()
+
+    is_streaming = False
+
+    for output_name, value in outputs.items():
+        if not inspect.isgenerator(value):
+            continue
+
+        if (step_name, output_name) in run.plan.stream_outputs:
+            log.debug("Streaming output: %s.%s", step_name, output_name)
+            is_streaming = True
+
+        else:
+            outputs[output_name] = list(value)
+
+    return is_streaming
+
+
+def _wrap_step_call(
+    step: CompiledStep,
+    run: _RunContext,
+    func: Callable[..., Any],
+    args: Sequence[Any],
+) -> tuple[Callable[..., Any], Sequence[Any]]:
+    """
+    Wrap a task plugin invocation in the timeout and retry policy of its step,
+    if the step has one, and measure it if profiling.  Each attempt is
+    measured in the thread which runs it, since with a timeout, that isn't
+    the calling thread; the measurements of the successful attempt are kept.
+
+    Args:
+        step: The step
+        run: The context of the run the step is part of
+        func: The function which invokes the step's task plugin
+        args: Positional args for the function
+
+    Returns:
+        A (function, positional args) 2-tuple to call instead; the keyword
+        args are unchanged.  If profiling, the function returns an (output,
+        call stats) pair.
+    """
+    if run.profiler is not None:
+        args = (
+            step.name in run.profiler.cprofile_steps,
+            step.name in run.profiler.tracemalloc_steps,
+            func,
+            *args,
+        )
+        func = call_profiled
+
+    if step.timeout is None and not step.retries:
+        return func, args
+
+    return call_with_retries, (
+        step.name,
+        step.timeout,
+        step.retries,
+        step.retry_timeouts,
+        func,
+        *args,
+    )
+
+
+def _call_step(
+    invocation: _StepInvocation, run: _RunContext
+) -> tuple[Any, Optional[CallStats]]:
+    """
+    Call the task plugin of a step in the calling thread, measuring the call
+    if profiling.  A coroutine task plugin is run to completion on an event
+    loop of its own.
+
+    Args:
+        invocation: The step invocation
+        run: The context of the run the step is part of
+
+    Returns:
+        A (task plugin output, call measurements or None) 2-tuple
+    """
+    step = invocation.step
+
+    func: Callable[..., Any] = step.plugin_func
+    args: Sequence[Any] = invocation.arg_values
+    if step.is_coroutine:
+        func = util.call_sync
+        args = (step.plugin_func, *args)
+
+    func, args = _wrap_step_call(step, run, func, args)
+
+    if run.profiler is None:
+        return func(*args, **invocation.kwarg_values), None
+
+    # The wrapped call returns its measurements with its output
+    return func(*args, **invocation.kwarg_values)
+
+
+def _release_dead_outputs(step_name: str, run: _RunContext) -> None:
+    """
+    Update liveness bookkeeping for a step which has completed (or was
+    skipped), and release any step outputs which no remaining step will
+    consume.  This keeps large outputs (arrays, models, etc) from staying
+    resident until the end of the run.
+
+    Args:
+        step_name: The name of the step which completed
+        run: The context of the run the step is part of
+    """
+    log = _get_logger()
+
+    # Sample memory usage before releasing anything, when it is likely to be
+    # at its highest.
+    rss = util.get_rss()
+    if rss is not None and (run.peak_rss is None or rss > run.peak_rss):
+        run.peak_rss = rss
+    run.peak_resident_steps = max(run.peak_resident_steps, len(run.step_outputs))
+
+    dead_steps = []
+    for consumed_step_name in run.consumed_steps[step_name]:
+        run.pending_consumers[consumed_step_name] -= 1
+        if run.pending_consumers[consumed_step_name] == 0:
+            dead_steps.append(consumed_step_name)
+
+    # Outputs nothing consumes are dead as soon as they're produced.
+    if run.pending_consumers[step_name] == 0:
+        dead_steps.append(step_name)
+
+    for dead_step_name in dead_steps:
+        if run.step_outputs.pop(dead_step_name, None) is not None:
+            log.debug("Released outputs of step: %s", dead_step_name)
+
+        if run.array_transport is not None:
+            run.array_transport.release(dead_step_name)
+
+
+def _log_memory_report(run: _RunContext) -> None:
+    """
+    Log a summary of memory usage over the course of a run.
+
+    Args:
+        run: The context of a completed run
+    """
+    log = _get_logger()
+
+    if run.peak_rss is not None:
+        log.info(
+            "Peak resident memory between steps: %.1f MiB",
+            run.peak_rss / (1024 * 1024),
+        )
+
+    log.info("Peak number of steps with resident outputs: %d", run.peak_resident_steps)
+
+
+def _run_steps_serial(run: _RunContext) -> None:
+    """
+    Run all steps of a task graph one at a time, in a topologically sorted
+    order.
+
+    Args:
+        run: The context of the run
+    """
+    log = _get_logger()
+
+    log.debug("Step order:\n  %s", "\n  ".join(run.plan.step_order))
+
+    for step_name in run.plan.step_order:
+        if step_name in run.completed_steps:
+            log.info("Skipping completed step: %s", step_name)
+            _release_dead_outputs(step_name, run)
+            continue
+
+        with _step_error_context(step_name):
+            log.info("Running step: %s", step_name)
+
+            invocation = _prepare_step(step_name, run)
+
+            call_stats = None
+            if invocation.cache_hit:
+                output = invocation.cached_output
+            else:
+                output, call_stats = _call_step(invocation, run)
+
+            _finish_step(invocation, output, run, call_stats)
+
+
+def _start_ready_step(step_name: str, run: _RunContext) -> Optional[_StepInvocation]:
+    """
+    Start a step whose dependencies are satisfied, for the concurrent
+    runners: skip it if it was already completed, or finish it right away if
+    its output was cached.
+
+    Args:
+        step_name: The name of the ready step
+        run: The context of the run the step is part of
+
+    Returns:
+        A step invocation whose task plugin must be called, or None if the
+        step is done
+    """
+    log = _get_logger()
+
+    if step_name in run.completed_steps:
+        log.info("Skipping completed step: %s", step_name)
+        _release_dead_outputs(step_name, run)
+        return None
+
+    with _step_error_context(step_name):
+        log.info("Running step: %s", step_name)
+
+        invocation = _prepare_step(step_name, run)
+
+        if invocation.cache_hit:
+            _finish_step(invocation, invocation.cached_output, run)
+            return None
+
+    return invocation
+
+
+def _finish_step_from_future(
+    invocation: _StepInvocation,
+    future: Union[concurrent.futures.Future, asyncio.Future],
+    run: _RunContext,
 ) -> None:
     """
-    Run an experiment via a declarative experiment description.
+    Do bookkeeping for a step whose task plugin call, submitted by one of the
+    concurrent runners, has completed.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        invocation: The step invocation which completed
+        future: The completed future for the task plugin's output (or an
+            (output, call stats) pair, if profiling)
+        run: The context of the run the step is part of
+    """
+    log = _get_logger()
+    step_name = invocation.step.name
+
+    with _step_error_context(step_name):
+        call_stats = None
+        if run.profiler is not None:
+            output, call_stats = future.result()
+        else:
+            output = future.result()
+
+        if run.array_transport is not None:
+            output = run.array_transport.attach(step_name, output)
+
+        _finish_step(invocation, output, run, call_stats)
+
+    log.debug("Finished step: %s", step_name)
+
+
+def _submit_step(
+    executor: concurrent.futures.Executor,
+    invocation: _StepInvocation,
+    run: _RunContext,
+    use_processes: bool,
+) -> concurrent.futures.Future:
+    """
+    Submit the task plugin invocation of a step to a pool.
+
+    Args:
+        executor: The pool
+        invocation: The step invocation
+        run: The context of the run the step is part of
+        use_processes: Whether the pool is a process pool
+
+    Returns:
+        A future for the task plugin's output
+    """
+    func: Callable[..., Any]
+    args: Sequence[Any]
+    kwargs: Mapping[str, Any]
+    step = invocation.step
+
+    if run.array_transport is not None:
+        func = call_task_plugin_shared
+        args = (
+            run.array_transport.directory,
+            run.array_transport.min_size,
+            step.task_plugin_id,
+            run.array_transport.encode(invocation.arg_values),
+            run.array_transport.encode(invocation.kwarg_values),
+        )
+        kwargs = {}
+
+    elif use_processes:
+        # Worker processes look the plugin up themselves
+        func = _call_task_plugin
+        args = (step.task_plugin_id, invocation.arg_values, invocation.kwarg_values)
+        kwargs = {}
+
+    else:
+        func = step.plugin_func
+        args = invocation.arg_values
+        kwargs = invocation.kwarg_values
+
+    # If profiling, the call is measured where it runs, and the future's
+    # result becomes an (output, call stats) pair.
+    func, args = _wrap_step_call(step, run, func, args)
+
+    return executor.submit(func, *args, **kwargs)
+
+
+def _run_steps_parallel(
+    run: _RunContext,
+    max_workers: int,
+    use_processes: bool,
+    shared_array_min_size: Optional[int],
+) -> None:
+    """
+    Run the steps of a task graph concurrently, as their dependencies are
+    satisfied.  Argument resolution and output bookkeeping all happen in the
+    calling thread; only task plugin invocations are handed off to the pool.
+
+    Args:
+        run: The context of the run
+        max_workers: The maximum number of task plugins to run at once
+        use_processes: If True, run task plugins in a pool of worker
+            processes rather than threads.  All plugin arguments and return
+            values must then be picklable.
+        shared_array_min_size: If running steps in a process pool, numpy
+            arrays of at least this many bytes are passed to and from worker
+            processes via memory-mapped files rather than by pickling.  None
+            disables this.
+    """
+    topo_sorter = graphlib.TopologicalSorter(run.plan.dependencies)
+    topo_sorter.prepare()
+
+    executor: concurrent.futures.Executor
+    if use_processes:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+
+        if shared_array_min_size is not None:
+            run.array_transport = SharedArrayTransport(shared_array_min_size)
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    running_steps: dict[concurrent.futures.Future, _StepInvocation] = {}
+
+    try:
+        while topo_sorter.is_active():
+            for step_name in topo_sorter.get_ready():
+                invocation = _start_ready_step(step_name, run)
+
+                if invocation is None:
+                    topo_sorter.done(step_name)
+
+                else:
+                    with _step_error_context(step_name):
+                        future = _submit_step(executor, invocation, run, use_processes)
+                    running_steps[future] = invocation
+
+            if not running_steps:
+                # Everything ready was skipped or satisfied from the cache;
+                # look for newly ready steps.
+                continue
+
+            done_futures, _ = concurrent.futures.wait(
+                running_steps, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+
+            for future in done_futures:
+                invocation = running_steps.pop(future)
+                _finish_step_from_future(invocation, future, run)
+                topo_sorter.done(invocation.step.name)
+
+    finally:
+        # On error, don't start any more steps; wait for those already
+        # running to finish since they can't be interrupted.
+        executor.shutdown(wait=True, cancel_futures=True)
+
+        if run.array_transport is not None:
+            run.array_transport.close()
+            run.array_transport = None
+
+
+def _start_step_async(
+    executor: concurrent.futures.Executor,
+    invocation: _StepInvocation,
+    run: _RunContext,
+) -> asyncio.Future:
+    """
+    Start the task plugin invocation of a step on the running event loop.
+    Coroutine task plugins run on the loop itself; others are handed off to a
+    thread pool.
+
+    Args:
+        executor: The thread pool
+        invocation: The step invocation
+        run: The context of the run the step is part of
+
+    Returns:
+        A future for the task plugin's output (or an (output, call stats)
+        pair, if profiling)
+    """
+    step = invocation.step
+
+    if not step.is_coroutine:
+        return asyncio.wrap_future(
+            _submit_step(executor, invocation, run, use_processes=False)
+        )
+
+    func: Callable[..., Any] = step.plugin_func
+    args: Sequence[Any] = invocation.arg_values
+
+    if step.timeout is not None or step.retries:
+        func = call_with_retries_async
+        args = (step.name, step.timeout, step.retries, step.plugin_func, *args)
+
+    if run.profiler is not None:
+        coroutine = call_profiled_async(func, *args, **invocation.kwarg_values)
+    else:
+        coroutine = func(*args, **invocation.kwarg_values)
+
+    return asyncio.ensure_future(coroutine)
+
+
+async def _run_steps_async(run: _RunContext, max_workers: int) -> None:
+    """
+    Run the steps of a task graph concurrently on an event loop, as their
+    dependencies are satisfied.  This lets steps which are dominated by I/O
+    overlap without a thread each, if their task plugins are coroutines.
+    Other task plugins run in a thread pool.  Argument resolution and output
+    bookkeeping all happen on the event loop.
+
+    Args:
+        run: The context of the run
+        max_workers: The maximum number of task plugins to run at once,
+            coroutines and threads combined
+    """
+    topo_sorter = graphlib.TopologicalSorter(run.plan.dependencies)
+    topo_sorter.prepare()
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    ready_steps: collections.deque[str] = collections.deque()
+    running_steps: dict[asyncio.Future, _StepInvocation] = {}
+
+    try:
+        while topo_sorter.is_active():
+            ready_steps.extend(topo_sorter.get_ready())
+
+            # Unlike a pool, the event loop doesn't bound concurrency by
+            # itself, so hold ready steps back until there is room.
+            while ready_steps and len(running_steps) < max_workers:
+                step_name = ready_steps.popleft()
+                invocation = _start_ready_step(step_name, run)
+
+                if invocation is None:
+                    topo_sorter.done(step_name)
+                    ready_steps.extend(topo_sorter.get_ready())
+
+                else:
+                    with _step_error_context(step_name):
+                        future = _start_step_async(executor, invocation, run)
+                    running_steps[future] = invocation
+
+            if not running_steps:
+                continue
+
+            done_futures, _ = await asyncio.wait(
+                running_steps, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            for future in done_futures:
+                invocation = running_steps.pop(future)
+                _finish_step_from_future(invocation, future, run)
+                topo_sorter.done(invocation.step.name)
+
+    finally:
+        # On error, don't start any more steps.  Coroutines can be
+        # cancelled; steps running in threads can't be interrupted, so wait
+        # for them to finish.
+        for future in running_steps:
+            future.cancel()
+
+        if running_steps:
+            await asyncio.wait(running_steps)
+
+            for future in running_steps:
+                # Retrieve exceptions, so they aren't reported as unhandled
+                if not future.cancelled():
+                    future.exception()
+
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def run_plan(
+    plan: ExecutionPlan,
+    global_parameters: MutableMapping[str, Any],
+    max_workers: Optional[int] = None,
+    use_processes: bool = False,
+    step_cache: Optional[StepOutputCache] = None,
+    checkpoint: Optional[StepCheckpointStore] = None,
+    resume: bool = False,
+    initial_outputs: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    shared_array_min_size: Optional[int] = DEFAULT_MIN_SHARED_ARRAY_SIZE,
+    profiler: Optional[StepProfiler] = None,
+) -> Mapping[str, Mapping[str, Any]]:
+    """
+    Run a compiled execution plan.  A plan may be run any number of times, so
+    this avoids re-analyzing the experiment description when the same
+    experiment is run repeatedly, e.g. with different global parameters.
+
+    Args:
+        plan: An execution plan, as produced by compile_experiment()
         global_parameters: External parameter values to use in the
             experiment, as a dict
+        max_workers: The maximum number of steps to run concurrently.  If None
+            or 1, steps are run one at a time in the calling thread.  If
+            greater than 1, independent steps of the graph are run
+            concurrently in a pool of this width.  If any task plugin is a
+            coroutine function and a thread pool would be used, the graph is
+            instead run on an event loop: coroutine plugins are awaited on
+            the loop, so that I/O-bound steps overlap, and other plugins run
+            in the pool.
+        use_processes: If True and max_workers is greater than 1, use a pool
+            of processes instead of threads.  This is useful for CPU-bound
+            task plugins which don't release the GIL, but requires all step
+            inputs and outputs to be picklable.
+        step_cache: A step output cache used to reuse outputs of previous
+            invocations of cacheable task plugins with the same arguments.  If
+            None, all steps are always run.
+        checkpoint: A checkpoint store to which step outputs are saved as
+            steps complete.  If None, no checkpoints are saved.
+        resume: If True, restore the outputs of steps found in the checkpoint
+            store and skip running those steps.  Requires a checkpoint store.
+        initial_outputs: Outputs of steps outside of the plan which steps of
+            the plan consume, if the plan is a slice of a larger plan.  This
+            is a nested mapping: step name => output name => output value.
+        shared_array_min_size: If use_processes is True, numpy arrays of at
+            least this many bytes are passed between processes via
+            memory-mapped files instead of being pickled, so that steps in
+            different processes can share them without copying.  None
+            disables this.
+        profiler: A profiler which records timing and memory measurements
+            of each step as it completes.  If None, steps are not profiled.
+
+    Returns:
+        The outputs of steps which are still needed by consumers outside of
+        the plan, as a nested mapping: step name => output name => output
+        value.  This is empty unless the plan is a slice of a larger plan.
     """
 
     log = _get_logger()
 
-    global_parameter_spec = experiment_desc.get("parameters", {})
-    tasks = experiment_desc["tasks"]
-    graph = experiment_desc["graph"]
-
-    _resolve_global_parameters(global_parameter_spec, global_parameters)
+    resolve_global_parameters(plan.parameter_spec, global_parameters)
 
     if log.isEnabledFor(logging.DEBUG):
         props_values = "\n  ".join(
@@ -466,42 +1027,87 @@ def run_experiment(
         )
         log.debug("Global parameters:\n  %s", props_values)
 
-    step_outputs: MutableMapping[str, MutableMapping[str, Any]] = (
-        collections.defaultdict(dict)
-    )
+    run = _RunContext(plan, global_parameters, step_cache, checkpoint, profiler)
 
-    step_order = util.get_sorted_steps(graph)
+    if initial_outputs:
+        run.step_outputs.update(initial_outputs)
 
-    log.debug("Step order:\n  %s", "\n  ".join(step_order))
+    if resume and checkpoint is not None:
+        restored_outputs = checkpoint.load()
+        for step_name, outputs in restored_outputs.items():
+            if outputs:
+                run.step_outputs[step_name].update(outputs)
+            run.completed_steps.add(step_name)
 
-    for step_name in step_order:
-        try:
-            log.info("Running step: %s", step_name)
+        log.info("Restored %d completed step(s) from checkpoint", len(restored_outputs))
 
-            step = graph[step_name]
+    if max_workers is None or max_workers <= 1:
+        _run_steps_serial(run)
 
-            task_plugin_short_name = util.step_get_plugin_short_name(step)
-            if not task_plugin_short_name:
-                raise MissingTaskPluginNameError(step_name)
+    elif not use_processes and any(step.is_coroutine for step in plan.steps.values()):
+        log.debug(
+            "Running steps on an event loop with up to %d concurrent steps",
+            max_workers,
+        )
+        asyncio.run(_run_steps_async(run, max_workers))
 
-            task_def = tasks.get(task_plugin_short_name)
-            if not task_def:
-                raise TaskPluginNotFoundError(task_plugin_short_name, step_name)
+    else:
+        log.debug(
+            "Running steps with up to %d concurrent %s",
+            max_workers,
+            "processes" if use_processes else "threads",
+        )
+        _run_steps_parallel(run, max_workers, use_processes, shared_array_min_size)
 
-            task_plugin_id = task_def["plugin"]
+    _log_memory_report(run)
 
-            output = _run_step(step, task_plugin_id, global_parameters, step_outputs)
+    return {
+        step_name: outputs
+        for step_name, outputs in run.step_outputs.items()
+        if step_name in plan.steps
+    }
 
-            output_defs = task_def.get("outputs")
-            if output_defs:
-                _update_output_map(step_outputs, step_name, output_defs, output)
-                log.debug("Output(s): %s", str(step_outputs[step_name]))
 
-            # else: should I warn if there was an output from the task but no
-            # output_names were given?
+def run_experiment(
+    experiment_desc: Mapping[str, Any],
+    global_parameters: MutableMapping[str, Any],
+    max_workers: Optional[int] = None,
+    use_processes: bool = False,
+    step_cache: Optional[StepOutputCache] = None,
+    checkpoint: Optional[StepCheckpointStore] = None,
+    resume: bool = False,
+    profiler: Optional[StepProfiler] = None,
+) -> None:
+    """
+    Run an experiment via a declarative experiment description.  This compiles
+    the description to an execution plan and runs it; see run_plan() for
+    details.
+
+    Args:
+        experiment_desc: The experiment description, as parsed YAML or
+            equivalent
+        global_parameters: External parameter values to use in the
+            experiment, as a dict
+        max_workers: The maximum number of steps to run concurrently
+        use_processes: If True and max_workers is greater than 1, use a pool
+            of processes instead of threads
+        step_cache: A step output cache, or None to always run all steps
+        checkpoint: A checkpoint store to which step outputs are saved as
+            steps complete, or None
+        resume: If True, restore completed steps from the checkpoint store and
+            skip running them
+        profiler: A profiler to record step measurements with, or None
+    """
 
-        except StepError as e:
-            # Fill in useful contextual info on the error if necessary.
-            if not e.context_step_name:
-                e.context_step_name = step_name
-            raise
+    plan = compile_experiment(experiment_desc)
+
+    run_plan(
+        plan,
+        global_parameters,
+        max_workers=max_workers,
+        use_processes=use_processes,
+        step_cache=step_cache,
+        checkpoint=checkpoint,
+        resume=resume,
+        profiler=profiler,
+    )
@@ -18,8 +18,12 @@
 Build a "type registry", i.e. a mapping from type name to Type instance,
 from a set of type definitions.
 """
+import collections
 import graphlib
+import hashlib
+import threading
 from collections.abc import Iterable, Iterator, Mapping, MutableMapping, Sequence
+from types import MappingProxyType
 from typing import Any, Optional, Union, cast
 
 from dioptra.sdk.exceptions.task_engine import (
@@ -51,6 +55,9 @@ BUILTIN_TYPES = {
     TYPE_NULL.name: TYPE_NULL,
 }
 
+# Max number of built type registries kept by get_type_registry()
+DEFAULT_MAX_CACHED_REGISTRIES = 64
+
 
 # Type aliases for type annotations
 _TypeRegistry = Mapping[str, types.Type]
@@ -441,3 +448,77 @@ def build_type_registry(
             type_registry[type_name] = type_
 
     return type_registry
+
+
+# Registries built by get_type_registry(), keyed by type definitions digest,
+# in least to most recently used order.
+_REGISTRY_CACHE: collections.OrderedDict[str, Mapping[str, types.Type]] = (
+    collections.OrderedDict()
+)
+_REGISTRY_CACHE_LOCK = threading.Lock()
+
+
+def compute_type_defs_digest(type_defs: Mapping[str, _TypeDefinition]) -> str:
+    """
+    Compute a digest which identifies a set of type definitions.  Definition
+    order is significant, since it determines registry iteration order.
+
+    Args:
+        type_defs: The type definitions, a mapping type name to type definition
+
+    Returns:
+        A digest as a hex string
+    """
+    # Type definitions are plain parsed YAML (or equivalent), whose repr is
+    # deterministic and distinguishes e.g. 1 from "1" (unlike JSON).
+    return hashlib.sha256(repr(type_defs).encode("utf-8")).hexdigest()
+
+
+def get_type_registry(
+    type_defs: Mapping[str, _TypeDefinition],
+    max_cached_registries: int = DEFAULT_MAX_CACHED_REGISTRIES,
+) -> Mapping[str, types.Type]:
+    """
+    Get a type registry for a set of type definitions.  This is like
+    build_type_registry(), except registries are cached by a digest of the
+    type definitions, so a type library shared by many experiments is only
+    built once per process.  The returned registry is shared, so it is
+    read-only.
+
+    Args:
+        type_defs: The type definitions, a mapping type name to type definition
+        max_cached_registries: The max number of registries to keep cached;
+            least recently used registries are evicted first
+
+    Returns:
+        A read-only type registry, as a mapping from type name to Type
+        instance.  See build_type_registry().
+    """
+    digest = compute_type_defs_digest(type_defs)
+
+    with _REGISTRY_CACHE_LOCK:
+        type_registry = _REGISTRY_CACHE.get(digest)
+        if type_registry is not None:
+            _REGISTRY_CACHE.move_to_end(digest)
+
+    if type_registry is None:
+        # Build outside the lock; if another thread races us, one of the
+        # (equivalent) registries wins.  Failures are not cached: they raise.
+        type_registry = MappingProxyType(build_type_registry(type_defs))
+
+        with _REGISTRY_CACHE_LOCK:
+            type_registry = _REGISTRY_CACHE.setdefault(digest, type_registry)
+            _REGISTRY_CACHE.move_to_end(digest)
+
+            while len(_REGISTRY_CACHE) > max_cached_registries:
+                _REGISTRY_CACHE.popitem(last=False)
+
+    return type_registry
+
+
+def clear_type_registry_cache() -> None:
+    """
+    Discard all type registries cached by get_type_registry().
+    """
+    with _REGISTRY_CACHE_LOCK:
+        _REGISTRY_CACHE.clear()
@@ -24,6 +24,7 @@ from typing import Any, Optional
 
 from dioptra.task_engine import type_registry, types, util
 from dioptra.task_engine.issues import IssueSeverity, IssueType, ValidationIssue
+from dioptra.task_engine.validation_context import ValidationContext
 
 # Type aliases for type annotations
 _TypeMap = Mapping[str, types.Type]
@@ -31,6 +32,55 @@ _TypeMap = Mapping[str, types.Type]
 # parameters, graph steps.
 _DefMap = Mapping[str, Any]
 
+# Bound on the number of entries in each of the type query memo tables below
+_TYPE_MEMO_SIZE = 4096
+
+# Exact classes of scalar values whose inferred type depends only on the class
+# (str is handled separately, due to references)
+_SCALAR_VALUE_TYPES: Mapping[type, types.Type] = {
+    bool: type_registry.TYPE_BOOLEAN,
+    int: type_registry.TYPE_INTEGER,
+    float: type_registry.TYPE_NUMBER,
+    type(None): type_registry.TYPE_NULL,
+}
+
+
+class _TypeKey:
+    """
+    Hashable wrapper which compares types by identity, for use as a memo table
+    key.  Types compare by name, which is only meaningful within one type
+    registry; identity is always safe, and types are immutable so a result
+    computed for a given pair of instances never changes.  Memo tables hold
+    strong references to their keys, so identities can't be reused while an
+    entry exists.
+    """
+
+    __slots__ = ("type_",)
+
+    def __init__(self, type_: types.Type) -> None:
+        self.type_ = type_
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _TypeKey) and self.type_ is other.type_
+
+    def __hash__(self) -> int:
+        return id(self.type_)
+
+
+def _distinct_types(types_: Iterable[types.Type]) -> Iterable[types.Type]:
+    """
+    Dedupe the given types by identity, preserving order.  Inferred types are
+    hash-consed, so this collapses e.g. the element types of a large literal
+    list down to the few distinct types actually present.
+
+    Args:
+        types_: An iterable of Type instances
+
+    Returns:
+        An iterable of the distinct Type instances
+    """
+    return {id(type_): type_ for type_ in types_}.values()
+
 
 def _get_reference_type(
     reference: str,
@@ -110,6 +160,32 @@ def _find_common_base_of_two_types(type1: types.Type, type2: types.Type) -> type
     Returns:
         A Type instance
     """
+    if type1 is type2:
+        common_base = type1
+    else:
+        common_base = _find_common_base_of_two_types_memo(
+            _TypeKey(type1), _TypeKey(type2)
+        )
+
+    return common_base
+
+
+@functools.lru_cache(maxsize=_TYPE_MEMO_SIZE)
+def _find_common_base_of_two_types_memo(
+    type_key1: _TypeKey, type_key2: _TypeKey
+) -> types.Type:
+    """
+    Memoized implementation of _find_common_base_of_two_types().
+
+    Args:
+        type_key1: A Type instance, wrapped for identity comparison
+        type_key2: A Type instance, wrapped for identity comparison
+
+    Returns:
+        A Type instance
+    """
+    type1 = type_key1.type_
+    type2 = type_key2.type_
     common_base: Optional[types.Type]
 
     if isinstance(type1, types.SimpleType) and isinstance(type2, types.SimpleType):
@@ -148,7 +224,9 @@ def _find_common_base_type(types_: Iterable[types.Type]):
         A Type instance
     """
     try:
-        common_base = functools.reduce(_find_common_base_of_two_types, types_)
+        common_base = functools.reduce(
+            _find_common_base_of_two_types, _distinct_types(types_)
+        )
     except TypeError as e:
         raise ValueError("_find_common_base_type() requires at least one type") from e
 
@@ -184,10 +262,14 @@ def _infer_type_from_mapping(
     type_: types.Type
 
     if mapping:
+        # Keys are hashable, so in practice scalars whose inferred type only
+        # depends on their class.  Any other key leads to an inferred type of
+        # "any" regardless of its value, so one representative key per class
+        # suffices.
         key_types = (
             # disable reference resolution here
             _infer_type(key)
-            for key in mapping
+            for key in {type(key): key for key in mapping}.values()
         )
 
         key_base_type = _find_common_base_type(key_types)
@@ -201,28 +283,28 @@ def _infer_type_from_mapping(
                 for prop_name, prop_value in mapping.items()
             }
 
-            type_ = types.StructuredType(
-                types.TypeStructure(types.StructureType.MAPPING, prop_types)
+            type_ = types.intern_structured_type(
+                types.StructureType.MAPPING, prop_types
             )
 
         elif key_base_type is type_registry.TYPE_INTEGER:
             # Integer-keyed keytype/valuetype style mappings are also
             # permitted.  Need to come up with a single type from potentially
             # multiple different property value types.
-            value_types = {
-                _infer_type(v, type_reg, global_parameter_types, graph, tasks)
-                for v in mapping.values()
-            }
+            value_types = set(
+                _distinct_types(
+                    _infer_type(v, type_reg, global_parameter_types, graph, tasks)
+                    for v in mapping.values()
+                )
+            )
 
             if len(value_types) == 1:
                 value_type = next(iter(value_types))
             else:
-                value_type = types.UnionType(value_types)
+                value_type = types.intern_union_type(value_types)
 
-            type_ = types.StructuredType(
-                types.TypeStructure(
-                    types.StructureType.MAPPING, [key_base_type, value_type]
-                )
+            type_ = types.intern_structured_type(
+                types.StructureType.MAPPING, [key_base_type, value_type]
             )
 
         else:
@@ -234,9 +316,7 @@ def _infer_type_from_mapping(
     else:
         # If an empty mapping, mapping[{}] is inferred (i.e. enumerated
         # property mapping with no properties).
-        type_ = types.StructuredType(
-            types.TypeStructure(types.StructureType.MAPPING, {})
-        )
+        type_ = types.intern_structured_type(types.StructureType.MAPPING, {})
 
     return type_
 
@@ -267,15 +347,25 @@ def _infer_type_from_iterable(
     Returns:
         The value type
     """
-    # Infer all element types
-    elt_types = [
-        _infer_type(elt, type_reg, global_parameter_types, graph, tasks)
-        for elt in iterable
-    ]
+    # Infer all element types.  Large literals often repeat the very same
+    # element objects (e.g. via YAML aliases), so non-scalar elements are
+    # inferred once per object.  Elements are kept in the cache alongside
+    # their types so that their ids can't be reused while iterating.
+    elt_types = []
+    seen_elts: dict[int, tuple[Any, types.Type]] = {}
+    for elt in iterable:
+        elt_type = _SCALAR_VALUE_TYPES.get(type(elt))
 
-    type_ = types.StructuredType(
-        types.TypeStructure(types.StructureType.TUPLE, elt_types)
-    )
+        if elt_type is None and id(elt) in seen_elts:
+            elt_type = seen_elts[id(elt)][1]
+
+        elif elt_type is None:
+            elt_type = _infer_type(elt, type_reg, global_parameter_types, graph, tasks)
+            seen_elts[id(elt)] = (elt, elt_type)
+
+        elt_types.append(elt_type)
+
+    type_ = types.intern_structured_type(types.StructureType.TUPLE, elt_types)
 
     return type_
 
@@ -305,7 +395,14 @@ def _infer_type(
     Returns:
         The value type
     """
-    if isinstance(value, str):
+    type_ = _SCALAR_VALUE_TYPES.get(type(value))
+
+    if type_ is not None:
+        # Fast path for the common scalar values which make up most of a large
+        # literal.
+        pass
+
+    elif isinstance(value, str):
         if (
             util.is_reference(value)
             and type_reg is not None
@@ -413,7 +510,7 @@ def _mapping_structures_compatible(
         if result:
             result = all(
                 _types_compatible(invoc_prop_type, task_value_type)
-                for invoc_prop_type in invoc_struct_def.values()
+                for invoc_prop_type in _distinct_types(invoc_struct_def.values())
             )
 
     elif not invoc_is_enumerated and task_is_enumerated:
@@ -504,7 +601,7 @@ def _types_compatible_structured(
 
         result = all(
             _types_compatible(tuple_elt_type, list_elt_type)
-            for tuple_elt_type in tuple_elt_types
+            for tuple_elt_type in _distinct_types(tuple_elt_types)
         )
 
     elif (
@@ -551,7 +648,61 @@ def _types_compatible(
 ) -> bool:
     """
     Check an invocation argument type for compatibility with a corresponding
-    task parameter type.
+    task parameter type.  Results for structured and union types are memoized,
+    since the same (large) types tend to be checked over and over.
+
+    Args:
+        invocation_arg_type: An invocation argument type
+        task_param_type: A task parameter argument type
+
+    Returns:
+        True if the types are compatible; False if not
+    """
+    if invocation_arg_type is task_param_type:
+        result = True
+
+    elif isinstance(invocation_arg_type, types.SimpleType) and isinstance(
+        task_param_type, types.SimpleType
+    ):
+        # Cheap enough that memoizing wouldn't pay off
+        result = _check_types_compatible(invocation_arg_type, task_param_type)
+
+    else:
+        result = _types_compatible_memo(
+            _TypeKey(invocation_arg_type), _TypeKey(task_param_type)
+        )
+
+    return result
+
+
+@functools.lru_cache(maxsize=_TYPE_MEMO_SIZE)
+def _types_compatible_memo(
+    invocation_arg_type_key: _TypeKey, task_param_type_key: _TypeKey
+) -> bool:
+    """
+    Memoized wrapper around _check_types_compatible().
+
+    Args:
+        invocation_arg_type_key: An invocation argument type, wrapped for
+            identity comparison
+        task_param_type_key: A task parameter argument type, wrapped for
+            identity comparison
+
+    Returns:
+        True if the types are compatible; False if not
+    """
+    return _check_types_compatible(
+        invocation_arg_type_key.type_, task_param_type_key.type_
+    )
+
+
+def _check_types_compatible(
+    invocation_arg_type: types.Type, task_param_type: types.Type
+) -> bool:
+    """
+    Check an invocation argument type for compatibility with a corresponding
+    task parameter type, without memoization.  Use _types_compatible()
+    instead.
 
     Args:
         invocation_arg_type: An invocation argument type
@@ -667,32 +818,32 @@ def _check_invocation_parameter(
 
 
 def _step_check_types(
-    step_def: Mapping[str, Any],
-    type_reg: _TypeMap,
+    step_name: str,
+    context: ValidationContext,
     global_parameter_types: _TypeMap,
-    graph: _DefMap,
-    tasks: _DefMap,
 ) -> list[ValidationIssue]:
     """
     Check the types of task invocation parameters in the given step.
 
     Args:
-        step_def: A step definition
-        type_reg: A type registry as a mapping from type name to Type instance
+        step_name: The name of the step to check
+        context: Shared analysis of the experiment description
         global_parameter_types: A mapping from global parameter name to Type
             instance, giving the types of all global parameters
-        graph: A task graph, mapping step names to step definitions
-        tasks: Task definitions, mapping task short name to task definition
 
     Returns:
         A list of ValidationIssue objects; will be empty if no issues were
         found
     """
+    type_reg = context.type_registry
+    graph = context.graph
+    tasks = context.tasks
+
     # Get info about how the task plugin is being invoked, in the given step
     (
         invocation_pos_arg_specs,
         invocation_keyword_arg_specs,
-    ) = util.step_get_invocation_arg_specs(step_def)
+    ) = context.step_arg_specs[step_name]
 
     # For mypy: assume a step definition well-formedness check has already
     # occurred, so we know we can get invocation arguments.
@@ -700,14 +851,13 @@ def _step_check_types(
     assert invocation_keyword_arg_specs is not None
 
     # Get info about the task plugin: how it needs to be invoked
-    task_plugin_short_name = util.step_get_plugin_short_name(step_def)
+    task_plugin_short_name = context.step_task_names[step_name]
 
     # For mypy: assume a step definition well-formedness check has already
     # occurred, so we know we can get a task plugin short name.
     assert task_plugin_short_name is not None
 
-    task_def = tasks[task_plugin_short_name]
-    task_inputs_map = util.make_task_input_map(task_def)
+    task_inputs_map = context.task_input_maps[task_plugin_short_name]
 
     # Now, we can evaluate the task plugin invocation with respect to its
     # parameter type requirements.
@@ -859,7 +1009,9 @@ def _infer_global_parameter_types(
     return global_parameter_types
 
 
-def check_types(experiment_desc: Mapping[str, Any]) -> list[ValidationIssue]:
+def check_types(
+    experiment_desc: Mapping[str, Any], context: Optional[ValidationContext] = None
+) -> list[ValidationIssue]:
     """
     Check the types of all task invocation arguments across all steps in the
     task graph, against declared task plugin inputs and outputs.
@@ -867,20 +1019,20 @@ def check_types(experiment_desc: Mapping[str, Any]) -> list[ValidationIssue]:
     Args:
         experiment_desc: The experiment description, as parsed YAML or
             equivalent
+        context: Shared analysis of the experiment description, if the caller
+            already has one.  If None, one is created.
 
     Returns:
         A list of ValidationIssue objects; will be empty if no issues were
         found
     """
-    types_ = experiment_desc.get("types", {})
-    global_parameter_spec = experiment_desc.get("parameters", {})
-    tasks = experiment_desc["tasks"]
-    graph = experiment_desc["graph"]
+    if context is None:
+        context = ValidationContext(experiment_desc)
 
-    type_reg = type_registry.build_type_registry(types_)
+    global_parameter_spec = context.parameters
 
     global_parameter_types = _infer_global_parameter_types(
-        global_parameter_spec, type_reg
+        global_parameter_spec, context.type_registry
     )
 
     all_issues = _check_global_parameter_defaults(
@@ -888,10 +1040,8 @@ def check_types(experiment_desc: Mapping[str, Any]) -> list[ValidationIssue]:
     )
 
     if not all_issues:
-        for step_name, step_def in graph.items():
-            issues = _step_check_types(
-                step_def, type_reg, global_parameter_types, graph, tasks
-            )
+        for step_name in context.graph:
+            issues = _step_check_types(step_name, context, global_parameter_types)
 
             for issue in issues:
                 issue.message = 'in step "{}": {}'.format(step_name, issue.message)
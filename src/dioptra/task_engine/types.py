@@ -19,7 +19,9 @@ Define classes related to types.
 """
 
 import enum
-from collections.abc import Iterable, Mapping, Sequence, Set
+import threading
+import weakref
+from collections.abc import Hashable, Iterable, Mapping, Sequence, Set
 from typing import Any, Optional, Union
 
 # This creates a circular import.  The exception module imports this module
@@ -130,6 +132,9 @@ class TypeStructure:
 
         self.__struct_type = struct_type
         self.__struct_def = struct_def
+        # Structures are immutable, so the (possibly expensive, for large
+        # structures) hash value is computed at most once.
+        self.__hash: Optional[int] = None
 
         self.__check_structure_agrees_with_type()
 
@@ -207,9 +212,11 @@ class TypeStructure:
         Returns:
             The hash value
         """
-        hashable_struct = _make_hashable(self.struct_def)
+        if self.__hash is None:
+            hashable_struct = _make_hashable(self.struct_def)
+            self.__hash = hash((self.struct_type, hashable_struct))
 
-        return hash((self.struct_type, hashable_struct))
+        return self.__hash
 
     def __repr__(self) -> str:
         """
@@ -596,3 +603,83 @@ class UnionType(Type):
         )
 
         return s
+
+
+# Table of canonical anonymous types, for hash-consing.  Keys are derived from
+# the *identities* of component types, so the table never conflates types from
+# different type registries which merely happen to share names.  Values are
+# weakly held, so unused types are not kept alive by the table.
+_INTERNED_TYPES: weakref.WeakValueDictionary[Hashable, Type] = (
+    weakref.WeakValueDictionary()
+)
+_INTERNED_TYPES_LOCK = threading.Lock()
+
+
+def intern_structured_type(
+    struct_type: StructureType,
+    struct_def: Union[Type, Mapping[str, Type], Sequence[Type]],
+) -> StructuredType:
+    """
+    Get the canonical anonymous structured type with the given structure.  Two
+    calls with the same structure type and the same component type instances
+    produce the same StructuredType instance.  If the components are
+    themselves canonical (or named), structurally identical types are
+    therefore identical objects, and can be compared and memoized by identity.
+
+    Args:
+        struct_type: A StructureType enum value which represents the
+            structure type
+        struct_def: The structure definition; see TypeStructure
+
+    Returns:
+        An anonymous StructuredType instance
+    """
+    key_def: Hashable
+    if isinstance(struct_def, Type):
+        key_def = id(struct_def)
+    elif isinstance(struct_def, Mapping):
+        key_def = frozenset(
+            (prop_name, id(prop_type)) for prop_name, prop_type in struct_def.items()
+        )
+    else:
+        key_def = tuple(id(elt_type) for elt_type in struct_def)
+
+    key = (struct_type, key_def)
+
+    with _INTERNED_TYPES_LOCK:
+        type_ = _INTERNED_TYPES.get(key)
+        if type_ is None:
+            type_ = StructuredType(TypeStructure(struct_type, struct_def))
+            _INTERNED_TYPES[key] = type_
+
+    # For mypy: the key includes the structure type, which only structured
+    # types use.
+    assert isinstance(type_, StructuredType)
+
+    return type_
+
+
+def intern_union_type(member_types: Iterable[Type]) -> UnionType:
+    """
+    Get the canonical anonymous union type with the given member types.  Two
+    calls with the same member type instances produce the same UnionType
+    instance.
+
+    Args:
+        member_types: The member types of the union
+
+    Returns:
+        An anonymous UnionType instance
+    """
+    union_type = UnionType(member_types)
+
+    key = (UnionType, frozenset(id(member) for member in union_type.member_types))
+
+    with _INTERNED_TYPES_LOCK:
+        type_ = _INTERNED_TYPES.setdefault(key, union_type)
+
+    # For mypy: the key includes the UnionType class, which only union types
+    # use.
+    assert isinstance(type_, UnionType)
+
+    return type_
@@ -14,13 +14,18 @@
 #
 # ACCESS THE FULL CC BY 4.0 LICENSE HERE:
 # https://creativecommons.org/licenses/by/4.0/legalcode
+import asyncio
 import graphlib
-from collections.abc import Callable, Container, Iterator, Mapping, Sequence
+import inspect
+import os
+import sys
+from collections.abc import Callable, Container, Iterable, Iterator, Mapping, Sequence
 from typing import Any, Optional, Union
 
 import jsonschema.validators
 
 from dioptra.sdk.exceptions.task_engine import (
+    IllegalPluginNameError,
     StepNotFoundError,
     StepReferenceCycleError,
 )
@@ -48,6 +53,43 @@ def is_iterable(value: Any) -> bool:
     return result
 
 
+def canonical_repr(value: Any) -> str:
+    """
+    Make a string representation of a value for digesting, which is the same
+    for equal values regardless of mapping key order or set iteration order,
+    and which distinguishes values of different types, e.g. 1 from "1".
+    Mapping keys needn't be strings, or comparable with each other.
+
+    Args:
+        value: A value, typically parsed YAML or equivalent
+
+    Returns:
+        A string representation of the value
+    """
+    if isinstance(value, Mapping):
+        # Sort the encoded items, since keys may be of mutually incomparable
+        # types.
+        items = sorted(
+            canonical_repr(key) + ":" + canonical_repr(item_value)
+            for key, item_value in value.items()
+        )
+        result = "{" + ",".join(items) + "}"
+
+    elif isinstance(value, (set, frozenset)):
+        result = "set(" + ",".join(sorted(canonical_repr(elt) for elt in value)) + ")"
+
+    elif isinstance(value, tuple):
+        result = "(" + ",".join(canonical_repr(elt) for elt in value) + ")"
+
+    elif isinstance(value, list):
+        result = "[" + ",".join(canonical_repr(elt) for elt in value) + "]"
+
+    else:
+        result = repr(value)
+
+    return result
+
+
 def schema_validate(
     instance: Any,
     schema: Union[dict[str, Any], bool],
@@ -81,6 +123,188 @@ def schema_validate(
     return error_messages
 
 
+def _get_schema_refs(schema: Any, refs: set[str]) -> set[str]:
+    """
+    Collect the "$ref" values used anywhere within the given JSON-Schema.
+
+    Args:
+        schema: A JSON-Schema or part of one
+        refs: A set to add found references to
+
+    Returns:
+        The given set of references
+    """
+    if isinstance(schema, Mapping):
+        for key, value in schema.items():
+            if key == "$ref" and isinstance(value, str):
+                refs.add(value)
+            else:
+                _get_schema_refs(value, refs)
+
+    elif isinstance(schema, list):
+        for value in schema:
+            _get_schema_refs(value, refs)
+
+    return refs
+
+
+def _get_reachable(graph: Mapping[str, Iterable[str]], start: str) -> set[str]:
+    """
+    Find the nodes reachable from a node in a directed graph, by following at
+    least one edge.
+
+    Args:
+        graph: The graph, as a mapping from node to its successors
+        start: The node to start from
+
+    Returns:
+        The set of reachable nodes; includes start only if it is on a cycle
+    """
+    reachable: set[str] = set()
+    to_visit = list(graph.get(start, ()))
+
+    while to_visit:
+        node = to_visit.pop()
+        if node not in reachable:
+            reachable.add(node)
+            to_visit.extend(graph.get(node, ()))
+
+    return reachable
+
+
+def inline_schema_refs(
+    schema: Union[dict[str, Any], bool]
+) -> Union[dict[str, Any], bool]:
+    """
+    Produce a JSON-Schema equivalent to the given one, with references to its
+    own "$defs" replaced by the referenced definitions.  Resolving a "$ref" is
+    one of the more expensive things a validator does, and a schema whose
+    definitions are referenced from many places pays for it on every use.
+
+    Only sub-schemas consisting solely of a "$ref" of the form "#/$defs/<name>"
+    are inlined.  Definitions which are (directly or indirectly) recursive are
+    left as references, and "$defs" is retained so those still resolve.
+
+    Args:
+        schema: JSON-Schema as a data structure, e.g. parsed JSON
+
+    Returns:
+        A new schema; the given schema is not modified
+    """
+    if not isinstance(schema, Mapping) or not isinstance(schema.get("$defs"), Mapping):
+        return schema
+
+    defs = schema["$defs"]
+    prefix = "#/$defs/"
+
+    def_graph = {
+        name: {
+            ref.removeprefix(prefix)
+            for ref in _get_schema_refs(def_, set())
+            if ref.startswith(prefix)
+        }
+        for name, def_ in defs.items()
+    }
+
+    recursive_defs = {
+        name for name in def_graph if name in _get_reachable(def_graph, name)
+    }
+
+    def inline(sub_schema: Any) -> Any:
+        if isinstance(sub_schema, Mapping):
+            ref = sub_schema.get("$ref")
+            def_name = ref.removeprefix(prefix) if isinstance(ref, str) else None
+
+            if (
+                len(sub_schema) == 1
+                and ref != def_name
+                and def_name in defs
+                and def_name not in recursive_defs
+            ):
+                result = inline(defs[def_name])
+            else:
+                result = {key: inline(value) for key, value in sub_schema.items()}
+
+        elif isinstance(sub_schema, list):
+            result = [inline(value) for value in sub_schema]
+
+        else:
+            result = sub_schema
+
+        return result
+
+    inlined_schema = {
+        key: value if key == "$defs" else inline(value) for key, value in schema.items()
+    }
+
+    return inlined_schema
+
+
+class SchemaValidator:
+    """
+    A JSON-Schema validator which is built once and reused for many
+    instances.  Checking validity uses a copy of the schema with its
+    definitions inlined, and skips error message generation entirely; only
+    invalid instances are re-validated against the original schema to produce
+    error messages.
+
+    Instances may be shared between threads.
+    """
+
+    def __init__(self, schema: Union[dict[str, Any], bool]) -> None:
+        """
+        Initialize this validator.
+
+        Args:
+            schema: JSON-Schema as a data structure, e.g. parsed JSON
+        """
+        validator_class = jsonschema.validators.validator_for(schema)
+
+        self.schema = schema
+        self._validator = validator_class(schema=schema)
+        self._fast_validator = validator_class(schema=inline_schema_refs(schema))
+
+    def is_valid(self, instance: Any) -> bool:
+        """
+        Determine whether the given instance is valid according to the schema.
+
+        Args:
+            instance: A value to validate
+
+        Returns:
+            True if the instance is valid; False if not
+        """
+        return self._fast_validator.is_valid(instance)
+
+    def validate(
+        self,
+        instance: Any,
+        location_desc_callback: Optional[
+            Callable[[Sequence[Union[int, str]]], str]
+        ] = None,
+    ) -> list[str]:
+        """
+        Validate the given instance against the schema.
+
+        Args:
+            instance: A value to validate
+            location_desc_callback: A callback function used to customize the
+                description of the location of errors.  See schema_validate().
+
+        Returns:
+            A list of error messages; will be empty if validation succeeded
+        """
+        if self.is_valid(instance):
+            return []
+
+        error_messages = [
+            validation_error_to_message(error, self.schema, location_desc_callback)
+            for error in self._validator.iter_errors(instance)
+        ]
+
+        return error_messages
+
+
 def step_get_plugin_short_name(step: Mapping[str, Any]) -> Optional[str]:
     """
     Get the plugin short name from a step description.  There is a bit of
@@ -235,25 +459,30 @@ def _get_step_references(input_: Any, step_names: Container[str]) -> Iterator[st
             yield step_name
 
 
-def get_sorted_steps(step_graph: Mapping[str, Any]) -> list[str]:
+def get_step_dependencies(step_graph: Mapping[str, Any]) -> dict[str, list[str]]:
     """
-    Find a topological sorted list of step names for the given graph.
+    Find the direct dependencies of each step in the given graph.  A step
+    depends on another step if it refers to that step's output(s), or if it
+    declares the other step as an explicit dependency.
 
     Args:
         step_graph: Step definitions, as a mapping from step name to step
             definition.
 
     Returns:
-        A list of step names
+        A mapping from step name to a list of names of the steps it directly
+        depends on.  Each list is free of duplicates.
     """
-    topo_sorter: graphlib.TopologicalSorter = graphlib.TopologicalSorter()
+    step_deps = {}
 
     for step_name, step_def in step_graph.items():
-        topo_sorter.add(step_name)
+        # Use a dict as an insertion-ordered set, so that the resulting
+        # dependency lists (and therefore step orderings) are deterministic.
+        deps: dict[str, None] = {}
 
         for dep_step_name in _get_step_references(step_def, step_graph.keys()):
             if dep_step_name in step_graph:
-                topo_sorter.add(step_name, dep_step_name)
+                deps[dep_step_name] = None
             else:
                 raise StepNotFoundError(dep_step_name, step_name)
 
@@ -263,10 +492,154 @@ def get_sorted_steps(step_graph: Mapping[str, Any]) -> list[str]:
 
         for dep_step_name in explicit_deps:
             if dep_step_name in step_graph:
-                topo_sorter.add(step_name, dep_step_name)
+                deps[dep_step_name] = None
             else:
                 raise StepNotFoundError(dep_step_name, step_name)
 
+        step_deps[step_name] = list(deps)
+
+    return step_deps
+
+
+def get_step_output_consumers(step_graph: Mapping[str, Any]) -> dict[str, list[str]]:
+    """
+    Find the steps which consume the outputs of each step in the given graph,
+    i.e. which refer to those outputs.  Explicit dependencies are not
+    considered here, since they don't involve any step outputs.
+
+    Args:
+        step_graph: Step definitions, as a mapping from step name to step
+            definition.
+
+    Returns:
+        A mapping from step name to a list of names of the steps which consume
+        its outputs.  Each list is free of duplicates.  Every step in the graph
+        has an entry, which may be an empty list.
+    """
+    consumers: dict[str, dict[str, None]] = {step_name: {} for step_name in step_graph}
+
+    for step_name, step_def in step_graph.items():
+        for ref_step_name in _get_step_references(step_def, step_graph.keys()):
+            consumers[ref_step_name][step_name] = None
+
+    return {step_name: list(names) for step_name, names in consumers.items()}
+
+
+def get_rss() -> Optional[int]:
+    """
+    Get the current resident set size of this process.  This is only
+    supported on platforms with a /proc filesystem.
+
+    Returns:
+        The resident set size in bytes, or None if it could not be determined
+    """
+    try:
+        with open("/proc/self/statm", "rb") as fp:
+            rss_pages = int(fp.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+    return rss_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def get_peak_rss() -> Optional[int]:
+    """
+    Get the peak resident set size of this process so far.  This is only
+    supported on Unix-like platforms.
+
+    Returns:
+        The peak resident set size in bytes, or None if it could not be
+        determined
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes; macOS reports bytes.
+    if sys.platform != "darwin":
+        peak_rss *= 1024
+
+    return peak_rss
+
+
+def call_sync(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Call a function and return its result.  If the function returns a
+    coroutine (e.g. it is an "async def" task plugin), the coroutine is run to
+    completion on a new event loop first, so that coroutine task plugins can
+    be called like any other.
+
+    Args:
+        func: The function to call
+        *args: Positional arguments for the function
+        **kwargs: Keyword arguments for the function
+
+    Returns:
+        The function's return value, or the coroutine's result
+    """
+    output = func(*args, **kwargs)
+
+    if inspect.iscoroutine(output):
+        output = asyncio.run(output)
+
+    return output
+
+
+def collect_generators(output: Any) -> Any:
+    """
+    Collect generators in a task plugin output into lists: the output itself
+    if it is a generator, or its elements if it is a tuple or list of outputs.
+    This is needed where an output must leave the process (generators can't be
+    pickled).
+
+    Args:
+        output: A task plugin output
+
+    Returns:
+        The output, with generators replaced by lists of their values
+    """
+    if inspect.isgenerator(output):
+        output = list(output)
+
+    elif isinstance(output, (tuple, list)) and any(
+        inspect.isgenerator(elt) for elt in output
+    ):
+        collected = [list(elt) if inspect.isgenerator(elt) else elt for elt in output]
+        output = collected if isinstance(output, list) else tuple(collected)
+
+    return output
+
+
+def get_sorted_steps(step_graph: Mapping[str, Any]) -> list[str]:
+    """
+    Find a topological sorted list of step names for the given graph.
+
+    Args:
+        step_graph: Step definitions, as a mapping from step name to step
+            definition.
+
+    Returns:
+        A list of step names
+    """
+    return sort_step_dependencies(get_step_dependencies(step_graph))
+
+
+def sort_step_dependencies(step_deps: Mapping[str, Iterable[str]]) -> list[str]:
+    """
+    Find a topological sorted list of step names from step dependencies.
+
+    Args:
+        step_deps: A mapping from step name to the names of the steps it
+            directly depends on, e.g. as produced by get_step_dependencies()
+
+    Returns:
+        A list of step names
+    """
+    topo_sorter: graphlib.TopologicalSorter = graphlib.TopologicalSorter(step_deps)
+
     try:
         sorted_steps = list(topo_sorter.static_order())
     except graphlib.CycleError as e:
@@ -275,6 +648,44 @@ def get_sorted_steps(step_graph: Mapping[str, Any]) -> list[str]:
     return sorted_steps
 
 
+def get_pyplugs_coords(task_plugin: str) -> list[str]:
+    """
+    Split a fully qualified task plugin to the three parts required as
+    identifying coordinates by pyplugs.  The coordinates are:
+
+        <package> <module> <function name>
+
+    The task plugin is a dot-delimited string with at least two components.
+    The last two components map to <module> and <function name>; everything to
+    their left comprises the <package> part.  If there are only two components
+    in the plugin, the package will default to the empty string.  This keeps
+    with how pyplugs registers plugins.  For example:
+
+        a.b => "" a b
+        a.b.c => a b c
+        a.b.c.d => a.b c d
+        a.b.c.d.e => a.b.c d e
+
+        etc...
+
+    Args:
+        task_plugin: The dotted plugin string from the declarative experiment
+            description
+
+    Returns:
+        A length-3 list of pyplugs coordinates
+    """
+    coords = task_plugin.rsplit(".", 2)
+
+    if len(coords) < 2:
+        raise IllegalPluginNameError(task_plugin)
+
+    elif len(coords) == 2:
+        coords.insert(0, "")
+
+    return coords
+
+
 def input_def_get_name_type(in_def: Mapping[str, Any]) -> tuple[str, str]:
     """
     Get a parameter name and type from a task input parameter definition.
@@ -292,6 +703,17 @@ def input_def_get_name_type(in_def: Mapping[str, Any]) -> tuple[str, str]:
     return in_name, in_type
 
 
+def input_def_is_stream(in_def: Mapping[str, Any]) -> bool:
+    """
+    Determine whether a task input parameter definition declares that the
+    input is consumed as a stream.  Only long form definitions can do this.
+
+    :param in_def: A task input definition
+    :return: True if the input is a stream; False if not
+    """
+    return "name" in in_def and in_def.get("stream") is True
+
+
 def make_task_input_map(task_def: Mapping[str, Any]) -> Mapping[str, Any]:
     """
     Make a mapping from task input parameter name to parameter definition,
@@ -14,6 +14,7 @@
 #
 # ACCESS THE FULL CC BY 4.0 LICENSE HERE:
 # https://creativecommons.org/licenses/by/4.0/legalcode
+import functools
 import json
 import pathlib
 from collections.abc import Iterable, Mapping, Sequence
@@ -23,6 +24,7 @@ from dioptra.sdk.exceptions.base import BaseTaskEngineError
 from dioptra.task_engine import type_registry, type_validation, types, util
 from dioptra.task_engine.error_message import json_path_to_string
 from dioptra.task_engine.issues import IssueSeverity, IssueType, ValidationIssue
+from dioptra.task_engine.validation_context import ValidationContext
 
 _SCHEMA_FILENAME = "experiment_schema.json"
 
@@ -98,9 +100,12 @@ def _instance_path_to_description(  # noqa: C901
     return description
 
 
+@functools.lru_cache(maxsize=None)
 def _get_json_schema() -> Union[dict, bool]:  # hypothetical types of schemas
     """
     Read and parse the declarative experiment description JSON-Schema file.
+    The file is only read once per process; callers must not modify the
+    returned schema.
 
     Returns:
         The schema, as parsed JSON
@@ -116,6 +121,18 @@ def _get_json_schema() -> Union[dict, bool]:  # hypothetical types of schemas
     return schema
 
 
+@functools.lru_cache(maxsize=None)
+def _get_schema_validator() -> util.SchemaValidator:
+    """
+    Get a validator for the declarative experiment description JSON-Schema.
+    The validator is only built once per process.
+
+    Returns:
+        The validator
+    """
+    return util.SchemaValidator(_get_json_schema())
+
+
 def _schema_validate(experiment_desc: Mapping[str, Any]) -> list[ValidationIssue]:
     """
     Validate the given declarative experiment description against a JSON-Schema
@@ -130,10 +147,8 @@ def _schema_validate(experiment_desc: Mapping[str, Any]) -> list[ValidationIssue
         experiment description was valid.
     """
 
-    schema = _get_json_schema()
-
-    error_messages = util.schema_validate(
-        experiment_desc, schema, _instance_path_to_description
+    error_messages = _get_schema_validator().validate(
+        experiment_desc, _instance_path_to_description
     )
 
     issues = [
@@ -179,52 +194,43 @@ def _find_non_string_keys(mapping: Mapping, key_meaning: str) -> list[Validation
     return issues
 
 
-def _check_string_keys(experiment_desc: Mapping[str, Any]) -> list[ValidationIssue]:
+def _check_string_keys(context: ValidationContext) -> list[ValidationIssue]:
     """
     Ensure certain mappings within the experiment description use only string
     keys.  This check targets certain mappings: type names, global parameter
     names, task short names, graph step names.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
         experiment description was valid.
     """
 
-    types = experiment_desc.get("types", {})
-    parameters = experiment_desc.get("parameters", {})
-    tasks = experiment_desc["tasks"]
-    graph = experiment_desc["graph"]
     issues = []
 
-    issues += _find_non_string_keys(types, "Type names")
-    issues += _find_non_string_keys(parameters, "Global parameter names")
-    issues += _find_non_string_keys(tasks, "Task short names")
-    issues += _find_non_string_keys(graph, "Graph step names")
+    issues += _find_non_string_keys(context.types, "Type names")
+    issues += _find_non_string_keys(context.parameters, "Global parameter names")
+    issues += _find_non_string_keys(context.tasks, "Task short names")
+    issues += _find_non_string_keys(context.graph, "Graph step names")
 
     return issues
 
 
-def _check_name_collisions(experiment_desc: Mapping[str, Any]) -> list[ValidationIssue]:
+def _check_name_collisions(context: ValidationContext) -> list[ValidationIssue]:
     """
     Check whether any graph step names collide with any parameter names.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
         experiment description was valid.
     """
 
-    param_names = set(experiment_desc.get("parameters", []))
-    step_names = set(experiment_desc["graph"])
-
-    collisions = param_names & step_names
+    collisions = context.parameters.keys() & context.graph.keys()
 
     issues = []
     if collisions:
@@ -238,30 +244,27 @@ def _check_name_collisions(experiment_desc: Mapping[str, Any]) -> list[Validatio
 
 
 def _check_global_parameter_types(
-    experiment_desc: Mapping[str, Any]
+    context: ValidationContext,
 ) -> list[ValidationIssue]:
     """
     Check whether all global parameter types are valid.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
         experiment description was valid.
     """
 
-    global_parameters = experiment_desc.get("parameters", {})
-    type_defs = experiment_desc.get("types", {})
-    type_names = type_registry.BUILTIN_TYPES.keys() | type_defs.keys()
+    type_names = context.type_names
 
     issues = []
 
     # Can't really use None to mean no default, since that's a valid default!
     no_default = object()
 
-    for param_name, param_def in global_parameters.items():
+    for param_name, param_def in context.parameters.items():
         if isinstance(param_def, Mapping):
             param_type = param_def.get("type")
             param_default = param_def.get("default", no_default)
@@ -296,26 +299,24 @@ def _check_global_parameter_types(
 
 
 def _check_type_definition_type_references(
-    experiment_desc: Mapping[str, Any]
+    context: ValidationContext,
 ) -> list[ValidationIssue]:
     """
     Check for references to undefined types in all type definitions.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
         experiment description was valid.
     """
 
-    type_defs = experiment_desc.get("types", {})
-    type_names = type_registry.BUILTIN_TYPES.keys() | type_defs.keys()
+    type_names = context.type_names
 
     issues = []
 
-    for type_name, type_def in type_defs.items():
+    for type_name, type_def in context.types.items():
         for type_ref in type_registry.get_dependency_types(type_def):
             if type_ref not in type_names:
                 message = (
@@ -332,26 +333,24 @@ def _check_type_definition_type_references(
 
 
 def _check_type_reference_cycle(
-    experiment_desc: Mapping[str, Any]
+    context: ValidationContext,
 ) -> list[ValidationIssue]:
     """
     Check for a reference cycle among type definitions.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
         experiment description was valid.
     """
 
-    type_defs = experiment_desc.get("types", {})
     issues = []
     message = None
 
     try:
-        type_registry.get_sorted_types(type_defs)
+        type_registry.get_sorted_types(context.types)
 
     except BaseTaskEngineError as e:
         # If all references resolve and the description is schema-valid, the
@@ -367,15 +366,14 @@ def _check_type_reference_cycle(
 
 
 def _check_union_member_duplicates(
-    experiment_desc: Mapping[str, Any]
+    context: ValidationContext,
 ) -> list[ValidationIssue]:
     """
     Check for union type definitions for which there is duplication in the
     membership.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
@@ -383,8 +381,7 @@ def _check_union_member_duplicates(
     """
 
     issues = []
-    type_defs = experiment_desc.get("types", {})
-    type_reg = type_registry.build_type_registry(type_defs)
+    type_reg = context.type_registry
 
     for type_name, type_ in type_reg.items():
         if isinstance(type_, types.UnionType):
@@ -393,7 +390,7 @@ def _check_union_member_duplicates(
             # never be any.  We must re-create every member type from the
             # definition in order to tell whether there were any duplicates.
 
-            union_type_def = type_defs[type_name]
+            union_type_def = context.types[type_name]
             member_type_defs = union_type_def["union"]
 
             dupe_types = set()
@@ -422,27 +419,21 @@ def _check_union_member_duplicates(
 
 
 def _check_task_plugin_references(
-    experiment_desc: Mapping[str, Any]
+    context: ValidationContext,
 ) -> list[ValidationIssue]:
     """
     Check whether all task plugin short names refer to known task plugins.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
         experiment description was valid.
     """
-    task_defs = experiment_desc["tasks"]
-    graph = experiment_desc["graph"]
-
     issues = []
-    for step_name, step_def in graph.items():
-        task_plugin_short_name = util.step_get_plugin_short_name(step_def)
-
-        if task_plugin_short_name not in task_defs:
+    for step_name, task_plugin_short_name in context.step_task_names.items():
+        if task_plugin_short_name not in context.tasks:
             message = 'In step "{}": unrecognized task plugin: {}'.format(
                 step_name, task_plugin_short_name
             )
@@ -453,24 +444,21 @@ def _check_task_plugin_references(
 
 
 def _check_task_plugin_pyplugs_coords(
-    experiment_desc: Mapping[str, Any]
+    context: ValidationContext,
 ) -> list[ValidationIssue]:
     """
     Check task plugin IDs for validity.  They must at minimum include a module
     name and a function name.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
         experiment description was valid.
     """
-    task_defs = experiment_desc["tasks"]
-
     issues = []
-    for task_short_name, task_def in task_defs.items():
+    for task_short_name, task_def in context.tasks.items():
         plugin = task_def["plugin"]
         if "." not in plugin:
             message = 'In task "{}": plugin ID requires at least one ".": {}'.format(
@@ -492,24 +480,22 @@ def _check_task_plugin_pyplugs_coords(
 
 
 def _check_task_plugin_io_names(
-    experiment_desc: Mapping[str, Any]
+    context: ValidationContext,
 ) -> list[ValidationIssue]:
     """
     Check task definitions for duplicate input and output names.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
         experiment description was valid.
     """
 
-    task_defs = experiment_desc["tasks"]
     issues = []
 
-    for short_task_name, task_def in task_defs.items():
+    for short_task_name, task_def in context.tasks.items():
         inputs = task_def.get("inputs", [])
         names = set()
         repeated_names = set()
@@ -530,15 +516,10 @@ def _check_task_plugin_io_names(
 
             issues.append(issue)
 
-        outputs = task_def.get("outputs", [])
         repeated_names.clear()
         names.clear()
 
-        if not isinstance(outputs, list):
-            outputs = [outputs]
-
-        for output in outputs:
-            name = next(iter(output))
+        for name, _ in context.task_outputs[short_task_name]:
             if name in names:
                 repeated_names.add(name)
             else:
@@ -557,28 +538,25 @@ def _check_task_plugin_io_names(
 
 
 def _check_task_plugin_io_types(
-    experiment_desc: Mapping[str, Any]
+    context: ValidationContext,
 ) -> list[ValidationIssue]:
     """
     Check task definition input and output type names for validity: whether
     they name known types.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
         experiment description was valid.
     """
 
-    type_defs = experiment_desc.get("types", {})
-    task_defs = experiment_desc["tasks"]
     issues = []
 
-    type_names = type_registry.BUILTIN_TYPES.keys() | type_defs.keys()
+    type_names = context.type_names
 
-    for short_task_name, task_def in task_defs.items():
+    for short_task_name, task_def in context.tasks.items():
         inputs = task_def.get("inputs", [])
 
         for input_ in inputs:
@@ -594,13 +572,7 @@ def _check_task_plugin_io_types(
 
                 issues.append(issue)
 
-        outputs = task_def.get("outputs", [])
-
-        if not isinstance(outputs, list):
-            outputs = [outputs]
-
-        for output in outputs:
-            name, type_ = next(iter(output.items()))
+        for name, type_ in context.task_outputs[short_task_name]:
             if type_ not in type_names:
                 message = 'In task "{}": output "{}" has undefined type: {}'.format(
                     short_task_name, name, type_
@@ -616,27 +588,25 @@ def _check_task_plugin_io_types(
 
 
 def _check_graph_references(  # noqa: C901
-    experiment_desc: Mapping[str, Any]
+    context: ValidationContext,
 ) -> list[ValidationIssue]:
     """
     Scan for references within task invocations, check whether they are legal,
     and whether they refer to recognized parameters, steps, and/or step outputs.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
         experiment description was valid.
     """
-    graph = experiment_desc["graph"]
-    task_defs = experiment_desc["tasks"]
-    params = experiment_desc.get("parameters", {})
+    graph = context.graph
+    params = context.parameters
 
     issues = []
-    for step_name, step_def in graph.items():
-        for ref in util.get_references(step_def):
+    for step_name, refs in context.step_references.items():
+        for ref in refs:
             message = None
 
             dot_idx = ref.find(".")
@@ -648,19 +618,10 @@ def _check_graph_references(  # noqa: C901
                 ref_output = None
 
             if ref_name in graph:
-                referent_step = graph[ref_name]
-                task_plugin_short_name = util.step_get_plugin_short_name(referent_step)
                 # unrecognized task plugin short name is a different check.
                 # We will disregard that possibility here.
-                task_def = task_defs[task_plugin_short_name]
-                task_outputs = task_def.get("outputs", [])
-
-                if not isinstance(task_outputs, list):
-                    task_outputs = [task_outputs]
-
-                task_output_names = [
-                    next(iter(task_output)) for task_output in task_outputs
-                ]
+                task_plugin_short_name = context.step_task_names[ref_name]
+                task_outputs = context.task_outputs[task_plugin_short_name]
 
                 if ref_output is None:
                     if not task_outputs:
@@ -675,7 +636,9 @@ def _check_graph_references(  # noqa: C901
                             " one output."
                         ).format(step_name, ref)
 
-                elif ref_output not in task_output_names:
+                elif (
+                    ref_output not in context.task_output_names[task_plugin_short_name]
+                ):
                     message = (
                         'In step "{}": reference "{}": unrecognized output: {}'
                     ).format(step_name, ref, ref_output)
@@ -702,31 +665,24 @@ def _check_graph_references(  # noqa: C901
 
 
 def _check_graph_dependencies(
-    experiment_desc: Mapping[str, Any]
+    context: ValidationContext,
 ) -> list[ValidationIssue]:
     """
     Check explicitly declared dependencies for each step and ensure they refer
     to other steps.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
         experiment description was valid.
     """
-    graph = experiment_desc["graph"]
+    graph = context.graph
 
     issues = []
-    for step_name, step_def in graph.items():
-        deps = step_def.get("dependencies", [])
-        if isinstance(deps, str):
-            deps = {deps}
-        else:
-            deps = set(deps)
-
-        unrecognized_deps = deps - graph.keys()
+    for step_name, deps in context.step_explicit_dependencies.items():
+        unrecognized_deps = {dep for dep in deps if dep not in graph}
 
         if unrecognized_deps:
             message = 'In step "{}": unrecognized dependency step(s): {}'.format(
@@ -738,13 +694,12 @@ def _check_graph_dependencies(
     return issues
 
 
-def _check_graph_cycle(experiment_desc: Mapping[str, Any]) -> list[ValidationIssue]:
+def _check_graph_cycle(context: ValidationContext) -> list[ValidationIssue]:
     """
     Check for a cycle in the task graph.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
@@ -754,7 +709,7 @@ def _check_graph_cycle(experiment_desc: Mapping[str, Any]) -> list[ValidationIss
     issues = []
     message = None
     try:
-        util.get_sorted_steps(experiment_desc["graph"])
+        util.sort_step_dependencies(context.step_dependencies)
     except BaseTaskEngineError as e:
         # If all references resolve and the description is schema-valid, the
         # only exception that could be thrown is a StepReferenceCycleError.
@@ -768,25 +723,21 @@ def _check_graph_cycle(experiment_desc: Mapping[str, Any]) -> list[ValidationIss
     return issues
 
 
-def _check_names_dots(experiment_desc: Mapping[str, Any]) -> list[ValidationIssue]:
+def _check_names_dots(context: ValidationContext) -> list[ValidationIssue]:
     """
     Check whether any parameter or step names have a dot.  That needs to be
     disallowed because references to these would have the same syntax as a step
     output (<step>.<output>) and be ambiguous or misinterpreted.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
         experiment description was valid.
     """
-    parameters = experiment_desc.get("parameters", [])
-    graph = experiment_desc["graph"]
-
     issues = []
-    for param_name in parameters:
+    for param_name in context.parameters:
         # The check for string keys is separate and prerequisite for this
         # check, so we will assume keys are strings here.
         if "." in param_name:
@@ -800,7 +751,7 @@ def _check_names_dots(experiment_desc: Mapping[str, Any]) -> list[ValidationIssu
 
             issues.append(issue)
 
-    for step_name in graph:
+    for step_name in context.graph:
         if "." in step_name:
             message = (
                 'Step name "{}" contains a dot.  References to this'
@@ -815,15 +766,14 @@ def _check_names_dots(experiment_desc: Mapping[str, Any]) -> list[ValidationIssu
     return issues
 
 
-def _check_step_structure(experiment_desc: Mapping[str, Any]) -> list[ValidationIssue]:
+def _check_step_structure(context: ValidationContext) -> list[ValidationIssue]:
     """
     Ensure each graph step includes a reference to a task plugin.  This check
     is about the structure of the step, not whether the reference resolves or
     whether the invocation makes sense with respect to the task plugin.
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
@@ -833,10 +783,8 @@ def _check_step_structure(experiment_desc: Mapping[str, Any]) -> list[Validation
     # I tried writing JSON-Schema for this, but I felt it was too complicated
     # (if it had worked at all).  So I wrote some code to check instead.
 
-    graph = experiment_desc["graph"]
-
     issues = []
-    for step_name, step_def in graph.items():
+    for step_name, step_def in context.graph.items():
         message = None
         if "task" not in step_def:
             # This is a short-form positional or keyword arg invocation.
@@ -866,7 +814,7 @@ def _check_step_structure(experiment_desc: Mapping[str, Any]) -> list[Validation
         if not message:
             # as another safety check if the above checks find no issues,
             # ensure we can get a task plugin short name from the step.
-            task_short_name = util.step_get_plugin_short_name(step_def)
+            task_short_name = context.step_task_names[step_name]
             if task_short_name is None:
                 message = (
                     'In step "{}": illegal task invocation: unable to'
@@ -880,31 +828,25 @@ def _check_step_structure(experiment_desc: Mapping[str, Any]) -> list[Validation
     return issues
 
 
-def _check_task_invocation(experiment_desc: Mapping[str, Any]) -> list[ValidationIssue]:
+def _check_task_invocation(context: ValidationContext) -> list[ValidationIssue]:
     """
     Check task invocation args against declared task inputs, with regard
     to name, number, etc (but not type).
 
     Args:
-        experiment_desc: The experiment description, as parsed YAML or
-            equivalent
+        context: Shared analysis of the experiment description
 
     Returns:
         A list of ValidationIssue objects; will be an empty list if the
         experiment description was valid.
     """
 
-    tasks = experiment_desc["tasks"]
-    graph = experiment_desc["graph"]
-
     issues = []
 
-    for step_name, step_def in graph.items():
-        task_short_name = util.step_get_plugin_short_name(step_def)
-        task_def = tasks[task_short_name]
-
-        task_input_map = util.make_task_input_map(task_def)
-        invoc_pos_args, invoc_kwargs = util.step_get_invocation_arg_specs(step_def)
+    for step_name, task_short_name in context.step_task_names.items():
+        assert task_short_name is not None
+        task_input_map = context.task_input_maps[task_short_name]
+        invoc_pos_args, invoc_kwargs = context.step_arg_specs[step_name]
 
         # step_get_invocation_arg_specs() returns nulls if the step definition
         # is malformed, but we already checked that.  This code does not run
@@ -1005,7 +947,9 @@ def _any_errors(issues: Iterable[ValidationIssue]) -> bool:
 def _manually_validate(experiment_desc: Mapping[str, Any]) -> list[ValidationIssue]:
     """
     Do any extra domain-specific handwritten validation we can think of, which
-    can't be done (or awkward to do) via JSON-Schema.
+    can't be done (or awkward to do) via JSON-Schema.  All checks share one
+    analysis of the description, so structures such as references, task input
+    maps and the type registry are each built only once.
 
     Args:
         experiment_desc: The experiment description, as parsed YAML or
@@ -1016,40 +960,41 @@ def _manually_validate(experiment_desc: Mapping[str, Any]) -> list[ValidationIss
         experiment description was valid.
     """
 
+    context = ValidationContext(experiment_desc)
     issues = []
 
-    string_key_issues = _check_string_keys(experiment_desc)
+    string_key_issues = _check_string_keys(context)
     issues += string_key_issues
 
     if not string_key_issues:
         # Obviously the question of dots in names is moot if the names aren't
         # even strings!
-        issues += _check_names_dots(experiment_desc)
+        issues += _check_names_dots(context)
 
-    issues += _check_task_plugin_io_names(experiment_desc)
-    issues += _check_task_plugin_io_types(experiment_desc)
-    issues += _check_task_plugin_pyplugs_coords(experiment_desc)
+    issues += _check_task_plugin_io_names(context)
+    issues += _check_task_plugin_io_types(context)
+    issues += _check_task_plugin_pyplugs_coords(context)
 
-    step_structure_issues = _check_step_structure(experiment_desc)
+    step_structure_issues = _check_step_structure(context)
     issues += step_structure_issues
 
-    name_collision_issues = _check_name_collisions(experiment_desc)
+    name_collision_issues = _check_name_collisions(context)
     issues += name_collision_issues
 
     if not step_structure_issues:
-        task_ref_issues = _check_task_plugin_references(experiment_desc)
+        task_ref_issues = _check_task_plugin_references(context)
         issues += task_ref_issues
 
         # The below checks require correct references (via task short name)
         # to task definitions, so we can find their input requirements.
         if not task_ref_issues:
-            issues += _check_task_invocation(experiment_desc)
+            issues += _check_task_invocation(context)
 
             # If there were name collisions, we can't properly interpret
             # references.  So we will skip these checks.
             if not name_collision_issues:
-                graph_ref_issues = _check_graph_references(experiment_desc)
-                graph_ref_issues += _check_graph_dependencies(experiment_desc)
+                graph_ref_issues = _check_graph_references(context)
+                graph_ref_issues += _check_graph_dependencies(context)
                 issues += graph_ref_issues
 
                 # The graph topology is based on references.  If there were
@@ -1057,23 +1002,23 @@ def _manually_validate(experiment_desc: Mapping[str, Any]) -> list[ValidationIss
                 # able to check the graph for cycles.  So we will skip this
                 # check.
                 if not graph_ref_issues:
-                    issues += _check_graph_cycle(experiment_desc)
+                    issues += _check_graph_cycle(context)
 
-    issues += _check_global_parameter_types(experiment_desc)
-    issues += _check_type_definition_type_references(experiment_desc)
-    issues += _check_type_reference_cycle(experiment_desc)
+    issues += _check_global_parameter_types(context)
+    issues += _check_type_definition_type_references(context)
+    issues += _check_type_reference_cycle(context)
 
     # We must have basic things like correct types, tasks, steps, global
     # parameters, and resolvable references therein, before type validation can
     # be expected to succeed.  So maybe make type validation depend on
     # everything above?
     if not _any_errors(issues):
-        issues += type_validation.check_types(experiment_desc)
+        issues += type_validation.check_types(experiment_desc, context)
 
-        # This check re-creates the type registry, which can error out if
-        # there were type issues detected above (e.g. a type reference cycle).
-        # So let's skip the check if there were other errors.
-        issues += _check_union_member_duplicates(experiment_desc)
+        # This check uses the type registry, which can't be built if there
+        # were type issues detected above (e.g. a type reference cycle).  So
+        # let's skip the check if there were other errors.
+        issues += _check_union_member_duplicates(context)
 
     return issues
 
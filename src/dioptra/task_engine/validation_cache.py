@@ -0,0 +1,228 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import collections
+import functools
+import hashlib
+import json
+import logging
+import pathlib
+import threading
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Optional
+
+from redis.exceptions import RedisError
+
+from dioptra.task_engine import (
+    type_registry,
+    type_validation,
+    types,
+    util,
+    validation,
+    validation_context,
+)
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+DEFAULT_MAX_CACHE_ENTRIES = 1024
+DEFAULT_REDIS_TTL = 7 * 24 * 3600
+
+_REDIS_KEY_PREFIX = "dioptra:task-engine:validation:"
+
+# Modules whose code determines whether a description is valid.  Results are
+# only shared between processes running the same code.
+_VALIDATION_MODULES = (
+    type_registry,
+    type_validation,
+    types,
+    util,
+    validation,
+    validation_context,
+)
+
+
+def _get_logger() -> logging.Logger:
+    """
+    Get a logger to use for functions in this module.
+
+    Returns:
+        The logger
+    """
+    return logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_validator_fingerprint() -> str:
+    """
+    Compute a hash of the experiment description schema and the source code
+    of the validation modules.
+
+    Returns:
+        A hash as a hex string
+    """
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps(validation._get_json_schema(), sort_keys=True).encode())
+
+    for module in _VALIDATION_MODULES:
+        assert module.__file__
+        hasher.update(pathlib.Path(module.__file__).read_bytes())
+
+    return hasher.hexdigest()
+
+
+def compute_description_digest(experiment_desc: Mapping[str, Any]) -> str:
+    """
+    Compute a digest which identifies an experiment description together with
+    the validation code which judges it.  Two equal descriptions have the same
+    digest, as long as they are checked by the same version of the task
+    engine.
+
+    Args:
+        experiment_desc: The experiment description, as parsed YAML or
+            equivalent
+
+    Returns:
+        A digest as a hex string
+    """
+    hasher = hashlib.sha256(_get_validator_fingerprint().encode("ascii"))
+    hasher.update(util.canonical_repr(experiment_desc).encode("utf-8"))
+
+    return hasher.hexdigest()
+
+
+class ValidationCache:
+    """
+    A cache of experiment description validation results, keyed by
+    description digest.  Results are kept in memory, bounded to a number of
+    entries with least recently used entries evicted first.  If a Redis
+    connection is given when looking up a description, results are also
+    shared through Redis with other processes, e.g. between the REST API and
+    workers.
+
+    Instances may be shared between threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_CACHE_ENTRIES,
+        redis_ttl: int = DEFAULT_REDIS_TTL,
+    ) -> None:
+        """
+        Initialize this cache.
+
+        Args:
+            max_entries: Bound on the number of results kept in memory
+            redis_ttl: How long results stored in Redis are kept, in seconds
+        """
+        self.max_entries = max_entries
+        self.redis_ttl = redis_ttl
+
+        self.__results: collections.OrderedDict[str, bool] = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get_valid_digest(
+        self, experiment_desc: Mapping[str, Any], redis: Optional["Redis"] = None
+    ) -> Optional[str]:
+        """
+        Validate the given experiment description, unless a result for it is
+        already cached.
+
+        Args:
+            experiment_desc: The experiment description, as parsed YAML or
+                equivalent
+            redis: A Redis connection to share results through, or None to
+                only use the in-memory cache
+
+        Returns:
+            The description digest if the description is valid, which a job
+            may carry to show it has been validated; None if it is invalid
+        """
+        digest = compute_description_digest(experiment_desc)
+
+        result = self._get(digest, redis)
+        if result is None:
+            result = validation.is_valid(experiment_desc)
+            self._put(digest, result, redis)
+
+        return digest if result else None
+
+    def _get(self, digest: str, redis: Optional["Redis"]) -> Optional[bool]:
+        """
+        Look up a validation result.
+
+        Args:
+            digest: A description digest
+            redis: A Redis connection to look in if the result isn't in
+                memory, or None
+
+        Returns:
+            The validation result, or None if it wasn't cached
+        """
+        with self.__lock:
+            result = self.__results.get(digest)
+            if result is not None:
+                self.__results.move_to_end(digest)
+
+        if result is None and redis is not None:
+            try:
+                value = redis.get(_REDIS_KEY_PREFIX + digest)
+            except RedisError as e:
+                _get_logger().warning("Unable to read validation cache: %s", e)
+                value = None
+
+            if value is not None:
+                result = value in (b"1", "1")
+                self._put(digest, result, None)
+
+        return result
+
+    def _put(self, digest: str, result: bool, redis: Optional["Redis"]) -> None:
+        """
+        Store a validation result.
+
+        Args:
+            digest: A description digest
+            result: Whether the description is valid
+            redis: A Redis connection to also store the result in, or None
+        """
+        with self.__lock:
+            self.__results[digest] = result
+            self.__results.move_to_end(digest)
+
+            while len(self.__results) > self.max_entries:
+                self.__results.popitem(last=False)
+
+        if redis is not None:
+            try:
+                redis.set(
+                    _REDIS_KEY_PREFIX + digest,
+                    b"1" if result else b"0",
+                    ex=self.redis_ttl,
+                )
+            except RedisError as e:
+                _get_logger().warning("Unable to write validation cache: %s", e)
+
+
+@functools.lru_cache(maxsize=None)
+def get_validation_cache() -> ValidationCache:
+    """
+    Get the process-wide validation cache.
+
+    Returns:
+        The cache
+    """
+    return ValidationCache()
@@ -0,0 +1,188 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+"""
+Shared analysis of a declarative experiment description, used by validation
+checks.
+"""
+
+import functools
+from collections.abc import Mapping, Sequence
+from typing import Any, Optional
+
+from dioptra.task_engine import type_registry, types, util
+
+
+class ValidationContext:
+    """
+    Structures derived from an experiment description which validation checks
+    have in common: name tables, references, invocation arguments, step
+    dependencies and the type registry.  Each is computed the first time a
+    check needs it and then reused, so validation walks the description a
+    bounded number of times regardless of how many checks there are.
+
+    A context assumes the description is schema-valid.  Some structures also
+    assume that the checks which guard their use have passed; e.g. the type
+    registry can only be built if type definitions have no reference errors.
+    """
+
+    def __init__(self, experiment_desc: Mapping[str, Any]) -> None:
+        """
+        Initialize this context.
+
+        Args:
+            experiment_desc: The experiment description, as parsed YAML or
+                equivalent
+        """
+        self.experiment_desc = experiment_desc
+        self.types: Mapping[str, Any] = experiment_desc.get("types", {})
+        self.parameters: Mapping[str, Any] = experiment_desc.get("parameters", {})
+        self.tasks: Mapping[str, Any] = experiment_desc["tasks"]
+        self.graph: Mapping[str, Any] = experiment_desc["graph"]
+
+    @functools.cached_property
+    def type_names(self) -> set[str]:
+        """
+        The names of all known types: builtin and defined.
+        """
+        return type_registry.BUILTIN_TYPES.keys() | self.types.keys()
+
+    @functools.cached_property
+    def type_registry(self) -> Mapping[str, types.Type]:
+        """
+        A (shared, read-only) type registry built from the type definitions.
+        """
+        return type_registry.get_type_registry(self.types)
+
+    @functools.cached_property
+    def task_input_maps(self) -> Mapping[str, Mapping[str, Any]]:
+        """
+        A mapping from task short name to a map from input name to input
+        definition, as produced by util.make_task_input_map().
+        """
+        return {
+            task_name: util.make_task_input_map(task_def)
+            for task_name, task_def in self.tasks.items()
+        }
+
+    @functools.cached_property
+    def task_outputs(self) -> Mapping[str, Sequence[tuple[str, Any]]]:
+        """
+        A mapping from task short name to a list of (output name, output type
+        name) pairs, in definition order.
+        """
+        task_outputs = {}
+
+        for task_name, task_def in self.tasks.items():
+            output_defs = task_def.get("outputs", [])
+
+            if not isinstance(output_defs, list):
+                output_defs = [output_defs]
+
+            task_outputs[task_name] = [
+                next(iter(output_def.items())) for output_def in output_defs
+            ]
+
+        return task_outputs
+
+    @functools.cached_property
+    def task_output_names(self) -> Mapping[str, set[str]]:
+        """
+        A mapping from task short name to the set of its output names.
+        """
+        return {
+            task_name: {output_name for output_name, _ in outputs}
+            for task_name, outputs in self.task_outputs.items()
+        }
+
+    @functools.cached_property
+    def step_task_names(self) -> Mapping[str, Optional[str]]:
+        """
+        A mapping from step name to the short name of the task plugin the step
+        invokes, or None if one could not be determined.
+        """
+        return {
+            step_name: util.step_get_plugin_short_name(step_def)
+            for step_name, step_def in self.graph.items()
+        }
+
+    @functools.cached_property
+    def step_references(self) -> Mapping[str, Sequence[str]]:
+        """
+        A mapping from step name to the references made by the step, as
+        strings without the leading "$", in order of appearance.
+        """
+        return {
+            step_name: list(util.get_references(step_def))
+            for step_name, step_def in self.graph.items()
+        }
+
+    @functools.cached_property
+    def step_explicit_dependencies(self) -> Mapping[str, Sequence[str]]:
+        """
+        A mapping from step name to the names of steps it explicitly declares
+        as dependencies.
+        """
+        step_deps = {}
+
+        for step_name, step_def in self.graph.items():
+            deps = step_def.get("dependencies", [])
+            if isinstance(deps, str):
+                deps = [deps]
+
+            step_deps[step_name] = deps
+
+        return step_deps
+
+    @functools.cached_property
+    def step_dependencies(self) -> Mapping[str, Sequence[str]]:
+        """
+        A mapping from step name to a duplicate-free list of names of steps
+        it directly depends on, via references or explicit dependencies.
+        Names which aren't steps are ignored.
+        """
+        step_deps = {}
+
+        for step_name, refs in self.step_references.items():
+            # Use a dict as an insertion-ordered set
+            deps: dict[str, None] = {}
+
+            for ref in refs:
+                ref_name = ref.partition(".")[0]
+                if ref_name in self.graph:
+                    deps[ref_name] = None
+
+            for dep_step_name in self.step_explicit_dependencies[step_name]:
+                if dep_step_name in self.graph:
+                    deps[dep_step_name] = None
+
+            step_deps[step_name] = list(deps)
+
+        return step_deps
+
+    @functools.cached_property
+    def step_arg_specs(
+        self,
+    ) -> Mapping[str, tuple[Optional[Sequence[Any]], Optional[Mapping[str, Any]]]]:
+        """
+        A mapping from step name to the positional and keyword argument specs
+        of its task invocation, as produced by
+        util.step_get_invocation_arg_specs().
+        """
+        return {
+            step_name: util.step_get_invocation_arg_specs(step_def)
+            for step_name, step_def in self.graph.items()
+        }
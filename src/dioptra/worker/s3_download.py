@@ -14,14 +14,41 @@
 #
 # ACCESS THE FULL CC BY 4.0 LICENSE HERE:
 # https://creativecommons.org/licenses/by/4.0/legalcode
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+from collections.abc import Iterable
 from pathlib import Path
-from typing import Any, Union
+from typing import Any, Callable, Iterator, Optional, Union
 
 import structlog
+from boto3.s3.transfer import TransferConfig
 from botocore.client import BaseClient
 
 from dioptra.sdk.utilities.paths import clear_directory
-from dioptra.sdk.utilities.s3 import download_files, s3_uri_to_bucket_prefix
+from dioptra.sdk.utilities.s3 import (
+    DownloadReport,
+    download_files,
+    download_objects,
+    get_s3_objects,
+    s3_uri_to_bucket_prefix,
+)
+
+# Name of the file in which s3_sync() and s3_snapshot() record what they
+# downloaded, in the destination directory
+SYNC_MANIFEST_FILENAME = ".s3_sync_manifest.json"
+
+# Default bound on the number of snapshots s3_snapshot() keeps
+DEFAULT_MAX_SNAPSHOTS = 10
+
+# Prefix of the names of the lease files s3_snapshot() locks to keep
+# snapshots in use from being pruned.  Hidden, like snapshots being built.
+_LEASE_FILE_PREFIX = ".lease-"
 
 
 def _get_logger() -> Any:
@@ -57,12 +84,39 @@ def _normalize_s3_prefix(prefix: str) -> str:
     return prefix
 
 
+def _get_bucket_info(s3_uris: tuple[str, ...]) -> list[tuple[str, str]]:
+    """
+    Split S3 URIs into buckets and normalized key prefixes.
+
+    Args:
+        s3_uris: S3 URIs
+
+    Returns:
+        A list of (bucket, prefix) 2-tuples
+    """
+    bucket_info = []
+    for s3_uri in s3_uris:
+        bucket, prefix = s3_uri_to_bucket_prefix(s3_uri)
+
+        if not bucket:
+            raise ValueError("S3 URIs must include a bucket: " + s3_uri)
+
+        prefix = _normalize_s3_prefix(prefix)
+
+        bucket_info.append((bucket, prefix))
+
+    return bucket_info
+
+
 def s3_download(
     s3: BaseClient,
     dest_dir: Union[str, Path],
     clear_dest: bool = False,
     preserve_key_paths: bool = False,
     *s3_uris: str,
+    max_workers: Optional[int] = None,
+    transfer_config: Optional[TransferConfig] = None,
+    retries: int = 0,
 ):
     """
     Download files from S3 buckets to the local filesystem.  This function is
@@ -84,19 +138,16 @@ def s3_download(
             flattened to list of filenames.  No subdirectories are created in
             this case.
         s3_uris: S3 URIs to download from.
+        max_workers: The maximum number of concurrent downloads.  If None or
+            1, files are downloaded one at a time.
+        transfer_config: A boto3 transfer configuration shared by all of the
+            downloads, or None to use the default
+        retries: The number of times to retry each download after a
+            transient error
     """
     log = _get_logger()
 
-    bucket_info = []
-    for s3_uri in s3_uris:
-        bucket, prefix = s3_uri_to_bucket_prefix(s3_uri)
-
-        if not bucket:
-            raise ValueError("S3 URIs must include a bucket: " + s3_uri)
-
-        prefix = _normalize_s3_prefix(prefix)
-
-        bucket_info.append((bucket, prefix))
+    bucket_info = _get_bucket_info(s3_uris)
 
     # Make sure the destination dir exists!
     dest_dir_path = Path(dest_dir)
@@ -108,4 +159,611 @@ def s3_download(
 
     for s3_uri, (bucket, prefix) in zip(s3_uris, bucket_info):
         log.info("Downloading: %s", s3_uri)
-        download_files(s3, dest_dir_path, bucket, prefix, preserve_key_paths)
+        download_files(
+            s3,
+            dest_dir_path,
+            bucket,
+            prefix,
+            preserve_key_paths,
+            max_workers=max_workers,
+            transfer_config=transfer_config,
+            retries=retries,
+        )
+
+
+def _read_sync_manifest(dest_dir: Path) -> dict[str, dict[str, Any]]:
+    """
+    Read the manifest of the last sync to a directory.
+
+    Args:
+        dest_dir: The directory
+
+    Returns:
+        A mapping from path relative to dest_dir to information about the S3
+        object downloaded to it, or an empty mapping if there is no usable
+        manifest
+    """
+    log = _get_logger()
+    manifest_path = dest_dir / SYNC_MANIFEST_FILENAME
+
+    try:
+        with manifest_path.open("r", encoding="utf-8") as fp:
+            manifest = json.load(fp)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        log.warning("Ignoring unreadable sync manifest", path=str(manifest_path), e=e)
+        return {}
+
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _reuse_unchanged_file(
+    old_path: Path,
+    new_path: Path,
+    obj_entry: dict[str, Any],
+    old_entry: Optional[dict[str, Any]],
+) -> bool:
+    """
+    Link or copy a file from the last sync into the new directory tree, if
+    the S3 object it was downloaded from is unchanged (same bucket, key, ETag
+    and size) and the local file has not been modified since (same size and
+    mtime).
+
+    Args:
+        old_path: The path the object was downloaded to by the last sync
+        new_path: The path the object is to be downloaded to by this sync
+        obj_entry: Information about the S3 object, from its listing
+        old_entry: The last sync's manifest entry for old_path, or None
+
+    Returns:
+        True if the file was reused; False if it must be downloaded
+    """
+    if (
+        old_entry is None
+        or obj_entry["etag"] is None
+        or any(
+            old_entry.get(field) != obj_entry[field]
+            for field in ("bucket", "key", "etag", "size")
+        )
+    ):
+        return False
+
+    try:
+        old_stat = old_path.stat()
+    except OSError:
+        return False
+
+    if old_stat.st_size != old_entry["size"] or old_stat.st_mtime_ns != old_entry.get(
+        "mtime_ns"
+    ):
+        return False
+
+    new_path.unlink(missing_ok=True)
+
+    # Hard links are free and keep the mtime, so the manifest entry stays
+    # valid.  copy2() keeps the mtime too, for filesystems without links.
+    # If the old file is gone, e.g. deleted by another process since it was
+    # checked, it is simply downloaded again.
+    try:
+        os.link(old_path, new_path)
+    except OSError:
+        try:
+            shutil.copy2(old_path, new_path)
+        except OSError:
+            new_path.unlink(missing_ok=True)
+            return False
+
+    return True
+
+
+def _swap_directories(new_dir: Path, dest_dir: Path) -> None:
+    """
+    Replace a directory with another on the same filesystem, by renaming.
+    Readers see either the old or the new directory contents, never a mix.
+    If dest_dir can't be renamed, e.g. because it is a mount point, its
+    contents are replaced in place instead.
+
+    Args:
+        new_dir: The directory with the new contents; it is consumed
+        dest_dir: The directory to replace
+    """
+    log = _get_logger()
+    old_dir = new_dir.with_name(new_dir.name + ".old")
+
+    try:
+        os.rename(dest_dir, old_dir)
+    except OSError as e:
+        log.warning("Unable to swap directory, updating in place", e=e)
+        clear_directory(dest_dir)
+        for entry in new_dir.iterdir():
+            shutil.move(str(entry), str(dest_dir / entry.name))
+        return
+
+    try:
+        os.rename(new_dir, dest_dir)
+    except OSError:
+        os.rename(old_dir, dest_dir)
+        raise
+
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def _iter_objects(
+    s3: BaseClient,
+    s3_uris: tuple[str, ...],
+    bucket_info: list[tuple[str, str]],
+    preserve_key_paths: bool,
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    """
+    List the objects under S3 URIs, and map them to local paths.
+
+    Args:
+        s3: A boto3 S3 client object
+        s3_uris: S3 URIs to list
+        bucket_info: The buckets and normalized key prefixes of s3_uris, as
+            obtained from _get_bucket_info()
+        preserve_key_paths: Whether local paths mirror the directory
+            structure represented by the keys, or flatten it
+
+    Yields:
+        (local relative path, object information) 2-tuples, in listing
+        order.  Object information mappings are manifest entries, without
+        the local file mtime.
+    """
+    log = _get_logger()
+
+    for s3_uri, (bucket, prefix) in zip(s3_uris, bucket_info):
+        log.info("Listing: %s", s3_uri)
+
+        for obj_info in get_s3_objects(s3, bucket, prefix):
+            key = obj_info["Key"]
+            rel_path = key if preserve_key_paths else Path(key).name
+
+            yield rel_path, {
+                "bucket": bucket,
+                "key": key,
+                "etag": obj_info.get("ETag"),
+                "size": obj_info.get("Size"),
+            }
+
+
+def _build_tree(
+    s3: BaseClient,
+    objects: Iterable[tuple[str, dict[str, Any]]],
+    tree_dir: Path,
+    reference_dir: Optional[Path],
+    max_workers: Optional[int],
+    transfer_config: Optional[TransferConfig],
+    retries: int,
+) -> tuple[dict[str, dict[str, Any]], DownloadReport]:
+    """
+    Fill a directory with S3 objects, reusing unchanged files from a
+    reference directory built the same way, and write its manifest.
+
+    Args:
+        s3: A boto3 S3 client object
+        objects: The objects to put in the directory, as produced by
+            _iter_objects()
+        tree_dir: The directory to fill
+        reference_dir: A directory with a manifest whose files may be reused,
+            or None
+        max_workers: The maximum number of concurrent downloads
+        transfer_config: A boto3 transfer configuration, or None
+        retries: The number of times to retry each download after a
+            transient error
+
+    Returns:
+        A (manifest, download report) 2-tuple
+    """
+    reference_manifest = (
+        _read_sync_manifest(reference_dir) if reference_dir is not None else {}
+    )
+    manifest = {}
+
+    def _get_downloads() -> Iterator[tuple[str, str, Path]]:
+        for rel_path, obj_entry in objects:
+            manifest[rel_path] = obj_entry
+
+            new_path = tree_dir / rel_path
+            new_path.parent.mkdir(parents=True, exist_ok=True)
+
+            if reference_dir is None or not _reuse_unchanged_file(
+                reference_dir / rel_path,
+                new_path,
+                obj_entry,
+                reference_manifest.get(rel_path),
+            ):
+                yield obj_entry["bucket"], obj_entry["key"], new_path
+
+    report = download_objects(
+        s3, _get_downloads(), max_workers, transfer_config, retries
+    )
+
+    for rel_path, obj_entry in manifest.items():
+        obj_entry["mtime_ns"] = (tree_dir / rel_path).stat().st_mtime_ns
+
+    with (tree_dir / SYNC_MANIFEST_FILENAME).open("w", encoding="utf-8") as fp:
+        json.dump(manifest, fp)
+
+    return manifest, report
+
+
+def s3_sync(
+    s3: BaseClient,
+    dest_dir: Union[str, Path],
+    preserve_key_paths: bool = False,
+    *s3_uris: str,
+    max_workers: Optional[int] = None,
+    transfer_config: Optional[TransferConfig] = None,
+    retries: int = 0,
+):
+    """
+    Make a local directory mirror the files in S3 buckets, downloading only
+    what changed since the last sync.  This is an incremental alternative to
+    s3_download() with clear_dest=True.
+
+    Each sync records the ETag and size of each downloaded object and the
+    size and mtime of the local file, in a manifest file in dest_dir.  Files
+    whose objects and local copies are unchanged are reused; others are
+    downloaded.  The new directory contents are assembled in a sibling
+    directory and then swapped in, so that files of deleted objects are
+    removed and readers never see a partially updated directory.
+
+    Args:
+        s3: A boto3 S3 client object
+        dest_dir: The directory to sync to; will be created if necessary.
+            Anything in it which didn't come from the given S3 URIs is
+            removed.
+        preserve_key_paths: If True, mirror the directory structure
+            represented by the keys; if False, flatten it.  See s3_download().
+        s3_uris: S3 URIs to download from.
+        max_workers: The maximum number of concurrent downloads.  If None or
+            1, files are downloaded one at a time.
+        transfer_config: A boto3 transfer configuration shared by all of the
+            downloads, or None to use the default
+        retries: The number of times to retry each download after a
+            transient error
+    """
+    log = _get_logger()
+
+    bucket_info = _get_bucket_info(s3_uris)
+
+    dest_dir_path = Path(dest_dir)
+    dest_dir_path.mkdir(parents=True, exist_ok=True)
+
+    staging_dir = Path(
+        tempfile.mkdtemp(
+            dir=dest_dir_path.parent, prefix="." + dest_dir_path.name + ".sync-"
+        )
+    )
+
+    try:
+        # mkdtemp() makes the directory private; keep dest_dir's permissions.
+        staging_dir.chmod(stat.S_IMODE(dest_dir_path.stat().st_mode))
+
+        manifest, report = _build_tree(
+            s3,
+            _iter_objects(s3, s3_uris, bucket_info, preserve_key_paths),
+            staging_dir,
+            dest_dir_path,
+            max_workers,
+            transfer_config,
+            retries,
+        )
+
+        _swap_directories(staging_dir, dest_dir_path)
+
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    log.info(
+        "Synced directory: %s",
+        dest_dir,
+        downloaded=report.num_files,
+        reused=len(manifest) - report.num_files,
+    )
+
+
+def _get_snapshot_digest(
+    objects: list[tuple[str, dict[str, Any]]], preserve_key_paths: bool
+) -> str:
+    """
+    Compute a digest which identifies the contents of a snapshot, from the
+    ETags and sizes of the objects in it and where they are put.
+
+    Args:
+        objects: The objects in the snapshot, as produced by _iter_objects()
+        preserve_key_paths: Whether key paths are preserved in the snapshot
+
+    Returns:
+        A digest as a hex string
+    """
+    digest_material = [
+        preserve_key_paths,
+        [
+            [
+                rel_path,
+                obj_entry["bucket"],
+                obj_entry["key"],
+                obj_entry["etag"],
+                obj_entry["size"],
+            ]
+            for rel_path, obj_entry in objects
+        ],
+    ]
+
+    return hashlib.sha256(json.dumps(digest_material).encode("utf-8")).hexdigest()
+
+
+def _get_snapshots(snapshot_root: Path) -> list[Path]:
+    """
+    Find the published snapshots in a snapshot directory.
+
+    Args:
+        snapshot_root: The directory snapshots are stored in
+
+    Returns:
+        Snapshot directories, most recently used first
+    """
+    snapshots = []
+
+    for entry in snapshot_root.iterdir():
+        # Snapshots being built or deleted are hidden
+        if entry.name.startswith("."):
+            continue
+
+        try:
+            snapshots.append((entry.stat().st_mtime_ns, entry))
+        except FileNotFoundError:
+            continue
+
+    snapshots.sort(reverse=True)
+
+    return [entry for _, entry in snapshots]
+
+
+def _lock_lease(snapshot_root: Path, digest: str, operation: int) -> Optional[int]:
+    """
+    Open and lock the lease file of a snapshot.  Jobs hold a shared lock on
+    the lease of each snapshot they use, and pruning takes an exclusive lock,
+    so snapshots in use are never pruned.  Locks are released when their
+    file descriptor is closed, including when the process exits.
+
+    Args:
+        snapshot_root: The directory snapshots are stored in
+        digest: The digest naming the snapshot
+        operation: The flock() operation, e.g. fcntl.LOCK_SH
+
+    Returns:
+        The file descriptor of the locked lease file, or None if the
+        operation was non-blocking and the lock is held elsewhere
+    """
+    lease_path = snapshot_root / (_LEASE_FILE_PREFIX + digest)
+
+    while True:
+        fd = os.open(lease_path, os.O_RDWR | os.O_CREAT, 0o666)
+
+        try:
+            fcntl.flock(fd, operation)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+
+        # Lease files are deleted along with their snapshots; if this one
+        # was deleted while waiting for the lock, lock its replacement.
+        try:
+            if os.stat(lease_path).st_ino == os.fstat(fd).st_ino:
+                return fd
+        except FileNotFoundError:
+            pass
+
+        os.close(fd)
+
+
+def _prune_snapshots(snapshot_root: Path, max_snapshots: int) -> None:
+    """
+    Delete least recently used snapshots, beyond a bound on their number.
+    Snapshots leased by a job are skipped.  Each is renamed to hide it before
+    it is deleted, so that a partially deleted snapshot is never used.
+
+    Args:
+        snapshot_root: The directory snapshots are stored in
+        max_snapshots: The number of snapshots to keep
+    """
+    log = _get_logger()
+
+    for snapshot_dir in _get_snapshots(snapshot_root)[max_snapshots:]:
+        lease_fd = _lock_lease(
+            snapshot_root, snapshot_dir.name, fcntl.LOCK_EX | fcntl.LOCK_NB
+        )
+
+        if lease_fd is None:
+            # In use
+            continue
+
+        hidden_dir = snapshot_root / (".deleting-" + snapshot_dir.name)
+
+        try:
+            try:
+                os.rename(snapshot_dir, hidden_dir)
+            except OSError:
+                # Another worker got there first
+                continue
+
+            (snapshot_root / (_LEASE_FILE_PREFIX + snapshot_dir.name)).unlink(
+                missing_ok=True
+            )
+
+        finally:
+            os.close(lease_fd)
+
+        log.info("Deleting plugin snapshot: %s", snapshot_dir.name)
+        shutil.rmtree(hidden_dir, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def s3_snapshot(
+    s3: BaseClient,
+    snapshot_root: Union[str, Path],
+    preserve_key_paths: bool = False,
+    *s3_uris: str,
+    max_workers: Optional[int] = None,
+    transfer_config: Optional[TransferConfig] = None,
+    retries: int = 0,
+    finalize: Optional[Callable[[Path], Any]] = None,
+    max_snapshots: int = DEFAULT_MAX_SNAPSHOTS,
+) -> Iterator[Path]:
+    """
+    Get an immutable local snapshot of the files in S3 buckets, for the
+    duration of the context.  Snapshots are content-addressed: they are stored
+    in subdirectories of snapshot_root named after a digest of the listed
+    objects' ETags and sizes, so that jobs which need the same files share one
+    copy, and a job whose snapshot already exists needs only to list the keys.
+    Any number of processes on a host may share snapshot_root.
+
+    A new snapshot is built in a hidden directory, reusing unchanged files of
+    the most recently used snapshot by hard link where possible, and then
+    published by renaming it.  If another process publishes the same
+    snapshot first, that one is used.  Snapshots must not be modified once
+    published.  The least recently used snapshots are deleted once there are
+    more than max_snapshots, except for those leased: the snapshot is leased
+    for the duration of the context, so it may be read from, e.g. to import
+    modules lazily, until the context exits.
+
+    Args:
+        s3: A boto3 S3 client object
+        snapshot_root: The directory to store snapshots in; will be created
+            if necessary
+        preserve_key_paths: If True, mirror the directory structure
+            represented by the keys; if False, flatten it.  See s3_download().
+        s3_uris: S3 URIs to download from.
+        max_workers: The maximum number of concurrent downloads.  If None or
+            1, files are downloaded one at a time.
+        transfer_config: A boto3 transfer configuration shared by all of the
+            downloads, or None to use the default
+        retries: The number of times to retry each download after a
+            transient error
+        finalize: A function called with a new snapshot's directory, before
+            it is published, e.g. to write derived files into it
+        max_snapshots: The number of snapshots to keep
+
+    Yields:
+        The snapshot directory
+    """
+    log = _get_logger()
+
+    bucket_info = _get_bucket_info(s3_uris)
+
+    snapshot_root_path = Path(snapshot_root)
+    snapshot_root_path.mkdir(parents=True, exist_ok=True)
+
+    objects = list(_iter_objects(s3, s3_uris, bucket_info, preserve_key_paths))
+    digest = _get_snapshot_digest(objects, preserve_key_paths)
+    snapshot_dir = snapshot_root_path / digest
+
+    lease_fd = _lock_lease(snapshot_root_path, digest, fcntl.LOCK_SH)
+
+    try:
+        if snapshot_dir.is_dir():
+            log.info("Using snapshot: %s", digest)
+
+            # Mark the snapshot as recently used
+            os.utime(snapshot_dir)
+
+        else:
+            _build_snapshot(
+                s3,
+                snapshot_root_path,
+                snapshot_dir,
+                objects,
+                max_workers,
+                transfer_config,
+                retries,
+                finalize,
+            )
+            _prune_snapshots(snapshot_root_path, max_snapshots)
+
+        yield snapshot_dir
+
+    finally:
+        os.close(lease_fd)
+
+
+def _build_snapshot(
+    s3: BaseClient,
+    snapshot_root: Path,
+    snapshot_dir: Path,
+    objects: list[tuple[str, dict[str, Any]]],
+    max_workers: Optional[int],
+    transfer_config: Optional[TransferConfig],
+    retries: int,
+    finalize: Optional[Callable[[Path], Any]],
+) -> None:
+    """
+    Build and publish a snapshot.  See s3_snapshot().
+
+    Args:
+        s3: A boto3 S3 client object
+        snapshot_root: The directory snapshots are stored in
+        snapshot_dir: The directory to publish the snapshot as
+        objects: The objects in the snapshot, as produced by _iter_objects()
+        max_workers: The maximum number of concurrent downloads
+        transfer_config: A boto3 transfer configuration, or None
+        retries: The number of times to retry each download
+        finalize: A function called with the new snapshot's directory before
+            it is published, or None
+    """
+    log = _get_logger()
+
+    # The snapshot which files are reused from is leased while building, so
+    # that it isn't pruned meanwhile.
+    reference_dir = None
+    reference_fd = None
+    for candidate_dir in _get_snapshots(snapshot_root)[:1]:
+        reference_fd = _lock_lease(snapshot_root, candidate_dir.name, fcntl.LOCK_SH)
+
+        # It may have been pruned before it was leased
+        if candidate_dir.is_dir():
+            reference_dir = candidate_dir
+
+    staging_dir = Path(tempfile.mkdtemp(dir=snapshot_root, prefix=".building-"))
+
+    try:
+        # mkdtemp() makes the directory private; keep snapshot_root's
+        # permissions.
+        staging_dir.chmod(stat.S_IMODE(snapshot_root.stat().st_mode))
+
+        manifest, report = _build_tree(
+            s3,
+            objects,
+            staging_dir,
+            reference_dir,
+            max_workers,
+            transfer_config,
+            retries,
+        )
+
+        if finalize is not None:
+            finalize(staging_dir)
+
+        try:
+            os.rename(staging_dir, snapshot_dir)
+        except OSError:
+            if not snapshot_dir.is_dir():
+                raise
+
+            log.info("Snapshot was published concurrently: %s", snapshot_dir.name)
+
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+        if reference_fd is not None:
+            os.close(reference_fd)
+
+    log.info(
+        "Created snapshot: %s",
+        snapshot_dir.name,
+        downloaded=report.num_files,
+        reused=len(manifest) - report.num_files,
+    )
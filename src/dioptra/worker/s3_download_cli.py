@@ -25,7 +25,7 @@ from dioptra.sdk.utilities.logging import (
     attach_stdout_stream_handler,
     configure_structlog,
 )
-from dioptra.worker.s3_download import s3_download
+from dioptra.worker.s3_download import s3_download, s3_sync
 
 
 def parse_args() -> argparse.Namespace:
@@ -62,6 +62,16 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
     )
 
+    parser.add_argument(
+        "-s",
+        "--sync",
+        help="""
+        Make the destination directory mirror the S3 URI(s), downloading only
+        files which changed since the last sync to it.  Implies --clear.
+        """,
+        action="store_true",
+    )
+
     parser.add_argument(
         "-p",
         "--preserve-paths",
@@ -75,6 +85,28 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
     )
 
+    parser.add_argument(
+        "-j",
+        "--max-workers",
+        help="""
+        Download up to this many files concurrently.  Default: files are
+        downloaded one at a time.
+        """,
+        type=int,
+        default=None,
+    )
+
+    parser.add_argument(
+        "-r",
+        "--retries",
+        help="""
+        Retry each download up to this many times after a transient error,
+        e.g. a dropped connection.  Default: %(default)s
+        """,
+        type=int,
+        default=2,
+    )
+
     parser.add_argument(
         "-l",
         "--log-level",
@@ -129,7 +161,25 @@ def main() -> None:
 
     s3 = boto3.client("s3", endpoint_url=args.endpoint_url)
 
-    s3_download(s3, args.dest_dir, args.clear, args.preserve_paths, *args.s3_uri)
+    if args.sync:
+        s3_sync(
+            s3,
+            args.dest_dir,
+            args.preserve_paths,
+            *args.s3_uri,
+            max_workers=args.max_workers,
+            retries=args.retries,
+        )
+    else:
+        s3_download(
+            s3,
+            args.dest_dir,
+            args.clear,
+            args.preserve_paths,
+            *args.s3_uri,
+            max_workers=args.max_workers,
+            retries=args.retries,
+        )
 
 
 if __name__ == "__main__":
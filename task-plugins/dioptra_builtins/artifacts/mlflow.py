@@ -20,6 +20,7 @@ This module contains a set of task plugins for managing artifacts generated duri
 entry point run.
 """
 
+import asyncio
 import tarfile
 from pathlib import Path
 from typing import Any, Callable, Dict, Optional, Union
@@ -111,6 +112,69 @@ def upload_data_frame_artifact(
         - :py:meth:`pandas.DataFrame.to_pickle`
     """
 
+    df_artifact_path = _save_data_frame(
+        data_frame, file_name, file_format, file_format_kwargs, working_dir
+    )
+    upload_file_as_artifact(artifact_path=df_artifact_path)
+
+
+@pyplugs.register
+def upload_directory_as_tarball_artifact(
+    source_dir: Union[str, Path],
+    tarball_filename: str,
+    tarball_write_mode: str = "w:gz",
+    working_dir: Optional[Union[str, Path]] = None,
+) -> None:
+    """Archives a directory and uploads it as an artifact of the active MLFlow run.
+
+    Args:
+        source_dir: The directory which should be uploaded.
+        tarball_filename: The filename to use for the archived directory tarball.
+        tarball_write_mode: The write mode for the tarball, see :py:func:`tarfile.open`
+            for the full list of compression options. The default is `"w:gz"` (gzip
+            compression).
+        working_dir: The location where the file should be saved. If `None`, then the
+            current working directory is used. The default is `None`.
+
+    See Also:
+        - :py:func:`tarfile.open`
+    """
+    tarball_path = _make_tarball(
+        source_dir, tarball_filename, tarball_write_mode, working_dir
+    )
+    upload_file_as_artifact(artifact_path=tarball_path)
+
+
+@pyplugs.register
+def upload_file_as_artifact(artifact_path: Union[str, Path]) -> None:
+    """Uploads a file as an artifact of the active MLFlow run.
+
+    Args:
+        artifact_path: The location of the file to be uploaded.
+
+    See Also:
+        - :py:func:`mlflow.log_artifact`
+    """
+    artifact_path = Path(artifact_path)
+    mlflow.log_artifact(str(artifact_path))
+    LOGGER.info("Artifact uploaded for current MLFlow run", filename=artifact_path.name)
+
+
+def _save_data_frame(
+    data_frame: pd.DataFrame,
+    file_name: str,
+    file_format: str,
+    file_format_kwargs: Optional[Dict[str, Any]] = None,
+    working_dir: Optional[Union[str, Path]] = None,
+) -> Path:
+    """Serializes a :py:class:`~pandas.DataFrame` to a file.
+
+    See :py:func:`upload_data_frame_artifact` for a description of the arguments.
+
+    Returns:
+        The location of the serialized :py:class:`~pandas.DataFrame`.
+    """
+
     def to_format(
         data_frame: pd.DataFrame, format: str, output_dir: Union[str, Path]
     ) -> Dict[str, Any]:
@@ -176,29 +240,22 @@ def upload_data_frame_artifact(
         file_format=file_format,
     )
 
-    upload_file_as_artifact(artifact_path=df_artifact_path)
+    return df_artifact_path
 
 
-@pyplugs.register
-def upload_directory_as_tarball_artifact(
+def _make_tarball(
     source_dir: Union[str, Path],
     tarball_filename: str,
     tarball_write_mode: str = "w:gz",
     working_dir: Optional[Union[str, Path]] = None,
-) -> None:
-    """Archives a directory and uploads it as an artifact of the active MLFlow run.
+) -> Path:
+    """Archives a directory.
 
-    Args:
-        source_dir: The directory which should be uploaded.
-        tarball_filename: The filename to use for the archived directory tarball.
-        tarball_write_mode: The write mode for the tarball, see :py:func:`tarfile.open`
-            for the full list of compression options. The default is `"w:gz"` (gzip
-            compression).
-        working_dir: The location where the file should be saved. If `None`, then the
-            current working directory is used. The default is `None`.
+    See :py:func:`upload_directory_as_tarball_artifact` for a description of the
+    arguments.
 
-    See Also:
-        - :py:func:`tarfile.open`
+    Returns:
+        The location of the tarball.
     """
     if working_dir is None:
         working_dir = Path.cwd()
@@ -216,19 +273,111 @@ def upload_directory_as_tarball_artifact(
         tarball_path=tarball_path,
     )
 
-    upload_file_as_artifact(artifact_path=tarball_path)
+    return tarball_path
 
 
 @pyplugs.register
-def upload_file_as_artifact(artifact_path: Union[str, Path]) -> None:
+async def download_all_artifacts_in_run_async(
+    run_id: str, artifact_path: str, destination_path: Optional[str] = None
+) -> str:
+    """Downloads an artifact file or directory from a previous MLFlow run.
+
+    This is a coroutine version of :py:func:`download_all_artifacts_in_run`. The
+    download runs in a worker thread, so the task engine can overlap it with other
+    steps.
+
+    Args:
+        run_id: The unique identifier of a previous MLFlow run.
+        artifact_path: The relative source path to the desired artifact.
+        destination_path: The relative destination path where the artifacts will be
+            downloaded. If `None`, the artifacts will be downloaded to a new
+            uniquely-named directory on the local filesystem. The default is `None`.
+
+    Returns:
+        A string pointing to the directory containing the downloaded artifacts.
+
+    See Also:
+        - :py:meth:`mlflow.tracking.MlflowClient.download_artifacts`
+    """
+    return await asyncio.to_thread(
+        download_all_artifacts_in_run, run_id, artifact_path, destination_path
+    )
+
+
+@pyplugs.register
+async def upload_data_frame_artifact_async(
+    data_frame: pd.DataFrame,
+    file_name: str,
+    file_format: str,
+    file_format_kwargs: Optional[Dict[str, Any]] = None,
+    working_dir: Optional[Union[str, Path]] = None,
+) -> None:
+    """Uploads a :py:class:`~pandas.DataFrame` as an artifact of the active MLFlow run.
+
+    This is a coroutine version of :py:func:`upload_data_frame_artifact`, see it for
+    the supported file formats. Serialization and upload run in worker threads, so
+    the task engine can overlap them with other steps.
+
+    Args:
+        data_frame: A :py:class:`~pandas.DataFrame` to be uploaded.
+        file_name: The filename to use for the serialized :py:class:`~pandas.DataFrame`.
+        file_format: The :py:class:`~pandas.DataFrame` file serialization format.
+        file_format_kwargs: A dictionary of additional keyword arguments to pass to the
+            serializer. If `None`, then no additional keyword arguments are passed. The
+            default is `None`.
+        working_dir: The location where the file should be saved. If `None`, then the
+            current working directory is used. The default is `None`.
+    """
+    df_artifact_path = await asyncio.to_thread(
+        _save_data_frame,
+        data_frame,
+        file_name,
+        file_format,
+        file_format_kwargs,
+        working_dir,
+    )
+    await upload_file_as_artifact_async(artifact_path=df_artifact_path)
+
+
+@pyplugs.register
+async def upload_directory_as_tarball_artifact_async(
+    source_dir: Union[str, Path],
+    tarball_filename: str,
+    tarball_write_mode: str = "w:gz",
+    working_dir: Optional[Union[str, Path]] = None,
+) -> None:
+    """Archives a directory and uploads it as an artifact of the active MLFlow run.
+
+    This is a coroutine version of :py:func:`upload_directory_as_tarball_artifact`.
+    Archiving and upload run in worker threads, so the task engine can overlap them
+    with other steps.
+
+    Args:
+        source_dir: The directory which should be uploaded.
+        tarball_filename: The filename to use for the archived directory tarball.
+        tarball_write_mode: The write mode for the tarball, see :py:func:`tarfile.open`
+            for the full list of compression options. The default is `"w:gz"` (gzip
+            compression).
+        working_dir: The location where the file should be saved. If `None`, then the
+            current working directory is used. The default is `None`.
+    """
+    tarball_path = await asyncio.to_thread(
+        _make_tarball, source_dir, tarball_filename, tarball_write_mode, working_dir
+    )
+    await upload_file_as_artifact_async(artifact_path=tarball_path)
+
+
+@pyplugs.register
+async def upload_file_as_artifact_async(artifact_path: Union[str, Path]) -> None:
     """Uploads a file as an artifact of the active MLFlow run.
 
+    This is a coroutine version of :py:func:`upload_file_as_artifact`. The upload
+    runs in a worker thread, so the task engine can overlap it with other steps.
+
     Args:
         artifact_path: The location of the file to be uploaded.
 
     See Also:
         - :py:func:`mlflow.log_artifact`
     """
-    artifact_path = Path(artifact_path)
-    mlflow.log_artifact(str(artifact_path))
-    LOGGER.info("Artifact uploaded for current MLFlow run", filename=artifact_path.name)
+    await asyncio.to_thread(upload_file_as_artifact, artifact_path)
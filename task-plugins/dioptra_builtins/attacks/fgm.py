@@ -50,28 +50,16 @@ from structlog.stdlib import BoundLogger
 from dioptra import pyplugs
 from dioptra.sdk.exceptions import ARTDependencyError, TensorflowDependencyError
 from dioptra.sdk.utilities.decorators import require_package
+from dioptra.sdk.utilities.imports import lazy_import
 
 LOGGER: BoundLogger = structlog.stdlib.get_logger()
 
-try:
-    from art.attacks.evasion import FastGradientMethod
-    from art.estimators.classification import KerasClassifier
-
-except ImportError:  # pragma: nocover
-    LOGGER.warn(
-        "Unable to import one or more optional packages, functionality may be reduced",
-        package="art",
-    )
-
-
-try:
-    from tensorflow.keras.preprocessing.image import ImageDataGenerator, save_img
-
-except ImportError:  # pragma: nocover
-    LOGGER.warn(
-        "Unable to import one or more optional packages, functionality may be reduced",
-        package="tensorflow",
-    )
+FastGradientMethod = lazy_import("art.attacks.evasion", "FastGradientMethod")
+KerasClassifier = lazy_import("art.estimators.classification", "KerasClassifier")
+ImageDataGenerator = lazy_import(
+    "tensorflow.keras.preprocessing.image", "ImageDataGenerator"
+)
+save_img = lazy_import("tensorflow.keras.preprocessing.image", "save_img")
 
 
 @pyplugs.register
@@ -32,20 +32,16 @@ from structlog.stdlib import BoundLogger
 from dioptra import pyplugs
 from dioptra.sdk.exceptions import TensorflowDependencyError
 from dioptra.sdk.utilities.decorators import require_package
+from dioptra.sdk.utilities.imports import lazy_import
 
 LOGGER: BoundLogger = structlog.stdlib.get_logger()
 
-try:
-    from tensorflow.keras.preprocessing.image import (
-        DirectoryIterator,
-        ImageDataGenerator,
-    )
-
-except ImportError:  # pragma: nocover
-    LOGGER.warn(
-        "Unable to import one or more optional packages, functionality may be reduced",
-        package="tensorflow",
-    )
+DirectoryIterator = lazy_import(
+    "tensorflow.keras.preprocessing.image", "DirectoryIterator"
+)
+ImageDataGenerator = lazy_import(
+    "tensorflow.keras.preprocessing.image", "ImageDataGenerator"
+)
 
 
 @pyplugs.register
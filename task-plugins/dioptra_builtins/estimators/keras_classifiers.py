@@ -27,27 +27,19 @@ from structlog.stdlib import BoundLogger
 from dioptra import pyplugs
 from dioptra.sdk.exceptions import TensorflowDependencyError
 from dioptra.sdk.utilities.decorators import require_package
+from dioptra.sdk.utilities.imports import lazy_import
 
 LOGGER: BoundLogger = structlog.stdlib.get_logger()
 
-try:
-    from tensorflow.keras.layers import (
-        BatchNormalization,
-        Conv2D,
-        Dense,
-        Dropout,
-        Flatten,
-        MaxPooling2D,
-    )
-    from tensorflow.keras.metrics import Metric
-    from tensorflow.keras.models import Sequential
-    from tensorflow.keras.optimizers.legacy import Optimizer
-
-except ImportError:  # pragma: nocover
-    LOGGER.warn(
-        "Unable to import one or more optional packages, functionality may be reduced",
-        package="tensorflow",
-    )
+BatchNormalization = lazy_import("tensorflow.keras.layers", "BatchNormalization")
+Conv2D = lazy_import("tensorflow.keras.layers", "Conv2D")
+Dense = lazy_import("tensorflow.keras.layers", "Dense")
+Dropout = lazy_import("tensorflow.keras.layers", "Dropout")
+Flatten = lazy_import("tensorflow.keras.layers", "Flatten")
+MaxPooling2D = lazy_import("tensorflow.keras.layers", "MaxPooling2D")
+Metric = lazy_import("tensorflow.keras.metrics", "Metric")
+Sequential = lazy_import("tensorflow.keras.models", "Sequential")
+Optimizer = lazy_import("tensorflow.keras.optimizers.legacy", "Optimizer")
 
 
 @pyplugs.register
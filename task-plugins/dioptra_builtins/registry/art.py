@@ -30,29 +30,14 @@ from structlog.stdlib import BoundLogger
 from dioptra import pyplugs
 from dioptra.sdk.exceptions import ARTDependencyError, TensorflowDependencyError
 from dioptra.sdk.utilities.decorators import require_package
+from dioptra.sdk.utilities.imports import lazy_import
 
 from .mlflow import load_tensorflow_keras_classifier
 
 LOGGER: BoundLogger = structlog.stdlib.get_logger()
 
-try:
-    from art.estimators.classification import KerasClassifier
-
-except ImportError:  # pragma: nocover
-    LOGGER.warn(
-        "Unable to import one or more optional packages, functionality may be reduced",
-        package="art",
-    )
-
-
-try:
-    from tensorflow.keras.models import Sequential
-
-except ImportError:  # pragma: nocover
-    LOGGER.warn(
-        "Unable to import one or more optional packages, functionality may be reduced",
-        package="tensorflow",
-    )
+KerasClassifier = lazy_import("art.estimators.classification", "KerasClassifier")
+Sequential = lazy_import("tensorflow.keras.models", "Sequential")
 
 
 @pyplugs.register
@@ -30,17 +30,11 @@ from structlog.stdlib import BoundLogger
 from dioptra import pyplugs
 from dioptra.sdk.exceptions import TensorflowDependencyError
 from dioptra.sdk.utilities.decorators import require_package
+from dioptra.sdk.utilities.imports import lazy_import
 
 LOGGER: BoundLogger = structlog.stdlib.get_logger()
 
-try:
-    from tensorflow.keras.models import Sequential
-
-except ImportError:  # pragma: nocover
-    LOGGER.warn(
-        "Unable to import one or more optional packages, functionality may be reduced",
-        package="tensorflow",
-    )
+Sequential = lazy_import("tensorflow.keras.models", "Sequential")
 
 
 @pyplugs.register
@@ -0,0 +1,61 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+from typing import Any, Optional
+
+import pytest
+from flask import Flask
+
+import dioptra.mlflow_plugins.dioptra_clients
+from dioptra.mlflow_plugins.dioptra_clients import DioptraDatabaseClient
+from dioptra.restapi import create_app
+
+
+@pytest.fixture
+def created_apps(monkeypatch) -> list[Flask]:
+    apps = []
+
+    def counted_create_app(env: Optional[str] = None, **kwargs: Any) -> Flask:
+        app = create_app(env=env, **kwargs)
+        apps.append(app)
+        return app
+
+    monkeypatch.setattr(dioptra.mlflow_plugins.dioptra_clients, "_APPS", {})
+    monkeypatch.setattr(
+        dioptra.mlflow_plugins.dioptra_clients, "create_app", counted_create_app
+    )
+
+    return apps
+
+
+def test_app_reused(monkeypatch, created_apps) -> None:
+    monkeypatch.setenv("DIOPTRA_RESTAPI_ENV", "test")
+
+    app = DioptraDatabaseClient().app
+
+    assert DioptraDatabaseClient().app is app
+    assert created_apps == [app]
+
+
+def test_app_forgotten_after_fork(monkeypatch, created_apps) -> None:
+    monkeypatch.setenv("DIOPTRA_RESTAPI_ENV", "test")
+    monkeypatch.setattr(dioptra.mlflow_plugins.dioptra_clients, "_INHERITED_APPS", [])
+
+    app = DioptraDatabaseClient().app
+    dioptra.mlflow_plugins.dioptra_clients._forget_apps_after_fork()
+
+    assert DioptraDatabaseClient().app is not app
+    assert len(created_apps) == 2
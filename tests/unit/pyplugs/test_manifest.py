@@ -0,0 +1,228 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import sys
+import textwrap
+import uuid
+
+import pytest
+
+from dioptra import pyplugs
+from dioptra.pyplugs import _manifest
+from dioptra.sdk.exceptions import UnknownPluginError
+
+_PLUGIN_SOURCE = '''\
+"""Module docs"""
+import dioptra.pyplugs
+from dioptra import pyplugs
+from dioptra.pyplugs import register as reg
+
+
+@pyplugs.register(sort_value=5)
+def first(a, b):
+    """Add things
+
+    More about adding.
+    """
+    return a + b
+
+
+@dioptra.pyplugs.register
+def second():
+    """Second function"""
+    return "second"
+
+
+@reg()
+def third():
+    return "third"
+
+
+def not_a_plugin():
+    pass
+'''
+
+_EARLY_PLUGIN_SOURCE = """\
+from dioptra import pyplugs
+
+
+@pyplugs.register(sort_value=-1)
+def early():
+    return "early"
+"""
+
+_DYNAMIC_PLUGIN_SOURCE = """\
+from dioptra import pyplugs
+
+
+def dynamic():
+    return "dynamic"
+
+
+pyplugs.register(dynamic)
+"""
+
+
+_ALIASED_PLUGIN_SOURCE = """\
+import dioptra.pyplugs as pp
+from dioptra import pyplugs as plugs
+
+
+@pp.register
+def aliased():
+    return "aliased"
+
+
+@plugs.register(sort_value=2)
+def also_aliased():
+    return "also aliased"
+"""
+
+_REBOUND_PLUGIN_SOURCE = """\
+from dioptra import pyplugs
+
+p = pyplugs
+
+
+@p.register(sort_value=1)
+def rebound():
+    return "rebound"
+"""
+
+
+@pytest.fixture
+def plugin_package(tmp_path, monkeypatch):
+    """A freshly written plug-in package with a manifest"""
+    package = "manifest_pkg_" + uuid.uuid4().hex
+    package_dir = tmp_path / package
+    package_dir.mkdir()
+    (package_dir / "__init__.py").write_text("")
+    (package_dir / "plugin_a.py").write_text(_PLUGIN_SOURCE)
+    (package_dir / "plugin_b.py").write_text(_EARLY_PLUGIN_SOURCE)
+    (package_dir / "plugin_dynamic.py").write_text(_DYNAMIC_PLUGIN_SOURCE)
+    (package_dir / "plugin_rebound.py").write_text(_REBOUND_PLUGIN_SOURCE)
+    (package_dir / "no_plugins.py").write_text("x = 1\n")
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    assert _manifest.write_manifests(tmp_path) == 1
+
+    yield package
+
+    pyplugs._plugins._PLUGINS.pop(package, None)
+    for module_name in list(sys.modules):
+        if module_name.startswith(package):
+            del sys.modules[module_name]
+
+
+def _is_imported(package, plugin):
+    return package + "." + plugin in sys.modules
+
+
+def test_scan_plugin_source():
+    manifest_plugin = _manifest.scan_plugin_source(_PLUGIN_SOURCE.encode())
+
+    assert manifest_plugin.module_doc == "Module docs"
+    assert manifest_plugin.funcs == [
+        _manifest.ManifestFunc("first", "Add things", "More about adding.", 5),
+        _manifest.ManifestFunc("second", "Second function", "", 0),
+        _manifest.ManifestFunc("third", "", "", 0),
+    ]
+
+    assert _manifest.scan_plugin_source(_DYNAMIC_PLUGIN_SOURCE.encode()) is None
+
+
+def test_scan_aliased_plugin_source():
+    manifest_plugin = _manifest.scan_plugin_source(_ALIASED_PLUGIN_SOURCE.encode())
+
+    assert manifest_plugin.funcs == [
+        _manifest.ManifestFunc("aliased", "", "", 0),
+        _manifest.ManifestFunc("also_aliased", "", "", 2),
+    ]
+
+
+@pytest.mark.parametrize("source", [_REBOUND_PLUGIN_SOURCE, "x = 1\n"])
+def test_scan_unresolved_plugin_source(source):
+    # Registrations which can't be resolved statically, or none at all, need
+    # the module to be imported
+    assert _manifest.scan_plugin_source(source.encode()) is None
+
+
+def test_lookups_without_import(plugin_package):
+    # Only the module registering its plug-in dynamically must be imported
+    assert pyplugs.names(plugin_package) == [
+        "plugin_b",
+        "plugin_dynamic",
+        "plugin_rebound",
+        "plugin_a",
+    ]
+    assert pyplugs.funcs(plugin_package, "plugin_a") == ["first", "second", "third"]
+    assert pyplugs.exists(plugin_package, "plugin_a")
+    assert not pyplugs.exists(plugin_package, "no_plugins")
+
+    plugin_info = pyplugs.info(plugin_package, "plugin_a")
+    assert plugin_info.func_name == "first"
+    assert plugin_info.description == "Add things"
+    assert plugin_info.doc == "More about adding."
+    assert plugin_info.module_doc == "Module docs"
+    assert plugin_info.sort_value == 5
+
+    assert not _is_imported(plugin_package, "plugin_a")
+    assert not _is_imported(plugin_package, "plugin_b")
+    assert _is_imported(plugin_package, "plugin_dynamic")
+
+    # Registrations the manifest can't resolve are found by importing
+    assert pyplugs.funcs(plugin_package, "plugin_rebound") == ["rebound"]
+    assert _is_imported(plugin_package, "plugin_rebound")
+
+    with pytest.raises(UnknownPluginError):
+        pyplugs.info(plugin_package, "no_plugins")
+
+
+def test_import_deferred_until_use(plugin_package):
+    lazy_func = pyplugs.info(plugin_package, "plugin_a", "second").func
+    assert not _is_imported(plugin_package, "plugin_a")
+
+    assert lazy_func() == "second"
+    assert _is_imported(plugin_package, "plugin_a")
+
+    # Once imported, the real function is used
+    func = pyplugs.get(plugin_package, "plugin_a", "first")
+    assert func.__module__ == plugin_package + ".plugin_a"
+    assert pyplugs.info(plugin_package, "plugin_a").func is func
+    assert pyplugs.call(plugin_package, "plugin_a", "first", 1, 2) == 3
+
+
+def test_stale_manifest(plugin_package, tmp_path):
+    (tmp_path / plugin_package / "plugin_a.py").write_text(
+        _PLUGIN_SOURCE
+        + textwrap.dedent(
+            """
+
+            @pyplugs.register
+            def fourth():
+                return "fourth"
+            """
+        )
+    )
+    _manifest._VERIFIED.clear()
+
+    assert pyplugs.funcs(plugin_package, "plugin_a") == [
+        "first",
+        "second",
+        "third",
+        "fourth",
+    ]
+    assert _is_imported(plugin_package, "plugin_a")
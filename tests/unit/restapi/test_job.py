@@ -50,6 +50,7 @@ def job_request_factory(
     Returns:
         A factory function for creating job submission requests.
     """
+
     def wrapped() -> dict[str, Any]:
         return {
             "experimentName": "mnist",
@@ -119,6 +120,44 @@ def submit_job(
     )
 
 
+def submit_task_engine_job(
+    client: FlaskClient,
+    json_request: dict[str, Any],
+) -> TestResponse:
+    """Submit a task engine job using the API.
+
+    Args:
+        client: The Flask test client.
+        json_request: The job parameters to include in the submission request.
+
+    Returns:
+        The response from the API.
+    """
+    return client.post(
+        f"/{V0_ROOT}/{JOB_ROUTE}/newTaskEngine",
+        json=json_request,
+        follow_redirects=True,
+    )
+
+
+def change_job_status(client: FlaskClient, id: str, status: str) -> TestResponse:
+    """Change the status of a job using the API.
+
+    Args:
+        client: The Flask test client.
+        id: The id of the job to update.
+        status: The new status of the job.
+
+    Returns:
+        The response from the API.
+    """
+    return client.put(
+        f"/{V0_ROOT}/{JOB_ROUTE}/{id}",
+        json={"status": status},
+        follow_redirects=True,
+    )
+
+
 # -- Assertions ------------------------------------------------------------------------
 
 
@@ -228,3 +267,75 @@ def test_list_jobs(
     job3_expected = submit_job(client, form_request=job_request_factory()).get_json()  # noqa: B950; fmt: skip
     job_expected_list = [job1_expected, job2_expected, job3_expected]
     assert_retrieving_all_jobs_works(client, expected=job_expected_list)
+
+
+def test_resume_task_engine_job(
+    monkeypatch: MonkeyPatch,
+    client: FlaskClient,
+    db: SQLAlchemy,
+    job_request_factory: Callable[[], dict[str, Any]],
+) -> None:
+    """Test that a failed job can be resumed by a new task engine job, and that other
+    jobs can't be resumed.
+
+    This test validates this by following these actions:
+
+    - A user submits a job, and tries to resume it before it fails.
+    - The user tries to resume a job which does not exist.
+    - The job fails, and the user resumes it.
+    - The ID of the failed job is passed on to the worker.
+    """
+    # Inline import necessary to prevent circular import
+    import dioptra.restapi.v0.shared.rq.service as rq_service
+
+    enqueued_kwargs: list[dict[str, Any]] = []
+
+    class RecordingRQQueue(mock_rq.MockRQQueue):
+        def enqueue(self, *args, **kwargs) -> mock_rq.MockRQJob:
+            enqueued_kwargs.append(kwargs.get("kwargs"))
+            return super().enqueue(*args, **kwargs)
+
+    monkeypatch.setattr(rq_service, "RQQueue", RecordingRQQueue)
+    monkeypatch.setattr(S3Service, "upload", mock_s3.mock_s3_upload)
+
+    register_mnist_experiment(client)
+    register_tensorflow_cpu_queue(client)
+    job_id = submit_job(client, form_request=job_request_factory()).get_json()["jobId"]
+    task_engine_request = {
+        "experimentName": "mnist",
+        "queue": "tensorflow_cpu",
+        "experimentDescription": {
+            "tasks": {"hello": {"plugin": "plugins.hello"}},
+            "graph": {"step1": {"hello": []}},
+        },
+    }
+
+    response = submit_task_engine_job(
+        client, {**task_engine_request, "resumeFromJobId": job_id}
+    )
+    assert response.status_code == 400
+
+    response = submit_task_engine_job(
+        client, {**task_engine_request, "resumeFromJobId": "not-a-job"}
+    )
+    assert response.status_code == 400
+
+    # Parameter sweeps can't be resumed
+    response = client.post(
+        f"/{V0_ROOT}/{JOB_ROUTE}/newTaskEngineSweep",
+        json={
+            **task_engine_request,
+            "parameterGrid": {},
+            "resumeFromJobId": job_id,
+        },
+        follow_redirects=True,
+    )
+    assert response.status_code == 400
+    assert "resumeFromJobId" in response.get_json()["schema_errors"]
+
+    change_job_status(client, id=job_id, status="failed")
+    response = submit_task_engine_job(
+        client, {**task_engine_request, "resumeFromJobId": job_id}
+    )
+    assert response.status_code == 200
+    assert enqueued_kwargs[-1]["resume_from_job_id"] == job_id
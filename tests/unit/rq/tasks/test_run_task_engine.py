@@ -3,7 +3,9 @@ import pathlib
 
 import mlflow
 import mlflow.entities
+import pytest
 import rq.job
+from mlflow.tracking import MlflowClient
 
 import dioptra.pyplugs
 import dioptra.rq.tasks.run_task_engine
@@ -13,6 +15,9 @@ from dioptra.mlflow_plugins.dioptra_tags import (
     DIOPTRA_JOB_ID,
     DIOPTRA_QUEUE,
 )
+from dioptra.task_engine.validation_cache import compute_description_digest
+
+_recorded = []
 
 
 @dioptra.pyplugs.register
@@ -28,6 +33,21 @@ def silly_plugin():
     pathlib.Path("test.txt").write_text("hello")
 
 
+@dioptra.pyplugs.register
+def add(a, b):
+    return a + b
+
+
+@dioptra.pyplugs.register
+def record(value):
+    _recorded.append(value)
+
+
+@dioptra.pyplugs.register
+def fail(value):
+    raise ValueError("step failed")
+
+
 def test_run_task_engine(monkeypatch, tmp_path, s3_stubbed_plugins):
     saved_cwd = pathlib.Path.cwd()
 
@@ -35,6 +55,7 @@ def test_run_task_engine(monkeypatch, tmp_path, s3_stubbed_plugins):
 
     mlflow_tags = {}
     mlflow_params = {}
+    mlflow_metrics = {}
     mlflow_artifacts = {}
     mlflow_run_status = None
     mlflow_experiment_id = None
@@ -60,11 +81,17 @@ def test_run_task_engine(monkeypatch, tmp_path, s3_stubbed_plugins):
 
     global_experiment_params = {"param1": 123, "param2": "foo"}
 
-    def mlflow_set_tag(k, v):
-        mlflow_tags[k] = v
+    def mlflow_log_batch(self, run_id, metrics=(), params=(), tags=()):
+        assert run_id == mlflow_run.info.run_id
+        mlflow_params.update((param.key, param.value) for param in params)
+        mlflow_tags.update((tag.key, tag.value) for tag in tags)
 
-    def mlflow_set_params(params):
-        mlflow_params.update(params)
+    def mlflow_client_add_artifact(self, run_id, artifact, name):
+        assert run_id == mlflow_run.info.run_id
+        mlflow_add_artifact(artifact, name)
+
+    def mlflow_log_metrics(metrics):
+        mlflow_metrics.update(metrics)
 
     def mlflow_add_artifact(artifact, name):
         mlflow_artifacts[name] = artifact
@@ -80,21 +107,19 @@ def test_run_task_engine(monkeypatch, tmp_path, s3_stubbed_plugins):
     def dioptra_set_job_status(self, job_id, status):
         dioptra_job["status"] = status
 
-    def dioptra_set_run_id_for_job(self, run_id, job_id):
+    def dioptra_start_job(self, job_id, run_id):
         dioptra_job["mlflow_run_id"] = run_id
+        dioptra_job["status"] = "started"
+        return dioptra_job
 
     monkeypatch.setattr(mlflow, "start_run", lambda: mlflow_run)
     monkeypatch.setattr(mlflow, "end_run", mlflow_end_run)
-    monkeypatch.setattr(mlflow, "set_tag", mlflow_set_tag)
     monkeypatch.setattr(mlflow, "log_dict", mlflow_add_artifact)
-    monkeypatch.setattr(mlflow, "log_params", mlflow_set_params)
+    monkeypatch.setattr(mlflow, "log_metrics", mlflow_log_metrics)
     monkeypatch.setattr(mlflow, "set_experiment", mlflow_set_experiment)
-    monkeypatch.setattr(
-        DioptraDatabaseClient, "get_job", lambda self, job_id: dioptra_job
-    )
-    monkeypatch.setattr(
-        DioptraDatabaseClient, "set_mlflow_run_id_for_job", dioptra_set_run_id_for_job
-    )
+    monkeypatch.setattr(MlflowClient, "log_batch", mlflow_log_batch)
+    monkeypatch.setattr(MlflowClient, "log_dict", mlflow_client_add_artifact)
+    monkeypatch.setattr(DioptraDatabaseClient, "start_job", dioptra_start_job)
     monkeypatch.setattr(
         DioptraDatabaseClient, "update_job_status", dioptra_set_job_status
     )
@@ -120,15 +145,38 @@ def test_run_task_engine(monkeypatch, tmp_path, s3_stubbed_plugins):
     tmp_plugins_dir = tmp_path / "plugins"
     tmp_work_dir = tmp_path / "work"
     tmp_work_dir.mkdir()
+    tmp_checkpoint_dir = tmp_path / "checkpoints"
 
     monkeypatch.setenv("DIOPTRA_PLUGIN_DIR", str(tmp_plugins_dir))
     monkeypatch.setenv("DIOPTRA_PLUGINS_S3_URI", "s3://plugins/dioptra_builtins")
     monkeypatch.setenv("DIOPTRA_CUSTOM_PLUGINS_S3_URI", "s3://plugins/dioptra_custom")
     monkeypatch.setenv("MLFLOW_S3_ENDPOINT_URL", "http://example.org/")
     monkeypatch.setenv("DIOPTRA_WORKDIR", str(tmp_work_dir))
+    monkeypatch.setenv("DIOPTRA_CHECKPOINT_DIR", str(tmp_checkpoint_dir))
+    monkeypatch.setenv("DIOPTRA_CPROFILE_STEPS", "step1")
+    monkeypatch.setenv("DIOPTRA_TASK_ENGINE_MAX_WORKERS", "4")
+
+    run_experiment_kwargs = {}
+    run_experiment = dioptra.rq.tasks.run_task_engine.run_experiment
 
+    def run_experiment_spy(*args, **kwargs):
+        run_experiment_kwargs.update(kwargs)
+        return run_experiment(*args, **kwargs)
+
+    monkeypatch.setattr(
+        dioptra.rq.tasks.run_task_engine, "run_experiment", run_experiment_spy
+    )
+
+    # The REST API validates descriptions on submission, and passes along a
+    # digest so the worker needn't validate again.  Validating would use the
+    # job's (dummy) Redis connection, so this also checks validation was
+    # skipped.
     dioptra.rq.tasks.run_task_engine.run_task_engine_task(
-        1, silly_experiment, global_experiment_params, s3
+        1,
+        silly_experiment,
+        global_experiment_params,
+        s3,
+        validated_digest=compute_description_digest(silly_experiment),
     )
 
     for key, value in bucket_info["plugins"].items():
@@ -146,9 +194,274 @@ def test_run_task_engine(monkeypatch, tmp_path, s3_stubbed_plugins):
         DIOPTRA_QUEUE: dioptra_job["queue"],
         DIOPTRA_DEPENDS_ON: dioptra_job["depends_on"],
     }
-    assert mlflow_artifacts == {"experiment.yaml": silly_experiment}
-    assert mlflow_params == global_experiment_params
+    assert mlflow_artifacts.keys() == {"experiment.yaml", "step_profile.json"}
+    assert mlflow_artifacts["experiment.yaml"] == silly_experiment
+    (step1_profile,) = mlflow_artifacts["step_profile.json"]
+    assert step1_profile["step_name"] == "step1"
+    assert "silly_plugin" in step1_profile["cprofile_stats"]
+    assert mlflow_metrics["step.step1.wall_time"] >= 0
+    # The worker's concurrency setting is passed on to the task engine
+    assert run_experiment_kwargs["max_workers"] == 4
+    assert mlflow_params == {
+        key: str(value) for key, value in global_experiment_params.items()
+    }
     # Ensure the work dir was cleaned up
     assert next(tmp_work_dir.iterdir(), None) is None
+    # Ensure checkpoints were cleaned up after the successful run
+    assert not (tmp_checkpoint_dir / rq_job.id).exists()
     # Ensure cwd has been properly restored
     assert pathlib.Path.cwd() == saved_cwd
+
+
+class _FakeQueue:
+    """Records enqueued jobs instead of submitting them to Redis"""
+
+    jobs = []
+
+    def __init__(self, name, connection):
+        self.name = name
+
+    def enqueue(self, func, kwargs, timeout=None, depends_on=None):
+        job_id = "child{}".format(len(self.jobs))
+        self.jobs.append((job_id, self.name, func, kwargs, depends_on))
+
+        return job_id
+
+
+class _FakeChildJob:
+    """Stands in for the redis queue job of a child job, as it runs"""
+
+    def __init__(self, job_id, depends_on):
+        self.id = job_id
+        # Child jobs' dependencies must allow failure, so the final job runs
+        assert depends_on is None or depends_on.allow_failure
+        self.dependency_ids = depends_on.dependencies if depends_on else []
+
+
+def _run_child_jobs(monkeypatch):
+    """
+    Run the child jobs submitted to _FakeQueue in order, as workers would.
+
+    Returns:
+        The IDs of the child jobs which failed
+    """
+    failed_job_ids = []
+    current_job = None
+
+    monkeypatch.setattr(
+        dioptra.rq.tasks.run_task_engine, "get_current_job", lambda: current_job
+    )
+    monkeypatch.setattr(
+        dioptra.rq.tasks.run_task_engine,
+        "_get_failed_dependencies",
+        lambda rq_job: [
+            job_id for job_id in rq_job.dependency_ids if job_id in failed_job_ids
+        ],
+    )
+
+    for job_id, _, func, kwargs, depends_on in _FakeQueue.jobs:
+        current_job = _FakeChildJob(job_id, depends_on)
+
+        try:
+            func(**kwargs)
+
+        except Exception:
+            failed_job_ids.append(job_id)
+
+    return failed_job_ids
+
+
+@pytest.fixture
+def distributed_run(monkeypatch, tmp_path):
+    """
+    Set up to run distributed experiments, with MLflow, the Dioptra database
+    and Redis mocked up.
+
+    Returns:
+        A mapping holding the run's state: the Dioptra job, the statuses
+        MLflow runs were ended with, and the MLflow artifacts logged
+    """
+    _recorded.clear()
+    _FakeQueue.jobs = []
+
+    state = {
+        "dioptra_job": {"job_id": "job0", "queue": "worker_queue"},
+        "mlflow_run_statuses": [],
+        "mlflow_artifacts": {},
+    }
+
+    mlflow_run_info = mlflow.entities.RunInfo(
+        None, "exp1", "user1", "happy", "now", None, None, run_id="run_123"
+    )
+    mlflow_run = mlflow.entities.Run(mlflow_run_info, None)
+
+    rq_job = rq.job.Job.create(
+        func=lambda: 0,  # dummy function
+        id="job0",
+        connection="dummy_connection",
+        origin="worker_queue",
+    )
+
+    def mlflow_start_run(run_id=None):
+        assert run_id in (None, mlflow_run.info.run_id)
+        return mlflow_run
+
+    def mlflow_add_artifact(artifact, name):
+        state["mlflow_artifacts"][name] = artifact
+
+    def dioptra_set_job_status(self, job_id, status):
+        state["dioptra_job"]["status"] = status
+
+    def dioptra_start_job(self, job_id, run_id):
+        state["dioptra_job"]["status"] = "started"
+        return state["dioptra_job"]
+
+    monkeypatch.setattr(mlflow, "start_run", mlflow_start_run)
+    monkeypatch.setattr(
+        mlflow,
+        "end_run",
+        lambda status="FINISHED": state["mlflow_run_statuses"].append(status),
+    )
+    monkeypatch.setattr(mlflow, "log_dict", mlflow_add_artifact)
+    monkeypatch.setattr(mlflow, "log_metrics", lambda metrics: None)
+    monkeypatch.setattr(mlflow, "set_experiment", lambda experiment_id: None)
+    monkeypatch.setattr(MlflowClient, "log_batch", lambda self, *args, **kwargs: None)
+    monkeypatch.setattr(
+        MlflowClient,
+        "log_dict",
+        lambda self, run_id, artifact, name: mlflow_add_artifact(artifact, name),
+    )
+    monkeypatch.setattr(DioptraDatabaseClient, "start_job", dioptra_start_job)
+    monkeypatch.setattr(
+        DioptraDatabaseClient, "update_job_status", dioptra_set_job_status
+    )
+    monkeypatch.setattr(
+        dioptra.rq.tasks.run_task_engine, "get_current_job", lambda: rq_job
+    )
+    monkeypatch.setattr(dioptra.rq.tasks.run_task_engine, "Queue", _FakeQueue)
+    # Plugin downloads are tested above
+    monkeypatch.setattr(
+        dioptra.rq.tasks.run_task_engine, "s3_download", lambda *args, **kwargs: None
+    )
+
+    tmp_work_dir = tmp_path / "work"
+    tmp_work_dir.mkdir()
+
+    monkeypatch.setenv("DIOPTRA_PLUGIN_DIR", str(tmp_path / "plugins"))
+    monkeypatch.setenv("DIOPTRA_PLUGINS_S3_URI", "s3://plugins/dioptra_builtins")
+    monkeypatch.setenv("DIOPTRA_CUSTOM_PLUGINS_S3_URI", "s3://plugins/dioptra_custom")
+    monkeypatch.setenv("MLFLOW_S3_ENDPOINT_URL", "http://example.org/")
+    monkeypatch.setenv("DIOPTRA_WORKDIR", str(tmp_work_dir))
+    monkeypatch.setenv("DIOPTRA_STEP_OUTPUT_STORE_URI", str(tmp_path / "outputs"))
+    # Keep the MLflow client's local store out of the source tree
+    monkeypatch.setenv("MLFLOW_TRACKING_URI", (tmp_path / "mlruns").as_uri())
+
+    return state
+
+
+def _make_distributed_experiment(step5_task):
+    plugin_prefix = "tests.unit.rq.tasks.test_run_task_engine."
+
+    return {
+        "tasks": {
+            "add": {"plugin": plugin_prefix + "add", "outputs": {"value": "integer"}},
+            "record": {"plugin": plugin_prefix + "record"},
+            "fail": {"plugin": plugin_prefix + "fail"},
+        },
+        "graph": {
+            "step1": {"add": [1, 2]},
+            "step2": {"add": ["$step1", 1]},
+            "step3": {"add": ["$step1", 2]},
+            "step4": {"add": ["$step2", "$step3"]},
+            "step5": {step5_task: ["$step4"]},
+        },
+    }
+
+
+def test_run_task_engine_distributed(distributed_run, monkeypatch, tmp_path):
+    experiment = _make_distributed_experiment("record")
+
+    dioptra.rq.tasks.run_task_engine.run_task_engine_task(
+        1,
+        experiment,
+        {},
+        validated_digest=compute_description_digest(experiment),
+    )
+
+    # The parent job only submits child jobs, leaving the run open for them
+    assert not _recorded
+    assert distributed_run["dioptra_job"]["status"] == "started"
+    assert distributed_run["mlflow_run_statuses"] == ["RUNNING"]
+
+    *partition_jobs, finish_job = _FakeQueue.jobs
+    job_ids = {
+        kwargs["step_names"][0]: job_id for job_id, *_, kwargs, _ in partition_jobs
+    }
+
+    assert [
+        (kwargs["step_names"], depends_on and depends_on.dependencies)
+        for _, _, _, kwargs, depends_on in partition_jobs
+    ] == [
+        (["step1"], None),
+        (["step2"], [job_ids["step1"]]),
+        (["step3"], [job_ids["step1"]]),
+        (["step4", "step5"], [job_ids["step2"], job_ids["step3"]]),
+    ]
+    assert all(queue_name == "worker_queue" for _, queue_name, *_ in _FakeQueue.jobs)
+    assert finish_job[4].dependencies == list(job_ids.values())
+
+    assert not _run_child_jobs(monkeypatch)
+
+    assert _recorded == [9]
+    assert distributed_run["dioptra_job"]["status"] == "finished"
+    assert distributed_run["mlflow_run_statuses"] == ["RUNNING"] * 5 + ["FINISHED"]
+    assert "step_profiles/step4.json" in distributed_run["mlflow_artifacts"]
+    # Step outputs passed between partitions were cleaned up
+    assert not (tmp_path / "outputs" / "job0").exists()
+    assert next((tmp_path / "work").iterdir(), None) is None
+
+
+def test_run_task_engine_distributed_failure(distributed_run, monkeypatch, tmp_path):
+    experiment = _make_distributed_experiment("fail")
+
+    dioptra.rq.tasks.run_task_engine.run_task_engine_task(
+        1,
+        experiment,
+        {},
+        validated_digest=compute_description_digest(experiment),
+    )
+
+    *partition_jobs, finish_job = _FakeQueue.jobs
+    assert len(partition_jobs) == 4
+
+    # Only the partition with the failing step fails
+    assert _run_child_jobs(monkeypatch) == [partition_jobs[-1][0]]
+
+    assert distributed_run["dioptra_job"]["status"] == "failed"
+    # Partitions leave the run running, and only the final job ends it
+    assert distributed_run["mlflow_run_statuses"] == ["RUNNING"] * 5 + ["FAILED"]
+    assert "step_profiles/step4.json" in distributed_run["mlflow_artifacts"]
+    assert not (tmp_path / "outputs" / "job0").exists()
+
+
+def test_run_partition_skipped_after_failure(distributed_run, monkeypatch, tmp_path):
+    experiment = _make_distributed_experiment("record")
+
+    dioptra.rq.tasks.run_task_engine.run_task_engine_task(
+        1,
+        experiment,
+        {},
+        validated_digest=compute_description_digest(experiment),
+    )
+
+    # Fail the job of step2 without running it; the job of step4 and step5,
+    # which depends on it, must not run its steps or touch the run.
+    _FakeQueue.jobs[1] = (*_FakeQueue.jobs[1][:2], fail, {"value": 0}, None)
+
+    assert _run_child_jobs(monkeypatch) == ["child1", "child3"]
+
+    assert not _recorded
+    assert distributed_run["dioptra_job"]["status"] == "failed"
+    assert distributed_run["mlflow_run_statuses"] == ["RUNNING"] * 3 + ["FAILED"]
+    assert "step_profiles/step4.json" not in distributed_run["mlflow_artifacts"]
+    assert not (tmp_path / "outputs" / "job0").exists()
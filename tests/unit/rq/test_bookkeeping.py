@@ -0,0 +1,134 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import threading
+
+import pytest
+from mlflow.utils.validation import MAX_PARAMS_TAGS_PER_BATCH
+
+from dioptra.mlflow_plugins.dioptra_tags import (
+    DIOPTRA_DEPENDS_ON,
+    DIOPTRA_JOB_ID,
+    DIOPTRA_QUEUE,
+    DIOPTRA_RESUMED_FROM_JOB_ID,
+    DIOPTRA_RESUMED_FROM_RUN_ID,
+)
+from dioptra.rq.bookkeeping import JobBookkeeper
+
+
+class _FakeDatabaseClient(object):
+    def __init__(self, error=None):
+        self.error = error
+        self.started = []
+        self.threads = set()
+
+    def start_job(self, job_id, run_id):
+        self.threads.add(threading.current_thread())
+
+        if self.error:
+            raise self.error
+
+        self.started.append((job_id, run_id))
+
+        return {"job_id": job_id, "queue": "worker_queue", "depends_on": None}
+
+    def get_job(self, job_id):
+        return {"job_id": job_id, "mlflow_run_id": "run_" + job_id}
+
+
+class _FakeMlflowClient(object):
+    def __init__(self):
+        self.batches = []
+        self.artifacts = {}
+
+    def log_batch(self, run_id, metrics=(), params=(), tags=()):
+        self.batches.append((run_id, list(params), list(tags)))
+
+    def log_dict(self, run_id, dictionary, artifact_file):
+        self.artifacts[(run_id, artifact_file)] = dictionary
+
+
+def test_start_job_batches_writes_in_background():
+    db_client = _FakeDatabaseClient()
+    mlflow_client = _FakeMlflowClient()
+    experiment = {"graph": {}}
+    global_parameters = {"a": 1, "b": "x"}
+
+    with JobBookkeeper(db_client, mlflow_client) as bookkeeper:
+        bookkeeper.start_job("job0", "run0", experiment, global_parameters)
+        # Changes after submission mustn't leak into the pending write
+        global_parameters["c"] = 3
+        bookkeeper.flush()
+
+    assert db_client.started == [("job0", "run0")]
+    assert threading.current_thread() not in db_client.threads
+
+    ((run_id, params, tags),) = mlflow_client.batches
+    assert run_id == "run0"
+    assert {param.key: param.value for param in params} == {"a": "1", "b": "x"}
+    assert {tag.key: tag.value for tag in tags} == {
+        DIOPTRA_JOB_ID: "job0",
+        DIOPTRA_QUEUE: "worker_queue",
+        DIOPTRA_DEPENDS_ON: "None",
+    }
+    assert mlflow_client.artifacts == {("run0", "experiment.yaml"): experiment}
+
+
+def test_start_job_tags_resumed_job():
+    mlflow_client = _FakeMlflowClient()
+
+    with JobBookkeeper(_FakeDatabaseClient(), mlflow_client) as bookkeeper:
+        bookkeeper.start_job("job1", "run1", {}, {}, resumed_from_job_id="job0")
+        bookkeeper.flush()
+
+    ((_, _, tags),) = mlflow_client.batches
+    tags = {tag.key: tag.value for tag in tags}
+    assert tags[DIOPTRA_RESUMED_FROM_JOB_ID] == "job0"
+    assert tags[DIOPTRA_RESUMED_FROM_RUN_ID] == "run_job0"
+
+
+def test_start_job_splits_large_batches():
+    mlflow_client = _FakeMlflowClient()
+    global_parameters = {
+        "param{}".format(i): i for i in range(MAX_PARAMS_TAGS_PER_BATCH + 10)
+    }
+
+    with JobBookkeeper(_FakeDatabaseClient(), mlflow_client) as bookkeeper:
+        bookkeeper.start_job("job0", "run0", {}, global_parameters)
+        bookkeeper.flush()
+
+    assert [len(params) + len(tags) for _, params, tags in mlflow_client.batches] == [
+        MAX_PARAMS_TAGS_PER_BATCH,
+        13,
+    ]
+    assert sum(len(params) for _, params, _ in mlflow_client.batches) == len(
+        global_parameters
+    )
+
+
+def test_flush_raises_background_error():
+    mlflow_client = _FakeMlflowClient()
+    bookkeeper = JobBookkeeper(_FakeDatabaseClient(ValueError("oops")), mlflow_client)
+    bookkeeper.start_job("job0", "run0", {}, {})
+
+    with pytest.raises(ValueError, match="oops"):
+        bookkeeper.flush()
+
+    # The error is only raised once, and stops the rest of the job's start
+    # being recorded.
+    bookkeeper.flush()
+    bookkeeper.close()
+    assert not mlflow_client.batches
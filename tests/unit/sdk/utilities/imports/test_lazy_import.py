@@ -0,0 +1,57 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import sys
+
+import pytest
+
+from dioptra.sdk.utilities.imports import lazy_import
+
+
+@pytest.fixture
+def lazy_module(tmp_path, monkeypatch):
+    (tmp_path / "lazy_test_module.py").write_text(
+        "class Thing:\n    value = 42\n\n\ndef double(x):\n    return 2 * x\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "lazy_test_module"
+    sys.modules.pop("lazy_test_module", None)
+
+
+def test_import_deferred_until_used(lazy_module) -> None:
+    double = lazy_import(lazy_module, "double")
+    module = lazy_import(lazy_module)
+    assert lazy_module not in sys.modules
+
+    assert double(3) == 6
+    assert lazy_module in sys.modules
+    assert module.Thing.value == 42
+
+
+def test_instance_checks_resolve(lazy_module) -> None:
+    Thing = lazy_import(lazy_module, "Thing")
+    thing = Thing()
+
+    assert isinstance(thing, Thing)
+    assert issubclass(type(thing), Thing)
+    assert not isinstance(1, Thing)
+
+
+def test_missing_package_fails_on_use() -> None:
+    missing = lazy_import("dioptra_no_such_package.module", "func")
+
+    with pytest.raises(ModuleNotFoundError):
+        missing()
@@ -0,0 +1,126 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+import dioptra.sdk.utilities.s3.download
+from dioptra.sdk.utilities.s3 import download_files
+
+
+class _FakeS3:
+    """
+    A minimal S3 client with one bucket, whose key listings are paged, and
+    whose downloads may fail a given number of times per key.
+    """
+
+    def __init__(
+        self,
+        objects: dict[str, bytes],
+        failures: int = 0,
+        error: type[Exception] = ConnectionResetError,
+    ) -> None:
+        self.objects = objects
+        self.failures = {key: failures for key in objects}
+        self.error = error
+        self.lock = threading.Lock()
+
+    def list_objects_v2(
+        self, Bucket: str, Prefix: str, ContinuationToken: Optional[str] = None
+    ) -> dict[str, Any]:
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = keys[start : start + 2]
+        is_truncated = start + 2 < len(keys)
+
+        resp: dict[str, Any] = {
+            "IsTruncated": is_truncated,
+            "Contents": [{"Key": key} for key in page],
+        }
+        if is_truncated:
+            resp["NextContinuationToken"] = str(start + 2)
+
+        return resp
+
+    def download_file(
+        self, bucket: str, key: str, filename: str, Config: Any = None
+    ) -> None:
+        with self.lock:
+            if self.failures[key] > 0:
+                self.failures[key] -= 1
+                raise self.error(key)
+
+        Path(filename).write_bytes(self.objects[key])
+
+
+def _make_objects() -> dict[str, bytes]:
+    return {"data/file{}.dat".format(idx): bytes([idx] * idx) for idx in range(7)}
+
+
+@pytest.mark.parametrize("max_workers", [None, 3])
+def test_download_files(tmp_path, max_workers) -> None:
+    s3 = _FakeS3(_make_objects())
+
+    report = download_files(
+        s3, tmp_path, "bucket", "data/", True, max_workers=max_workers
+    )
+
+    assert report.num_files == 7
+    assert report.num_bytes == sum(range(7))
+    assert {
+        path.relative_to(tmp_path).as_posix(): path.read_bytes()
+        for path in tmp_path.rglob("*.dat")
+    } == s3.objects
+
+
+@pytest.mark.parametrize("max_workers", [None, 3])
+def test_download_files_retries(monkeypatch, tmp_path, max_workers) -> None:
+    monkeypatch.setattr(dioptra.sdk.utilities.s3.download, "_RETRY_BASE_DELAY", 0.0)
+    s3 = _FakeS3(_make_objects(), failures=2)
+
+    report = download_files(
+        s3, tmp_path, "bucket", "data/", max_workers=max_workers, retries=2
+    )
+
+    assert report.num_files == 7
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        Path(key).name for key in s3.objects
+    )
+
+
+@pytest.mark.parametrize("max_workers", [None, 3])
+def test_download_files_error(monkeypatch, tmp_path, max_workers) -> None:
+    monkeypatch.setattr(dioptra.sdk.utilities.s3.download, "_RETRY_BASE_DELAY", 0.0)
+    s3 = _FakeS3(_make_objects(), failures=2)
+
+    with pytest.raises(ConnectionResetError):
+        download_files(
+            s3, tmp_path, "bucket", "data/", max_workers=max_workers, retries=1
+        )
+
+
+def test_download_files_local_error_not_retried(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(dioptra.sdk.utilities.s3.download, "_RETRY_BASE_DELAY", 0.0)
+    s3 = _FakeS3(_make_objects(), failures=1, error=PermissionError)
+
+    with pytest.raises(PermissionError):
+        download_files(s3, tmp_path, "bucket", "data/", retries=2)
+
+    # The first download failed once, and wasn't retried
+    assert sorted(s3.failures.values()) == [0] + [1] * 6
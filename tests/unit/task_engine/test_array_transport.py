@@ -0,0 +1,132 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import os
+from collections.abc import Iterator
+from typing import Any
+
+import numpy as np
+import pytest
+
+import dioptra.task_engine.plan
+import dioptra.task_engine.task_engine
+from dioptra.task_engine.array_transport import (
+    SharedArrayHandle,
+    SharedArrayTransport,
+    export_arrays,
+)
+
+from .test_task_engine import pyplugs_register
+
+
+def make_array(size: int) -> np.ndarray:
+    """Makes a big array, to register with pyplugs"""
+    return np.arange(size, dtype=np.int64)
+
+
+def is_shared(array: np.ndarray) -> bool:
+    """Checks whether an array was passed via shared memory"""
+    return isinstance(array, np.memmap)
+
+
+def check_true(value: Any) -> None:
+    """Raises an exception if the given value is not True"""
+    if value is not True:
+        raise ValueError("Not true: {}".format(value))
+
+
+@pytest.fixture
+def plugins() -> Iterator[None]:
+    with pyplugs_register(make_array, is_shared, check_true):
+        yield
+
+
+@pytest.fixture
+def transport() -> Iterator[SharedArrayTransport]:
+    transport = SharedArrayTransport(min_size=1024)
+
+    try:
+        yield transport
+    finally:
+        transport.close()
+
+
+def test_transport_lifecycle(transport) -> None:
+    big = np.ones(1024)
+    small = np.ones(2)
+
+    exported = export_arrays((big, small, "x"), transport.directory, 1024)
+    assert isinstance(exported[0], SharedArrayHandle)
+    assert exported[1] is small
+    assert exported[2] == "x"
+
+    attached = transport.attach("step1", exported)
+    assert isinstance(attached[0], np.memmap)
+    np.testing.assert_array_equal(attached[0], big)
+
+    # Arrays opened by the transport are encoded as handles; others are not
+    assert transport.encode([attached[0], {"a": big}]) == [exported[0], {"a": big}]
+
+    transport.release("step1")
+    assert not os.path.exists(exported[0].path)
+
+    # The array stays usable after its file is released
+    np.testing.assert_array_equal(attached[0], big)
+
+    directory = transport.directory
+    transport.close()
+    assert not os.path.exists(directory)
+
+
+@pytest.mark.parametrize("min_size, expect_shared", [(1024, True), (None, False)])
+def test_process_pool_shared_arrays(plugins, min_size, expect_shared) -> None:
+    desc = {
+        "tasks": {
+            "make_array": {
+                "plugin": "tests.unit.task_engine.test_array_transport.make_array",
+                "outputs": {"array": "any"},
+            },
+            "is_shared": {
+                "plugin": "tests.unit.task_engine.test_array_transport.is_shared",
+                "outputs": {"shared": "boolean"},
+            },
+            "check_true": {
+                "plugin": "tests.unit.task_engine.test_array_transport.check_true"
+            },
+        },
+        "graph": {
+            "array": {"make_array": [1024]},
+            "shared": {"is_shared": ["$array"]},
+            "check": {"check_true": ["$shared"]},
+        },
+    }
+
+    plan = dioptra.task_engine.plan.compile_experiment(desc)
+
+    if expect_shared:
+        dioptra.task_engine.task_engine.run_plan(
+            plan, {}, max_workers=2, use_processes=True, shared_array_min_size=min_size
+        )
+
+    else:
+        with pytest.raises(ValueError):
+            dioptra.task_engine.task_engine.run_plan(
+                plan,
+                {},
+                max_workers=2,
+                use_processes=True,
+                shared_array_min_size=min_size,
+            )
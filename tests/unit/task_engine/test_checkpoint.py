@@ -0,0 +1,132 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+import dioptra.task_engine.task_engine
+from dioptra.task_engine.checkpoint import StepCheckpointStore, compute_run_digest
+
+from .test_task_engine import pyplugs_register
+
+_calls: list[Any] = []
+_fail = False
+
+
+@pytest.fixture
+def plugins() -> Iterator[None]:
+    global _fail
+    _calls.clear()
+    _fail = False
+
+    with pyplugs_register(logged_add, maybe_fail):
+        yield
+
+
+def logged_add(a: Any, b: Any) -> Any:
+    """Simple function which logs its calls, to register with pyplugs"""
+    _calls.append((a, b))
+    return a + b
+
+
+def maybe_fail(n: Any) -> Any:
+    """Simple function which fails on demand, to register with pyplugs"""
+    if _fail:
+        raise RuntimeError("failed on purpose")
+    return n
+
+
+_DESC = {
+    "tasks": {
+        "add": {
+            "plugin": "tests.unit.task_engine.test_checkpoint.logged_add",
+            "outputs": {"value": "integer"},
+        },
+        "maybe_fail": {
+            "plugin": "tests.unit.task_engine.test_checkpoint.maybe_fail",
+            "outputs": {"value": "integer"},
+        },
+    },
+    "graph": {
+        "step1": {"add": [1, 2]},
+        "step2": {"add": ["$step1", 3]},
+        "step3": {"maybe_fail": "$step2"},
+        "step4": {"add": ["$step3", "$step1"]},
+    },
+}
+
+
+def test_resume(tmp_path, plugins) -> None:
+    global _fail
+
+    digest = compute_run_digest(_DESC, {})
+    _fail = True
+
+    with pytest.raises(RuntimeError):
+        dioptra.task_engine.task_engine.run_experiment(
+            _DESC, {}, checkpoint=StepCheckpointStore(tmp_path, digest)
+        )
+
+    assert _calls == [(1, 2), (3, 3)]
+
+    _fail = False
+    _calls.clear()
+
+    dioptra.task_engine.task_engine.run_experiment(
+        _DESC, {}, checkpoint=StepCheckpointStore(tmp_path, digest), resume=True
+    )
+
+    # Only step4 needed to be run; it used restored outputs.
+    assert _calls == [(6, 3)]
+
+
+def test_run_digest_key_types() -> None:
+    # Keys of mixed types are fine, and are told apart from their strings
+    assert compute_run_digest(_DESC, {1: "a", "b": 2}) != compute_run_digest(
+        _DESC, {"1": "a", "b": 2}
+    )
+    assert compute_run_digest(_DESC, {"b": 2, 1: "a"}) == compute_run_digest(
+        _DESC, {1: "a", "b": 2}
+    )
+
+
+def test_resume_different_run(tmp_path, plugins) -> None:
+    store = StepCheckpointStore(tmp_path, compute_run_digest(_DESC, {}))
+    dioptra.task_engine.task_engine.run_experiment(_DESC, {}, checkpoint=store)
+
+    _calls.clear()
+
+    # Checkpoints for a different run digest must be ignored.
+    store = StepCheckpointStore(tmp_path, compute_run_digest(_DESC, {"x": 1}))
+    dioptra.task_engine.task_engine.run_experiment(
+        _DESC, {}, checkpoint=store, resume=True
+    )
+
+    assert _calls == [(1, 2), (3, 3), (6, 3)]
+
+
+def test_unserializable_output(tmp_path) -> None:
+    store = StepCheckpointStore(tmp_path, "digest")
+
+    store.save("step1", {"value": 1})
+    store.save("step/2", {})
+    store.save("step3", {"value": lambda: 1})
+
+    store = StepCheckpointStore(tmp_path, "digest")
+
+    assert store.load() == {"step1": {"value": 1}, "step/2": {}}
@@ -0,0 +1,196 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import json
+import pathlib
+from collections.abc import Iterator
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import dioptra.task_engine.task_engine
+from dioptra.task_engine.estimate import (
+    TimingHistory,
+    estimate_experiment,
+    get_estimate_summary,
+    load_timing_history_from_mlflow,
+)
+from dioptra.task_engine.step_cache import StepOutputCache
+
+from .test_task_engine import pyplugs_register
+
+_ADD_PLUGIN_ID = "tests.unit.task_engine.test_estimate.add"
+_SLOW_ADD_PLUGIN_ID = "tests.unit.task_engine.test_estimate.slow_add"
+
+
+def add(a: Any, b: Any) -> Any:
+    """Simple function to register with pyplugs"""
+    return a + b
+
+
+def slow_add(a: Any, b: Any) -> Any:
+    """Simple function to register with pyplugs"""
+    return a + b
+
+
+@pytest.fixture
+def add_plugins() -> Iterator[None]:
+    with pyplugs_register(add, slow_add):
+        yield
+
+
+def _make_desc() -> dict[str, Any]:
+    return {
+        "tasks": {
+            "add": {
+                "plugin": _ADD_PLUGIN_ID,
+                "outputs": {"value": "integer"},
+                "cache": True,
+            },
+            "slow_add": {
+                "plugin": _SLOW_ADD_PLUGIN_ID,
+                "outputs": {"value": "integer"},
+                "cache": True,
+            },
+        },
+        "graph": {
+            "a": {"add": [1, 2]},
+            "b": {"slow_add": ["$a", 1]},
+            "c": {"add": [3, 4]},
+            "d": {"add": ["$b", "$c"]},
+        },
+    }
+
+
+def _make_report() -> list[dict[str, Any]]:
+    return [
+        {
+            "step_name": "x",
+            "task_plugin_id": _ADD_PLUGIN_ID,
+            "cache_hit": False,
+            "wall_time": 1.0,
+            "peak_rss_delta": 100,
+        },
+        {
+            "step_name": "y",
+            "task_plugin_id": _ADD_PLUGIN_ID,
+            "cache_hit": False,
+            "wall_time": 3.0,
+            "peak_rss_delta": 50,
+        },
+        {
+            "step_name": "z",
+            "task_plugin_id": _ADD_PLUGIN_ID,
+            "cache_hit": True,
+        },
+        {
+            "step_name": "b",
+            "cache_hit": False,
+            "wall_time": 10.0,
+            "peak_rss_delta": 50,
+        },
+    ]
+
+
+@pytest.mark.parametrize(
+    "max_workers, duration, peak_memory", [(None, 16.0, 100), (2, 14.0, 200)]
+)
+def test_estimate(add_plugins, max_workers, duration, peak_memory) -> None:
+    history = TimingHistory()
+    history.add_report(_make_report())
+
+    estimate = estimate_experiment(_make_desc(), {}, history, max_workers=max_workers)
+
+    assert estimate.critical_path == ("a", "b", "d")
+    assert estimate.critical_path_time == 14.0
+    assert estimate.duration == duration
+    assert estimate.peak_memory == peak_memory
+    assert estimate.unmeasured_steps == ()
+
+    assert estimate.steps["a"].wall_time == 2.0
+    assert estimate.steps["a"].peak_rss_delta == 100
+    assert estimate.steps["b"].wall_time == 10.0
+    assert not any(step.cache_hit for step in estimate.steps.values())
+
+    summary = get_estimate_summary(estimate)
+    assert json.loads(json.dumps(summary)) == summary
+
+
+def test_estimate_unmeasured(add_plugins) -> None:
+    estimate = estimate_experiment(_make_desc(), {}, TimingHistory())
+
+    assert estimate.duration == 0.0
+    assert set(estimate.unmeasured_steps) == {"a", "b", "c", "d"}
+    assert estimate.steps["a"].wall_time is None
+
+
+def test_estimate_cache_hits(add_plugins, tmp_path) -> None:
+    cache = StepOutputCache(tmp_path)
+    dioptra.task_engine.task_engine.run_experiment(_make_desc(), {}, step_cache=cache)
+
+    history = TimingHistory()
+    history.add_report(_make_report())
+
+    estimate = estimate_experiment(_make_desc(), {}, history, step_cache=cache)
+
+    # Steps which consume outputs of other steps can't be predicted, and are
+    # assumed to run.
+    assert estimate.steps["a"].cache_hit
+    assert estimate.steps["b"].cache_hit is None
+    assert estimate.steps["c"].cache_hit
+    assert estimate.steps["d"].cache_hit is None
+    assert estimate.critical_path_time == 12.0
+    assert estimate.duration == 12.0
+
+
+def test_load_timing_history_from_mlflow(add_plugins, tmp_path) -> None:
+    artifacts = {
+        "step_profile.json": [_make_report()[0]],
+        "step_profiles/b.json": [_make_report()[3]],
+    }
+
+    def list_artifacts(run_id: str, path: str = "") -> list[SimpleNamespace]:
+        if path:
+            return [
+                SimpleNamespace(path="step_profiles/b.json", is_dir=False),
+                SimpleNamespace(path="step_profiles/readme.txt", is_dir=False),
+            ]
+
+        return [
+            SimpleNamespace(path="step_profile.json", is_dir=False),
+            SimpleNamespace(path="step_profiles", is_dir=True),
+        ]
+
+    def download_artifacts(run_id: str, path: str, dst_path: str) -> str:
+        local_path = pathlib.Path(dst_path, path)
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        local_path.write_text(json.dumps(artifacts[path]), encoding="utf-8")
+        return str(local_path)
+
+    client = SimpleNamespace(
+        search_runs=lambda *args, **kwargs: [
+            SimpleNamespace(info=SimpleNamespace(run_id="run1"))
+        ],
+        list_artifacts=list_artifacts,
+        download_artifacts=download_artifacts,
+    )
+
+    history = load_timing_history_from_mlflow(client, ["1"])
+    estimate = estimate_experiment(_make_desc(), {}, history)
+
+    assert estimate.steps["a"].wall_time == 1.0
+    assert estimate.steps["b"].wall_time == 10.0
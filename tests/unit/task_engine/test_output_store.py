@@ -0,0 +1,116 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import io
+import pickle
+
+import boto3
+import botocore.stub
+import pytest
+
+from dioptra.task_engine.output_store import (
+    LocalStepOutputStore,
+    S3StepOutputStore,
+    StepOutputStore,
+    make_step_output_store,
+)
+
+
+def test_incomplete_store_subclass() -> None:
+    class _WriteOnlyStore(StepOutputStore):
+        def _write(self, key, data):
+            pass
+
+    with pytest.raises(TypeError):
+        _WriteOnlyStore()
+
+
+def test_local_store(tmp_path) -> None:
+    store = LocalStepOutputStore(tmp_path / "store")
+
+    assert store.get("step1") is None
+
+    store.put("step1", {"value": [1, 2, 3]})
+    # Step names needn't be legal filenames
+    store.put("step/2", {"a": 1, "b": "two"})
+
+    # Another store at the same location, e.g. in another job, sees them
+    other_store = make_step_output_store(str(tmp_path / "store"))
+    assert isinstance(other_store, LocalStepOutputStore)
+    assert other_store.get("step1") == {"value": [1, 2, 3]}
+    assert other_store.get("step/2") == {"a": 1, "b": "two"}
+
+    store.clear()
+
+    assert not (tmp_path / "store").exists()
+    assert other_store.get("step1") is None
+
+
+def test_s3_store() -> None:
+    s3 = boto3.client(
+        "s3",
+        region_name="us-east-1",
+        aws_access_key_id="key",
+        aws_secret_access_key="secret",
+    )
+    stubber = botocore.stub.Stubber(s3)
+
+    step_data = pickle.dumps({"value": 1}, protocol=pickle.HIGHEST_PROTOCOL)
+
+    stubber.add_response(
+        "put_object",
+        {},
+        {"Bucket": "outputs", "Key": "runs/job0/step1.pkl", "Body": step_data},
+    )
+    stubber.add_response(
+        "get_object",
+        {"Body": io.BytesIO(step_data)},
+        {"Bucket": "outputs", "Key": "runs/job0/step1.pkl"},
+    )
+    stubber.add_client_error(
+        "get_object",
+        "NoSuchKey",
+        expected_params={"Bucket": "outputs", "Key": "runs/job0/step2.pkl"},
+    )
+    stubber.add_response(
+        "list_objects_v2",
+        {"IsTruncated": False, "Contents": [{"Key": "runs/job0/step1.pkl"}]},
+        {"Bucket": "outputs", "Prefix": "runs/job0/"},
+    )
+    stubber.add_response(
+        "delete_objects",
+        {},
+        {
+            "Bucket": "outputs",
+            "Delete": {"Objects": [{"Key": "runs/job0/step1.pkl"}]},
+        },
+    )
+
+    with stubber:
+        store = make_step_output_store("s3://outputs/runs/job0", s3)
+        assert isinstance(store, S3StepOutputStore)
+
+        store.put("step1", {"value": 1})
+        assert store.get("step1") == {"value": 1}
+        assert store.get("step2") is None
+        store.clear()
+
+    stubber.assert_no_pending_responses()
+
+
+def test_s3_store_requires_client() -> None:
+    with pytest.raises(ValueError):
+        make_step_output_store("s3://outputs/runs/job0")
@@ -0,0 +1,94 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+import dioptra.task_engine.plan
+from dioptra.task_engine.partition import PlanPartition, partition_plan
+
+from .test_task_engine import add, hello, pyplugs_register, square
+
+
+@pytest.fixture
+def plugins() -> Iterator[None]:
+    with pyplugs_register(add, hello, square):
+        yield
+
+
+def _make_desc() -> dict[str, Any]:
+    return {
+        "tasks": {
+            "add": {
+                "plugin": "tests.unit.task_engine.test_task_engine.add",
+                "outputs": {"value": "integer"},
+            },
+            "square": {
+                "plugin": "tests.unit.task_engine.test_task_engine.square",
+                "outputs": {"value": "integer"},
+            },
+            "hello": {"plugin": "tests.unit.task_engine.test_task_engine.hello"},
+        },
+        "graph": {
+            "step1": {"add": [1, 2]},
+            "step2": {"square": "$step1"},
+            # step2 fans out...
+            "step3": {"add": ["$step2", 1]},
+            "step4": {"add": ["$step2", 2]},
+            # ...and back in
+            "step5": {"add": ["$step3", "$step4"]},
+            "step6": {"dependencies": ["step5"], "hello": []},
+            # An independent step
+            "step7": {"hello": []},
+        },
+    }
+
+
+def test_partition_plan(plugins) -> None:
+    plan = dioptra.task_engine.plan.compile_experiment(_make_desc())
+
+    partitions = partition_plan(plan)
+
+    assert sorted(partitions) == [
+        PlanPartition("step1", ("step1", "step2"), ()),
+        PlanPartition("step3", ("step3",), ("step1",)),
+        PlanPartition("step4", ("step4",), ("step1",)),
+        PlanPartition("step5", ("step5", "step6"), ("step3", "step4")),
+        PlanPartition("step7", ("step7",), ()),
+    ]
+
+    # Partitions are in dependency order
+    seen: set[str] = set()
+    for partition in partitions:
+        assert seen.issuperset(partition.dependencies)
+        seen.add(partition.name)
+
+
+def test_partition_plan_chain(plugins) -> None:
+    desc = _make_desc()
+    desc["graph"] = {
+        "step1": {"add": [1, 2]},
+        "step2": {"square": "$step1"},
+        "step3": {"square": "$step2"},
+    }
+
+    plan = dioptra.task_engine.plan.compile_experiment(desc)
+
+    assert partition_plan(plan) == [
+        PlanPartition("step1", ("step1", "step2", "step3"), ())
+    ]
@@ -0,0 +1,159 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+import dioptra.task_engine.plan
+import dioptra.task_engine.task_engine
+from dioptra.sdk.exceptions.task_engine import (
+    StepNotFoundError,
+    UnresolvableReferenceError,
+)
+
+from .test_task_engine import pyplugs_register
+
+_calls: list[Any] = []
+
+
+def record(value: Any) -> Any:
+    """Records the values it was called with, to register with pyplugs"""
+    _calls.append(value)
+    return value
+
+
+def append_one(values: list[Any]) -> list[Any]:
+    """Modifies its argument, to register with pyplugs"""
+    values.append(1)
+    return values
+
+
+@pytest.fixture
+def plugins() -> Iterator[None]:
+    _calls.clear()
+
+    with pyplugs_register(record), pyplugs_register(append_one):
+        yield
+
+
+def _make_desc() -> dict[str, Any]:
+    return {
+        "parameters": {"a": 1},
+        "tasks": {
+            "record": {
+                "plugin": "tests.unit.task_engine.test_plan.record",
+                "outputs": {"value": "any"},
+            },
+            "append_one": {
+                "plugin": "tests.unit.task_engine.test_plan.append_one",
+                "outputs": {"value": "any"},
+            },
+        },
+        "graph": {
+            "step1": {"record": ["$a"]},
+            "step2": {"record": [{"x": ["$step1.value", "$$escaped"]}]},
+            "step3": {"append_one": [[]]},
+            "step4": {"record": ["$step3"]},
+        },
+    }
+
+
+def test_compile(plugins) -> None:
+    plan = dioptra.task_engine.plan.compile_experiment(_make_desc())
+
+    assert plan.step_order.index("step1") < plan.step_order.index("step2")
+    assert plan.step_order.index("step3") < plan.step_order.index("step4")
+    assert plan.dependencies["step2"] == ("step1",)
+    assert plan.consumers["step1"] == ("step2",)
+
+    step1 = plan.steps["step1"]
+    assert step1.plugin_func is record
+    assert step1.args == (dioptra.task_engine.plan.ParameterReference("a"),)
+
+    step2 = plan.steps["step2"]
+    assert step2.args == (
+        dioptra.task_engine.plan.DictArg(
+            (
+                (
+                    "x",
+                    dioptra.task_engine.plan.ListArg(
+                        (
+                            dioptra.task_engine.plan.OutputReference("step1", "value"),
+                            dioptra.task_engine.plan.Constant("$escaped"),
+                        )
+                    ),
+                ),
+            )
+        ),
+    )
+
+    # Literal arguments are folded into constants
+    assert plan.steps["step3"].args == (dioptra.task_engine.plan.Constant([]),)
+
+    with pytest.raises(TypeError):
+        plan.steps["step5"] = step1  # type: ignore[index]
+
+
+def test_run_plan_repeatedly(plugins) -> None:
+    plan = dioptra.task_engine.plan.compile_experiment(_make_desc())
+
+    dioptra.task_engine.task_engine.run_plan(plan, {})
+    dioptra.task_engine.task_engine.run_plan(plan, {"a": 2}, max_workers=2)
+
+    # A plugin which modifies its constant argument doesn't affect later runs
+    assert sorted(_calls, key=str) == sorted(
+        [1, {"x": [1, "$escaped"]}, [1], 2, {"x": [2, "$escaped"]}, [1]], key=str
+    )
+
+
+@pytest.mark.parametrize(
+    "reference, error_type",
+    [
+        ("$foo", UnresolvableReferenceError),
+        ("$foo.value", StepNotFoundError),
+    ],
+)
+def test_compile_bad_reference(plugins, reference, error_type) -> None:
+    desc = _make_desc()
+    desc["graph"]["step4"]["record"] = [reference]
+
+    with pytest.raises(error_type) as exc_info:
+        dioptra.task_engine.plan.compile_experiment(desc)
+
+    assert exc_info.value.context_step_name == "step4"
+
+
+def test_compile_stream_outputs(plugins) -> None:
+    desc = _make_desc()
+    desc["tasks"]["stream"] = {
+        "plugin": "tests.unit.task_engine.test_plan.record",
+        "inputs": [{"name": "value", "type": "any", "stream": True}],
+        "outputs": {"value": "any"},
+    }
+    desc["graph"]["step5"] = {"stream": ["$step4"]}
+    desc["graph"]["step6"] = {"stream": {"value": ["$step2"]}}
+    desc["graph"]["step7"] = {"stream": ["$step1"]}
+
+    plan = dioptra.task_engine.plan.compile_experiment(desc)
+
+    # step1's output is also consumed by step2, and step2's is nested in a
+    # list, so only step4's may be streamed.
+    assert plan.stream_outputs == {("step4", "value")}
+
+    sliced_plan = dioptra.task_engine.plan.slice_plan(plan, ["step4"])
+    assert sliced_plan.stream_outputs == frozenset()
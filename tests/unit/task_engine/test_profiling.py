@@ -0,0 +1,175 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import asyncio
+import concurrent.futures
+import threading
+import tracemalloc
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+import dioptra.task_engine.task_engine
+from dioptra.task_engine.profiling import (
+    StepProfile,
+    StepProfiler,
+    call_profiled,
+    call_profiled_async,
+    get_profile_summary,
+)
+from dioptra.task_engine.step_cache import StepOutputCache
+
+from .test_task_engine import pyplugs_register
+
+
+def allocate(size: int) -> list[int]:
+    """Allocates some memory, to register with pyplugs"""
+    return list(range(size))
+
+
+@pytest.fixture
+def allocate_plugin() -> Iterator[None]:
+    with pyplugs_register(allocate):
+        yield
+
+
+def _make_desc() -> dict[str, Any]:
+    return {
+        "tasks": {
+            "allocate": {
+                "plugin": "tests.unit.task_engine.test_profiling.allocate",
+                "outputs": {"values": "any"},
+                "cache": True,
+            }
+        },
+        "graph": {
+            "step1": {"allocate": [10]},
+            "step2": {"allocate": [100000]},
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    "max_workers, use_processes", [(None, False), (2, False), (2, True)]
+)
+def test_profile_steps(allocate_plugin, max_workers, use_processes) -> None:
+    profiler = StepProfiler(cprofile_steps=["step1"], tracemalloc_steps=["step2"])
+
+    dioptra.task_engine.task_engine.run_experiment(
+        _make_desc(),
+        {},
+        max_workers=max_workers,
+        use_processes=use_processes,
+        profiler=profiler,
+    )
+
+    report = {summary["step_name"]: summary for summary in profiler.get_report()}
+    assert report.keys() == {"step1", "step2"}
+
+    for summary in report.values():
+        assert not summary["cache_hit"]
+        assert summary["wall_time"] >= 0
+        assert summary["cpu_time"] >= 0
+        assert summary["arg_resolution_time"] >= 0
+
+    # Only the first step to use a plugin is charged for importing it
+    assert (
+        report["step1"]["plugin_import_time"] == 0
+        or report["step2"]["plugin_import_time"] == 0
+    )
+
+    assert "allocate" in report["step1"]["cprofile_stats"]
+    assert "tracemalloc_stats" not in report["step1"]
+    assert "test_profiling.py" in report["step2"]["tracemalloc_stats"]
+    assert "cprofile_stats" not in report["step2"]
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_profile_step_with_timeout(allocate_plugin, max_workers) -> None:
+    # With a timeout, the plugin runs in a thread of its own, which is where
+    # it must be measured.
+    desc = _make_desc()
+    desc["graph"] = {
+        "step1": {"task": "allocate", "args": [1000000], "timeout": 60, "retries": 1}
+    }
+    profiler = StepProfiler(cprofile_steps=["step1"])
+
+    dioptra.task_engine.task_engine.run_experiment(
+        desc, {}, max_workers=max_workers, profiler=profiler
+    )
+
+    (summary,) = profiler.get_report()
+    assert summary["cpu_time"] > 0
+    assert "allocate" in summary["cprofile_stats"]
+
+
+def test_concurrent_tracemalloc() -> None:
+    started = threading.Event()
+    first_done = threading.Event()
+
+    def wait_for_first() -> list[int]:
+        started.set()
+        first_done.wait(10)
+        return allocate(1000)
+
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+
+        def start_second() -> concurrent.futures.Future:
+            future = executor.submit(call_profiled, False, True, wait_for_first)
+            started.wait(10)
+            return future
+
+        # The first call starts tracing, and finishes while the second call
+        # still needs it.
+        future, first_stats = call_profiled(False, True, start_second)
+        first_done.set()
+        _, second_stats = future.result()
+
+    assert first_stats.tracemalloc_stats is not None
+    assert second_stats.tracemalloc_stats is not None
+    assert not tracemalloc.is_tracing()
+
+
+def test_profile_async_call() -> None:
+    async def async_allocate(size: int) -> list[int]:
+        return allocate(size)
+
+    output, call_stats = asyncio.run(call_profiled_async(async_allocate, 10))
+
+    assert output == list(range(10))
+    assert call_stats.wall_time >= 0
+    # CPU time isn't measured for coroutines, rather than reported as zero
+    assert call_stats.cpu_time is None
+
+    profiler = StepProfiler()
+    profiler.add(StepProfile("step1", 0.0, 0.0, False, call_stats))
+    assert profiler.get_report()[0]["cpu_time"] is None
+
+
+def test_profile_cache_hit(allocate_plugin, tmp_path) -> None:
+    cache = StepOutputCache(tmp_path)
+    dioptra.task_engine.task_engine.run_experiment(_make_desc(), {}, step_cache=cache)
+
+    profiler = StepProfiler()
+    dioptra.task_engine.task_engine.run_experiment(
+        _make_desc(), {}, step_cache=cache, profiler=profiler
+    )
+
+    for profile in profiler.profiles:
+        assert profile.cache_hit
+        assert profile.call_stats is None
+        assert "wall_time" not in get_profile_summary(profile)
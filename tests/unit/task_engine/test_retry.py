@@ -0,0 +1,141 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import asyncio
+import pickle
+import threading
+from typing import Any
+
+import pytest
+
+import dioptra.task_engine.retry
+from dioptra.sdk.exceptions.task_engine import StepTimeoutError
+from dioptra.task_engine.retry import call_with_retries, call_with_retries_async
+
+
+@pytest.fixture(autouse=True)
+def no_delay(monkeypatch) -> None:
+    monkeypatch.setattr(dioptra.task_engine.retry, "RETRY_BASE_DELAY", 0.0)
+
+
+class Flaky:
+    """Raises the given error on its first few calls, then returns a value"""
+
+    def __init__(self, failures: int, error: Exception) -> None:
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def __call__(self, value: Any) -> Any:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return value
+
+    async def call_async(self, value: Any) -> Any:
+        return self(value)
+
+
+def test_retry_transient() -> None:
+    flaky = Flaky(2, ConnectionResetError("reset"))
+
+    assert call_with_retries("step1", None, 2, False, flaky, "ok") == "ok"
+    assert flaky.calls == 3
+
+
+def test_retry_exhausted() -> None:
+    flaky = Flaky(3, ConnectionResetError("reset"))
+
+    with pytest.raises(ConnectionResetError):
+        call_with_retries("step1", None, 2, False, flaky, "ok")
+
+    assert flaky.calls == 3
+
+
+def test_retry_not_transient() -> None:
+    flaky = Flaky(1, ValueError("bad"))
+
+    with pytest.raises(ValueError):
+        call_with_retries("step1", None, 2, False, flaky, "ok")
+
+    assert flaky.calls == 1
+
+
+def test_retry_not_transient_os_error() -> None:
+    flaky = Flaky(1, FileNotFoundError("missing"))
+
+    with pytest.raises(FileNotFoundError):
+        call_with_retries("step1", None, 2, False, flaky, "ok")
+
+    assert flaky.calls == 1
+
+
+@pytest.mark.parametrize("retry_timeouts, expected_calls", [(False, 1), (True, 2)])
+def test_timeout(retry_timeouts: bool, expected_calls: int) -> None:
+    released = threading.Event()
+    calls = []
+
+    def hang() -> None:
+        calls.append(1)
+        released.wait(10)
+
+    try:
+        with pytest.raises(StepTimeoutError) as exc_info:
+            call_with_retries("step1", 0.05, 1, retry_timeouts, hang)
+    finally:
+        released.set()
+
+    assert exc_info.value.timeout == 0.05
+    # Timed out threads keep running, so are only retried on request
+    assert len(calls) == expected_calls
+
+
+def test_timeout_not_reached() -> None:
+    assert call_with_retries("step1", 10, 0, False, lambda a, b=0: a + b, 1, b=2) == 3
+
+
+def test_retry_async() -> None:
+    flaky = Flaky(1, ConnectionResetError("reset"))
+
+    assert (
+        asyncio.run(call_with_retries_async("step1", None, 1, flaky.call_async, "ok"))
+        == "ok"
+    )
+    assert flaky.calls == 2
+
+
+def test_timeout_async() -> None:
+    cancelled = []
+
+    async def hang() -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    with pytest.raises(StepTimeoutError):
+        asyncio.run(call_with_retries_async("step1", 0.05, 0, hang))
+
+    # Unlike threads, coroutines are cancelled
+    assert cancelled == [1]
+
+
+def test_timeout_error_pickle() -> None:
+    error = pickle.loads(pickle.dumps(StepTimeoutError(1.5, "step1")))
+
+    assert error.timeout == 1.5
+    assert error.context_step_name == "step1"
@@ -0,0 +1,122 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+import dioptra.task_engine.task_engine
+from dioptra.task_engine.step_cache import StepOutputCache
+
+from .test_task_engine import pyplugs_register
+
+_num_calls = 0
+
+
+@pytest.fixture
+def counted_add_plugin() -> Iterator[None]:
+    global _num_calls
+    _num_calls = 0
+
+    with pyplugs_register(counted_add):
+        yield
+
+
+def counted_add(a: Any, b: Any) -> Any:
+    """Simple function which counts its calls, to register with pyplugs"""
+    global _num_calls
+    _num_calls += 1
+    return a + b
+
+
+def _make_desc(cache: bool) -> dict[str, Any]:
+    return {
+        "tasks": {
+            "add": {
+                "plugin": "tests.unit.task_engine.test_step_cache.counted_add",
+                "outputs": {"value": "integer"},
+                "cache": cache,
+            }
+        },
+        "graph": {
+            "step1": {"add": [1, 2]},
+            "step2": {"add": ["$step1", 3]},
+        },
+    }
+
+
+def test_cache_reuse(tmp_path, counted_add_plugin) -> None:
+    cache = StepOutputCache(tmp_path)
+    desc = _make_desc(True)
+
+    dioptra.task_engine.task_engine.run_experiment(desc, {}, step_cache=cache)
+    assert _num_calls == 2
+
+    dioptra.task_engine.task_engine.run_experiment(desc, {}, step_cache=cache)
+    assert _num_calls == 2
+
+    # Change an arg of step2: step1 still comes from the cache.
+    desc["graph"]["step2"]["add"][1] = 4
+    dioptra.task_engine.task_engine.run_experiment(
+        desc, {}, max_workers=2, step_cache=cache
+    )
+    assert _num_calls == 3
+
+
+def test_cache_opt_out(tmp_path, counted_add_plugin) -> None:
+    cache = StepOutputCache(tmp_path, cache_by_default=True)
+    desc = _make_desc(False)
+
+    dioptra.task_engine.task_engine.run_experiment(desc, {}, step_cache=cache)
+    dioptra.task_engine.task_engine.run_experiment(desc, {}, step_cache=cache)
+    assert _num_calls == 4
+
+    del desc["tasks"]["add"]["cache"]
+    dioptra.task_engine.task_engine.run_experiment(desc, {}, step_cache=cache)
+    dioptra.task_engine.task_engine.run_experiment(desc, {}, step_cache=cache)
+    assert _num_calls == 6
+
+
+def test_cache_key(tmp_path, counted_add_plugin) -> None:
+    plugin_id = "tests.unit.task_engine.test_step_cache.counted_add"
+    cache = StepOutputCache(tmp_path)
+
+    assert cache.make_key(plugin_id, [1, 2], {}) == cache.make_key(
+        plugin_id, [1, 2], {}
+    )
+    assert cache.make_key(plugin_id, [1], {"b": 2, "c": 3}) == cache.make_key(
+        plugin_id, [1], {"c": 3, "b": 2}
+    )
+    assert cache.make_key(plugin_id, [1, 2], {}) != cache.make_key(
+        plugin_id, [2, 1], {}
+    )
+    # unpicklable args can't be cached
+    assert cache.make_key(plugin_id, [lambda: 1], {}) is None
+
+
+def test_cache_eviction(tmp_path) -> None:
+    cache = StepOutputCache(tmp_path, max_size=1024)
+
+    cache.put("aa01", b"x" * 600)
+    cache.put("aa02", b"y" * 600)
+
+    hit1, _ = cache.get("aa01")
+    hit2, value2 = cache.get("aa02")
+
+    assert not hit1
+    assert hit2
+    assert value2 == b"y" * 600
@@ -0,0 +1,177 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import threading
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+import dioptra.task_engine.plan
+import dioptra.task_engine.sweep
+from dioptra.sdk.exceptions.task_engine import InvalidParameterGridError
+
+from .test_task_engine import pyplugs_register
+
+_calls: list[tuple[str, Any]] = []
+
+
+def load(name: str) -> str:
+    """Stands in for an expensive task, to register with pyplugs"""
+    _calls.append(("load", name))
+    return name
+
+
+def attack(model: str, eps: float) -> str:
+    """Stands in for a parameterized task, to register with pyplugs"""
+    _calls.append(("attack", (model, eps)))
+    return "{}@{}".format(model, eps)
+
+
+def score(result: str, note: str) -> None:
+    """Records its input, to register with pyplugs"""
+    _calls.append(("score", (result, note)))
+
+
+@pytest.fixture
+def plugins() -> Iterator[None]:
+    _calls.clear()
+
+    with pyplugs_register(load), pyplugs_register(attack), pyplugs_register(score):
+        yield
+
+
+def _make_desc() -> dict[str, Any]:
+    plugin_prefix = "tests.unit.task_engine.test_sweep."
+
+    return {
+        "parameters": {"model_name": "m", "eps": 0.1, "note": "n"},
+        "tasks": {
+            "load": {"plugin": plugin_prefix + "load", "outputs": {"m": "string"}},
+            "attack": {"plugin": plugin_prefix + "attack", "outputs": {"r": "string"}},
+            "score": {"plugin": plugin_prefix + "score"},
+        },
+        "graph": {
+            "model": {"load": ["$model_name"]},
+            "adv": {"attack": {"model": "$model", "eps": "$eps"}},
+            "report": {"score": ["$adv", "$note"]},
+        },
+    }
+
+
+def test_expand_parameter_grid() -> None:
+    points = dioptra.task_engine.sweep.expand_parameter_grid(
+        {"a": [1, 2], "b": ["x", "y"]}
+    )
+
+    assert points == [
+        {"a": 1, "b": "x"},
+        {"a": 1, "b": "y"},
+        {"a": 2, "b": "x"},
+        {"a": 2, "b": "y"},
+    ]
+
+
+def test_parameter_dependent_steps(plugins) -> None:
+    plan = dioptra.task_engine.plan.compile_experiment(_make_desc())
+
+    assert dioptra.task_engine.sweep.get_parameter_dependent_steps(plan, ["eps"]) == {
+        "adv",
+        "report",
+    }
+    assert dioptra.task_engine.sweep.get_parameter_dependent_steps(plan, ["note"]) == {
+        "report"
+    }
+    assert dioptra.task_engine.sweep.get_parameter_dependent_steps(
+        plan, ["model_name"]
+    ) == {"model", "adv", "report"}
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_run_sweep(plugins, max_workers) -> None:
+    points = dioptra.task_engine.sweep.run_sweep(
+        _make_desc(), {"note": "hi"}, {"eps": [0.1, 0.2]}, max_workers=max_workers
+    )
+
+    assert points == [{"eps": 0.1}, {"eps": 0.2}]
+
+    # The model is loaded only once
+    assert _calls == [
+        ("load", "m"),
+        ("attack", ("m", 0.1)),
+        ("score", ("m@0.1", "hi")),
+        ("attack", ("m", 0.2)),
+        ("score", ("m@0.2", "hi")),
+    ]
+
+
+@pytest.mark.parametrize(
+    "parameter_grid",
+    [
+        {"foo": [1, 2]},
+        {"eps": []},
+    ],
+)
+def test_invalid_parameter_grid(plugins, parameter_grid) -> None:
+    plan = dioptra.task_engine.plan.compile_experiment(_make_desc())
+
+    with pytest.raises(InvalidParameterGridError):
+        dioptra.task_engine.sweep.ParameterSweep(plan, {}, parameter_grid)
+
+
+class _Model:
+    """Holds a lock, so can't be copied"""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.lock = threading.Lock()
+
+
+def load_model(name: str) -> _Model:
+    """Returns an uncopyable value, to register with pyplugs"""
+    return _Model(name)
+
+
+def use_model(model: _Model, eps: float) -> None:
+    """Records its input, to register with pyplugs"""
+    _calls.append(("use_model", (model, eps)))
+
+
+def test_run_sweep_shares_prefix_outputs() -> None:
+    _calls.clear()
+    plugin_prefix = "tests.unit.task_engine.test_sweep."
+    desc = {
+        "parameters": {"model_name": "m", "eps": 0.1},
+        "tasks": {
+            "load_model": {
+                "plugin": plugin_prefix + "load_model",
+                "outputs": {"model": "any"},
+            },
+            "use_model": {"plugin": plugin_prefix + "use_model"},
+        },
+        "graph": {
+            "model": {"load_model": ["$model_name"]},
+            "result": {"use_model": ["$model", "$eps"]},
+        },
+    }
+
+    with pyplugs_register(load_model), pyplugs_register(use_model):
+        dioptra.task_engine.sweep.run_sweep(desc, {}, {"eps": [0.1, 0.2]})
+
+    # Every point is given the one model the prefix loaded, uncopied
+    (model1, eps1), (model2, eps2) = (args for _, args in _calls)
+    assert model1 is model2
+    assert (eps1, eps2) == (0.1, 0.2)
@@ -14,14 +14,21 @@
 #
 # ACCESS THE FULL CC BY 4.0 LICENSE HERE:
 # https://creativecommons.org/licenses/by/4.0/legalcode
+import asyncio
 import contextlib
 import functools
-from typing import Any, Callable, Iterator, Mapping
+import gc
+import inspect
+import threading
+import time
+import weakref
+from typing import Any, Callable, Iterable, Iterator, Mapping
 
 import pytest
 
 import dioptra.pyplugs
 import dioptra.pyplugs._plugins
+import dioptra.task_engine.retry
 import dioptra.task_engine.task_engine
 from dioptra.sdk.exceptions.task_engine import (
     IllegalOutputReferenceError,
@@ -32,8 +39,10 @@ from dioptra.sdk.exceptions.task_engine import (
     OutputNotFoundError,
     StepNotFoundError,
     StepReferenceCycleError,
+    StepTimeoutError,
     UnresolvableReferenceError,
 )
+from dioptra.task_engine.profiling import StepProfiler
 
 _output = None
 
@@ -88,6 +97,130 @@ def hello() -> str:
     return "hello"
 
 
+# Used to force steps to run at the same time: each party waits for the
+# other(s) to arrive.  If steps were run one at a time, this would time out.
+_barrier = threading.Barrier(2, timeout=10)
+
+
+@capture_return
+def rendezvous(n: Any) -> Any:
+    """
+    Simple function which blocks until another step also calls it, to register
+    with pyplugs, for testing
+    """
+    _barrier.wait()
+    return n
+
+
+def check_equal(a: Any, b: Any) -> None:
+    """
+    Simple function which raises an error if its args are unequal, to register
+    with pyplugs, for testing
+    """
+    if a != b:
+        raise ValueError("{!r} != {!r}".format(a, b))
+
+
+async def async_add(a: Any, b: Any) -> Any:
+    """Simple coroutine function to register with pyplugs, for testing"""
+    await asyncio.sleep(0)
+    return a + b
+
+
+# Coroutine steps which have arrived at async_rendezvous()
+_async_arrivals: set[Any] = set()
+
+
+async def async_rendezvous(n: Any) -> Any:
+    """
+    Simple coroutine function which waits until another step also calls it, to
+    register with pyplugs, for testing.  If steps were not run concurrently on
+    one event loop, this would time out.
+    """
+    _async_arrivals.add(n)
+
+    async def wait_for_other() -> None:
+        while len(_async_arrivals) < 2:
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(wait_for_other(), timeout=10)
+
+    return n
+
+
+def count_up(n: int) -> Iterator[int]:
+    """Simple generator function to register with pyplugs, for testing"""
+    yield from range(1, n + 1)
+
+
+def describe_values(values: Iterable[Any]) -> list[Any]:
+    """
+    Simple function which reports the kind of iterable it was given and the
+    sum of its values, to register with pyplugs, for testing
+    """
+    kind = "generator" if inspect.isgenerator(values) else type(values).__name__
+    return [kind, sum(values)]
+
+
+# Number of times flaky() has been called
+_flaky_calls = 0
+
+
+def flaky(n: Any) -> Any:
+    """
+    Simple function which fails with a transient error on its first call, to
+    register with pyplugs, for testing
+    """
+    global _flaky_calls
+    _flaky_calls += 1
+    if _flaky_calls == 1:
+        raise ConnectionResetError("Connection reset")
+    return n
+
+
+def hang() -> None:
+    """
+    Simple function which takes much longer than a test should, to register
+    with pyplugs, for testing
+    """
+    time.sleep(10)
+
+
+async def async_hang() -> None:
+    """
+    Simple coroutine function which takes much longer than a test should, to
+    register with pyplugs, for testing
+    """
+    await asyncio.sleep(10)
+
+
+class Big:
+    """A stand-in for a large step output"""
+
+
+_big_ref: Any = None
+
+
+def make_big() -> Big:
+    """
+    Simple function which creates an object and remembers a weak reference to
+    it, to register with pyplugs, for testing
+    """
+    global _big_ref
+    big = Big()
+    _big_ref = weakref.ref(big)
+    return big
+
+
+def is_big_alive() -> bool:
+    """
+    Simple function which checks whether the object created by make_big() is
+    still alive, to register with pyplugs, for testing
+    """
+    gc.collect()
+    return _big_ref() is not None
+
+
 @contextlib.contextmanager
 def pyplugs_register(*funcs: Callable[..., Any]) -> Iterator[None]:
     """
@@ -557,3 +690,322 @@ def test_illegal_plugin_name() -> None:
         dioptra.task_engine.task_engine.run_experiment(desc, {})
 
     assert e.value.plugin_name == "foo"
+
+
+@require_plugins(add, rendezvous)
+def test_parallel_independent_steps() -> None:
+    desc = {
+        "tasks": {
+            "add": {"plugin": "tests.unit.task_engine.test_task_engine.add"},
+            "rendezvous": {
+                "plugin": "tests.unit.task_engine.test_task_engine.rendezvous",
+                "outputs": {"value": "integer"},
+            },
+        },
+        "graph": {
+            "step1": {"rendezvous": 1},
+            "step2": {"rendezvous": 2},
+            "step3": {"add": ["$step1", "$step2"]},
+        },
+    }
+
+    _barrier.reset()
+    dioptra.task_engine.task_engine.run_experiment(desc, {}, max_workers=2)
+
+    assert _output == 3
+
+
+@require_plugins(addsub, square)
+def test_parallel_error_context() -> None:
+    desc = {
+        "tasks": {
+            "addsub": {
+                "plugin": "tests.unit.task_engine.test_task_engine.addsub",
+                "outputs": ["sum", "diff"],
+            },
+            "square": {"plugin": "tests.unit.task_engine.test_task_engine.square"},
+        },
+        "graph": {
+            "step1": {"addsub": [1, 2]},
+            "step2": {"square": "$step1"},
+        },
+    }
+
+    with pytest.raises(IllegalOutputReferenceError) as e:
+        dioptra.task_engine.task_engine.run_experiment(desc, {}, max_workers=2)
+
+    assert e.value.context_step_name == "step2"
+    assert e.value.step_name == "step1"
+
+
+@require_plugins(addsub, add, check_equal)
+def test_parallel_processes() -> None:
+    desc = {
+        "tasks": {
+            "addsub": {
+                "plugin": "tests.unit.task_engine.test_task_engine.addsub",
+                "outputs": [{"sum": "integer"}, {"diff": "integer"}],
+            },
+            "add": {
+                "plugin": "tests.unit.task_engine.test_task_engine.add",
+                "outputs": {"value": "integer"},
+            },
+            "check_equal": {
+                "plugin": "tests.unit.task_engine.test_task_engine.check_equal"
+            },
+        },
+        "graph": {
+            "step1": {"addsub": [1, 2]},
+            "step2": {"addsub": [3, 4]},
+            "step3": {"add": ["$step1.sum", "$step2.diff"]},
+            "step4": {"check_equal": ["$step3", 2]},
+        },
+    }
+
+    dioptra.task_engine.task_engine.run_experiment(
+        desc, {}, max_workers=2, use_processes=True
+    )
+
+    desc["graph"]["step4"] = {"check_equal": ["$step3", 3]}
+
+    with pytest.raises(ValueError):
+        dioptra.task_engine.task_engine.run_experiment(
+            desc, {}, max_workers=2, use_processes=True
+        )
+
+
+@require_plugins(make_big, is_big_alive, check_equal)
+def test_outputs_released_after_last_use() -> None:
+    desc = {
+        "tasks": {
+            "make_big": {
+                "plugin": "tests.unit.task_engine.test_task_engine.make_big",
+                "outputs": {"value": "any"},
+            },
+            "is_big_alive": {
+                "plugin": "tests.unit.task_engine.test_task_engine.is_big_alive",
+                "outputs": {"value": "boolean"},
+            },
+            "check_equal": {
+                "plugin": "tests.unit.task_engine.test_task_engine.check_equal"
+            },
+        },
+        "graph": {
+            "step1": {"make_big": []},
+            "step2": {"check_equal": ["$step1", "$step1"]},
+            "step3": {"is_big_alive": [], "dependencies": "step1"},
+            # step3 ran after step1 but possibly before step2
+            "step4": {"is_big_alive": [], "dependencies": "step2"},
+            "step5": {"check_equal": ["$step4", False]},
+        },
+    }
+
+    dioptra.task_engine.task_engine.run_experiment(desc, {})
+    dioptra.task_engine.task_engine.run_experiment(desc, {}, max_workers=2)
+
+
+@require_plugins(async_rendezvous, rendezvous, add, check_equal)
+def test_async_independent_steps() -> None:
+    desc = {
+        "tasks": {
+            "add": {
+                "plugin": "tests.unit.task_engine.test_task_engine.add",
+                "outputs": {"value": "integer"},
+            },
+            "async_rendezvous": {
+                "plugin": "tests.unit.task_engine.test_task_engine.async_rendezvous",
+                "outputs": {"value": "integer"},
+            },
+            "rendezvous": {
+                "plugin": "tests.unit.task_engine.test_task_engine.rendezvous",
+                "outputs": {"value": "integer"},
+            },
+            "check_equal": {
+                "plugin": "tests.unit.task_engine.test_task_engine.check_equal"
+            },
+        },
+        "graph": {
+            # Coroutines overlap on the event loop...
+            "step1": {"async_rendezvous": 1},
+            "step2": {"async_rendezvous": 2},
+            # ...and so do sync plugins in the thread pool.
+            "step3": {"rendezvous": "$step1"},
+            "step4": {"rendezvous": "$step2"},
+            "step5": {"add": ["$step3", "$step4"]},
+            "step6": {"check_equal": ["$step5", 3]},
+        },
+    }
+
+    _async_arrivals.clear()
+    _barrier.reset()
+    dioptra.task_engine.task_engine.run_experiment(desc, {}, max_workers=2)
+
+
+@pytest.mark.parametrize(
+    "run_kwargs",
+    [
+        {},
+        {"max_workers": 2},
+        {"max_workers": 2, "use_processes": True},
+        {"max_workers": 2, "profiler": StepProfiler()},
+    ],
+)
+def test_async_steps(run_kwargs) -> None:
+    desc = {
+        "tasks": {
+            "async_add": {
+                "plugin": "tests.unit.task_engine.test_task_engine.async_add",
+                "outputs": {"value": "integer"},
+            },
+            "check_equal": {
+                "plugin": "tests.unit.task_engine.test_task_engine.check_equal"
+            },
+        },
+        "graph": {
+            "step1": {"async_add": [1, 2]},
+            "step2": {"async_add": ["$step1", 3]},
+            "step3": {"check_equal": ["$step2", 6]},
+        },
+    }
+
+    with pyplugs_register(async_add, check_equal):
+        dioptra.task_engine.task_engine.run_experiment(desc, {}, **run_kwargs)
+
+        desc["graph"]["step3"] = {"check_equal": ["$step2", 7]}
+
+        with pytest.raises(ValueError):
+            dioptra.task_engine.task_engine.run_experiment(desc, {}, **run_kwargs)
+
+
+def _make_stream_desc(stream: bool) -> dict[str, Any]:
+    return {
+        "tasks": {
+            "count_up": {
+                "plugin": "tests.unit.task_engine.test_task_engine.count_up",
+                "outputs": {"values": "any"},
+            },
+            "describe_values": {
+                "plugin": "tests.unit.task_engine.test_task_engine.describe_values",
+                "inputs": [{"name": "values", "type": "any", "stream": stream}],
+                "outputs": {"description": "any"},
+            },
+            "check_equal": {
+                "plugin": "tests.unit.task_engine.test_task_engine.check_equal"
+            },
+        },
+        "graph": {
+            "step1": {"count_up": [3]},
+            "step2": {"describe_values": ["$step1"]},
+            "step3": {"check_equal": ["$step2", ["generator", 6]]},
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    "run_kwargs",
+    [
+        {},
+        {"max_workers": 2},
+        {"max_workers": 2, "profiler": StepProfiler()},
+    ],
+)
+def test_stream_output(run_kwargs) -> None:
+    desc = _make_stream_desc(True)
+
+    with pyplugs_register(count_up, describe_values, check_equal):
+        dioptra.task_engine.task_engine.run_experiment(desc, {}, **run_kwargs)
+
+
+@pytest.mark.parametrize(
+    "run_kwargs",
+    [
+        {},
+        {"max_workers": 2},
+        {"max_workers": 2, "use_processes": True},
+    ],
+)
+def test_stream_output_collected(run_kwargs) -> None:
+    # Without a stream input, the consumer gets a list
+    desc = _make_stream_desc(False)
+    desc["graph"]["step3"] = {"check_equal": ["$step2", ["list", 6]]}
+
+    with pyplugs_register(count_up, describe_values, check_equal):
+        dioptra.task_engine.task_engine.run_experiment(desc, {}, **run_kwargs)
+
+        # Nor does a stream input get a generator when another step consumes
+        # the same output: each must see all of the values.
+        desc = _make_stream_desc(True)
+        desc["graph"]["step3"] = {"check_equal": ["$step2", ["list", 6]]}
+        desc["graph"]["step4"] = {"describe_values": ["$step1.values"]}
+        desc["graph"]["step5"] = {"check_equal": ["$step4", ["list", 6]]}
+
+        dioptra.task_engine.task_engine.run_experiment(desc, {}, **run_kwargs)
+
+
+@pytest.mark.parametrize(
+    "run_kwargs",
+    [
+        {},
+        {"max_workers": 2},
+        {"max_workers": 2, "use_processes": True},
+        {"max_workers": 2, "profiler": StepProfiler()},
+    ],
+)
+def test_step_retries(monkeypatch, run_kwargs) -> None:
+    global _flaky_calls
+    _flaky_calls = 0
+    monkeypatch.setattr(dioptra.task_engine.retry, "RETRY_BASE_DELAY", 0.0)
+
+    desc = {
+        "tasks": {
+            "flaky": {
+                "plugin": "tests.unit.task_engine.test_task_engine.flaky",
+                "outputs": {"value": "integer"},
+            },
+            "check_equal": {
+                "plugin": "tests.unit.task_engine.test_task_engine.check_equal"
+            },
+        },
+        "graph": {
+            "step1": {"task": "flaky", "args": [1], "retries": 1},
+            "step2": {"check_equal": ["$step1", 1]},
+        },
+    }
+
+    with pyplugs_register(flaky, check_equal):
+        dioptra.task_engine.task_engine.run_experiment(desc, {}, **run_kwargs)
+
+        # Without retries, the error propagates
+        _flaky_calls = 0
+        del desc["graph"]["step1"]["retries"]
+
+        with pytest.raises(ConnectionResetError):
+            dioptra.task_engine.task_engine.run_experiment(desc, {}, **run_kwargs)
+
+
+@pytest.mark.parametrize(
+    "task_name, run_kwargs",
+    [
+        ("hang", {}),
+        ("hang", {"max_workers": 2}),
+        ("async_hang", {}),
+        # async_hang plus a coroutine step runs on the event loop
+        ("async_hang", {"max_workers": 2}),
+    ],
+)
+def test_step_timeout(task_name, run_kwargs) -> None:
+    desc = {
+        "tasks": {
+            "hang": {"plugin": "tests.unit.task_engine.test_task_engine.hang"},
+            "async_hang": {
+                "plugin": "tests.unit.task_engine.test_task_engine.async_hang"
+            },
+        },
+        "graph": {"step1": {"task": task_name, "timeout": 0.1}},
+    }
+
+    with pyplugs_register(hang, async_hang):
+        with pytest.raises(StepTimeoutError) as exc_info:
+            dioptra.task_engine.task_engine.run_experiment(desc, {}, **run_kwargs)
+
+    assert exc_info.value.context_step_name == "step1"
@@ -40,6 +40,8 @@ from dioptra.task_engine.type_registry import (
     TYPE_NUMBER,
     TYPE_STRING,
     build_type_registry,
+    clear_type_registry_cache,
+    get_type_registry,
 )
 from dioptra.task_engine.types import (
     SimpleType,
@@ -329,3 +331,45 @@ def test_anonymous_simple_type() -> None:
 
     with pytest.raises(AnonymousSimpleTypeError):
         build_type_registry(types)
+
+
+def test_get_type_registry_cached() -> None:
+    clear_type_registry_cache()
+    types = {"A": None, "B": {"list": "A"}, "C": {"union": ["A", "B"]}}
+
+    type_reg = get_type_registry(types)
+
+    assert type_reg == build_type_registry(types)
+    assert (
+        get_type_registry({"A": None, "B": {"list": "A"}, "C": {"union": ["A", "B"]}})
+        is type_reg
+    )
+    assert get_type_registry({"A": None}) is not type_reg
+
+    with pytest.raises(TypeError):
+        type_reg["D"] = TYPE_ANY  # type: ignore[index]
+
+
+def test_get_type_registry_eviction() -> None:
+    clear_type_registry_cache()
+    types1 = {"A": None}
+    types2 = {"B": None}
+    types3 = {"C": None}
+
+    type_reg1 = get_type_registry(types1, max_cached_registries=2)
+    type_reg2 = get_type_registry(types2, max_cached_registries=2)
+    # Use 1, so 2 becomes least recently used
+    assert get_type_registry(types1, max_cached_registries=2) is type_reg1
+    get_type_registry(types3, max_cached_registries=2)
+
+    assert get_type_registry(types1, max_cached_registries=2) is type_reg1
+    assert get_type_registry(types2, max_cached_registries=2) is not type_reg2
+
+
+def test_get_type_registry_error_not_cached() -> None:
+    clear_type_registry_cache()
+    types = {"A": {"list": "undefined"}}
+
+    for _ in range(2):
+        with pytest.raises(TypeNotFoundError):
+            get_type_registry(types)
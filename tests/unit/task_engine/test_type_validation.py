@@ -24,7 +24,11 @@ from dioptra.task_engine.type_registry import (
     TYPE_NUMBER,
     TYPE_STRING,
 )
-from dioptra.task_engine.type_validation import _infer_type, _types_compatible
+from dioptra.task_engine.type_validation import (
+    _infer_type,
+    _types_compatible,
+    _types_compatible_memo,
+)
 from dioptra.task_engine.types import (
     SimpleType,
     StructuredType,
@@ -617,3 +621,39 @@ def test_hybrid_invocation_type_ok_with_references() -> None:
     }
 
     assert is_valid(experiment_desc)
+
+
+def test_type_inference_large_literal() -> None:
+    point = {"x": 1, "y": 2.5}
+    value = [point] * 500 + [{"x": i, "y": 1.5} for i in range(500)]
+
+    inferred_type = _infer_type(value)
+
+    assert inferred_type.structure.struct_type is StructureType.TUPLE
+    elt_types = inferred_type.structure.struct_def
+    assert len(elt_types) == 1000
+    # Structurally identical element types are shared
+    assert all(elt_type is elt_types[0] for elt_type in elt_types)
+    assert elt_types[0] == StructuredType(
+        TypeStructure(StructureType.MAPPING, {"x": TYPE_INTEGER, "y": TYPE_NUMBER})
+    )
+
+    assert _infer_type(value) is inferred_type
+
+
+def test_types_compatible_memoized() -> None:
+    elt_type = StructuredType(
+        TypeStructure(StructureType.MAPPING, {"x": TYPE_NUMBER, "y": TYPE_NUMBER}),
+        "point",
+    )
+    list_type = StructuredType(TypeStructure(StructureType.LIST, elt_type), "points")
+    inferred_type = _infer_type([{"x": i, "y": 0.5} for i in range(1000)])
+
+    _types_compatible_memo.cache_clear()
+    assert _types_compatible(inferred_type, list_type)
+    misses = _types_compatible_memo.cache_info().misses
+    # One check per distinct type pair, not per element
+    assert misses < 5
+
+    assert _types_compatible(inferred_type, list_type)
+    assert _types_compatible_memo.cache_info().misses == misses
@@ -27,6 +27,8 @@ from dioptra.task_engine.types import (
     StructureType,
     TypeStructure,
     UnionType,
+    intern_structured_type,
+    intern_union_type,
 )
 
 
@@ -512,3 +514,66 @@ def test_union_type_neq() -> None:
     assert union_type1 != union_type_anon1
     assert union_type1 != union_type_anon2
     assert union_type_anon1 != union_type_anon2
+
+
+def test_structure_hash_cached() -> None:
+    struct = TypeStructure(StructureType.TUPLE, [TYPE_INTEGER] * 1000)
+
+    assert hash(struct) == hash(struct)
+    assert hash(struct) == hash(
+        TypeStructure(StructureType.TUPLE, [TYPE_INTEGER] * 1000)
+    )
+
+
+def test_intern_structured_type() -> None:
+    list_type = intern_structured_type(StructureType.LIST, TYPE_INTEGER)
+    tuple_type = intern_structured_type(StructureType.TUPLE, [list_type, TYPE_STRING])
+    map_type = intern_structured_type(
+        StructureType.MAPPING, {"a": tuple_type, "b": TYPE_STRING}
+    )
+
+    assert list_type.name is None
+    assert list_type == StructuredType(TypeStructure(StructureType.LIST, TYPE_INTEGER))
+
+    assert intern_structured_type(StructureType.LIST, TYPE_INTEGER) is list_type
+    assert (
+        intern_structured_type(
+            StructureType.TUPLE,
+            [intern_structured_type(StructureType.LIST, TYPE_INTEGER), TYPE_STRING],
+        )
+        is tuple_type
+    )
+    # Property order doesn't matter for enumerated mappings
+    assert (
+        intern_structured_type(
+            StructureType.MAPPING, {"b": TYPE_STRING, "a": tuple_type}
+        )
+        is map_type
+    )
+
+    assert intern_structured_type(StructureType.LIST, TYPE_STRING) is not list_type
+    assert intern_structured_type(
+        StructureType.MAPPING, [TYPE_STRING, TYPE_INTEGER]
+    ) is not intern_structured_type(StructureType.TUPLE, [TYPE_STRING, TYPE_INTEGER])
+
+
+def test_intern_by_identity() -> None:
+    # Same-named types from different registries may differ; interning must
+    # not conflate them.
+    type1 = SimpleType("A")
+    type2 = SimpleType("A", super_type=TYPE_STRING)
+
+    list_type1 = intern_structured_type(StructureType.LIST, type1)
+    list_type2 = intern_structured_type(StructureType.LIST, type2)
+
+    assert list_type1 is not list_type2
+    assert list_type1.structure.struct_def is type1
+    assert list_type2.structure.struct_def is type2
+
+
+def test_intern_union_type() -> None:
+    union_type = intern_union_type([TYPE_INTEGER, TYPE_STRING])
+
+    assert union_type.name is None
+    assert intern_union_type([TYPE_STRING, TYPE_INTEGER, TYPE_STRING]) is union_type
+    assert intern_union_type([TYPE_STRING]) is not union_type
@@ -14,11 +14,17 @@
 #
 # ACCESS THE FULL CC BY 4.0 LICENSE HERE:
 # https://creativecommons.org/licenses/by/4.0/legalcode
+from pathlib import Path
+
 import pytest
+import yaml
 
+from dioptra.task_engine import util, validation
 from dioptra.task_engine.issues import IssueSeverity
 from dioptra.task_engine.validation import is_valid, validate
 
+EXAMPLES_DIR = Path(__file__).parents[3] / "examples"
+
 
 @pytest.mark.parametrize(
     "experiment_desc",
@@ -217,6 +223,7 @@ def test_invalid_tasks(tasks) -> None:
         {"step1": {"task": "2in", "args": [1, 2]}},
         {"step1": {"task": "2in", "kwargs": {"in1": 1, "in2": 2}}},
         {"step1": {"task": "2in", "args": 1, "kwargs": {"in2": 2}}},
+        {"step1": {"task": "0in", "timeout": 1.5, "retries": 3}},
         {"step1": {"1in": [1]}, "step2": {"2in": [3, 4]}},
     ],
 )
@@ -262,6 +269,11 @@ def test_valid_graph(graph) -> None:
             "step2": {"add": 1},
         },
         {"step1": {"task": "add", "foo": "bar"}},
+        {"step1": {"task": "add", "timeout": 0}},
+        {"step1": {"task": "add", "retries": -1}},
+        {"step1": {"task": "add", "retries": 1.5}},
+        # Only the mixed form may set a timeout
+        {"step1": {"add": [], "timeout": 5}},
         {
             "step1": {
                 "task": "2arg",
@@ -709,3 +721,86 @@ def test_union_dupes():
     # Since this is only a warning, ensure that is_valid() returns True, even
     # though there are issues.
     assert is_valid(experiment_desc)
+
+
+def test_schema_validator_built_once():
+    validator = validation._get_schema_validator()
+
+    assert validation._get_schema_validator() is validator
+    assert validation._get_json_schema.cache_info().misses == 1
+
+
+def test_inline_schema_refs():
+    schema = {
+        "type": "object",
+        "properties": {
+            "leaf": {"$ref": "#/$defs/leaf"},
+            "tree": {"$ref": "#/$defs/tree"},
+        },
+        "$defs": {
+            "leaf": {"type": "string"},
+            "tree": {
+                "oneOf": [
+                    {"$ref": "#/$defs/leaf"},
+                    {"type": "array", "items": {"$ref": "#/$defs/tree"}},
+                ]
+            },
+        },
+    }
+
+    inlined = util.inline_schema_refs(schema)
+
+    assert inlined["properties"]["leaf"] == {"type": "string"}
+    # Recursive definitions must remain references
+    assert inlined["properties"]["tree"] == {"$ref": "#/$defs/tree"}
+    assert inlined["$defs"] == schema["$defs"]
+
+    validator = util.SchemaValidator(schema)
+    assert validator.is_valid({"leaf": "a", "tree": ["b", ["c"]]})
+    assert not validator.is_valid({"tree": ["b", [1]]})
+    assert validator.validate({"leaf": "a"}) == []
+    assert len(validator.validate({"leaf": 1})) == 1
+
+
+@pytest.mark.parametrize(
+    "example_path",
+    [
+        "tensorflow-backdoor-poisoning/src/gen_poison_model.yml",
+        "tensorflow-backdoor-poisoning/src/train_on_run_dataset.yml",
+        "tensorflow-adversarial-patches/src/deploy_patch.yml",
+    ],
+)
+def test_large_example_descriptions(example_path):
+    with (EXAMPLES_DIR / example_path).open("r", encoding="utf-8") as fp:
+        experiment_desc = yaml.safe_load(fp)
+
+    # Repeated validation exercises the cached validator
+    for _ in range(3):
+        assert validate(experiment_desc) == []
+
+
+def test_long_chain():
+    experiment_desc = {
+        "parameters": {"start": 0},
+        "tasks": {
+            "inc": {
+                "plugin": "org.example.inc",
+                "inputs": [{"x": "integer"}],
+                "outputs": {"y": "integer"},
+            }
+        },
+        "graph": {"step0": {"inc": ["$start"]}},
+    }
+
+    for i in range(1, 500):
+        experiment_desc["graph"]["step{}".format(i)] = {
+            "inc": ["$step{}".format(i - 1)]
+        }
+
+    assert validate(experiment_desc) == []
+
+    # Close the chain into a cycle
+    experiment_desc["graph"]["step0"] = {"inc": ["$step499"]}
+    issues = validate(experiment_desc)
+
+    assert len(issues) == 1 and "cycle" in issues[0].message.lower()
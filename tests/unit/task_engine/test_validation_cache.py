@@ -0,0 +1,119 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import pytest
+
+from dioptra.task_engine import validation
+from dioptra.task_engine.validation_cache import (
+    ValidationCache,
+    compute_description_digest,
+)
+
+VALID_DESC = {
+    "tasks": {"add": {"plugin": "org.example.add"}},
+    "graph": {"step1": {"add": []}},
+}
+INVALID_DESC = {"graph": {}}
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+@pytest.fixture
+def validation_calls(monkeypatch):
+    calls = []
+    real_is_valid = validation.is_valid
+
+    def is_valid(experiment_desc):
+        calls.append(experiment_desc)
+        return real_is_valid(experiment_desc)
+
+    monkeypatch.setattr(validation, "is_valid", is_valid)
+
+    return calls
+
+
+def test_digest_ignores_key_order():
+    reordered = {"graph": VALID_DESC["graph"], "tasks": VALID_DESC["tasks"]}
+
+    assert compute_description_digest(VALID_DESC) == compute_description_digest(
+        reordered
+    )
+    assert compute_description_digest(VALID_DESC) != compute_description_digest(
+        INVALID_DESC
+    )
+
+
+def test_digest_distinguishes_key_types():
+    assert compute_description_digest({"parameters": {1: 2}}) != (
+        compute_description_digest({"parameters": {"1": 2}})
+    )
+
+
+def test_mixed_key_types(validation_calls):
+    cache = ValidationCache()
+    valid_desc = {**VALID_DESC, "parameters": {"1": 2}}
+    invalid_desc = {**VALID_DESC, "parameters": {1: 2, "a": 3}}
+
+    assert cache.get_valid_digest(valid_desc) is not None
+    # Not mistaken for the valid description with a string key
+    assert cache.get_valid_digest({**VALID_DESC, "parameters": {1: 2}}) is None
+    # Incomparable keys don't stop the description being checked
+    assert cache.get_valid_digest(invalid_desc) is None
+    assert len(validation_calls) == 3
+
+
+def test_results_cached(validation_calls):
+    cache = ValidationCache()
+
+    digest = cache.get_valid_digest(VALID_DESC)
+    assert digest == compute_description_digest(VALID_DESC)
+    assert cache.get_valid_digest(VALID_DESC) == digest
+
+    assert cache.get_valid_digest(INVALID_DESC) is None
+    assert cache.get_valid_digest(INVALID_DESC) is None
+
+    assert len(validation_calls) == 2
+
+
+def test_results_evicted(validation_calls):
+    cache = ValidationCache(max_entries=1)
+
+    cache.get_valid_digest(VALID_DESC)
+    cache.get_valid_digest(INVALID_DESC)
+    cache.get_valid_digest(VALID_DESC)
+
+    assert len(validation_calls) == 3
+
+
+def test_results_shared_through_redis(validation_calls):
+    redis = FakeRedis()
+
+    digest = ValidationCache().get_valid_digest(VALID_DESC, redis)
+    assert ValidationCache().get_valid_digest(VALID_DESC, redis) == digest
+
+    ValidationCache().get_valid_digest(INVALID_DESC, redis)
+    assert ValidationCache().get_valid_digest(INVALID_DESC, redis) is None
+
+    assert len(validation_calls) == 2
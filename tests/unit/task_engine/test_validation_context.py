@@ -0,0 +1,86 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+from dioptra.task_engine import types
+from dioptra.task_engine.validation_context import ValidationContext
+
+EXPERIMENT_DESC = {
+    "types": {"pair": {"tuple": ["integer", "string"]}},
+    "parameters": {"count": 1},
+    "tasks": {
+        "make": {
+            "plugin": "org.example.make",
+            "inputs": [{"n": "integer"}],
+            "outputs": [{"value": "pair"}, {"size": "integer"}],
+        },
+        "use": {"plugin": "org.example.use", "inputs": [{"value": "pair"}]},
+    },
+    "graph": {
+        "step1": {"make": ["$count"]},
+        "step2": {
+            "task": "use",
+            "args": ["$step1.value"],
+            "dependencies": "step1",
+        },
+        "step3": {"use": {"value": "$step1.value"}, "dependencies": ["step2"]},
+    },
+}
+
+
+def test_step_analysis() -> None:
+    context = ValidationContext(EXPERIMENT_DESC)
+
+    assert context.step_task_names == {
+        "step1": "make",
+        "step2": "use",
+        "step3": "use",
+    }
+    assert context.step_references == {
+        "step1": ["count"],
+        "step2": ["step1.value"],
+        "step3": ["step1.value"],
+    }
+    assert context.step_explicit_dependencies == {
+        "step1": [],
+        "step2": ["step1"],
+        "step3": ["step2"],
+    }
+    assert context.step_dependencies == {
+        "step1": [],
+        "step2": ["step1"],
+        "step3": ["step1", "step2"],
+    }
+    assert context.step_arg_specs["step3"] == ([], {"value": "$step1.value"})
+
+
+def test_task_analysis() -> None:
+    context = ValidationContext(EXPERIMENT_DESC)
+
+    assert context.task_outputs == {
+        "make": [("value", "pair"), ("size", "integer")],
+        "use": [],
+    }
+    assert context.task_output_names["make"] == {"value", "size"}
+    assert list(context.task_input_maps["use"]) == ["value"]
+    assert "pair" in context.type_names and "integer" in context.type_names
+    assert isinstance(context.type_registry["pair"], types.StructuredType)
+
+
+def test_structures_built_once() -> None:
+    context = ValidationContext(EXPERIMENT_DESC)
+
+    assert context.type_registry is context.type_registry
+    assert context.step_references is context.step_references
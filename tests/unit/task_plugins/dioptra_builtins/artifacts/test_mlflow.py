@@ -16,6 +16,7 @@
 # https://creativecommons.org/licenses/by/4.0/legalcode
 from __future__ import annotations
 
+import asyncio
 import uuid
 from copy import deepcopy
 from pathlib import Path
@@ -252,3 +253,60 @@ def test_upload_file_as_artifact(mlflow_client, working_dir, file) -> None:
     fp = open(Path(working_dir) / file, "w+")
     fp.close()
     upload_file_as_artifact(Path(working_dir) / file)
+
+
+def test_download_all_artifacts_in_run_async(mlflow_client) -> None:
+    from dioptra_builtins.artifacts.mlflow import (
+        download_all_artifacts_in_run_async,
+    )
+
+    dst_path = asyncio.run(
+        download_all_artifacts_in_run_async("ex123", "path/to/file", "path/to/file")
+    )
+    assert isinstance(dst_path, str)
+    assert Path("path/to/file") == Path(dst_path).relative_to(Path.cwd())
+
+
+def test_upload_data_frame_artifact_async(mlflow_client, tmp_path, capsys) -> None:
+    from dioptra_builtins.artifacts.mlflow import upload_data_frame_artifact_async
+
+    data_frame = pd.DataFrame([["books", 20], ["frogs", -3]], columns=["a", "b"])
+
+    asyncio.run(
+        upload_data_frame_artifact_async(data_frame, "pddf.csv", "csv", None, tmp_path)
+    )
+
+    assert (tmp_path / "pddf.csv").is_file()
+    assert "REACHED" in capsys.readouterr().out
+
+
+def test_upload_directory_as_tarball_artifact_async(
+    mlflow_client, tmp_path, capsys
+) -> None:
+    from dioptra_builtins.artifacts.mlflow import (
+        upload_directory_as_tarball_artifact_async,
+    )
+
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    (source_dir / "myfile.py").touch()
+
+    asyncio.run(
+        upload_directory_as_tarball_artifact_async(
+            source_dir, "workflow.tar.gz", "w:gz", tmp_path
+        )
+    )
+
+    assert (tmp_path / "workflow.tar.gz").is_file()
+    assert "REACHED" in capsys.readouterr().out
+
+
+def test_upload_file_as_artifact_async(mlflow_client, tmp_path, capsys) -> None:
+    from dioptra_builtins.artifacts.mlflow import upload_file_as_artifact_async
+
+    artifact_path = tmp_path / "this.py"
+    artifact_path.touch()
+
+    asyncio.run(upload_file_as_artifact_async(artifact_path))
+
+    assert "REACHED" in capsys.readouterr().out
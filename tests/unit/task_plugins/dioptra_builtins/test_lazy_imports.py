@@ -0,0 +1,63 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+from __future__ import annotations
+
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+TASK_PLUGINS_DIR = (
+    Path(__file__).parent / ".." / ".." / ".." / ".." / "task-plugins"
+).resolve()
+HEAVY_PACKAGES = ["art", "tensorflow"]
+PLUGIN_MODULES = [
+    "dioptra_builtins.attacks.fgm",
+    "dioptra_builtins.backend_configs.tensorflow",
+    "dioptra_builtins.data.tensorflow",
+    "dioptra_builtins.estimators.keras_classifiers",
+    "dioptra_builtins.registry.art",
+    "dioptra_builtins.registry.mlflow",
+    "dioptra_builtins.tracking.mlflow",
+]
+
+
+def test_builtins_import_without_heavy_packages(tmp_path) -> None:
+    # Empty stand-ins for the heavy packages record whether anything imports them.
+    # Importing the builtins in a fresh interpreter keeps the check independent of
+    # whatever the rest of the test session has already imported.
+    for package in HEAVY_PACKAGES:
+        (tmp_path / package).mkdir()
+        (tmp_path / package / "__init__.py").touch()
+
+    script = textwrap.dedent(
+        f"""
+        import importlib, sys
+
+        sys.path[:0] = [{str(tmp_path)!r}, {str(TASK_PLUGINS_DIR)!r}]
+
+        for name in {PLUGIN_MODULES!r}:
+            importlib.import_module(name)
+
+        print(",".join(x for x in {HEAVY_PACKAGES!r} if x in sys.modules))
+        """
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, check=True, text=True
+    )
+
+    assert result.stdout.strip() == ""
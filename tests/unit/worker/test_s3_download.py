@@ -0,0 +1,245 @@
+# This Software (Dioptra) is being made available as a public service by the
+# National Institute of Standards and Technology (NIST), an Agency of the United
+# States Department of Commerce. This software was developed in part by employees of
+# NIST and in part by NIST contractors. Copyright in portions of this software that
+# were developed by NIST contractors has been licensed or assigned to NIST. Pursuant
+# to Title 17 United States Code Section 105, works of NIST employees are not
+# subject to copyright protection in the United States. However, NIST may hold
+# international copyright in software created by its employees and domestic
+# copyright (or licensing rights) in portions of software that were assigned or
+# licensed to NIST. To the extent that NIST holds copyright in this software, it is
+# being made available under the Creative Commons Attribution 4.0 International
+# license (CC BY 4.0). The disclaimers of the CC BY 4.0 license apply to all parts
+# of the software developed or licensed by NIST.
+#
+# ACCESS THE FULL CC BY 4.0 LICENSE HERE:
+# https://creativecommons.org/licenses/by/4.0/legalcode
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+from dioptra.worker.s3_download import SYNC_MANIFEST_FILENAME, s3_snapshot, s3_sync
+
+
+class _FakeS3:
+    """A minimal S3 client with one bucket, which counts downloads"""
+
+    def __init__(self, objects: dict[str, bytes]) -> None:
+        self.objects = objects
+        self.downloaded: list[str] = []
+
+    def list_objects_v2(
+        self, Bucket: str, Prefix: str, ContinuationToken: Optional[str] = None
+    ) -> dict[str, Any]:
+        return {
+            "IsTruncated": False,
+            "Contents": [
+                {
+                    "Key": key,
+                    "ETag": '"' + hashlib.md5(content).hexdigest() + '"',
+                    "Size": len(content),
+                }
+                for key, content in self.objects.items()
+                if key.startswith(Prefix)
+            ],
+        }
+
+    def download_file(
+        self, bucket: str, key: str, filename: str, Config: Any = None
+    ) -> None:
+        self.downloaded.append(key)
+        Path(filename).write_bytes(self.objects[key])
+
+
+@pytest.fixture
+def s3() -> _FakeS3:
+    return _FakeS3(
+        {
+            "plugins/a/file1.py": b"1",
+            "plugins/a/file2.py": b"2",
+            "plugins/b/file3.py": b"3",
+            "custom/file4.py": b"4",
+        }
+    )
+
+
+def _sync(s3: _FakeS3, dest_dir: Path, max_workers: Optional[int] = None) -> None:
+    s3_sync(
+        s3,
+        dest_dir,
+        True,
+        "s3://bucket/plugins",
+        "s3://bucket/custom",
+        max_workers=max_workers,
+    )
+
+
+def _read_tree(dest_dir: Path) -> dict[str, bytes]:
+    return {
+        path.relative_to(dest_dir).as_posix(): path.read_bytes()
+        for path in dest_dir.rglob("*")
+        if path.is_file() and path.name != SYNC_MANIFEST_FILENAME
+    }
+
+
+def test_s3_sync(s3, tmp_path) -> None:
+    dest_dir = tmp_path / "plugins"
+    dest_dir.mkdir()
+    (dest_dir / "stale.py").write_bytes(b"stale")
+
+    _sync(s3, dest_dir)
+
+    assert len(s3.downloaded) == 4
+    assert _read_tree(dest_dir) == s3.objects
+    assert list(tmp_path.iterdir()) == [dest_dir]
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_s3_sync_incremental(s3, tmp_path, max_workers) -> None:
+    dest_dir = tmp_path / "plugins"
+    _sync(s3, dest_dir, max_workers)
+
+    s3.downloaded.clear()
+    s3.objects["plugins/a/file2.py"] = b"22"
+    s3.objects["plugins/b/file5.py"] = b"5"
+    del s3.objects["custom/file4.py"]
+
+    # A local modification is undone
+    (dest_dir / "plugins/b/file3.py").write_bytes(b"33")
+
+    _sync(s3, dest_dir, max_workers)
+
+    assert sorted(s3.downloaded) == [
+        "plugins/a/file2.py",
+        "plugins/b/file3.py",
+        "plugins/b/file5.py",
+    ]
+    assert _read_tree(dest_dir) == s3.objects
+
+    s3.downloaded.clear()
+    _sync(s3, dest_dir, max_workers)
+
+    assert s3.downloaded == []
+    assert _read_tree(dest_dir) == s3.objects
+
+
+def test_s3_sync_flatten(s3, tmp_path) -> None:
+    s3_sync(s3, tmp_path / "plugins", False, "s3://bucket/plugins")
+
+    assert _read_tree(tmp_path / "plugins") == {
+        "file1.py": b"1",
+        "file2.py": b"2",
+        "file3.py": b"3",
+    }
+
+
+def _snapshot(s3: _FakeS3, snapshot_root: Path, **kwargs: Any) -> Path:
+    with s3_snapshot(
+        s3,
+        snapshot_root,
+        True,
+        "s3://bucket/plugins",
+        "s3://bucket/custom",
+        **kwargs,
+    ) as snapshot_dir:
+        return snapshot_dir
+
+
+def _list_snapshots(snapshot_root: Path) -> list[Path]:
+    return [path for path in snapshot_root.iterdir() if not path.name.startswith(".")]
+
+
+def test_s3_snapshot(s3, tmp_path) -> None:
+    finalized = []
+
+    def finalize(snapshot_dir: Path) -> None:
+        (snapshot_dir / "derived.txt").write_text("derived")
+        finalized.append(snapshot_dir)
+
+    snapshot_dir = _snapshot(s3, tmp_path, finalize=finalize)
+
+    assert len(s3.downloaded) == 4
+    assert snapshot_dir.parent == tmp_path
+    assert (snapshot_dir / "derived.txt").read_text() == "derived"
+    assert finalized and finalized[0] != snapshot_dir
+    del s3.downloaded[:], finalized[:]
+
+    # Unchanged objects: the snapshot is reused as is.
+    assert _snapshot(s3, tmp_path, finalize=finalize) == snapshot_dir
+    assert s3.downloaded == []
+    assert finalized == []
+
+    # A changed object: a new snapshot, which shares unchanged files with the
+    # old one.
+    s3.objects["custom/file4.py"] = b"44"
+    new_snapshot_dir = _snapshot(s3, tmp_path)
+
+    assert new_snapshot_dir != snapshot_dir
+    assert s3.downloaded == ["custom/file4.py"]
+    assert _read_tree(snapshot_dir)["custom/file4.py"] == b"4"
+    assert {
+        path: content
+        for path, content in _read_tree(new_snapshot_dir).items()
+        if path != "derived.txt"
+    } == s3.objects
+    assert (new_snapshot_dir / "plugins/a/file1.py").samefile(
+        snapshot_dir / "plugins/a/file1.py"
+    )
+
+
+def test_s3_snapshot_prune(s3, tmp_path) -> None:
+    snapshot_dir = _snapshot(s3, tmp_path, max_snapshots=1)
+
+    s3.objects["custom/file4.py"] = b"44"
+    new_snapshot_dir = _snapshot(s3, tmp_path, max_snapshots=1)
+
+    assert _list_snapshots(tmp_path) == [new_snapshot_dir]
+    assert not snapshot_dir.exists()
+    # Lease files of pruned snapshots are deleted with them
+    assert {path.name for path in tmp_path.iterdir()} == {
+        new_snapshot_dir.name,
+        ".lease-" + new_snapshot_dir.name,
+    }
+
+
+def test_s3_snapshot_prune_leased(s3, tmp_path) -> None:
+    with s3_snapshot(
+        s3, tmp_path, True, "s3://bucket/plugins", "s3://bucket/custom"
+    ) as snapshot_dir:
+        # Another job needs a new snapshot while this one is in use
+        s3.objects["custom/file4.py"] = b"44"
+        new_snapshot_dir = _snapshot(s3, tmp_path, max_snapshots=1)
+
+        assert snapshot_dir.is_dir()
+
+    # Once released, it may be pruned
+    s3.objects["custom/file4.py"] = b"444"
+    newest_snapshot_dir = _snapshot(s3, tmp_path, max_snapshots=1)
+
+    assert _list_snapshots(tmp_path) == [newest_snapshot_dir]
+    assert not snapshot_dir.exists()
+    assert not new_snapshot_dir.exists()
+
+
+def test_s3_snapshot_reference_deleted(s3, tmp_path, monkeypatch) -> None:
+    snapshot_dir = _snapshot(s3, tmp_path)
+    s3.objects["custom/file4.py"] = b"44"
+    del s3.downloaded[:]
+
+    # Files of the snapshot being reused vanish after they were checked
+    def vanish(src: Path, dest: Path) -> None:
+        raise FileNotFoundError(src)
+
+    monkeypatch.setattr(os, "link", vanish)
+    monkeypatch.setattr(shutil, "copy2", vanish)
+
+    new_snapshot_dir = _snapshot(s3, tmp_path)
+
+    # They're downloaded instead
+    assert sorted(s3.downloaded) == sorted(s3.objects)
+    assert _read_tree(new_snapshot_dir) == s3.objects
+    assert snapshot_dir != new_snapshot_dir